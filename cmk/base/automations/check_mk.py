@@ -1185,6 +1185,7 @@ class AutomationRenameHosts(Automation):
         # HW/SW Inventory
         if self._rename_host_file(var_dir + "/inventory", oldname, newname):
             self._rename_host_file(var_dir + "/inventory", oldname + ".gz", newname + ".gz")
+            self._rename_host_file(var_dir + "/inventory", oldname + ".bin", newname + ".bin")
             actions.append("inv")
 
         if self._rename_host_dir(var_dir + "/inventory_archive", oldname, newname):
@@ -1682,6 +1683,7 @@ class AutomationDeleteHosts(ABCDeleteHosts, Automation):
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
             f"{var_dir}/inventory/{hostname}.gz",
+            f"{var_dir}/inventory/{hostname}.bin",
             f"{var_dir}/agent_deployment/{hostname}",
         ]
 
@@ -1723,6 +1725,7 @@ class AutomationDeleteHostsKnownRemote(ABCDeleteHosts, Automation):
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
             f"{var_dir}/inventory/{hostname}.gz",
+            f"{var_dir}/inventory/{hostname}.bin",
         ]
 
     def _delete_host_files(self, hostname: HostName) -> None:
@@ -2296,6 +2299,7 @@ class AutomationDiagHost(Automation):
             on_error=OnError.RAISE,
             missing_sys_description=config_cache.missing_sys_description(host_name),
             oid_cache_dir=oid_cache_dir,
+            oid_cache_ttl=config.snmp_scan_oid_cache_ttl,
         )
         for source in sources.make_sources(
             host_name,
@@ -2761,6 +2765,7 @@ class AutomationGetAgentOutput(Automation):
             snmp_scan_config = SNMPScanConfig(
                 on_error=OnError.RAISE,
                 oid_cache_dir=Path(cmk.utils.paths.snmp_scan_cache_dir),
+                oid_cache_ttl=config.snmp_scan_oid_cache_ttl,
                 missing_sys_description=config_cache.missing_sys_description(hostname),
             )
 
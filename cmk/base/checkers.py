@@ -38,7 +38,15 @@ from cmk.utils.timeperiod import timeperiod_active
 
 from cmk.snmplib import SNMPBackendEnum, SNMPRawData
 
-from cmk.fetchers import Fetcher, get_raw_data, Mode, SNMPScanConfig, TLSConfig
+from cmk.fetchers import (
+    Fetcher,
+    fetch_all_tcp,
+    get_raw_data,
+    Mode,
+    SNMPScanConfig,
+    TCPFetcher,
+    TLSConfig,
+)
 from cmk.fetchers.config import make_persisted_section_dir
 from cmk.fetchers.filecache import FileCache, FileCacheOptions, MaxAge
 
@@ -75,6 +83,7 @@ import cmk.base.api.agent_based.register._config as _api
 from cmk.base.api.agent_based import cluster_mode, value_store
 from cmk.base.api.agent_based.plugin_classes import CheckPlugin as CheckPluginAPI
 from cmk.base.api.agent_based.value_store import ValueStoreManager
+from cmk.base import config
 from cmk.base.config import (
     ConfigCache,
     get_plugin_parameters,
@@ -129,15 +138,80 @@ def _fetch_all(
     ]
 ]:
     console.verbose(f"{tty.yellow}+{tty.normal} FETCHING DATA")
-    return [
-        _do_fetch(
+    prepared = [
+        (
             source.source_info(),
             source.file_cache(simulation=simulation, file_cache_options=file_cache_options),
             source.fetcher(),
-            mode=mode,
         )
         for source in sources
     ]
+    fetched = _fetch_agents_concurrently(prepared, mode=mode)
+    return [
+        fetched[index] if index in fetched else _do_fetch(*prepared[index], mode=mode)
+        for index in range(len(prepared))
+    ]
+
+
+def _fetch_agents_concurrently(
+    prepared: Sequence[tuple[SourceInfo, FileCache, Fetcher]], *, mode: Mode
+) -> Mapping[
+    int,
+    tuple[
+        SourceInfo,
+        result.Result[AgentRawData | SNMPRawData, Exception],
+        Snapshot,
+    ],
+]:
+    """Fetch the agents of several hosts (e.g. the nodes of a cluster) at once
+
+    Only the agents without usable cache files are fetched, all other sources
+    are left to _do_fetch().  The CPU time of the batch is accounted to its first
+    source.
+    """
+    uncached = {
+        index: fetcher
+        for index, (_source_info, file_cache, fetcher) in enumerate(prepared)
+        if isinstance(fetcher, TCPFetcher)
+        and not file_cache.simulation
+        and not file_cache.use_only_cache
+        and not _has_cached_data(file_cache, mode)
+    }
+    if len(uncached) < 2:
+        return {}
+
+    console.debug(f"  Sources: {', '.join(str(prepared[index][0]) for index in uncached)}")
+    with CPUTracker(console.debug) as tracker:
+        raw_data = fetch_all_tcp(list(uncached.values()))
+
+    fetched: dict[
+        int,
+        tuple[
+            SourceInfo,
+            result.Result[AgentRawData | SNMPRawData, Exception],
+            Snapshot,
+        ],
+    ] = {}
+    for index, data in zip(uncached, raw_data):
+        source_info, file_cache, _fetcher = prepared[index]
+        try:
+            data.map(partial(file_cache.write, mode=mode))
+        except MKTimeout:
+            raise
+        except Exception as exc:
+            data = result.Error(exc)
+        fetched[index] = (source_info, data, Snapshot.null() if fetched else tracker.duration)
+    return fetched
+
+
+def _has_cached_data(file_cache: FileCache, mode: Mode) -> bool:
+    try:
+        return file_cache.read(mode) is not None
+    except MKTimeout:
+        raise
+    except Exception:
+        # Leave the error to _do_fetch()
+        return True
 
 
 def _do_fetch(
@@ -409,6 +483,7 @@ class CMKFetcher:
                             ),
                             on_error=self.on_error if not is_cluster else OnError.RAISE,
                             oid_cache_dir=Path(cmk.utils.paths.snmp_scan_cache_dir),
+                            oid_cache_ttl=config.snmp_scan_oid_cache_ttl,
                         ),
                         selected_sections=(
                             self.selected_sections if not is_cluster else NO_SELECTION
@@ -600,7 +675,7 @@ def _compute_final_check_parameters(
             predictions=make_updated_predictions(
                 prediction_store,
                 partial(
-                    livestatus.get_rrd_data,
+                    livestatus.get_rrd_data_batch,
                     livestatus.LocalConnection(),
                     host_name,
                     service.description,
@@ -212,30 +212,44 @@ def _aggregate_check_table_services(
     skip_ignored: bool,
     filter_mode: FilterMode,
 ) -> Iterable[ConfiguredService]:
-    sfilter = _ServiceFilter(
-        host_name,
-        config_cache=config_cache,
-        mode=filter_mode,
-        skip_ignored=skip_ignored,
-    )
-
     # process all entries that are specific to the host
     # in search (single host) or that might match the host.
-    if not config_cache.is_ping_host(host_name):
-        yield from (s for s in config_cache.get_autochecks_of(host_name) if sfilter.keep(s))
+    services: list[ConfiguredService] = (
+        []
+        if config_cache.is_ping_host(host_name)
+        else list(config_cache.get_autochecks_of(host_name))
+    )
 
     # Now add checks a cluster might receive from its nodes
     if host_name in config_cache.hosts_config.clusters:
-        yield from (s for s in _get_clustered_services(config_cache, host_name) if sfilter.keep(s))
+        services.extend(_get_clustered_services(config_cache, host_name))
 
-    yield from (
-        svc
-        for _, svc in config_cache.enforced_services_table(host_name).values()
-        if sfilter.keep(svc)
-    )
+    services.extend(svc for _, svc in config_cache.enforced_services_table(host_name).values())
 
     # NOTE: as far as I can see, we only have two cases with the filter mode.
     # Either we compute services to check, or we compute services for fetching.
+    services_from_nodes = (
+        list(_get_services_from_cluster_nodes(config_cache, host_name))
+        if filter_mode is FilterMode.INCLUDE_CLUSTERED
+        else []
+    )
+
+    sfilter = _ServiceFilter(
+        host_name,
+        config_cache=config_cache,
+        mode=filter_mode,
+        skip_ignored=skip_ignored,
+        # Match the ignored services rules for all services of the host at once
+        ignored=(
+            config_cache.ignored_services_of(
+                host_name, {s.description for s in itertools.chain(services, services_from_nodes)}
+            )
+            if skip_ignored
+            else frozenset()
+        ),
+    )
+    yield from (s for s in services if sfilter.keep(s))
+
     if filter_mode is not FilterMode.INCLUDE_CLUSTERED:
         return
     # Now we are in the latter case.
@@ -255,7 +269,7 @@ def _aggregate_check_table_services(
     yield from (
         s
         # ... this adds it for node2
-        for s in _get_services_from_cluster_nodes(config_cache, host_name)
+        for s in services_from_nodes
         if sfilter.keep(s)
         # ... and this condition prevents it from being added on node3
         # 'not is_mine' means: would it be there, it would be clustered.
@@ -271,6 +285,7 @@ class _ServiceFilter:
         config_cache: ConfigCache,
         mode: FilterMode,
         skip_ignored: bool,
+        ignored: Container[ServiceName],
     ) -> None:
         """Filter services for a specific host
 
@@ -281,11 +296,12 @@ class _ServiceFilter:
         self._config_cache = config_cache
         self._mode = mode
         self._skip_ignored = skip_ignored
+        self._ignored = ignored
 
     def keep(self, service: ConfiguredService) -> bool:
         if self._skip_ignored and (
             self._config_cache.check_plugin_ignored(self._host_name, service.check_plugin_name)
-            or self._config_cache.service_ignored(self._host_name, service.description)
+            or service.description in self._ignored
         ):
             return False
 
@@ -1908,6 +1924,9 @@ class ConfigCache:
         tag_to_group_map = ConfigCache.get_tag_to_group_map()
         self._collect_hosttags(tag_to_group_map)
 
+        if (previous_matcher := getattr(self, "ruleset_matcher", None)) is not None:
+            # The persisted matching results of the replaced matcher are not used anymore
+            previous_matcher.close_match_store()
         self.ruleset_matcher = ruleset_matcher.RulesetMatcher(
             host_tags=host_tags,
             host_paths=self._host_paths,
@@ -1921,6 +1940,8 @@ class ConfigCache:
             nodes_of=self._nodes_cache,
             all_configured_hosts=list(set(self.hosts_config)),
             debug_matching_stats=ruleset_matching_stats,
+            host_index=ruleset_matching_host_index,
+            cache_size=ruleset_matching_cache_size,
         )
 
         self.ruleset_matcher.ruleset_optimizer.set_all_processed_hosts(
@@ -1930,6 +1951,8 @@ class ConfigCache:
                 if self.is_active(hn) and self.is_online(hn)
             }
         )
+        if ruleset_matching_store:
+            self.ruleset_matcher.load_match_store(cmk.utils.paths.ruleset_matching_store_dir)
 
         return self
 
@@ -3098,12 +3121,16 @@ class ConfigCache:
                 return SNMPBackendEnum.INLINE
             if host_backend == "classic":
                 return SNMPBackendEnum.CLASSIC
+            if host_backend == "bulk":
+                return SNMPBackendEnum.BULK
             raise MKGeneralException(f"Bad Host SNMP Backend configuration: {host_backend}")
 
         if with_inline_snmp and snmp_backend_default == "inline":
             return SNMPBackendEnum.INLINE
         if snmp_backend_default == "classic":
             return SNMPBackendEnum.CLASSIC
+        if snmp_backend_default == "bulk":
+            return SNMPBackendEnum.BULK
         # Note: in the above case we raise here.
         # I am not sure if this different behavior is intentional.
         return SNMPBackendEnum.CLASSIC
@@ -3739,6 +3766,19 @@ class ConfigCache:
     def service_ignored(self, host_name: HostName, description: ServiceName) -> bool:
         return self.ruleset_matcher.get_service_bool_value(host_name, description, ignored_services)
 
+    def ignored_services_of(
+        self, host_name: HostName, descriptions: Iterable[ServiceName]
+    ) -> set[ServiceName]:
+        """The services of the host which are ignored, like service_ignored() for each of them"""
+        return {
+            description
+            for description, values in self.ruleset_matcher.get_service_ruleset_values_of_services(
+                host_name, descriptions, ignored_services
+            ).items()
+            # See `get_service_bool_value()`: The first matching rule decides
+            if values and values[0]
+        }
+
     def check_plugin_ignored(
         self,
         host_name: HostName,
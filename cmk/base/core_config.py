@@ -75,6 +75,10 @@ class MonitoringCore(abc.ABC):
             config_cache.ruleset_matcher.persist_matching_stats(
                 "tmp/ruleset_matching_stats", config.get_ruleset_id_mapping()
             )
+        if config.ruleset_matching_store:
+            config_cache.ruleset_matcher.save_match_store(
+                cmk.utils.paths.ruleset_matching_store_dir
+            )
 
     @abc.abstractmethod
     def _create_config(
@@ -83,9 +83,12 @@ http_proxies: dict[str, dict[str, str]] = {}
 # SNMP communities and encoding
 
 # Global config for SNMP Backend
-snmp_backend_default: Literal["inline", "classic"] = "inline"
+snmp_backend_default: Literal["inline", "classic", "bulk"] = "inline"
 # Deprecated: Replaced by snmp_backend_hosts
 use_inline_snmp: bool = True
+# Seconds the OIDs fetched by the SNMP scan are reused by later scans of the same host.
+# 0 fetches them again on every scan.
+snmp_scan_oid_cache_ttl: int = 3600
 
 # Ruleset to enable specific SNMP Backend for each host.
 snmp_backend_hosts: list[RuleSpec[object]] = []
@@ -354,3 +357,9 @@ config_storage_format: Literal["standard", "raw", "pickle"] = "pickle"
 automatic_host_removal: list[RuleSpec[object]] = []
 
 ruleset_matching_stats = False
+# Evaluate the host conditions of rules with a bitmap index over all hosts (large setups)
+ruleset_matching_host_index = False
+# Share the host matching results between all processes working on the same configuration
+ruleset_matching_store = False
+# Maximum number of entries of each service matching cache, None for no limit
+ruleset_matching_cache_size: int | None = None
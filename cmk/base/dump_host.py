@@ -38,7 +38,7 @@ from cmk.checkengine.parameters import TimespecificParameters
 from cmk.checkengine.parser import NO_SELECTION
 
 import cmk.base.core
-from cmk.base import sources
+from cmk.base import config, sources
 from cmk.base.config import (
     ConfigCache,
     ConfiguredIPLookup,
@@ -238,6 +238,7 @@ def dump_host(
                     on_error=OnError.RAISE,
                     missing_sys_description=config_cache.missing_sys_description(hostname),
                     oid_cache_dir=oid_cache_dir,
+                    oid_cache_ttl=config.snmp_scan_oid_cache_ttl,
                 ),
                 selected_sections=NO_SELECTION,
                 backend_override=None,
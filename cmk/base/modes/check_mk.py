@@ -178,6 +178,8 @@ def parse_snmp_backend(backend: object) -> SNMPBackendEnum | None:
             return SNMPBackendEnum.CLASSIC
         case "stored-walk":
             return SNMPBackendEnum.STORED_WALK
+        case "bulk":
+            return SNMPBackendEnum.BULK
         case _:
             raise ValueError(backend)
 
@@ -312,7 +314,7 @@ _SNMP_BACKEND_OPTION: Final = Option(
     long_option="snmp-backend",
     short_help="Override default SNMP backend",
     argument=True,
-    argument_descr="inline|classic|stored-walk",
+    argument_descr="inline|classic|stored-walk|bulk",
 )
 
 # .
@@ -574,6 +576,7 @@ def mode_dump_agent(options: Mapping[str, object], hostname: HostName) -> None:
             on_error=OnError.RAISE,
             missing_sys_description=config_cache.missing_sys_description(hostname),
             oid_cache_dir=Path(cmk.utils.paths.snmp_scan_cache_dir),
+            oid_cache_ttl=config.snmp_scan_oid_cache_ttl,
         )
 
         output = []
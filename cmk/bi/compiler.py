@@ -80,6 +80,16 @@ class BICompiler:
         finally:
             self._load_compiled_aggregations()
 
+    def compilation_generation(self) -> tuple[float, ...]:
+        """Changes whenever the compiled aggregations or the frozen branches change"""
+        generation = []
+        for path in (self._path_compilation_timestamp, frozen_aggregations_dir):
+            try:
+                generation.append(path.stat().st_mtime)
+            except FileNotFoundError:
+                generation.append(0.0)
+        return tuple(generation)
+
     def get_frozen_aggr_id(self, frozen_info: FrozenBIInfo) -> str:
         return f"frozen_{frozen_info.based_on_aggregation_id}_{frozen_info.based_on_branch_title}"
 
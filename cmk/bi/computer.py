@@ -4,14 +4,23 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import copy
-from collections.abc import Iterator
+import threading
+from collections.abc import Hashable, Iterator
 from typing import NamedTuple
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.servicename import ServiceName
 
 from cmk.bi.data_fetcher import BIStatusFetcher
-from cmk.bi.lib import NodeResultBundle, RequiredBIElement
+from cmk.bi.lib import (
+    ABCBICompiledNode,
+    ABCBIStatusFetcher,
+    BIAggregationComputationOptions,
+    BIHostSpec,
+    BIStatusInfo,
+    NodeResultBundle,
+    RequiredBIElement,
+)
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule
 from cmk.ccc.plugin_registry import Registry
 
@@ -52,15 +61,167 @@ class BIComputerPostprocessingRegistry(Registry[ABCPostprocessComputeResult]):
 
 bi_computer_postprocessing_registry = BIComputerPostprocessingRegistry()
 
+# Identifies a node: The aggregation ID and the title of the branch, followed by the
+# positions of the node and the rules above it among their siblings
+_NodeKey = tuple
+
+
+def _element_state(states: BIStatusInfo, element: RequiredBIElement) -> object:
+    """The part of the status data the leaf of an element is computed from"""
+    if (row := states.get(BIHostSpec(element.site_id, element.host_name))) is None:
+        return None
+    if element.service_description is None:
+        return row._replace(services_with_fullstate={}, remaining_row_keys={})
+    return (
+        row.scheduled_downtime_depth,
+        row.services_with_fullstate.get(element.service_description),
+    )
+
+
+class BIResultCache:
+    """Results of the branch nodes, reused as long as their states do not change
+
+    A reverse index maps each element (site, host, service) to the nodes depending on
+    it: Its leaves and all the rules above them. When the state of an element changes,
+    only these nodes are computed again, all other subtrees are taken from the cache.
+
+    The cache may outlive the compiled aggregations it has been filled with, the nodes
+    are identified by their position within the branch. All results are dropped once
+    the generation of the compiled aggregations changes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._generation: Hashable = None
+        self._results: dict[_NodeKey, NodeResultBundle | None] = {}
+        self._dependents: dict[RequiredBIElement, set[_NodeKey]] = {}
+        self._indexed_branches: set[_NodeKey] = set()
+        self._element_states: dict[RequiredBIElement, object] = {}
+
+    def set_generation(self, generation: Hashable) -> None:
+        with self._lock:
+            if generation == self._generation:
+                return
+            self._results.clear()
+            self._dependents.clear()
+            self._indexed_branches.clear()
+            self._element_states.clear()
+            self._generation = generation
+
+    def compute_branches(
+        self,
+        compiled_aggregation: BICompiledAggregation,
+        branches: list[BICompiledRule],
+        bi_status_fetcher: ABCBIStatusFetcher,
+    ) -> list[NodeResultBundle]:
+        """Same as BICompiledAggregation.compute_branches, computing only the changed nodes"""
+        computation_options = compiled_aggregation.computation_options
+        assumed_state_ids = set(bi_status_fetcher.assumed_states)
+        aggregation_results = []
+        with self._lock:
+            for bi_compiled_branch in branches:
+                key = (compiled_aggregation.id, bi_compiled_branch.properties.title)
+                required_elements = bi_compiled_branch.required_elements()
+                self._index_branch(key, bi_compiled_branch)
+                self._invalidate(required_elements, bi_status_fetcher.states)
+                if assumed_state_ids.intersection(required_elements):
+                    # Assumptions are made per user, such results are not cached
+                    result = bi_compiled_branch.compute(
+                        computation_options, bi_status_fetcher, use_assumed=True
+                    )
+                else:
+                    result = self._compute_node(
+                        bi_compiled_branch, key, computation_options, bi_status_fetcher
+                    )
+                if result is not None:
+                    aggregation_results.append(result)
+        return aggregation_results
+
+    def _index_branch(self, key: _NodeKey, bi_compiled_branch: BICompiledRule) -> None:
+        if key in self._indexed_branches:
+            return
+        self._indexed_branches.add(key)
+        self._index_node(key, bi_compiled_branch)
+
+    def _index_node(self, key: _NodeKey, node: ABCBICompiledNode) -> None:
+        if isinstance(node, BICompiledRule):
+            for nr, sub_node in enumerate(node.nodes):
+                self._index_node((*key, nr), sub_node)
+            return
+        for element in node.required_elements():
+            # The leaf itself and all the rules up to the branch
+            self._dependents.setdefault(element, set()).update(
+                key[:length] for length in range(2, len(key) + 1)
+            )
+
+    def _invalidate(self, elements: set[RequiredBIElement], states: BIStatusInfo) -> None:
+        for element in elements:
+            state = _element_state(states, element)
+            if element in self._element_states and self._element_states[element] == state:
+                continue
+            self._element_states[element] = state
+            for key in self._dependents.get(element, ()):
+                self._results.pop(key, None)
+
+    def _compute_node(
+        self,
+        node: ABCBICompiledNode,
+        key: _NodeKey,
+        computation_options: BIAggregationComputationOptions,
+        bi_status_fetcher: ABCBIStatusFetcher,
+    ) -> NodeResultBundle | None:
+        if key in self._results:
+            return self._reuse(node, key)
+
+        if isinstance(node, BICompiledRule):
+            result = node.bundle_results(
+                [
+                    bundle
+                    for nr, sub_node in enumerate(node.nodes)
+                    if (
+                        bundle := self._compute_node(
+                            sub_node, (*key, nr), computation_options, bi_status_fetcher
+                        )
+                    )
+                    is not None
+                ],
+                computation_options,
+            )
+        else:
+            result = node.compute(computation_options, bi_status_fetcher)
+        self._results[key] = result
+        return result
+
+    def _reuse(self, node: ABCBICompiledNode, key: _NodeKey) -> NodeResultBundle | None:
+        """The cached result, referring to the given node and its sub nodes"""
+        result = self._results[key]
+        if result is None or result.instance is node:
+            return result
+
+        # The result has been computed with the compiled aggregations of an earlier request
+        nested_results = []
+        if isinstance(node, BICompiledRule):
+            nested_results = [
+                bundle
+                for nr, sub_node in enumerate(node.nodes)
+                if (bundle := self._reuse(sub_node, (*key, nr))) is not None
+            ]
+        result = result._replace(nested_results=nested_results, instance=node)
+        self._results[key] = result
+        return result
+
 
 class BIComputer:
     def __init__(
         self,
         compiled_aggregations: dict[str, BICompiledAggregation],
         bi_status_fetcher: BIStatusFetcher,
+        result_cache: BIResultCache | None = None,
     ) -> None:
         self._compiled_aggregations = compiled_aggregations
         self._bi_status_fetcher = bi_status_fetcher
+        # Without a cache, all branches are computed from scratch
+        self._result_cache = result_cache
         self._legacy_branch_cache: dict = {}
 
     def compute_aggregation_result(
@@ -113,10 +274,17 @@ class BIComputer:
     ) -> list[tuple[BICompiledAggregation, list[NodeResultBundle]]]:
         results = []
         for compiled_aggregation, branches in required_aggregations:
-            node_result_bundles = compiled_aggregation.compute_branches(
-                branches,
-                self._bi_status_fetcher,
-            )
+            if self._result_cache is None:
+                node_result_bundles = compiled_aggregation.compute_branches(
+                    branches,
+                    self._bi_status_fetcher,
+                )
+            else:
+                node_result_bundles = self._result_cache.compute_branches(
+                    compiled_aggregation,
+                    branches,
+                    self._bi_status_fetcher,
+                )
 
             # Postprocess results. Custom user plugins may add additional information for each node
             node_result_bundles = list(
@@ -12,6 +12,7 @@ from pathlib import Path
 from livestatus import LivestatusColumn, LivestatusOutputFormat, LivestatusResponse, SiteId
 
 from cmk.utils.hostaddress import HostName
+from cmk.utils.log import logger
 from cmk.utils.paths import tmp_dir
 
 from cmk.bi.lib import (
@@ -29,6 +30,11 @@ from cmk.bi.trees import BICompiledAggregation, BICompiledRule
 
 SiteProgramStart = tuple[SiteId, int]
 
+# Hosts per query filtering by host names, the core slows down with bigger filters
+_MAX_HOST_FILTERS = 1000
+# A site queried for more hosts is asked for all of its hosts, filtered locally
+_MAX_FILTERED_HOSTS = 10000
+
 
 # Livestatus delivers strings with incorrectly encoded special characters
 # (e.g. emoticons) if JSON output format is used
@@ -302,6 +308,10 @@ class BIStructureFetcher:
 
 
 class BIStatusFetcher(ABCBIStatusFetcher):
+    def __init__(self, sites_callback: SitesCallback) -> None:
+        super().__init__(sites_callback)
+        self._logger = logger.getChild("bi.status_fetcher")
+
     def set_assumed_states(self, assumed_states: dict) -> None:
         # Streamline format to site, host, service (may be None)
         self.assumed_states = {}
@@ -339,26 +349,84 @@ class BIStatusFetcher(ABCBIStatusFetcher):
             # and return all hosts
             return {}
 
-        # Query each site only for hosts that that site provides
-        req_hosts: set[HostName] = set()
-        req_sites: set[SiteId] = set()
-
-        for site, host, _service in required_elements:
-            req_hosts.add(host)
-            req_sites.add(site)
+        query = "GET hosts\nColumns: %s\n" % " ".join(self.get_status_columns())
+        return self.create_bi_status_data(
+            self._query_hosts(
+                query,
+                {BIHostSpec(site, host) for site, host, _service in required_elements},
+                LivestatusOutputFormat.JSON,
+            )
+        )
 
-        # TODO: the cmc slows down if the host filter gets too big
-        #       fetch all hosts if the filter exceeds 1000 hosts
-        host_filter = "".join(f"Filter: name = {host}\n" for host in req_hosts)
-        if len(req_hosts) > 1:
-            host_filter += f"Or: {len(req_hosts)}\n"
+    def _query_hosts(
+        self,
+        query: str,
+        hosts: set[BIHostSpec],
+        output_format: LivestatusOutputFormat = LivestatusOutputFormat.PYTHON,
+    ) -> LivestatusResponse:
+        """Query the rows of the given hosts, each site only for its own hosts
+
+        Depending on the number of hosts of a site, the site is queried with one host
+        filter, with several host filters of a limited number of hosts each or for
+        all of its hosts. Sites sharing a query are queried in parallel.
+        """
+        hosts_by_site: dict[SiteId, list[HostName]] = {}
+        for site_id, host_name in sorted(hosts):
+            hosts_by_site.setdefault(site_id, []).append(host_name)
+
+        unfiltered_sites = sorted(
+            site_id
+            for site_id, host_names in hosts_by_site.items()
+            if len(host_names) > _MAX_FILTERED_HOSTS
+        )
+        # Sorted by site, so that most of the chunks concern a single site
+        filtered_hosts = [
+            BIHostSpec(site_id, host_name)
+            for site_id, host_names in hosts_by_site.items()
+            if site_id not in unfiltered_sites
+            for host_name in host_names
+        ]
 
-        query = "GET hosts\nColumns: %s\n" % " ".join(self.get_status_columns()) + host_filter
-        return self.create_bi_status_data(
-            self.sites_callback.query(
-                query, list(req_sites), output_format=LivestatusOutputFormat.JSON
+        rows = LivestatusResponse([])
+        if unfiltered_sites:
+            rows.extend(self._timed_query("all hosts", query, unfiltered_sites, output_format))
+
+        strategy = "filtered" if len(filtered_hosts) <= _MAX_HOST_FILTERS else "chunked"
+        for start in range(0, len(filtered_hosts), _MAX_HOST_FILTERS):
+            chunk = filtered_hosts[start : start + _MAX_HOST_FILTERS]
+            host_names = sorted({host_name for _site_id, host_name in chunk})
+            host_filter = "".join(f"Filter: name = {host_name}\n" for host_name in host_names)
+            if len(host_names) > 1:
+                host_filter += f"Or: {len(host_names)}\n"
+            rows.extend(
+                self._timed_query(
+                    strategy,
+                    query + host_filter,
+                    sorted({site_id for site_id, _host_name in chunk}),
+                    output_format,
+                )
             )
+
+        # Drop the hosts which have not been asked for, e.g. the ones of a complete site
+        return LivestatusResponse([row for row in rows if BIHostSpec(row[0], row[1]) in hosts])
+
+    def _timed_query(
+        self,
+        strategy: str,
+        query: str,
+        only_sites: list[SiteId],
+        output_format: LivestatusOutputFormat,
+    ) -> LivestatusResponse:
+        start = time.perf_counter()
+        rows = self.sites_callback.query(query, only_sites, output_format=output_format)
+        self._logger.debug(
+            "Status query (%s) of sites %s took %.3fs for %d rows",
+            strategy,
+            ", ".join(only_sites),
+            time.perf_counter() - start,
+            len(rows),
         )
+        return rows
 
     # This variant of the function is configured not with a list of
     # hosts but with a livestatus filter header and a list of columns
@@ -399,17 +467,9 @@ class BIStatusFetcher(ABCBIStatusFetcher):
             remaining_hosts = missing_hosts
 
         if remaining_hosts:
-            remaining_sites = set()
-            host_filter = ""
-            for site_id, host in remaining_hosts:
-                remaining_sites.add(site_id)
-                host_filter += "Filter: name = %s\n" % host
-            if len(remaining_hosts) > 1:
-                host_filter += "Or: %d\n" % len(remaining_hosts)
             query = "GET hosts%s\n" % ("bygroup" if bygroup else "")
             query += "Columns: " + (" ".join(columns)) + "\n"
-            query += host_filter
-            data.extend(self.sites_callback.query(query, list(remaining_sites)))
+            data.extend(self._query_hosts(query, remaining_hosts))
 
         return self.create_bi_status_data(data, extra_columns=host_columns)
 
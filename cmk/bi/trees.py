@@ -402,6 +402,15 @@ class BICompiledRule(ABCBICompiledNode):
             ]
             if bundle is not None
         ]
+        return self.bundle_results(bundled_results, computation_options, use_assumed)
+
+    def bundle_results(
+        self,
+        bundled_results: list[NodeResultBundle],
+        computation_options: BIAggregationComputationOptions,
+        use_assumed: bool = False,
+    ) -> NodeResultBundle | None:
+        """The result of this rule from the results of its nodes"""
         if not bundled_results:
             return None
         actual_result = self._process_node_compute_result(
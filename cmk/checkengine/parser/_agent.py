@@ -6,9 +6,10 @@
 from __future__ import annotations
 
 import abc
+import io
 import logging
 import time
-from collections.abc import Iterator, Mapping, MutableMapping, Sequence
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
 from typing import final, Final, NamedTuple
 
 from cmk.utils.agentdatatype import AgentRawData
@@ -522,10 +523,21 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
         raw_data: AgentRawData,
         *,
         selection: SectionNameCollection,
+    ) -> HostSections[AgentRawDataSection]:
+        # The fetchers hand over (and cache) the agent output as a whole, so it is
+        # parsed from memory. Iterating the buffer yields one line at a time without
+        # building the list of all lines.
+        return self._parse_lines(io.BytesIO(raw_data), selection=selection)
+
+    def _parse_lines(
+        self,
+        lines: Iterable[bytes],
+        *,
+        selection: SectionNameCollection,
     ) -> HostSections[AgentRawDataSection]:
         now = int(time.time())
 
-        raw_sections, piggyback_sections = self._parse_host_section(raw_data)
+        raw_sections, piggyback_sections = self._parse_host_section(lines)
         section_info = {
             header.name: header
             for header, _ in raw_sections
@@ -612,7 +624,7 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
 
     def _parse_host_section(
         self,
-        raw_data: AgentRawData,
+        lines: Iterable[bytes],
     ) -> tuple[ImmutableSection, Mapping[PiggybackMarker, ImmutableSection]]:
         """Split agent output in chunks, splits lines by whitespaces."""
         parser: ParserState = NOOPParser(
@@ -623,7 +635,7 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
             encoding_fallback=self.encoding_fallback,
             logger=self._logger,
         )
-        for line in raw_data.split(b"\n"):
-            parser = parser(line.rstrip(b"\r"))
+        for line in lines:
+            parser = parser(line.rstrip(b"\r\n"))
 
         return parser.sections, parser.piggyback_sections
@@ -161,6 +161,7 @@ class Rule(TypedDict, total=False):
     contact_groups: ContactGroups
     count: Count
     customer: str  # TODO: This is a GUI-only feature, which doesn't belong here at all.
+    delay: int
     description: str
     docu_url: str
     disabled: bool
@@ -330,6 +331,8 @@ class ConfigFromWATO(TypedDict):
     history_rotation: Literal["daily", "weekly"]
     hostname_translation: TranslationOptions  # TODO: Mutable???
     housekeeping_interval: int
+    ingestion_queue_len: int
+    ingestion_workers: int
     log_level: LogConfig  # TODO: Mutable???
     log_messages: bool
     log_rulehits: bool
@@ -341,6 +344,8 @@ class ConfigFromWATO(TypedDict):
     rules: Collection[Rule]
     sqlite_housekeeping_interval: int
     sqlite_freelist_size: int
+    sqlite_batch_size: int
+    sqlite_batch_interval: int
     snmp_credentials: Iterable[SNMPCredential]
     socket_queue_len: int
     statistics_interval: int
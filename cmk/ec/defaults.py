@@ -56,6 +56,8 @@ def default_config() -> ConfigFromWATO:
         housekeeping_interval=60,
         sqlite_housekeeping_interval=3600,  # seconds ValueSpec Age
         sqlite_freelist_size=50 * 1024 * 1024,  # bytes ValueSpec FIlesize
+        sqlite_batch_size=1000,  # history entries written in one transaction
+        sqlite_batch_interval=100,  # ms
         statistics_interval=5,
         history_lifetime=365,  # days
         history_rotation="daily",
@@ -63,6 +65,8 @@ def default_config() -> ConfigFromWATO:
         remote_status=None,
         socket_queue_len=10,
         eventsocket_queue_len=10,
+        ingestion_queue_len=10000,  # events waiting for the rule matching
+        ingestion_workers=1,
         hostname_translation=TranslationOptions(),
         archive_orphans=False,
         archive_mode="sqlite",
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""The current events of the Event Console, indexed for the lookups done per message"""
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import TypeVar
+
+from .event import Event
+
+_K = TypeVar("_K")
+
+# rule_id, host and application of an event
+EventKey = tuple[str | None, str, str]
+
+
+def event_key(event: Event) -> EventKey:
+    return event["rule_id"], event["host"], event["application"]
+
+
+class EventStore:
+    """The events in the order they have been added, with indexes by id, rule, host and key
+
+    All indexes keep the order of the events, so the oldest event of a rule or host is
+    found without scanning. The indexes refer to the values of rule_id, host and
+    application an event had when it was added. Call reindex() after changing them.
+    """
+
+    def __init__(self, events: Iterable[Event] = ()) -> None:
+        self._by_id: dict[int, Event] = {}
+        self._keys: dict[int, EventKey] = {}
+        self._by_rule: dict[str | None, dict[int, Event]] = {}
+        self._by_host: dict[str, dict[int, Event]] = {}
+        self._by_key: dict[EventKey, dict[int, Event]] = {}
+        for event in events:
+            self.add(event)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self._by_id.values())
+
+    def __contains__(self, event: Event) -> bool:
+        return self._by_id.get(event["id"]) is event
+
+    def get(self, eid: int) -> Event | None:
+        return self._by_id.get(eid)
+
+    def add(self, event: Event) -> None:
+        self._by_id[event["id"]] = event
+        self._index(event)
+
+    def _index(self, event: Event) -> None:
+        eid = event["id"]
+        key = self._keys[eid] = event_key(event)
+        self._by_rule.setdefault(key[0], {})[eid] = event
+        self._by_host.setdefault(key[1], {})[eid] = event
+        self._by_key.setdefault(key, {})[eid] = event
+
+    def _unindex(self, event: Event) -> None:
+        eid = event["id"]
+        key = self._keys.pop(eid)
+        _discard(self._by_rule, key[0], eid)
+        _discard(self._by_host, key[1], eid)
+        _discard(self._by_key, key, eid)
+
+    def remove(self, event: Event) -> bool:
+        """Remove the event, return False if it is not in the store"""
+        if event not in self:
+            return False
+        self._unindex(event)
+        del self._by_id[event["id"]]
+        return True
+
+    def reindex(self, event: Event) -> None:
+        """Update the indexes after rule_id, host or application of the event changed
+
+        The event keeps its position among all events, but becomes the newest event of
+        its new rule, host and key.
+        """
+        if event in self and self._keys[event["id"]] != event_key(event):
+            self._unindex(event)
+            self._index(event)
+
+    def oldest(self) -> Event | None:
+        return next(iter(self._by_id.values()), None)
+
+    def oldest_of_rule(self, rule_id: str | None) -> Event | None:
+        return next(iter(self._by_rule.get(rule_id, {}).values()), None)
+
+    def oldest_of_host(self, host: str) -> Event | None:
+        return next(iter(self._by_host.get(host, {}).values()), None)
+
+    def of_rule(self, rule_id: str | None) -> Sequence[Event]:
+        return list(self._by_rule.get(rule_id, {}).values())
+
+    def of_key(self, key: EventKey) -> Sequence[Event]:
+        return list(self._by_key.get(key, {}).values())
+
+
+def _discard(index: dict[_K, dict[int, Event]], key: _K, eid: int) -> None:
+    events = index[key]
+    del events[eid]
+    if not events:
+        del index[key]
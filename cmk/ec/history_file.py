@@ -4,14 +4,16 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import itertools
+import mmap
 import shlex
 import subprocess
 import threading
 import time
+from collections import OrderedDict
 from collections.abc import Callable, Iterable, Sequence
 from logging import Logger
 from pathlib import Path
-from typing import Any
+from typing import Any, Final
 
 from cmk.utils.log import VERBOSE
 from cmk.utils.render import date_and_time
@@ -19,9 +21,13 @@ from cmk.utils.render import date_and_time
 from .config import Config
 from .event import Event, scrub_string
 from .history import _log_event, ActiveHistoryPeriod, get_logfile, History, HistoryWhat, quote_tab
+from .history_index import build_index, HistoryIndex, index_path, index_positions, index_record
 from .query import Columns, OperatorName, QueryFilter, QueryGET
 from .settings import Settings
 
+# Number of history file indexes kept in memory, the least recently used is dropped
+_MAX_LOADED_INDEXES: Final = 4
+
 
 class FileHistory(History):
     def __init__(
@@ -37,11 +43,14 @@ class FileHistory(History):
         self._logger = logger
         self._event_columns = event_columns
         self._history_columns = history_columns
+        self._index_positions = index_positions(history_columns)
         self._lock = threading.Lock()
         self._active_history_period = ActiveHistoryPeriod()
+        self._indexes: OrderedDict[Path, HistoryIndex] = OrderedDict()
 
     def flush(self) -> None:
         _expire_logfiles(self._settings, self._config, self._logger, self._lock, True)
+        self._forget_expired_indexes()
 
     def add(self, event: Event, what: HistoryWhat, who: str = "", addinfo: str = "") -> None:
         """Make a new entry in the event history.
@@ -66,12 +75,22 @@ class FileHistory(History):
                 for colname, defval in self._event_columns
             ]
 
-            with get_logfile(
+            logfile = get_logfile(
                 self._config,
                 self._settings.paths.history_dir.value,
                 self._active_history_period,
-            ).open(mode="ab") as f:
-                f.write(b"\t".join(columns) + b"\n")
+            )
+            with logfile.open(mode="ab") as f:
+                line = b"\t".join(columns) + b"\n"
+                f.write(line)
+                end = f.tell()
+
+            if end > len(line) and not index_path(logfile).exists():
+                # History file written without an index
+                build_index(logfile, self._index_positions)
+                return
+            with index_path(logfile).open(mode="ab") as f:
+                f.write(index_record(end, columns, self._index_positions))
 
     def get(self, query: QueryGET) -> Iterable[Sequence[object]]:
         if not self._settings.paths.history_dir.value.exists():
@@ -114,19 +133,69 @@ class FileHistory(History):
             if not _intersects(time_range, _get_logfile_timespan(path)):
                 self._logger.debug("skipping history file %s because of time filters", path)
                 continue
-            tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
-            cmd = " | ".join([tac] + grep_pipeline)
-            self._logger.debug("preprocessing history file with command [%s]", cmd)
-            new_entries = parse_history_file(
-                self._history_columns, path, query.filter_row, cmd, limit, self._logger
-            )
+            new_entries = self._get_indexed(path, query, time_range, limit)
+            if new_entries is None:
+                tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
+                cmd = " | ".join([tac] + grep_pipeline)
+                self._logger.debug("preprocessing history file with command [%s]", cmd)
+                new_entries = parse_history_file(
+                    self._history_columns, path, query.filter_row, cmd, limit, self._logger
+                )
             history_entries += new_entries
             if limit is not None:
                 limit -= len(new_entries)
         return history_entries
 
+    def _get_indexed(
+        self,
+        path: Path,
+        query: QueryGET,
+        time_range: tuple[float | None, float | None],
+        limit: int | None,
+    ) -> list[Any] | None:
+        """Read the entries found via the index, None if the index doesn't help"""
+        try:
+            index = self._load_index(path)
+        except Exception:
+            self._logger.exception("Cannot use the index of history file %s", path)
+            return None
+        entries = index.candidates(query.filters, time_range)
+        if entries is None:
+            if _grep_pipeline(query.filters):
+                return None  # grep is faster when scanning the whole file
+            entries = list(reversed(range(len(index))))
+        self._logger.debug("reading %d indexed entries of history file %s", len(entries), path)
+        return read_history_entries(
+            self._history_columns, path, index.ends, entries, query.filter_row, limit, self._logger
+        )
+
+    def _load_index(self, path: Path) -> HistoryIndex:
+        with self._lock:
+            if (index := self._indexes.pop(path, None)) is None:
+                index = HistoryIndex()
+            try:
+                index.update(index_path(path))
+                if index.end != path.stat().st_size:
+                    raise ValueError("incomplete index")
+            except (OSError, ValueError) as e:
+                self._logger.info("Rebuilding the index of history file %s (%s)", path, e)
+                build_index(path, self._index_positions)
+                index = HistoryIndex()
+                index.update(index_path(path))
+            self._indexes[path] = index
+            while len(self._indexes) > _MAX_LOADED_INDEXES:
+                self._indexes.popitem(last=False)
+            return index
+
+    def _forget_expired_indexes(self) -> None:
+        with self._lock:
+            self._indexes = OrderedDict(
+                (path, index) for path, index in self._indexes.items() if path.exists()
+            )
+
     def housekeeping(self) -> None:
         _expire_logfiles(self._settings, self._config, self._logger, self._lock, False)
+        self._forget_expired_indexes()
 
     def close(self) -> None:
         pass
@@ -152,6 +221,7 @@ def _expire_logfiles(
                         "Deleting log file %s (age %s)", path, date_and_time(path.stat().st_mtime)
                     )
                     path.unlink()
+                    index_path(path).unlink(missing_ok=True)
         except Exception as e:
             if settings.options.debug:
                 raise
@@ -212,7 +282,7 @@ def _grep_pattern(argument: str) -> str:
 
 
 def _greatest_lower_bound_for_filters(
-    filters: Iterable[tuple[OperatorName, float]]
+    filters: Iterable[tuple[OperatorName, float]],
 ) -> float | None:
     result: float | None = None
     for operator, value in filters:
@@ -279,7 +349,7 @@ def parse_history_file(
             raise Exception("Huh? stdout vanished...")
 
         for line in grep.stdout:
-            if limit is not None and len(entries) > limit:
+            if limit is not None and len(entries) >= limit:
                 break
             try:
                 parts: list[Any] = line.decode("utf-8").rstrip("\n").split("\t")
@@ -292,6 +362,35 @@ def parse_history_file(
     return entries
 
 
+def read_history_entries(
+    history_columns: Sequence[tuple[str, Any]],
+    path: Path,
+    ends: Sequence[int],
+    entries: Iterable[int],
+    filter_row: Callable[[Sequence[Any]], bool],
+    limit: int | None,
+    logger: Logger,
+) -> list[Any]:
+    """Read the given entries of a history file, located via the end offsets of the index"""
+    result: list[Any] = []
+    if not ends or path.stat().st_size == 0:
+        return result
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for entry in entries:
+            if limit is not None and len(result) >= limit:
+                break
+            line = data[ends[entry - 1] if entry else 0 : ends[entry]]
+            try:
+                parts: list[Any] = line.decode("utf-8").rstrip("\n").split("\t")
+                parts.insert(0, entry + 1)  # line number, as counted by nl
+                convert_history_line(history_columns, parts)
+                if filter_row(parts):
+                    result.append(parts)
+            except Exception:
+                logger.exception("Invalid line '%s' in history file %s", line, path)
+    return result
+
+
 def parse_history_file_python(
     history_columns: Sequence[tuple[str, Any]],
     path: Path,
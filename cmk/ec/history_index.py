@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Sidecar index of the history files
+
+Next to each history file "<period>.log" the file "<period>.idx" gets one line per
+history entry, appended together with the entry:
+
+    <end offset of the entry>\t<time>\t<event ID>\t<host>\t<rule ID>
+
+When loaded, the entries are grouped into blocks of consecutive entries with their
+time range, and there are postings lists of the entries per event ID, host and rule
+ID. A query then only reads the entries of the history file which may match, the
+query filters are applied to them as usual. Hosts and rule IDs are indexed case
+insensitively, so the postings serve both "=" and "=~" filters.
+"""
+
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Final
+
+from .query import Columns, QueryFilter
+
+__all__ = ["build_index", "HistoryIndex", "index_path", "index_positions", "index_record"]
+
+# Number of consecutive entries sharing a time range
+_BLOCK_SIZE: Final = 1024
+
+# Columns of the history files with postings lists
+_INDEXED_COLUMNS: Final = ("event_id", "event_host", "event_rule_id")
+
+
+def index_path(path: Path) -> Path:
+    return path.with_suffix(".idx")
+
+
+def index_positions(history_columns: Columns) -> Sequence[int]:
+    """Positions of the time and the indexed columns in the lines of a history file
+
+    The lines contain all history columns except the line number, which comes first.
+    """
+    column_names = [column_name for column_name, _default in history_columns[1:]]
+    return [column_names.index(name) for name in ("history_time", *_INDEXED_COLUMNS)]
+
+
+def index_record(end: int, columns: Sequence[bytes], positions: Sequence[int]) -> bytes:
+    """The line of the index for an entry of the history file ending at the given offset"""
+    fields = [str(end).encode("utf-8")] + [
+        columns[position].replace(b"\n", b" ") if position < len(columns) else b""
+        for position in positions
+    ]
+    return b"\t".join(fields) + b"\n"
+
+
+def build_index(path: Path, positions: Sequence[int]) -> None:
+    """(Re)write the index of an existing history file"""
+    tmp_path = index_path(path).with_suffix(".idx.new")
+    end = 0
+    with path.open("rb") as history_file, tmp_path.open("wb") as index_file:
+        for line in history_file:
+            end += len(line)
+            index_file.write(index_record(end, line.rstrip(b"\n").split(b"\t"), positions))
+    tmp_path.rename(index_path(path))
+
+
+class HistoryIndex:
+    """The loaded index of a history file, entries are numbered from 0"""
+
+    def __init__(self) -> None:
+        # End offsets of the entries in the history file
+        self.ends: list[int] = []
+        self._times: list[float] = []
+        self._blocks: list[tuple[float, float]] = []
+        self._postings: dict[str, dict[str, list[int]]] = {
+            column_name: {} for column_name in _INDEXED_COLUMNS
+        }
+        # Bytes of the index file already loaded
+        self._loaded = 0
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    @property
+    def end(self) -> int:
+        """Size of the indexed part of the history file"""
+        return self.ends[-1] if self.ends else 0
+
+    def update(self, path: Path) -> None:
+        """Load the lines appended to the index file since the last update"""
+        with path.open("rb") as f:
+            if f.seek(0, 2) < self._loaded:
+                raise ValueError(f"index file {path} has been truncated")
+            f.seek(self._loaded)
+            data = f.read()
+        # A line may just be written
+        complete = data.rfind(b"\n") + 1
+        for line in data[:complete].split(b"\n")[:-1]:
+            self._add(line.decode("utf-8", errors="replace").split("\t"))
+        self._loaded += complete
+
+    def _add(self, fields: Sequence[str]) -> None:
+        entry = len(self.ends)
+        self.ends.append(int(fields[0]))
+        time = float(fields[1])
+        self._times.append(time)
+        if entry % _BLOCK_SIZE:
+            low, high = self._blocks[-1]
+            self._blocks[-1] = (min(low, time), max(high, time))
+        else:
+            self._blocks.append((time, time))
+        for postings, value in zip(self._postings.values(), fields[2:]):
+            postings.setdefault(value.lower(), []).append(entry)
+
+    def candidates(
+        self, filters: Iterable[QueryFilter], time_range: tuple[float | None, float | None]
+    ) -> list[int] | None:
+        """The entries which may match the filters, newest first
+
+        None means that the index does not narrow down the entries.
+        """
+        found: set[int] | None = None
+        for f in filters:
+            if (postings := self._postings.get(f.column_name)) is None:
+                continue
+            if f.operator_name in ("=", "=~"):
+                keys = [f.argument]
+            elif f.operator_name == "in":
+                keys = f.argument
+            else:
+                continue
+            entries = {entry for key in keys for entry in postings.get(str(key).lower(), ())}
+            found = entries if found is None else found & entries
+
+        low, high = time_range
+        if low is None and high is None:
+            return None if found is None else sorted(found, reverse=True)
+
+        def in_time_range(entry: int) -> bool:
+            time = self._times[entry]
+            return (low is None or low <= time) and (high is None or time <= high)
+
+        if found is not None:
+            return [entry for entry in sorted(found, reverse=True) if in_time_range(entry)]
+        blocks = [
+            nr
+            for nr, (block_low, block_high) in enumerate(self._blocks)
+            if (low is None or low <= block_high) and (high is None or block_low <= high)
+        ]
+        if len(blocks) == len(self._blocks):
+            return None
+        return [
+            entry
+            for nr in reversed(blocks)
+            for entry in reversed(range(nr * _BLOCK_SIZE, min((nr + 1) * _BLOCK_SIZE, len(self))))
+            if in_time_range(entry)
+        ]
@@ -2,10 +2,19 @@
 # Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
-"""EC History sqlite backend."""
+"""EC History sqlite backend.
+
+Entries are added by a writer thread. It collects the entries for a short time or up
+to a number of entries and inserts them in one transaction. The housekeeping is done
+by the writer thread, too: Expired entries are deleted in chunks, in between the
+writes, and the free pages are returned incrementally instead of by a full VACUUM.
+"""
+
 import itertools
 import json
+import queue
 import sqlite3
+import threading
 import time
 from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
@@ -17,6 +26,7 @@ from typing import Final, Literal
 from .config import Config
 from .event import Event
 from .history import History, HistoryWhat
+from .perfcounters import Perfcounters
 from .query import Columns, QueryFilter, QueryGET
 from .settings import Options, Paths, Settings
 
@@ -60,6 +70,7 @@ INDEXED_COLUMNS: Final = (
 )
 
 SQLITE_PRAGMAS = {
+    "PRAGMA auto_vacuum = INCREMENTAL;": "Free pages are returned in steps, see _vacuum()",
     "PRAGMA journal_mode=WAL;": "WAL mode for concurrent reads and writes",
     "PRAGMA synchronous = NORMAL;": "Writes should not blocked by reads",
     "PRAGMA busy_timeout = 2000;": "2 seconds timeout for busy handler. Avoids database is locked errors",
@@ -69,6 +80,28 @@ SQLITE_INDEXES = [
     f"CREATE INDEX IF NOT EXISTS idx_{column} ON history ({column});" for column in INDEXED_COLUMNS
 ]
 
+# Entries waiting for the writer, adding blocks when this is reached
+_MAX_QUEUED: Final = 100_000
+
+# Expired entries deleted in one transaction
+_EXPIRY_CHUNK: Final = 5000
+
+_AUTO_VACUUM_INCREMENTAL: Final = 2
+
+
+@dataclass(frozen=True)
+class _Entry:
+    added: float  # for the write latency
+    row: Sequence[object]
+
+
+@dataclass(frozen=True)
+class _Sync:
+    done: threading.Event
+
+
+_Command = Literal["housekeeping", "stop"] | _Sync
+
 
 def configure_sqlite_types() -> None:
     """
@@ -150,14 +183,24 @@ class SQLiteHistory(History):
         logger: Logger,
         event_columns: Columns,
         history_columns: Columns,
+        *,
+        perfcounters: Perfcounters | None = None,
     ):
         self._settings = settings
         self._config = config
         self._logger = logger
         self._event_columns = event_columns
         self._history_columns = history_columns
+        self._perfcounters = perfcounters
         self._last_housekeeping = 0.0
         self._page_size = 4096
+        # Serializes the transactions of the writer and the readers
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[_Entry | _Command] = queue.Queue(maxsize=_MAX_QUEUED)
+        # Entries up to this time are being expired
+        self._expire_until: float | None = None
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
 
         if isinstance(self._settings.database, Path):
             self._settings.database.parent.mkdir(parents=True, exist_ok=True)
@@ -221,38 +264,56 @@ class SQLiteHistory(History):
 
     def flush(self) -> None:
         """Delete all entries the history table."""
-        with self.conn as connection:
+        self.sync()
+        with self._lock, self.conn as connection:
             connection.execute("DELETE FROM history;")
 
     def add(self, event: Event, what: HistoryWhat, who: str = "", addinfo: str = "") -> None:
-        """Add a single entry to the history table.
+        """Queue a single entry for the history table.
 
-        No need to include the line column, as it is autoincremented.
+        The first column is the line number, which is autoincremented, so ignored in TABLE_COLUMNS.
         """
-        with self.conn as connection:
-            cur = connection.cursor()
-            cur.execute(
-                f"""INSERT INTO
-                    history ({', '.join(TABLE_COLUMNS[1:])})
-                        VALUES ({', '.join(itertools.repeat('?', len(TABLE_COLUMNS[1:])))});""",
-                tuple(
-                    itertools.chain(
-                        (time.time(), what, who, addinfo),
-                        [
-                            event.get(colname.removeprefix("event_"), defval)
-                            for colname, defval in self._event_columns
-                        ],
-                    )
+        self._put(
+            _Entry(
+                time.monotonic(),
+                (
+                    None,
+                    time.time(),
+                    what,
+                    who,
+                    addinfo,
+                    *(
+                        event.get(colname.removeprefix("event_"), defval)
+                        for colname, defval in self._event_columns
+                    ),
                 ),
             )
+        )
+
+    def sync(self) -> None:
+        """Wait until the queued entries are written and the requested housekeeping is done"""
+        marker = _Sync(threading.Event())
+        self._put(marker)
+        marker.done.wait()
+
+    def _put(self, item: _Entry | _Command) -> None:
+        with self._writer_lock:
+            # Started on demand, the threads don't survive daemonizing the Event Console
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write, name="HistoryWriter", daemon=True
+                )
+                self._writer.start()
+        self._queue.put(item)
 
     def add_entries(self, entries: Sequence[Sequence[object]]) -> None:
         """Add multiple entries to the history table.
 
-        Used only by the cmk-update-config during EC history migration to sqlite.
-        The first column is the line number, which is autoincremented, so ignored in TABLE_COLUMNS.
+        Used by the writer thread and by the cmk-update-config during EC history migration to
+        sqlite. The first column is the line number, which is autoincremented, so ignored in
+        TABLE_COLUMNS.
         """
-        with self.conn as connection:
+        with self._lock, self.conn as connection:
             cur = connection.cursor()
             cur.executemany(
                 f"""INSERT INTO
@@ -270,40 +331,106 @@ class SQLiteHistory(History):
         if query.limit:
             sqlite_query += " LIMIT ?"
             sqlite_arguments += f" {query.limit + 1}"
-        with self.conn as connection:
+        self.sync()
+        with self._lock, self.conn as connection:
             cur = connection.cursor()
             cur.execute(sqlite_query, sqlite_arguments)
             return cur.fetchall()
 
     def housekeeping(self) -> None:
-        """Remove old entries from the history table.
+        """Let the writer remove old entries from the history table.
 
-        And performs a vacuum to shrink the database file.
+        And shrink the database file afterwards.
         """
         now = time.time()
         if now - self._last_housekeeping > self._config["sqlite_housekeeping_interval"]:
-            delta = now - timedelta(days=self._config["history_lifetime"]).total_seconds()
-            with self.conn as connection:
-                cur = connection.cursor()
-                cur.execute("DELETE FROM history WHERE time <= ?;", (delta,))
-            # should be executed outside of the transaction
-            self._vacuum()
+            self._put("housekeeping")
             self._last_housekeeping = now
 
+    def _write(self) -> None:
+        stop = False
+        while not stop:
+            items = self._collect()
+            try:
+                if entries := [item for item in items if isinstance(item, _Entry)]:
+                    self._write_entries(entries)
+                if "housekeeping" in items:
+                    self._expire_until = (
+                        time.time()
+                        - timedelta(days=self._config["history_lifetime"]).total_seconds()
+                    )
+                stop = "stop" in items
+                self._expire()
+            except Exception:
+                self._logger.exception("Error writing the event history")
+            finally:
+                for item in items:
+                    if isinstance(item, _Sync):
+                        item.done.set()
+
+    def _collect(self) -> list[_Entry | _Command]:
+        """Wait for the next entries, until the batch is complete or a command is given"""
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self._config["sqlite_batch_interval"] / 1000
+        while len(items) < self._config["sqlite_batch_size"] and isinstance(items[-1], _Entry):
+            try:
+                items.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return items
+
+    def _write_entries(self, entries: Sequence[_Entry]) -> None:
+        self.add_entries([entry.row for entry in entries])
+        if self._perfcounters is None:
+            return
+        now = time.monotonic()
+        self._perfcounters.count("history_writes", len(entries))
+        self._perfcounters.count_time(
+            "history_write", sum(now - entry.added for entry in entries) / len(entries)
+        )
+
+    def _expire(self) -> None:
+        """Delete the expired entries in chunks, as long as there is nothing else to do"""
+        while self._expire_until is not None and self._queue.empty():
+            with self._lock, self.conn as connection:
+                deleted = connection.execute(
+                    "DELETE FROM history WHERE line IN"
+                    " (SELECT line FROM history WHERE time <= ? LIMIT ?);",
+                    (self._expire_until, _EXPIRY_CHUNK),
+                ).rowcount
+            if deleted < _EXPIRY_CHUNK:
+                self._expire_until = None
+                self._vacuum()
+
     def _vacuum(self) -> None:
-        """Run VACUUM command only if the free pages in DB are greater than 50 Mb."""
-        with self.conn as connection:
-            freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
-            freelist_size = freelist_count * self._page_size
+        """Return the free pages only if they are greater than 50 Mb.
 
-        if freelist_size > self._config["sqlite_freelist_size"]:
-            self.conn.execute("VACUUM;")
+        Databases created before the incremental auto vacuum are converted by a full VACUUM.
+        """
+        with self._lock:
+            with self.conn as connection:
+                freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+                freelist_size = freelist_count * self._page_size
+                auto_vacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+            if freelist_size <= self._config["sqlite_freelist_size"]:
+                return
+            # should be executed outside of the transaction
+            if auto_vacuum == _AUTO_VACUUM_INCREMENTAL:
+                # Each step of the statement frees one page
+                self.conn.execute(f"PRAGMA incremental_vacuum({freelist_count});").fetchall()
+            else:
+                self.conn.execute("VACUUM;")
 
     def close(self) -> None:
-        """Explicitly close the connection to the sqlite database.
+        """Write the queued entries and explicitly close the connection to the sqlite database.
 
         Used during a new object instantiation,
         to avoid sqlite3.OperationalError: database is locked.
         """
-        self.conn.commit()
-        self.conn.close()
+        if self._writer is not None:
+            self._put("stop")
+            self._writer.join()
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
@@ -29,6 +29,7 @@ import threading
 import time
 import traceback
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
 from logging import DEBUG, getLogger, Logger
 from pathlib import Path
 from types import FrameType
@@ -55,6 +56,7 @@ from .config import Config, ConfigFromWATO, Count, ECRulePack, MatchGroups, Rule
 from .core_queries import HostInfo, query_hosts_scheduled_downtime_depth
 from .crash_reporting import CrashReportStore, ECCrashReport
 from .event import create_events_from_syslog_messages, Event, scrub_string
+from .event_store import event_key, EventStore
 from .helpers import ECLock, parse_bytes_into_syslog_messages
 from .history import ActiveHistoryPeriod, get_logfile, History, HistoryWhat, quote_tab, TimedHistory
 from .history_file import FileHistory
@@ -62,6 +64,7 @@ from .history_mongo import MongoDBHistory
 from .history_sqlite import SQLiteHistory, SQLiteSettings
 from .host_config import HostConfig
 from .perfcounters import Perfcounters
+from .pipeline import Pipeline, receive_datagrams
 from .query import (
     Columns,
     filter_operator_in,
@@ -72,8 +75,16 @@ from .query import (
     QueryREPLICATE,
     StatusTable,
 )
-from .rule_matcher import compile_rule, match, MatchFailure, MatchResult, MatchSuccess, RuleMatcher
+from .rule_matcher import (
+    compile_rule,
+    match,
+    MatchFailure,
+    MatchSuccess,
+    RuleMatcher,
+    RuleMatches,
+)
 from .rule_packs import load_active_config
+from .rule_prefilter import RulePrefilter
 from .settings import create_settings, FileDescriptor, PortNumber, Settings
 from .snmp import SNMPTrapParser
 from .syslog import SyslogFacility, SyslogPriority
@@ -173,6 +184,8 @@ def create_history_raw(
     logger: Logger,
     event_columns: Columns,
     history_columns: Columns,
+    *,
+    perfcounters: Perfcounters | None = None,
 ) -> History:
     """Factory for History objects based on the current configuration."""
     match config["archive_mode"]:
@@ -190,6 +203,7 @@ def create_history_raw(
                 logger,
                 event_columns,
                 history_columns,
+                perfcounters=perfcounters,
             )
         case _ as default:
             assert_never(default)
@@ -201,9 +215,13 @@ def create_history(
     logger: Logger,
     event_columns: Columns,
     history_columns: Columns,
+    *,
+    perfcounters: Perfcounters | None = None,
 ) -> History:
     """Factory for History objects based on the current configuration, optionally augmented with timing information."""
-    history = create_history_raw(settings, config, logger, event_columns, history_columns)
+    history = create_history_raw(
+        settings, config, logger, event_columns, history_columns, perfcounters=perfcounters
+    )
     return TimedHistory(history) if logger.isEnabledFor(DEBUG) else history
 
 
@@ -349,6 +367,20 @@ class MKSignalException(MKException):
 #   '----------------------------------------------------------------------'
 
 
+@dataclass(frozen=True)
+class _RuleSet:
+    """The compiled rules an event is matched against
+
+    A reload replaces these objects instead of changing them, so a snapshot taken
+    under the configuration lock can be used without holding the lock.
+    """
+
+    rules: Sequence[Rule]
+    rule_hash: Mapping[int, Mapping[int, Sequence[Rule]]] | None
+    rule_prefilter: RulePrefilter
+    rule_matcher: RuleMatcher
+
+
 class EventServer(ECServerThread):
     """Processing and classification of incoming events."""
 
@@ -381,6 +413,7 @@ class EventServer(ECServerThread):
         self._rules: list[Rule] = []
         self._rule_by_id: dict[str | None, Rule] = {}
         self._rule_hash: dict[int, dict[int, Any]] = {}
+        self._rule_prefilter = RulePrefilter([])
         self._hash_stats: list[list[int]] = []  # facility/priority
         for _unused_facility in range(32):
             self._hash_stats.append([0] * 8)
@@ -391,6 +424,7 @@ class EventServer(ECServerThread):
         self._history = history
         self._event_status = event_status
         self._event_columns = event_columns
+        self._pipeline = self._create_pipeline()
         self._message_period = ActiveHistoryPeriod()
         self._time_period = TimePeriods(logger)
         self._rule_matcher = RuleMatcher(
@@ -647,7 +681,25 @@ class EventServer(ECServerThread):
         # http://www.outflux.net/blog/archives/2008/03/09/using-select-on-a-fifo/
         return os.open(str(self.settings.paths.event_pipe.value), os.O_RDWR | os.O_NONBLOCK)
 
-    def serve(self) -> None:  # pylint: disable=too-many-branches
+    def serve(self) -> None:
+        self._pipeline = self._create_pipeline()
+        self._pipeline.start()
+        try:
+            self._receive()
+        finally:
+            self._pipeline.stop()
+
+    def _create_pipeline(self) -> Pipeline[tuple[float, RuleMatches | None]]:
+        return Pipeline(
+            match=self._match_instrumented,
+            commit=self._commit_instrumented,
+            num_workers=self._config["ingestion_workers"],
+            queue_len=self._config["ingestion_queue_len"],
+            perfcounters=self._perfcounters,
+            logger=self._logger,
+        )
+
+    def _receive(self) -> None:  # pylint: disable=too-many-branches
         pipe = self.open_pipe()
         listen_list = [
             f
@@ -698,7 +750,7 @@ class EventServer(ECServerThread):
             for fd, (cs, address, previous_data) in list(client_sockets.items()):
                 if fd in readable:
                     try:
-                        new_data = cs.recv(4096)
+                        new_data = cs.recv(65536)
                     except Exception:
                         new_data = b""
                         self._logger.exception("Exception during syslog socket_tcp recv")
@@ -716,7 +768,7 @@ class EventServer(ECServerThread):
             # Read data from pipe
             if pipe in readable:
                 try:
-                    unprocessed_pipe_data += os.read(pipe, 4096)
+                    unprocessed_pipe_data += os.read(pipe, 65536)
                 except Exception:
                     self._logger.exception("General exception during pipe os.read")
 
@@ -727,17 +779,20 @@ class EventServer(ECServerThread):
 
             # Read events from builtin syslog server
             if self._syslog_udp is not None and self._syslog_udp in readable:
-                message, address = self._syslog_udp.recvfrom(4096)
-                self.process_syslog_messages(
-                    [message], parse_address("syslog socket (UDP)", address)
-                )
+                for message, raw_address in receive_datagrams(self._syslog_udp, 4096):
+                    self.process_syslog_messages(
+                        [message], parse_address("syslog socket (UDP)", raw_address), block=False
+                    )
 
             # Read events from builtin snmptrap server
             if self._snmp_trap_socket is not None and self._snmp_trap_socket in readable:
-                message, address = self._snmp_trap_socket.recvfrom(65535)
-                self.process_potential_event_instrumented(
-                    self.create_events_from_trap(message, parse_address("SNMP trap", address))
-                )
+                for message, raw_address in receive_datagrams(self._snmp_trap_socket, 65535):
+                    self.process_potential_event_instrumented(
+                        self.create_events_from_trap(
+                            message, parse_address("SNMP trap", raw_address)
+                        ),
+                        block=False,
+                    )
 
             if spool_files := sorted(
                 self.settings.paths.spool_dir.value.glob("[!.]*"), key=lambda x: x.stat().st_mtime
@@ -755,29 +810,47 @@ class EventServer(ECServerThread):
         except Exception:
             self._logger.exception("exception while handling an SNMP trap, skipping this one")
 
-    def process_potential_event_instrumented(self, events: Iterable[Event]) -> None:
+    def process_potential_event_instrumented(
+        self, events: Iterable[Event], *, block: bool = True
+    ) -> None:
         """
-        Processes incoming data, just a wrapper between the real data and the
-        handler function to record some statistics etc.
+        Hands the incoming events over to the matching workers. Unless block is set,
+        the events are dropped when the queue is full.
         """
-        for event in events:
-            self._perfcounters.count("messages")
-            before = time.time()
-            # In replication slave mode (when not took over), ignore all events
-            if not is_replication_slave(self._config) or self._slave_status["mode"] != "sync":
-                self.process_potential_event(event)
-            elif self.settings.options.debug:
-                self._logger.info("Replication: we are in slave mode, ignoring event")
-            elapsed = time.time() - before
-            self._perfcounters.count_time("processing", elapsed)
+        self._pipeline.put(events, block=block)
+
+    def _match_instrumented(self, event: Event) -> tuple[float, RuleMatches | None]:
+        """
+        Just a wrapper between the real data and the handler function to record
+        some statistics etc.
+        """
+        before = time.time()
+        # In replication slave mode (when not took over), ignore all events
+        if not is_replication_slave(self._config) or self._slave_status["mode"] != "sync":
+            matches = self.match_event(event)
+        else:
+            matches = None
+        return time.time() - before, matches
+
+    def _commit_instrumented(self, event: Event, matched: tuple[float, RuleMatches | None]) -> None:
+        elapsed, matches = matched
+        self._perfcounters.count("messages")
+        before = time.time()
+        if matches is not None:
+            self.commit_event(event, matches)
+        elif self.settings.options.debug:
+            self._logger.info("Replication: we are in slave mode, ignoring event")
+        elapsed += time.time() - before
+        self._perfcounters.count_time("processing", elapsed)
 
     def process_syslog_messages(
-        self, messages: Iterable[bytes], address: tuple[str, int] | None
+        self, messages: Iterable[bytes], address: tuple[str, int] | None, *, block: bool = True
     ) -> None:
         self.process_potential_event_instrumented(
             create_events_from_syslog_messages(
                 messages, address, self._logger if self._config["debug_rules"] else None
-            )
+            ),
+            block=block,
         )
 
     def do_housekeeping(self) -> None:
@@ -985,9 +1058,8 @@ class EventServer(ECServerThread):
                 # First look for case 1: rule that already have at least one hit
                 # and this events in the state "counting" exist.
                 events_to_delete: list[tuple[Event, HistoryWhat]] = []
-                events = self._event_status.events()
-                for event in events:
-                    if event["rule_id"] == rule["id"] and event["phase"] == "counting":
+                for event in self._event_status.events_of_rule(rule["id"]):
+                    if event["phase"] == "counting":
                         # time has elapsed. Now lets see if we have reached
                         # the necessary count:
                         if event["count"] < expected_count:  # no -> trigger alarm
@@ -1040,10 +1112,8 @@ class EventServer(ECServerThread):
             merge, reset_ack = merge  # type: ignore[unreachable]
 
         if merge != "never":
-            for event in self._event_status.events():
-                if event["rule_id"] == rule["id"] and (
-                    event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked")
-                ):
+            for event in self._event_status.events_of_rule(rule["id"]):
+                if event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked"):
                     merge_event = event
                     break
 
@@ -1062,6 +1132,7 @@ class EventServer(ECServerThread):
             # Better rewrite (again). Rule might have changed. Also we have changed
             # the text and the user might have his own text added via set_text.
             self.rewrite_event(rule, merge_event, MatchGroups(), set_first=False)
+            self._event_status.reindex_event(merge_event)
             self._history.add(merge_event, "COUNTFAILED")
         else:
             # Create artificial event from scratch. Make sure that all important
@@ -1104,6 +1175,11 @@ class EventServer(ECServerThread):
                 event["phase"] = "closed"
                 self._event_status.remove_event(event, "AUTODELETE")
 
+    @property
+    def history(self) -> History:
+        """The history of the current configuration"""
+        return self._history
+
     def reload_configuration(self, config: Config, history: History) -> None:
         self._config = config
         self._history = history
@@ -1173,12 +1249,19 @@ class EventServer(ECServerThread):
             "Compiled %d active rules (ignoring %d disabled rules)", count_rules, count_disabled
         )
         if self._config["rule_optimizer"]:
+            self._rule_prefilter = RulePrefilter(self._rules)
             self._logger.info(
                 "Rule hash: %d rules - %d hashed, %d unspecific",
                 len(self._rules),
                 len(self._rules) - count_unspecific,
                 count_unspecific,
             )
+            self._logger.info(
+                "Rule prefilter: %d rules - %d filtered by %d anchors",
+                len(self._rules),
+                self._rule_prefilter.num_filtered_rules,
+                self._rule_prefilter.num_anchors,
+            )
             for facility in list(range(23)) + [31]:
                 if facility in self._rule_hash:
                     stats = [
@@ -1242,29 +1325,48 @@ class EventServer(ECServerThread):
                 (100.0 * count / float(total_count)),
             )
 
-    def process_potential_event(self, event: Event) -> None:  # pylint: disable=too-many-branches
-        self.do_translate_hostname(event)
+    def process_potential_event(self, event: Event) -> None:
+        self.commit_event(event, self.match_event(event))
 
-        # Log all incoming messages into a syslog-like text file if that is enabled
-        if self._config["log_messages"]:
-            self.log_message(event)
+    def _rule_set(self) -> _RuleSet:
+        with self._lock_configuration:
+            return _RuleSet(
+                rules=self._rules,
+                rule_hash=self._rule_hash if self._config["rule_optimizer"] else None,
+                rule_prefilter=self._rule_prefilter,
+                rule_matcher=self._rule_matcher,
+            )
+
+    def match_event(self, event: Event) -> RuleMatches:
+        """Match the event against the rules, without changing any state but the event
+
+        The configuration lock is only taken once to get the current rules, so that
+        the ingestion workers can match their events in parallel.
+        """
+        rule_set = self._rule_set()
+        self.do_translate_hostname(event)
 
         # Rule optimizer
-        if self._config["rule_optimizer"]:
-            self._hash_stats[event["facility"]][event["priority"]] += 1
-            rule_candidates = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
+        skipped: Sequence[Rule] = ()
+        rule_candidates: Sequence[Rule]
+        if rule_set.rule_hash is not None:
+            rule_candidates = rule_set.rule_hash.get(event["facility"], {}).get(
+                event["priority"], []
+            )
+            rule_candidates, skipped = rule_set.rule_prefilter.partition(rule_candidates, event)
         else:
-            rule_candidates = self._rules
+            rule_candidates = rule_set.rules
 
-        skip_pack = None
+        hits: list[tuple[Rule, MatchSuccess]] = []
+        skip_pack: str | None = None
         for rule in rule_candidates:
-            # TODO: Rewrite this skipping logic, so it's blindingly obvious, even for mypy.
-            if skip_pack and rule["pack"] == skip_pack:  # type: ignore[unreachable]
-                continue  # type: ignore[unreachable] # still in the rule pack that we want to skip
+            if skip_pack and rule["pack"] == skip_pack:
+                continue  # still in the rule pack that we want to skip
             skip_pack = None  # new pack, reset skipping
 
+            self._perfcounters.count("rule_tries")
             try:
-                result = self.event_rule_matches(rule, event)
+                result = rule_set.rule_matcher.event_rule_matches(rule, event)
             except Exception as e:
                 result = MatchFailure(
                     reason=f"Rule would match, but due to inverted matching does not. {e}"
@@ -1272,114 +1374,104 @@ class EventServer(ECServerThread):
                 self._logger.exception(result.reason)
 
             if isinstance(result, MatchSuccess):
-                self._perfcounters.count("rule_hits")
-                if self._config["debug_rules"]:
-                    self._logger.info("  matching groups:\n%s", pprint.pformat(result.match_groups))
+                hits.append((rule, result))
+                if rule.get("drop") == "skip_pack":
+                    skip_pack = rule["pack"]
+                    continue
+                break
 
-                self._event_status.count_rule_match(rule["id"])
-                if self._config["log_rulehits"]:
-                    self._logger.info(
-                        "Rule '%s/%s' hit by message %s/%s - '%s'.",
-                        rule["pack"],
-                        rule["id"],
-                        SyslogFacility(event["facility"]),
-                        SyslogPriority(event["priority"]),
-                        event["text"],
-                    )
+        return RuleMatches(hits=hits, skipped=skipped)
 
-                if rule.get("drop"):
-                    if rule["drop"] == "skip_pack":
-                        skip_pack = rule["pack"]
-                        if self._config["debug_rules"]:
-                            self._logger.info("  skipping this rule pack (%s)", skip_pack)
-                        continue
-                    self._perfcounters.count("drops")
-                    return
-
-                if result.cancelling:
-                    self._event_status.cancel_events(
-                        self, self._event_columns, event, result.match_groups, rule
-                    )
-                    return
+    def commit_event(  # pylint: disable=too-many-branches
+        self, event: Event, matches: RuleMatches
+    ) -> None:
+        """Create, count or cancel events according to the matching rules"""
+        # Log all incoming messages into a syslog-like text file if that is enabled
+        if self._config["log_messages"]:
+            self.log_message(event)
 
-                # Remember the rule id that this event originated from
-                event["rule_id"] = rule["id"]
+        if self._config["rule_optimizer"]:
+            self._hash_stats[event["facility"]][event["priority"]] += 1
+        if matches.skipped:
+            self._event_status.count_rule_skips(rule["id"] for rule in matches.skipped)
 
-                # Attach optional contact group information for visibility
-                # and eventually for notifications
-                self._add_rule_contact_groups_to_event(rule, event)
+        for rule, result in matches.hits:
+            self._perfcounters.count("rule_hits")
+            if self._config["debug_rules"]:
+                self._logger.info("  matching groups:\n%s", pprint.pformat(result.match_groups))
 
-                # Store groups from matching this event. In order to make
-                # persistence easier, we do not save them as list but join
-                # them on ASCII-1.
-                match_groups_message = result.match_groups.get("match_groups_message", ())
-                assert match_groups_message is not False
-                event["match_groups"] = match_groups_message
+            self._event_status.count_rule_match(rule["id"])
+            if self._config["log_rulehits"]:
+                self._logger.info(
+                    "Rule '%s/%s' hit by message %s/%s - '%s'.",
+                    rule["pack"],
+                    rule["id"],
+                    SyslogFacility(event["facility"]),
+                    SyslogPriority(event["priority"]),
+                    event["text"],
+                )
+
+            if rule.get("drop"):
+                if rule["drop"] == "skip_pack":
+                    if self._config["debug_rules"]:
+                        self._logger.info("  skipping this rule pack (%s)", rule["pack"])
+                    continue
+                self._perfcounters.count("drops")
+                return
 
-                match_groups_syslog_application = result.match_groups.get(
-                    "match_groups_syslog_application", ()
+            if result.cancelling:
+                self._event_status.cancel_events(
+                    self, self._event_columns, event, result.match_groups, rule
                 )
-                assert match_groups_syslog_application is not False
-                event["match_groups_syslog_application"] = match_groups_syslog_application
+                return
 
-                self.rewrite_event(rule, event, result.match_groups)
+            # Remember the rule id that this event originated from
+            event["rule_id"] = rule["id"]
 
-                # Lookup the monitoring core hosts and add the core host
-                # name to the event when one can be matched.
-                #
-                # Needs to be done AFTER event rewriting, because the rewriting
-                # may change the "host" field.
-                #
-                # For the moment we have no rule/condition matching on this
-                # field. So we only add the core host info for matched events.
-                self._add_core_host_to_new_event(event)
-
-                if "count" in rule:
-                    count = rule["count"]
-                    # Check if a matching event already exists that we need to
-                    # count up. If the count reaches the limit, the event will
-                    # be opened and its rule actions performed.
-                    existing_event = self._event_status.count_event(self, event, count)
-                    if existing_event:
-                        if "delay" in rule:
-                            if self._config["debug_rules"]:
-                                self._logger.info(
-                                    "Event opening will be delayed for %d seconds", rule["delay"]
-                                )
-                            existing_event["delay_until"] = time.time() + rule["delay"]
-                            existing_event["phase"] = "delayed"
-                        else:
-                            event_has_opened(
-                                self._history,
-                                self.settings,
-                                self._config,
-                                self._logger,
-                                self.host_config,
-                                self._event_columns,
-                                rule,
-                                existing_event,
-                            )
+            # Attach optional contact group information for visibility
+            # and eventually for notifications
+            self._add_rule_contact_groups_to_event(rule, event)
 
-                        self._history.add(existing_event, "COUNTREACHED")
+            # Store groups from matching this event. In order to make
+            # persistence easier, we do not save them as list but join
+            # them on ASCII-1.
+            match_groups_message = result.match_groups.get("match_groups_message", ())
+            assert match_groups_message is not False
+            event["match_groups"] = match_groups_message
 
-                        if "delay" not in rule and rule.get("autodelete"):
-                            existing_event["phase"] = "closed"
-                            with self._event_status.lock:
-                                self._event_status.remove_event(existing_event, "AUTODELETE")
-                elif "expect" in rule:
-                    self._event_status.count_expected_event(self, event)
-                else:
+            match_groups_syslog_application = result.match_groups.get(
+                "match_groups_syslog_application", ()
+            )
+            assert match_groups_syslog_application is not False
+            event["match_groups_syslog_application"] = match_groups_syslog_application
+
+            self.rewrite_event(rule, event, result.match_groups)
+
+            # Lookup the monitoring core hosts and add the core host
+            # name to the event when one can be matched.
+            #
+            # Needs to be done AFTER event rewriting, because the rewriting
+            # may change the "host" field.
+            #
+            # For the moment we have no rule/condition matching on this
+            # field. So we only add the core host info for matched events.
+            self._add_core_host_to_new_event(event)
+
+            if "count" in rule:
+                count = rule["count"]
+                # Check if a matching event already exists that we need to
+                # count up. If the count reaches the limit, the event will
+                # be opened and its rule actions performed.
+                existing_event = self._event_status.count_event(self, event, count)
+                if existing_event:
                     if "delay" in rule:
                         if self._config["debug_rules"]:
                             self._logger.info(
                                 "Event opening will be delayed for %d seconds", rule["delay"]
                             )
-                        event["delay_until"] = time.time() + rule["delay"]
-                        event["phase"] = "delayed"
+                        existing_event["delay_until"] = time.time() + rule["delay"]
+                        existing_event["phase"] = "delayed"
                     else:
-                        event["phase"] = "open"
-
-                    if self.new_event_respecting_limits(event) and event["phase"] == "open":
                         event_has_opened(
                             self._history,
                             self.settings,
@@ -1388,13 +1480,44 @@ class EventServer(ECServerThread):
                             self.host_config,
                             self._event_columns,
                             rule,
-                            event,
+                            existing_event,
                         )
-                        if rule.get("autodelete"):
-                            event["phase"] = "closed"
-                            with self._event_status.lock:
-                                self._event_status.remove_event(event, "AUTODELETE")
-                return
+
+                    self._history.add(existing_event, "COUNTREACHED")
+
+                    if "delay" not in rule and rule.get("autodelete"):
+                        existing_event["phase"] = "closed"
+                        with self._event_status.lock:
+                            self._event_status.remove_event(existing_event, "AUTODELETE")
+            elif "expect" in rule:
+                self._event_status.count_expected_event(self, event)
+            else:
+                if "delay" in rule:
+                    if self._config["debug_rules"]:
+                        self._logger.info(
+                            "Event opening will be delayed for %d seconds", rule["delay"]
+                        )
+                    event["delay_until"] = time.time() + rule["delay"]
+                    event["phase"] = "delayed"
+                else:
+                    event["phase"] = "open"
+
+                if self.new_event_respecting_limits(event) and event["phase"] == "open":
+                    event_has_opened(
+                        self._history,
+                        self.settings,
+                        self._config,
+                        self._logger,
+                        self.host_config,
+                        self._event_columns,
+                        rule,
+                        event,
+                    )
+                    if rule.get("autodelete"):
+                        event["phase"] = "closed"
+                        with self._event_status.lock:
+                            self._event_status.remove_event(event, "AUTODELETE")
+            return
 
         # End of loop over rules.
         if self._config["archive_orphans"]:
@@ -1438,18 +1561,6 @@ class EventServer(ECServerThread):
             )
             return False
 
-    def event_rule_matches(self, rule: Rule, event: Event) -> MatchResult:
-        """
-        Checks if an event matches a rule. Returns either MatchFailure (no match)
-        or a MatchSuccess with a pair of matchtype, groups, where matchtype is False for a
-        normal match and True for a cancelling match and the groups is a tuple
-        if matched regex groups in either text (normal) or match_ok (cancelling)
-        match.
-        """
-        self._perfcounters.count("rule_tries")
-        with self._lock_configuration:
-            return self._rule_matcher.event_rule_matches(rule, event)
-
     def rewrite_event(  # pylint: disable=too-many-branches
         self, rule: Rule, event: Event, match_groups: MatchGroups, set_first: bool = True
     ) -> None:
@@ -1906,6 +2017,7 @@ class StatusTableRules(StatusTable):
     columns: Columns = [
         ("rule_id", ""),
         ("rule_hits", 0),
+        ("rule_skips", 0),
     ]
 
     def __init__(self, logger: Logger, event_status: EventStatus) -> None:
@@ -2299,6 +2411,7 @@ class StatusServer(ECServerThread):
             getLogger("cmk.mkeventd"),
             self._lock_configuration,
             self._history,
+            self._perfcounters,
             self._event_status,
             self._event_server,
             self,
@@ -2494,6 +2607,7 @@ def run_eventd(  # pylint: disable=too-many-branches
                     logger,
                     lock_configuration,
                     history,
+                    perfcounters,
                     event_status,
                     event_server,
                     status_server,
@@ -2550,9 +2664,11 @@ class EventStatus:
 
     def flush(self) -> None:
         # TODO: Improve types!
-        self._events: list[Event] = []
+        self._events = EventStore()
         self._next_event_id = 1
         self._rule_stats: dict[str, int] = {}
+        # Messages the rule prefilter has ruled out, not saved
+        self._rule_skips: dict[str, int] = {}
         # needed for expecting rules
         self._interval_starts: dict[str, int] = {}
         self._initialize_event_limit_status()
@@ -2563,14 +2679,19 @@ class EventStatus:
         # - number of rule misses
 
     def events(self) -> list[Event]:
-        # TODO: Improve type!
-        return self._events
+        """A snapshot of the current events, oldest first"""
+        return list(self._events)
+
+    def events_of_rule(self, rule_id: str | None) -> Sequence[Event]:
+        """A snapshot of the current events of a rule, oldest first"""
+        return self._events.of_rule(rule_id)
 
     def event(self, eid: int) -> Event | None:
-        for event in self._events:
-            if event["id"] == eid:
-                return event
-        return None
+        return self._events.get(eid)
+
+    def reindex_event(self, event: Event) -> None:
+        """Call this after changing the rule_id, host or application of a stored event"""
+        self._events.reindex(event)
 
     def interval_start(self, rule_id: str, interval: int) -> int:
         """
@@ -2619,14 +2740,14 @@ class EventStatus:
     def pack_status(self) -> PackedEventStatus:
         return PackedEventStatus(
             next_event_id=self._next_event_id,
-            events=self._events,
+            events=list(self._events),
             rule_stats=self._rule_stats,
             interval_starts=self._interval_starts,
         )
 
     def unpack_status(self, status: PackedEventStatus) -> None:
         self._next_event_id = status["next_event_id"]
-        self._events = status["events"]
+        self._events = EventStore(status["events"])
         self._rule_stats = status["rule_stats"]
         self._interval_starts = status["interval_starts"]
 
@@ -2648,8 +2769,10 @@ class EventStatus:
         if rule_id:
             if rule_id in self._rule_stats:
                 del self._rule_stats[rule_id]
+            self._rule_skips.pop(rule_id, None)
         else:
             self._rule_stats = {}
+            self._rule_skips = {}
         self.save_status()
 
     def load_status(self, event_server: EventServer) -> None:
@@ -2658,16 +2781,18 @@ class EventStatus:
             try:
                 status = ast.literal_eval(path.read_text(encoding="utf-8"))
                 self._next_event_id = status["next_event_id"]
-                self._events = status["events"]
+                events: list[Event] = status["events"]
                 self._rule_stats = status["rule_stats"]
                 self._interval_starts = status.get("interval_starts", {})
                 self._logger.info("Loaded event state from %s.", path)
             except Exception:
                 self._logger.exception("Error loading event state from %s", path)
                 raise
+        else:
+            events = list(self._events)
 
         # Add new columns and fix broken events
-        for event in self._events:
+        for event in events:
             event.setdefault("ipaddress", "")
             event.setdefault("host", HostName(""))
             event.setdefault("application", "")
@@ -2677,6 +2802,9 @@ class EventStatus:
                 event_server.add_core_host_to_event(event)
                 event["host_in_downtime"] = False
 
+        # The indexes need the fixed host and application
+        self._events = EventStore(events)
+
         # core_host is needed to initialize the status
         self._initialize_event_limit_status()
 
@@ -2716,7 +2844,7 @@ class EventStatus:
         self._perfcounters.count("events")
         event["id"] = self._next_event_id
         self._next_event_id += 1
-        self._events.append(event)
+        self._events.add(event)
         self.num_existing_events += 1
         self._count_event_add(event)
         self._history.add(event, "NEW")
@@ -2729,19 +2857,18 @@ class EventStatus:
         self._history.add(event, "ARCHIVED")
 
     def remove_event(self, event: Event, delete_reason: HistoryWhat, user: str = "") -> None:
-        try:
-            self._events.remove(event)
-            self._history.add(event, delete_reason, user)
-            self._count_event_remove(event)
-        except ValueError:
-            self._logger.exception("Cannot remove event %d: not present", event["id"])
+        if not self._events.remove(event):
+            self._logger.error("Cannot remove event %d: not present", event["id"])
+            return
+        self._history.add(event, delete_reason, user)
+        self._count_event_remove(event)
 
     # protected by self.lock
     def remove_oldest_event(self, ty: LimitKind, event: Event) -> None:
         if ty == "overall":
             self._logger.log(VERBOSE, "  Removing oldest event")
-            oldest_event = self._events[0]
-            self.remove_event(oldest_event, "AUTODELETE")
+            if (oldest_event := self._events.oldest()) is not None:
+                self.remove_event(oldest_event, "AUTODELETE")
         elif ty == "by_rule" and event["rule_id"] is not None:
             self._logger.log(VERBOSE, '  Removing oldest event of rule "%s"', event["rule_id"])
             self._remove_oldest_event_of_rule(event["rule_id"])
@@ -2751,17 +2878,13 @@ class EventStatus:
 
     # protected by self.lock
     def _remove_oldest_event_of_rule(self, rule_id: str) -> None:
-        for event in self._events:
-            if event["rule_id"] == rule_id:
-                self.remove_event(event, "AUTODELETE")
-                return
+        if (event := self._events.oldest_of_rule(rule_id)) is not None:
+            self.remove_event(event, "AUTODELETE")
 
     # protected by self.lock
-    def _remove_oldest_event_of_host(self, hostname: str) -> None:
-        for event in self._events:
-            if event["host"] == hostname:
-                self.remove_event(event, "AUTODELETE")
-                return
+    def _remove_oldest_event_of_host(self, hostname: HostName) -> None:
+        if (event := self._events.oldest_of_host(hostname)) is not None:
+            self.remove_event(event, "AUTODELETE")
 
     # protected by self.lock
     def get_num_existing_events_by(self, ty: LimitKind, event: Event) -> int:
@@ -2789,10 +2912,8 @@ class EventStatus:
         """
         with self.lock:
             to_delete = []
-            for event in self._events:
-                if event["rule_id"] == rule["id"] and self.cancelling_match(
-                    match_groups, new_event, event, rule
-                ):
+            for event in self._events.of_rule(rule["id"]):
+                if self.cancelling_match(match_groups, new_event, event, rule):
                     # Fill a few fields of the cancelled event with data from
                     # the cancelling event so that action scripts have useful
                     # values and the logfile entry if more relevant.
@@ -2949,6 +3070,11 @@ class EventStatus:
             self._rule_stats.setdefault(rule_id, 0)
             self._rule_stats[rule_id] += 1
 
+    def count_rule_skips(self, rule_ids: Iterable[str]) -> None:
+        with self.lock:
+            for rule_id in rule_ids:
+                self._rule_skips[rule_id] = self._rule_skips.get(rule_id, 0) + 1
+
     def count_event_up(self, found: Event, event: Event) -> None:
         """
         Update event with new information from new occurrence,
@@ -2967,9 +3093,10 @@ class EventStatus:
         found.update(preserve)
 
     def count_expected_event(self, event_server: EventServer, event: Event) -> None:
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"] and ev["phase"] == "counting":
+        for ev in self._events.of_rule(event["rule_id"]):
+            if ev["phase"] == "counting":
                 self.count_event_up(ev, event)
+                self._events.reindex(ev)
                 return
 
         # None found, create one
@@ -2985,31 +3112,36 @@ class EventStatus:
         since the event has been created because the count was too
         low in the specified period of time.
         """
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"]:
-                if ev["phase"] == "ack" and not count["count_ack"]:
-                    continue  # skip acknowledged events
+        candidates = (
+            self._events.of_key(event_key(event))
+            if count["separate_host"] and count["separate_application"]
+            else self._events.of_rule(event["rule_id"])
+        )
+        for ev in candidates:
+            if ev["phase"] == "ack" and not count["count_ack"]:
+                continue  # skip acknowledged events
 
-                if count["separate_host"] and ev["host"] != event["host"]:
-                    continue  # treat events with separated hosts separately
+            if count["separate_host"] and ev["host"] != event["host"]:
+                continue  # treat events with separated hosts separately
 
-                if count["separate_application"] and ev["application"] != event["application"]:
-                    continue  # same for application
+            if count["separate_application"] and ev["application"] != event["application"]:
+                continue  # same for application
 
-                if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
-                    continue
+            if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
+                continue
 
-                count_duration = count.get("count_duration")
-                if count_duration is not None and ev["first"] + count_duration < event["time"]:
-                    # Counting has been discontinued on this event after a certain time
-                    continue
+            count_duration = count.get("count_duration")
+            if count_duration is not None and ev["first"] + count_duration < event["time"]:
+                # Counting has been discontinued on this event after a certain time
+                continue
 
-                if ev["host_in_downtime"] != event["host_in_downtime"]:
-                    continue  # treat events with different downtime states separately
+            if ev["host_in_downtime"] != event["host_in_downtime"]:
+                continue  # treat events with different downtime states separately
 
-                found = ev
-                self.count_event_up(found, event)
-                break
+            found = ev
+            self.count_event_up(found, event)
+            self._events.reindex(found)
+            break
         else:
             event["count"] = 1
             event["phase"] = "counting"
@@ -3023,7 +3155,7 @@ class EventStatus:
         return None  # do not do event action
 
     def delete_events_by(self, predicate: Callable[[Event], bool], user: str) -> None:
-        for event in self._events[:]:
+        for event in list(self._events):
             if predicate(event):
                 event["phase"] = "closed"
                 if user:
@@ -3031,10 +3163,13 @@ class EventStatus:
                 self.remove_event(event, "DELETE", user)
 
     def get_events(self) -> Iterable[Event]:
-        return self._events
+        return list(self._events)
 
-    def get_rule_stats(self) -> Iterable[tuple[str, int]]:
-        return sorted(self._rule_stats.items(), key=lambda x: x[0])
+    def get_rule_stats(self) -> Iterable[tuple[str, int, int]]:
+        return [
+            (rule_id, self._rule_stats.get(rule_id, 0), self._rule_skips.get(rule_id, 0))
+            for rule_id in sorted(self._rule_stats.keys() | self._rule_skips.keys())
+        ]
 
 
 # .
@@ -3345,6 +3480,7 @@ def reload_configuration(
     logger: Logger,
     lock_configuration: ECLock,
     history: History,
+    perfcounters: Perfcounters,
     event_status: EventStatus,
     event_server: EventServer,
     status_server: StatusServer,
@@ -3355,7 +3491,12 @@ def reload_configuration(
 
         history.close()
         history = create_history(
-            settings, config, logger, StatusTableEvents.columns, StatusTableHistory.columns
+            settings,
+            config,
+            logger,
+            StatusTableEvents.columns,
+            StatusTableHistory.columns,
+            perfcounters=perfcounters,
         )
         event_server.reload_configuration(config, history)
 
@@ -3397,8 +3538,14 @@ def main() -> None:
 
         slave_status = default_slave_status_master()
         config = load_configuration(settings, logger, slave_status)
+        perfcounters = Perfcounters(logger.getChild("lock.perfcounters"))
         history = create_history(
-            settings, config, logger, StatusTableEvents.columns, StatusTableHistory.columns
+            settings,
+            config,
+            logger,
+            StatusTableEvents.columns,
+            StatusTableHistory.columns,
+            perfcounters=perfcounters,
         )
 
         pid_path = settings.paths.pid_file.value
@@ -3421,7 +3568,6 @@ def main() -> None:
         settings.paths.status_file.value.parent.mkdir(parents=True, exist_ok=True)
 
         # First do all things that might fail, before daemonizing
-        perfcounters = Perfcounters(logger.getChild("lock.perfcounters"))
         event_status = EventStatus(
             settings, config, perfcounters, history, logger.getChild("EventStatus")
         )
@@ -3502,6 +3648,9 @@ def main() -> None:
         logger.log(VERBOSE, "Saving final event state")
         event_status.save_status()
 
+        logger.log(VERBOSE, "Writing the queued history entries")
+        event_server.history.close()
+
         logger.log(VERBOSE, "Cleaning up sockets")
         settings.paths.unix_socket.value.unlink()
         settings.paths.event_socket.value.unlink()
@@ -28,6 +28,13 @@ class Perfcounters:
         "overflows",
         "events",
         "connects",
+        "queue_drops",
+        "history_writes",
+    ]
+
+    # Current values, not accumulated
+    _gauge_names: Sequence[str] = [
+        "queue_depth",  # messages waiting for the rule matching
     ]
 
     # Average processing times
@@ -35,6 +42,7 @@ class Perfcounters:
         "processing": 0.99,  # event processing
         "sync": 0.95,  # Replication sync
         "request": 0.95,  # Client requests
+        "history_write": 0.95,  # Latency of the history writes
     }
 
     # TODO: Why aren't self._times / self._rates / ... not initialized with their defaults?
@@ -47,13 +55,18 @@ class Perfcounters:
         self._rates: dict[str, float] = {}
         self._average_rates: dict[str, float] = {}
         self._times: dict[str, float] = {}
+        self._gauges = {n: 0 for n in self._gauge_names}
         self._last_statistics: float | None = None
 
         self._logger = logger.getChild("Perfcounters")
 
-    def count(self, counter: str) -> None:
+    def count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def set_gauge(self, gauge: str, value: int) -> None:
         with self._lock:
-            self._counters[counter] += 1
+            self._gauges[gauge] = value
 
     def count_time(self, counter: str, ptime: float) -> None:
         with self._lock:
@@ -96,6 +109,9 @@ class Perfcounters:
         for name in cls._weights:
             columns.append((f"status_average_{name}_time", 0.0))
 
+        for name in cls._gauge_names:
+            columns.append((f"status_{name}", 0))
+
         return columns
 
     def get_status(self) -> Sequence[float]:
@@ -114,4 +130,7 @@ class Perfcounters:
             for name in self._weights:
                 row.append(self._times.get(name, 0.0))
 
+            for name in self._gauge_names:
+                row.append(self._gauges[name])
+
             return row
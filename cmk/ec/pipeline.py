@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Staged processing of the incoming events
+
+The receiving thread only reads the sockets and puts the events into a bounded
+queue, so it gets back to the sockets quickly, even during a burst of messages.
+Matching workers take the events from the queue and match them against the rules,
+which does not change any state. The results are committed one at a time, in the
+order the events have been received: Creating, counting and cancelling events works
+exactly as if the events were processed one after another.
+"""
+
+import functools
+import queue
+import socket
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from logging import Logger
+from typing import Final, Generic, TypeVar
+
+from .event import Event
+from .perfcounters import Perfcounters
+
+__all__ = ["Pipeline", "receive_datagrams"]
+
+_T = TypeVar("_T")
+
+# Datagrams read in one go, before the other sockets get their turn
+_MAX_DATAGRAMS: Final = 256
+
+
+def receive_datagrams(sock: socket.socket, bufsize: int) -> Iterator[tuple[bytes, object]]:
+    """Read the datagrams waiting on the readable socket
+
+    Draining the receive buffer in one go keeps the kernel from dropping datagrams
+    during a burst.
+    """
+    yield sock.recvfrom(bufsize)
+    for _nr in range(_MAX_DATAGRAMS - 1):
+        try:
+            yield sock.recvfrom(bufsize, socket.MSG_DONTWAIT)
+        except (BlockingIOError, InterruptedError):
+            return
+
+
+class Pipeline(Generic[_T]):
+    def __init__(
+        self,
+        *,
+        match: Callable[[Event], _T],
+        commit: Callable[[Event, _T], None],
+        num_workers: int,
+        queue_len: int,
+        perfcounters: Perfcounters,
+        logger: Logger,
+    ) -> None:
+        self._match: Final = match
+        self._commit: Final = commit
+        self._perfcounters: Final = perfcounters
+        self._logger: Final = logger
+        self._queue: queue.Queue[tuple[int, Event] | None] = queue.Queue(maxsize=queue_len)
+        # Sequence number of the next event put into the queue, only used by the receiver
+        self._next_received = 0
+        # Sequence number of the next event to be committed
+        self._next_commit = 0
+        self._turn = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"EventMatcher-{nr}", daemon=True)
+            for nr in range(max(1, num_workers))
+        ]
+
+    def start(self) -> None:
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self) -> None:
+        """Process the queued events and stop the workers"""
+        for _worker in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def put(self, events: Iterable[Event], *, block: bool) -> None:
+        """Queue the events, dropping them if the queue is full and block is False"""
+        for event in events:
+            try:
+                self._queue.put((self._next_received, event), block=block)
+            except queue.Full:
+                self._perfcounters.count("queue_drops")
+                continue
+            self._next_received += 1
+        self._perfcounters.set_gauge("queue_depth", self._queue.qsize())
+
+    def _work(self) -> None:
+        while (item := self._queue.get()) is not None:
+            sequence_number, event = item
+            try:
+                commit = functools.partial(self._commit, event, self._match(event))
+            except Exception:
+                self._logger.exception("Exception while matching event %r", event)
+                commit = None
+
+            with self._turn:
+                while self._next_commit != sequence_number:
+                    self._turn.wait()
+                try:
+                    if commit is not None:
+                        commit()
+                except Exception:
+                    self._logger.exception("Exception while processing event %r", event)
+                finally:
+                    self._next_commit += 1
+                    self._turn.notify_all()
@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import ipaddress
 import re
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from logging import Logger
 from typing import Literal, NamedTuple
@@ -40,6 +40,15 @@ class MatchSuccess:
 MatchResult = MatchFailure | MatchSuccess
 
 
+@dataclass(frozen=True)
+class RuleMatches:
+    """The matching rules of an event, in the order they are applied"""
+
+    hits: Sequence[tuple[Rule, MatchSuccess]]
+    # Rules ruled out by the prefilter
+    skipped: Sequence[Rule]
+
+
 def compile_matching_value(key: str, original_value: str) -> TextPattern | None:
     """Tries to convert a string to a compiled regex pattern.
 
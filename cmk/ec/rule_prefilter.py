@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Prefilter for the rules a message is matched against
+
+The rule hash only narrows the rules by syslog facility and priority. Most of the
+remaining rules fail on their text, host or application pattern. Each of these
+patterns has anchors, literals a matching value has to contain:
+
+ * a plain text pattern is its own anchor,
+ * a regular expression has the longest run of literal characters outside of
+   optional or repeated parts as anchor, or one anchor per alternative.
+
+The anchors of all rules are compiled into one Aho-Corasick automaton. Per message
+the host, application and text are scanned once, and only the rules whose anchors
+have been found need to be evaluated. The prefilter never rejects a rule that would
+match: anything that cannot be reduced to anchors is always evaluated.
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Sequence
+from re import _constants, _parser, Pattern  # type: ignore[attr-defined]
+from typing import Any, Final
+
+from .config import Rule, TextPattern
+from .event import Event
+
+__all__ = ["RulePrefilter"]
+
+_HOST: Final = 0
+_APPLICATION: Final = 1
+_TEXT: Final = 2
+
+# Delimits the host, which has to match completely
+_BOUNDARY: Final = "\x00"
+
+# Shorter anchors of regular expressions are found in almost every message
+_MIN_ANCHOR_LENGTH: Final = 3
+
+# Characters matched case insensitively by an ASCII letter, but not lowered to it
+_NORMALIZE: Final = str.maketrans({"\u0131": "i", "\u017f": "s", "\u0307": None})
+
+# For each checked field the anchors of which at least one has to be found
+_Requirements = tuple[tuple[int, frozenset[int]], ...]
+
+
+def _normalize(value: str) -> str:
+    return value.lower().translate(_NORMALIZE)
+
+
+class _Automaton:
+    """Aho-Corasick automaton finding all of the given words in a text"""
+
+    def __init__(self, words: Sequence[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        outputs: list[set[int]] = [set()]
+        for index, word in enumerate(words):
+            state = 0
+            for char in word:
+                if char not in self._goto[state]:
+                    self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    outputs.append(set())
+                state = self._goto[state][char]
+            outputs[state].add(index)
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+        self._outputs = [frozenset(output) for output in outputs]
+
+    def find(self, text: str) -> set[int]:
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
+
+
+class RulePrefilter:
+    """The anchors of the compiled rules
+
+    Rules are identified by object, the prefilter has to be created from the rules
+    the messages are matched against.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self._anchor_ids: dict[str, int] = {}
+        self._requirements: dict[int, _Requirements] = {}
+        for rule in rules:
+            if requirements := self._rule_requirements(rule):
+                self._requirements[id(rule)] = requirements
+        self._automaton = _Automaton(list(self._anchor_ids))
+
+    @property
+    def num_filtered_rules(self) -> int:
+        return len(self._requirements)
+
+    @property
+    def num_anchors(self) -> int:
+        return len(self._anchor_ids)
+
+    def may_match(self, event: Event) -> Callable[[Rule], bool]:
+        """Return a predicate telling whether a rule may match the event"""
+        if not self._requirements:
+            return lambda rule: True
+        found = (
+            self._automaton.find(f"{_BOUNDARY}{_normalize(event['host'])}{_BOUNDARY}"),
+            self._automaton.find(_normalize(event["application"])),
+            self._automaton.find(_normalize(event["text"])),
+        )
+        requirements = self._requirements
+
+        def predicate(rule: Rule) -> bool:
+            return all(
+                not anchors.isdisjoint(found[field])
+                for field, anchors in requirements.get(id(rule), ())
+            )
+
+        return predicate
+
+    def partition(
+        self, rules: Iterable[Rule], event: Event
+    ) -> tuple[Sequence[Rule], Sequence[Rule]]:
+        """Split the rules into those that may match the event and those that cannot"""
+        may_match = self.may_match(event)
+        candidates: list[Rule] = []
+        skipped: list[Rule] = []
+        for rule in rules:
+            (candidates if may_match(rule) else skipped).append(rule)
+        return candidates, skipped
+
+    def _rule_requirements(self, rule: Rule) -> _Requirements:
+        if rule.get("disabled") or rule.get("invert_matching"):
+            return ()
+        requirements = []
+        # match() of an absent pattern always succeeds. The rule fails only if both
+        # the positive and the cancelling pattern fail.
+        if "match_host" in rule and (anchors := self._anchors(rule["match_host"], complete=True)):
+            requirements.append((_HOST, anchors))
+        if (
+            applications := self._alternatives(
+                rule.get("match_application"), rule.get("cancel_application")
+            )
+        ) is not None:
+            requirements.append((_APPLICATION, applications))
+        if "match" in rule and (texts := self._alternatives(rule["match"], rule.get("match_ok"))):
+            requirements.append((_TEXT, texts))
+        return tuple(requirements)
+
+    def _alternatives(self, *patterns: TextPattern | None) -> frozenset[int] | None:
+        """Anchors of which one is found if any of the present patterns matches"""
+        present = [pattern for pattern in patterns if pattern is not None]
+        if not present:
+            return None
+        anchors = [self._anchors(pattern, complete=False) for pattern in present]
+        if not all(anchors):
+            return None
+        return frozenset().union(*anchors)
+
+    def _anchors(self, pattern: TextPattern, *, complete: bool) -> frozenset[int]:
+        if isinstance(pattern, str):
+            literals = [_normalize(pattern)]
+            if complete:
+                literals = [f"{_BOUNDARY}{literals[0]}{_BOUNDARY}"]
+        else:
+            literals = regex_anchors(pattern)
+        if not all(literals):
+            return frozenset()
+        return frozenset(
+            self._anchor_ids.setdefault(literal, len(self._anchor_ids)) for literal in literals
+        )
+
+
+def regex_anchors(pattern: Pattern[str]) -> list[str]:
+    """Return literals of which a text matching the expression contains at least one
+
+    The literals are lowered, an empty list means that there is no such anchor.
+    """
+    try:
+        parsed = _parser.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return []
+    items = _flatten(list(parsed))
+    longest = max(_literal_runs(items), key=len, default="")
+    if len(longest) >= _MIN_ANCHOR_LENGTH:
+        return [longest]
+    for op, value in items:
+        if op is _constants.BRANCH:
+            alternatives = [
+                max(_literal_runs(_flatten(list(branch))), key=len, default="")
+                for branch in value[1]
+            ]
+            if all(len(alternative) >= _MIN_ANCHOR_LENGTH for alternative in alternatives):
+                return alternatives
+    return []
+
+
+# Items of the parsed expression: (opcode, argument)
+_Items = list[tuple[Any, Any]]
+
+
+def _flatten(items: _Items) -> _Items:
+    """Inline the contents of groups, which do not change the matched text"""
+    flat: _Items = []
+    for op, value in items:
+        if op is _constants.SUBPATTERN:
+            _group, add_flags, del_flags, subpattern = value
+            if not add_flags and not del_flags:
+                flat.extend(_flatten(list(subpattern)))
+                continue
+        flat.append((op, value))
+    return flat
+
+
+def _literal_runs(items: _Items) -> Iterable[str]:
+    run: list[str] = []
+    for op, value in items:
+        if op is _constants.LITERAL and value < 0x80:
+            run.append(chr(value).lower())
+            continue
+        yield "".join(run)
+        run = []
+    yield "".join(run)
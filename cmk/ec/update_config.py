@@ -12,6 +12,7 @@ from pathlib import Path
 from cmk.ccc.store import save_mk_file
 
 from .history_file import parse_history_file_python
+from .history_index import index_path
 from .history_sqlite import SQLiteHistory
 from .main import (
     create_history_raw,
@@ -68,5 +69,6 @@ def history_files_to_sqlite(omd_root: Path, logger: logging.Logger) -> None:
 
         # processed files are not needed anymore
         file.rename(file.with_suffix(".bak"))
+        index_path(file).unlink(missing_ok=True)
         logger.debug("Renamed file %s", file)
     logger.debug("Migrating history files to sqlite took: %s", timedelta(seconds=time.time() - tic))
@@ -17,12 +17,14 @@ from ._nofetcher import NoFetcher, NoFetcherError
 from ._piggyback import PiggybackFetcher
 from ._program import ProgramFetcher
 from ._snmp import SNMPFetcher, SNMPScanConfig, SNMPSectionMeta
-from ._tcp import TCPFetcher, TLSConfig
+from ._tcp import fetch_all_tcp, fetch_all_tcp_async, TCPFetcher, TLSConfig
 
 __all__ = [
     "decrypt_by_agent_protocol",
     "NoFetcherError",
     "Fetcher",
+    "fetch_all_tcp",
+    "fetch_all_tcp_async",
     "get_raw_data",
     "IPMICredentials",
     "IPMIFetcher",
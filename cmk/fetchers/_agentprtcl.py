@@ -133,6 +133,55 @@ class MessageV1(Deserializer):
         return False
 
 
+class AgentCtlMessageDecoder:
+    """Decode the payload of an AgentCtlMessage while it is received
+
+    `b"".join([*map(decoder.feed, chunks), decoder.flush()])` is the same as
+    `AgentCtlMessage.from_bytes(b"".join(chunks)).payload`, but the message is
+    decompressed chunk by chunk instead of as a whole.
+    """
+
+    _HEADER_LENGTH: Final = Version.length() + len(bytes(CompressionType.UNCOMPRESSED))
+
+    def __init__(self) -> None:
+        self._header = bytearray()
+        self._decompressor: zlib._Decompress | None = None
+        self._in_payload = False
+
+    def feed(self, data: bytes) -> bytes:
+        if not self._in_payload:
+            self._header += data
+            if len(self._header) < self._HEADER_LENGTH:
+                return b""
+            # There only is a V1 so far, unknown versions raise a ValueError.
+            Version.from_bytes(self._header)
+            header = HeaderV1.from_bytes(memoryview(self._header)[Version.length() :])
+            if header.compression_type is CompressionType.ZLIB:
+                self._decompressor = zlib.decompressobj()
+            self._in_payload = True
+            data = bytes(self._header[self._HEADER_LENGTH :])
+            self._header.clear()
+
+        if self._decompressor is None:
+            return data
+        try:
+            return self._decompressor.decompress(data)
+        except zlib.error as e:
+            raise ValueError(f"Decompression with zlib failed: {e!r}") from e
+
+    def flush(self) -> bytes:
+        if self._decompressor is None:
+            # Uncompressed or too short for a header: nothing left to decode
+            return b""
+        try:
+            tail = self._decompressor.flush()
+        except zlib.error as e:
+            raise ValueError(f"Decompression with zlib failed: {e!r}") from e
+        if not self._decompressor.eof:
+            raise ValueError("Decompression with zlib failed: incomplete or truncated stream")
+        return tail
+
+
 def _decompress(compression_type: CompressionType, data: Buffer) -> Buffer:
     if compression_type is CompressionType.ZLIB:
         try:
@@ -2,76 +2,169 @@
 # Copyright (C) 2019 Checkmk GmbH - License: GNU General Public License v2
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
-"""SNMP caching"""
+"""SNMP caching
 
-import os
+The values of single OIDs fetched by the SNMP scan (sysDescr, sysObjectID and the
+other OIDs of the detect specifications) are cached per host and IP address.
+
+File layout (all integers little endian):
+
+    header      magic
+    entries     (timestamp, OID length, value length) followed by the OID and the
+                UTF-8 encoded value. A value length of 0xFFFFFFFF stands for None,
+                i.e. the OID could not be fetched.
+"""
+
+import struct
+import time
+from collections.abc import Iterator, MutableMapping
 from pathlib import Path
+from typing import Final
 
-import cmk.utils.cleanup
+from cmk.utils.caching import LRUCache
 from cmk.utils.hostaddress import HostAddress, HostName
 
 from cmk.snmplib import OID, SNMPDecodedString
 
 from cmk.ccc import store
 
-# TODO: Replace this by generic caching
-_g_single_oid_hostname: HostName | None = None
-_g_single_oid_ipaddress: HostAddress | None = None
-_g_single_oid_cache: dict[OID, SNMPDecodedString | None] | None = None
-
-
-def initialize_single_oid_cache(
-    host_name: HostName, ipaddress: HostAddress | None, from_disk: bool = False, *, cache_dir: Path
-) -> None:
-    global _g_single_oid_cache, _g_single_oid_ipaddress, _g_single_oid_hostname
-
-    if (
-        _g_single_oid_hostname != host_name
-        or _g_single_oid_ipaddress != ipaddress
-        or _g_single_oid_cache is None
-    ):
-        _g_single_oid_hostname = host_name
-        _g_single_oid_ipaddress = ipaddress
-        if from_disk:
-            _g_single_oid_cache = _load_single_oid_cache(host_name, ipaddress, cache_dir=cache_dir)
-        else:
-            _g_single_oid_cache = {}
-
-
-def write_single_oid_cache(
-    host_name: HostName, ipaddress: HostAddress | None, *, cache_dir: Path
-) -> None:
-    if not _g_single_oid_cache:
-        return
-
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    cache_path = f"{cache_dir}/{host_name}.{ipaddress}"
-    store.save_object_to_file(cache_path, _g_single_oid_cache, pretty=False)
-
-
-def _load_single_oid_cache(
-    host_name: HostName, ipaddress: HostAddress | None, cache_dir: Path
-) -> dict[OID, SNMPDecodedString | None]:
-    cache_path = cache_dir / f"{host_name}.{ipaddress}"
-    return store.load_object_from_file(cache_path, default={})
-
-
-def single_oid_cache() -> dict[OID, SNMPDecodedString | None]:
-    assert _g_single_oid_cache is not None
-    return _g_single_oid_cache
-
-
-def cleanup_host_caches() -> None:
-    _clear_other_hosts_oid_cache(None)
-
-
-cmk.utils.cleanup.register_cleanup(cleanup_host_caches)
-
-
-def _clear_other_hosts_oid_cache(hostname: HostName | None) -> None:
-    global _g_single_oid_cache, _g_single_oid_ipaddress, _g_single_oid_hostname
-    if _g_single_oid_hostname != hostname:
-        _g_single_oid_cache = None
-        _g_single_oid_hostname = hostname
-        _g_single_oid_ipaddress = None
+__all__ = ["SingleOIDCache", "single_oid_cache"]
+
+_MAGIC: Final = b"CMKSOC01"
+_ENTRY: Final = struct.Struct("<dHI")
+_NONE: Final = 0xFFFFFFFF
+
+# Number of hosts whose caches are kept in memory by a process
+_MAX_HOSTS: Final = 1024
+
+
+class SingleOIDCache(MutableMapping[OID, SNMPDecodedString | None]):
+    """Values of single OIDs of one host, expiring after ttl seconds (never if ttl is 0)"""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        ttl: float,
+        entries: MutableMapping[OID, tuple[float, SNMPDecodedString | None]] | None = None,
+    ) -> None:
+        self.path: Final = path
+        self.ttl: Final = ttl
+        self._entries = {} if entries is None else entries
+        self._changed = False
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r}, ttl={self.ttl!r})"
+
+    @classmethod
+    def load(cls, path: Path, *, ttl: float) -> "SingleOIDCache":
+        """Load the cache, skipping expired entries
+
+        A missing or broken file results in an empty cache.
+        """
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return cls(path, ttl=ttl)
+        try:
+            return cls(path, ttl=ttl, entries=_deserialize(raw, time.time() - ttl))
+        except (ValueError, struct.error, UnicodeDecodeError):
+            return cls(path, ttl=ttl)
+
+    def save(self) -> None:
+        """Write the cache if it has been changed since it was loaded"""
+        if not self._changed or self.ttl <= 0:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        store.save_bytes_to_file(self.path, _serialize(self._entries))
+        self._changed = False
+
+    def _is_expired(self, timestamp: float) -> bool:
+        return 0 < self.ttl < time.time() - timestamp
+
+    def __getitem__(self, oid: OID) -> SNMPDecodedString | None:
+        timestamp, value = self._entries[oid]
+        if self._is_expired(timestamp):
+            del self._entries[oid]
+            raise KeyError(oid)
+        return value
+
+    def __setitem__(self, oid: OID, value: SNMPDecodedString | None) -> None:
+        self._entries[oid] = (time.time(), value)
+        self._changed = True
+
+    def __delitem__(self, oid: OID) -> None:
+        del self._entries[oid]
+        self._changed = True
+
+    def __iter__(self) -> Iterator[OID]:
+        return iter(
+            [
+                oid
+                for oid, (timestamp, _v) in self._entries.items()
+                if not self._is_expired(timestamp)
+            ]
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _oid in self)
+
+
+def _serialize(entries: MutableMapping[OID, tuple[float, SNMPDecodedString | None]]) -> bytes:
+    chunks = [_MAGIC]
+    for oid, (timestamp, value) in entries.items():
+        raw_oid = oid.encode("utf-8")
+        raw_value = b"" if value is None else value.encode("utf-8")
+        chunks.append(
+            _ENTRY.pack(timestamp, len(raw_oid), _NONE if value is None else len(raw_value))
+        )
+        chunks.append(raw_oid)
+        chunks.append(raw_value)
+    return b"".join(chunks)
+
+
+def _deserialize(
+    raw: bytes, not_before: float
+) -> dict[OID, tuple[float, SNMPDecodedString | None]]:
+    if not raw.startswith(_MAGIC):
+        raise ValueError("Invalid single OID cache")
+    entries: dict[OID, tuple[float, SNMPDecodedString | None]] = {}
+    offset = len(_MAGIC)
+    while offset < len(raw):
+        timestamp, oid_length, value_length = _ENTRY.unpack_from(raw, offset)
+        offset += _ENTRY.size
+        end = offset + oid_length + (0 if value_length == _NONE else value_length)
+        if end > len(raw):
+            raise ValueError("Truncated single OID cache")
+        oid = raw[offset : offset + oid_length].decode("utf-8")
+        value = None if value_length == _NONE else raw[offset + oid_length : end].decode("utf-8")
+        offset = end
+        if timestamp >= not_before:
+            entries[oid] = (timestamp, value)
+    return entries
+
+
+_caches = LRUCache[Path, SingleOIDCache](maxsize=_MAX_HOSTS)
+
+
+def single_oid_cache(
+    host_name: HostName, ipaddress: HostAddress | None, *, cache_dir: Path, ttl: float
+) -> SingleOIDCache:
+    """Return the cache of the host
+
+    The caches are kept in memory, so processing many hosts in one process does not
+    read the files again. A ttl of 0 disables the cache across scans: the returned
+    cache is empty, and it is neither kept nor saved.
+    """
+    path = cache_dir / f"{host_name}.{ipaddress}"
+    if ttl <= 0:
+        return SingleOIDCache(path, ttl=ttl)
+    try:
+        cache = _caches[path]
+    except KeyError:
+        pass
+    else:
+        if cache.ttl == ttl:
+            return cache
+    cache = _caches[path] = SingleOIDCache.load(path, ttl=ttl)
+    return cache
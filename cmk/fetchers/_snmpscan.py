@@ -5,7 +5,7 @@
 
 import functools
 import re
-from collections.abc import Callable, Collection, Iterable
+from collections.abc import Callable, Collection, Iterable, MutableMapping
 from dataclasses import dataclass
 from logging import Logger
 from pathlib import Path
@@ -15,9 +15,16 @@ from cmk.utils.regex import regex
 from cmk.utils.sectionname import SectionName
 from cmk.utils.tty import format_warning
 
-from cmk.snmplib import get_single_oid, SNMPBackend, SNMPDetectAtom, SNMPDetectBaseType
+from cmk.snmplib import (
+    get_single_oid,
+    OID,
+    SNMPBackend,
+    SNMPDecodedString,
+    SNMPDetectAtom,
+    SNMPDetectBaseType,
+)
 
-import cmk.fetchers._snmpcache as snmp_cache
+from cmk.fetchers._snmpcache import single_oid_cache
 
 from cmk.ccc.exceptions import MKGeneralException, MKSNMPError, MKTimeout, OnError
 
@@ -29,6 +36,8 @@ class SNMPScanConfig:
     on_error: OnError
     missing_sys_description: bool
     oid_cache_dir: Path
+    # Seconds the fetched OIDs are reused by later scans, 0 to fetch them on every scan
+    oid_cache_ttl: float
 
 
 # gather auto_discovered check_plugin_names for this host
@@ -64,29 +73,37 @@ def _snmp_scan(
     scan_config: SNMPScanConfig,
     backend: SNMPBackend,
 ) -> frozenset[SectionName]:
-    snmp_cache.initialize_single_oid_cache(
-        backend.config.hostname, backend.config.ipaddress, cache_dir=scan_config.oid_cache_dir
+    oid_cache = single_oid_cache(
+        backend.config.hostname,
+        backend.config.ipaddress,
+        cache_dir=scan_config.oid_cache_dir,
+        ttl=scan_config.oid_cache_ttl,
     )
     backend.logger.debug("  SNMP scan:")
 
     if scan_config.missing_sys_description:
-        _fake_description_object(backend.logger)
+        _fake_description_object(oid_cache, backend.logger)
     else:
-        _prefetch_description_object(backend=backend)
+        _prefetch_description_object(oid_cache, backend=backend)
 
     found_sections = _find_sections(
         sections,
+        oid_cache,
         on_error=scan_config.on_error,
         backend=backend,
     )
     _output_snmp_check_plugins("SNMP scan found", found_sections, backend.logger)
-    snmp_cache.write_single_oid_cache(
-        backend.config.hostname, backend.config.ipaddress, cache_dir=scan_config.oid_cache_dir
-    )
+    if scan_config.missing_sys_description:
+        # The faked values must not be used by scans with sys description
+        for oid in (OID_SYS_DESCR, OID_SYS_OBJ):
+            oid_cache.pop(oid, None)
+    oid_cache.save()
     return found_sections
 
 
-def _prefetch_description_object(*, backend: SNMPBackend) -> None:
+def _prefetch_description_object(
+    oid_cache: MutableMapping[OID, SNMPDecodedString | None], *, backend: SNMPBackend
+) -> None:
     for oid, name in (
         (OID_SYS_DESCR, "system description"),
         (OID_SYS_OBJ, "system object"),
@@ -94,7 +111,7 @@ def _prefetch_description_object(*, backend: SNMPBackend) -> None:
         if (
             get_single_oid(
                 oid,
-                single_oid_cache=snmp_cache.single_oid_cache(),
+                single_oid_cache=oid_cache,
                 backend=backend,
                 log=backend.logger.debug,
             )
@@ -107,17 +124,20 @@ def _prefetch_description_object(*, backend: SNMPBackend) -> None:
             )
 
 
-def _fake_description_object(logger: Logger) -> None:
+def _fake_description_object(
+    oid_cache: MutableMapping[OID, SNMPDecodedString | None], logger: Logger
+) -> None:
     """Fake OID values to prevent issues with a lot of scan functions"""
     logger.debug(
         f'       Skipping system description OID (Set {OID_SYS_DESCR} and {OID_SYS_OBJ} to "")'
     )
-    snmp_cache.single_oid_cache()[OID_SYS_DESCR] = ""
-    snmp_cache.single_oid_cache()[OID_SYS_OBJ] = ""
+    oid_cache[OID_SYS_DESCR] = ""
+    oid_cache[OID_SYS_OBJ] = ""
 
 
 def _find_sections(
     sections: Iterable[SNMPScanSection],
+    oid_cache: MutableMapping[OID, SNMPDecodedString | None],
     *,
     on_error: OnError,
     backend: SNMPBackend,
@@ -127,7 +147,7 @@ def _find_sections(
         oid_value_getter = functools.partial(
             get_single_oid,
             section_name=name,
-            single_oid_cache=snmp_cache.single_oid_cache(),
+            single_oid_cache=oid_cache,
             backend=backend,
             log=backend.logger.debug,
         )
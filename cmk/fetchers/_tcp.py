@@ -3,14 +3,18 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import asyncio
+import contextlib
+import itertools
 import logging
 import socket
 import ssl
-from collections.abc import Buffer
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Final
 
+import cmk.utils.resulttype as result
 from cmk.utils.agent_registration import get_uuid_link_manager
 from cmk.utils.agentdatatype import AgentRawData
 from cmk.utils.certs import write_cert_store
@@ -20,14 +24,14 @@ from cmk.ccc.exceptions import MKFetcherError, MKTimeout
 
 from ._abstract import Fetcher, Mode
 from ._agentprtcl import (
-    AgentCtlMessage,
+    AgentCtlMessageDecoder,
     decrypt_by_agent_protocol,
     TCPEncryptionHandling,
     TransportProtocol,
     validate_agent_protocol,
 )
 
-__all__ = ["TCPFetcher", "TLSConfig"]
+__all__ = ["fetch_all_tcp", "fetch_all_tcp_async", "TCPFetcher", "TLSConfig"]
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -37,33 +41,73 @@ class TLSConfig:
     site_crt: Path
 
 
-def recvall(sock: socket.socket, flags: int = 0) -> bytes:
-    buffer = bytearray()
+_BUFSIZE: Final = 65536
+
+
+def iter_recv(sock: socket.socket, flags: int = 0, bufsize: int = _BUFSIZE) -> Iterator[bytes]:
+    """Yield the data as it comes in"""
     try:
-        while True:
-            data = sock.recv(4096, flags)
-            if not data:
-                break
-            buffer += data
+        while data := sock.recv(bufsize, flags):
+            yield data
     except OSError as e:
         raise MKFetcherError("Communication failed: %s" % e)
 
-    return bytes(buffer)
 
+async def _aiter_read(reader: asyncio.StreamReader, timeout: float) -> AsyncIterator[bytes]:
+    """Yield the data as it comes in, waiting at most `timeout` seconds for each chunk"""
+    while True:
+        async with asyncio.timeout(timeout):
+            data = await reader.read(_BUFSIZE)
+        if not data:
+            return
+        yield data
 
-def wrap_tls(sock: socket.socket, server_hostname: str, *, tls_config: TLSConfig) -> ssl.SSLSocket:
+
+def _join_ctl_message_payload(chunks: Iterable[bytes]) -> bytes:
+    """Decode the controller message while it is received and join its payload once"""
+    decoder = AgentCtlMessageDecoder()
+    try:
+        return b"".join([*map(decoder.feed, chunks), decoder.flush()])
+    except ValueError as e:
+        raise MKFetcherError(f"Failed to deserialize versioned agent data: {e!r}") from e
+
+
+def _make_tls_context(tls_config: TLSConfig) -> ssl.SSLContext:
     if not tls_config.ca_store.exists():
         # agent cert store should be written on agent receiver startup.
         # However, if it's missing for some reason, we have to write it.
         write_cert_store(source_dir=tls_config.cas_dir, store_path=tls_config.ca_store)
+    ctx = ssl.create_default_context(cafile=str(tls_config.ca_store))
+    ctx.load_cert_chain(certfile=tls_config.site_crt)
+    return ctx
+
+
+def _make_tls_context_or_error(tls_config: TLSConfig) -> ssl.SSLContext | Exception:
+    try:
+        return _make_tls_context(tls_config)
+    except ssl.SSLError as e:
+        error = MKFetcherError("Error establishing TLS connection")
+        error.__cause__ = e
+        return error
+    except Exception as e:
+        return e
+
+
+def wrap_tls(sock: socket.socket, server_hostname: str, *, tls_config: TLSConfig) -> ssl.SSLSocket:
     try:
-        ctx = ssl.create_default_context(cafile=str(tls_config.ca_store))
-        ctx.load_cert_chain(certfile=tls_config.site_crt)
-        return ctx.wrap_socket(sock, server_hostname=server_hostname)
+        return _make_tls_context(tls_config).wrap_socket(sock, server_hostname=server_hostname)
     except ssl.SSLError as e:
         raise MKFetcherError("Error establishing TLS connection") from e
 
 
+def _set_keepalive(sock: socket.socket) -> None:
+    # For an explanation on these options have a look at tcp(7) (man tcp)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 120)  # start after
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)  # wait between
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)  # how many tries
+
+
 class TCPFetcher(Fetcher[AgentRawData]):
     def __init__(
         self,
@@ -124,11 +168,7 @@ class TCPFetcher(Fetcher[AgentRawData]):
         )
         self.close()
         self._socket = socket.socket(self.family, socket.SOCK_STREAM)
-        # For an explanation on these options have a look at tcp(7) (man tcp)
-        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 120)  # start after
-        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)  # wait between
-        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)  # how many tries
+        _set_keepalive(self._socket)
         try:
             self._socket.settimeout(self.timeout)
             self._socket.connect(self.address)
@@ -160,29 +200,25 @@ class TCPFetcher(Fetcher[AgentRawData]):
 
     def _from_tls(
         self, sock: socket.socket, server_hostname: str
-    ) -> tuple[TransportProtocol, Buffer]:
+    ) -> tuple[TransportProtocol, bytes]:
         self._logger.debug("Reading data from agent via TLS socket")
         with wrap_tls(sock, server_hostname, tls_config=self.tls_config) as ssock:
             self._logger.debug("Reading data from agent")
-            raw_agent_data = recvall(ssock)
-        try:
-            agent_data = AgentCtlMessage.from_bytes(raw_agent_data).payload
-        except ValueError as e:
-            raise MKFetcherError(f"Failed to deserialize versioned agent data: {e!r}") from e
+            agent_data = _join_ctl_message_payload(iter_recv(ssock))
+        return self._unpack_ctl_message(agent_data), agent_data
 
-        if len(memoryview(agent_data)) <= 2:
+    def _unpack_ctl_message(self, agent_data: bytes) -> TransportProtocol:
+        if len(agent_data) <= 2:
             raise MKFetcherError("Empty payload from controller at %s:%d" % self.address)
 
         try:
             # I don't understand that recursive protocol thing.
             protocol = TransportProtocol.from_bytes(agent_data)
         except ValueError:
-            raise MKFetcherError(
-                f"Unknown transport protocol: {bytes(memoryview(agent_data)[:2])!r}"
-            )
+            raise MKFetcherError(f"Unknown transport protocol: {agent_data[:2]!r}")
 
         self._logger.debug("Detected transport protocol: %s", protocol)
-        return protocol, memoryview(agent_data)[2:]
+        return protocol
 
     def _get_agent_data(self, sock: socket.socket, server_hostname: str | None) -> AgentRawData:
         try:
@@ -190,6 +226,22 @@ class TCPFetcher(Fetcher[AgentRawData]):
         except OSError as e:
             raise MKFetcherError(f"Communication failed: {e}") from e
 
+        protocol = self._detect_protocol(raw_protocol, server_hostname)
+
+        if protocol is TransportProtocol.TLS:
+            if server_hostname is None:
+                raise MKFetcherError("Agent controller not registered")
+
+            protocol, output = self._from_tls(sock, server_hostname)
+        else:
+            self._logger.debug("Reading data from agent")
+            output = b"".join(itertools.chain([raw_protocol], iter_recv(sock, socket.MSG_WAITALL)))
+
+        return self._decode(protocol, output)
+
+    def _detect_protocol(
+        self, raw_protocol: bytes, server_hostname: str | None
+    ) -> TransportProtocol:
         if not raw_protocol:
             raise MKFetcherError("Empty output from host %s:%d" % self.address)
 
@@ -202,29 +254,151 @@ class TCPFetcher(Fetcher[AgentRawData]):
         validate_agent_protocol(
             protocol, self.encryption_handling, is_registered=server_hostname is not None
         )
+        return protocol
 
-        if protocol is TransportProtocol.TLS:
-            if server_hostname is None:
-                raise MKFetcherError("Agent controller not registered")
-
-            protocol, output = self._from_tls(sock, server_hostname)
-        else:
-            self._logger.debug("Reading data from agent")
-            output = recvall(sock, socket.MSG_WAITALL)
-
-        if not output:
+    def _decode(self, protocol: TransportProtocol, output: bytes) -> AgentRawData:
+        """Decode the output, still starting with the transport protocol"""
+        if len(output) <= 2:
             return AgentRawData(b"")  # nothing to to, validation will fail
 
         if protocol is TransportProtocol.PLAIN:
-            return AgentRawData(protocol.value + output)  # bring back stolen bytes
+            return AgentRawData(output)
 
         if (secret := self.pre_shared_secret) is None:
             raise MKFetcherError("Data is encrypted but no secret is known")
 
         self._logger.debug("Try to decrypt output")
         try:
-            return AgentRawData(decrypt_by_agent_protocol(secret, protocol, output))
+            return AgentRawData(decrypt_by_agent_protocol(secret, protocol, memoryview(output)[2:]))
         except MKTimeout:
             raise
         except Exception as e:
             raise MKFetcherError("Failed to decrypt agent output: %r" % e) from e
+
+    async def _fetch_async(
+        self, server_hostname: str | None, tls_context: ssl.SSLContext | Exception | None
+    ) -> AgentRawData:
+        """Same as open() and fetch() without blocking, see fetch_all_tcp_async()
+
+        The TLS context (or the error creating it) is only used for registered hosts.
+        The timeout of the fetcher applies to connecting and to each read, so a stalled
+        agent does not hold up the other hosts.
+        """
+        self._logger.debug(
+            "Connecting via TCP to %s:%d (%ss timeout)",
+            self.address[0],
+            self.address[1],
+            self.timeout,
+        )
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(*self.address, family=self.family), self.timeout
+            )
+        except TimeoutError:
+            raise MKFetcherError("Communication failed: timed out")
+        except OSError as e:
+            raise MKFetcherError("Communication failed: %s" % e)
+
+        try:
+            _set_keepalive(writer.get_extra_info("socket"))
+            try:
+                async with asyncio.timeout(self.timeout):
+                    raw_protocol = await reader.readexactly(2)
+            except asyncio.IncompleteReadError as e:
+                raw_protocol = e.partial
+
+            protocol = self._detect_protocol(raw_protocol, server_hostname)
+
+            if protocol is TransportProtocol.TLS:
+                if server_hostname is None or tls_context is None:
+                    raise MKFetcherError("Agent controller not registered")
+                if isinstance(tls_context, Exception):
+                    raise tls_context
+
+                self._logger.debug("Reading data from agent via TLS socket")
+                try:
+                    await writer.start_tls(
+                        tls_context,
+                        server_hostname=server_hostname,
+                        ssl_handshake_timeout=self.timeout,
+                    )
+                except ssl.SSLError as e:
+                    raise MKFetcherError("Error establishing TLS connection") from e
+                self._logger.debug("Reading data from agent")
+                output = _join_ctl_message_payload(
+                    [chunk async for chunk in _aiter_read(reader, self.timeout)]
+                )
+                protocol = self._unpack_ctl_message(output)
+            else:
+                self._logger.debug("Reading data from agent")
+                output = b"".join(
+                    [raw_protocol, *[chunk async for chunk in _aiter_read(reader, self.timeout)]]
+                )
+        except TimeoutError:
+            raise MKFetcherError("Communication failed: timed out")
+        except OSError as e:
+            raise MKFetcherError("Communication failed: %s" % e)
+        finally:
+            self._logger.debug("Closing TCP connection to %s:%d", self.address[0], self.address[1])
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+
+        return self._decode(protocol, output)
+
+
+async def fetch_all_tcp_async(
+    fetchers: Sequence[TCPFetcher],
+    *,
+    timeout: float | None = None,
+    max_concurrency: int = 256,
+) -> Sequence[result.Result[AgentRawData, Exception]]:
+    """Fetch the agent output of many hosts concurrently from within one process
+
+    The results are in the order of the fetchers and equal what the fetchers would
+    have returned one by one. The fetchers' own timeouts apply to connecting and to
+    each read, the `timeout` limits the whole exchange with each host. At most
+    `max_concurrency` connections are open at the same time.
+    """
+    # Look up all registered controllers at once: get_uuid() scans all links per host.
+    controller_uuids = {link.hostname: link.uuid for link in get_uuid_link_manager()}
+    # Loading the certificates blocks, so do it once per TLS config before the batch
+    tls_contexts = {
+        tls_config: _make_tls_context_or_error(tls_config)
+        for tls_config in {f.tls_config for f in fetchers if f.host_name in controller_uuids}
+    }
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(fetcher: TCPFetcher) -> result.Result[AgentRawData, Exception]:
+        controller_uuid = controller_uuids.get(fetcher.host_name)
+        async with semaphore:
+            try:
+                async with asyncio.timeout(timeout):
+                    return result.OK(
+                        await fetcher._fetch_async(
+                            str(controller_uuid) if controller_uuid is not None else None,
+                            tls_contexts.get(fetcher.tls_config),
+                        )
+                    )
+            except MKTimeout:
+                raise
+            except TimeoutError:
+                return result.Error(
+                    MKFetcherError("Timeout after %ss at %s:%d" % (timeout, *fetcher.address))
+                )
+            except Exception as exc:
+                return result.Error(exc)
+
+    return await asyncio.gather(*(fetch(f) for f in fetchers))
+
+
+def fetch_all_tcp(
+    fetchers: Sequence[TCPFetcher],
+    *,
+    timeout: float | None = None,
+    max_concurrency: int = 256,
+) -> Sequence[result.Result[AgentRawData, Exception]]:
+    """Blocking variant of fetch_all_tcp_async()"""
+    return asyncio.run(
+        fetch_all_tcp_async(fetchers, timeout=timeout, max_concurrency=max_concurrency)
+    )
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Minimal BER codec for SNMPv1 and SNMPv2c messages (RFC 1157, RFC 3416)
+
+Only the subset of BER needed by the SNMP PDUs is implemented.
+"""
+
+import enum
+from collections.abc import Sequence
+from typing import Final, NamedTuple
+
+from cmk.snmplib import OID, SNMPRawValue
+
+__all__ = [
+    "decode_message",
+    "encode_message",
+    "Message",
+    "PDUType",
+    "render_value",
+    "Tag",
+    "VarBind",
+]
+
+
+class Tag(enum.IntEnum):
+    INTEGER = 0x02
+    OCTET_STRING = 0x04
+    NULL = 0x05
+    OBJECT_IDENTIFIER = 0x06
+    SEQUENCE = 0x30
+    IP_ADDRESS = 0x40
+    COUNTER32 = 0x41
+    GAUGE32 = 0x42
+    TIMETICKS = 0x43
+    OPAQUE = 0x44
+    COUNTER64 = 0x46
+    NO_SUCH_OBJECT = 0x80
+    NO_SUCH_INSTANCE = 0x81
+    END_OF_MIB_VIEW = 0x82
+
+
+class PDUType(enum.IntEnum):
+    GET_REQUEST = 0xA0
+    GET_NEXT_REQUEST = 0xA1
+    RESPONSE = 0xA2
+    GET_BULK_REQUEST = 0xA5
+
+
+# error-status of SNMPv1: the variable at error-index is beyond the end of the MIB
+NO_SUCH_NAME: Final = 2
+
+_EXCEPTIONS: Final = frozenset({Tag.NO_SUCH_OBJECT, Tag.NO_SUCH_INSTANCE, Tag.END_OF_MIB_VIEW})
+_UNSIGNED: Final = frozenset({Tag.COUNTER32, Tag.GAUGE32, Tag.TIMETICKS, Tag.COUNTER64})
+
+
+class VarBind(NamedTuple):
+    oid: OID
+    tag: int
+    value: bytes
+
+
+class Message(NamedTuple):
+    version: int
+    community: bytes
+    pdu_type: int
+    request_id: int
+    # For GETBULK requests these are non-repeaters and max-repetitions
+    error_status: int
+    error_index: int
+    varbinds: Sequence[VarBind]
+
+
+def _encode_length(length: int) -> bytes:
+    if length < 0x80:
+        return bytes((length,))
+    raw = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes((0x80 | len(raw),)) + raw
+
+
+def _tlv(tag: int, payload: bytes) -> bytes:
+    return bytes((tag,)) + _encode_length(len(payload)) + payload
+
+
+def _encode_integer(value: int) -> bytes:
+    return _tlv(Tag.INTEGER, value.to_bytes(value.bit_length() // 8 + 1, "big", signed=True))
+
+
+def _encode_oid(oid: OID) -> bytes:
+    arcs = [int(arc) for arc in oid.strip(".").split(".")]
+    if len(arcs) < 2:
+        raise ValueError(f"Invalid OID {oid}")
+    payload = bytearray()
+    for arc in [40 * arcs[0] + arcs[1], *arcs[2:]]:
+        chunk = [arc & 0x7F]
+        while arc := arc >> 7:
+            chunk.append(0x80 | (arc & 0x7F))
+        payload += bytes(reversed(chunk))
+    return _tlv(Tag.OBJECT_IDENTIFIER, bytes(payload))
+
+
+def _decode_oid(payload: bytes) -> OID:
+    arcs: list[int] = []
+    arc = 0
+    for byte in payload:
+        arc = (arc << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(arc)
+            arc = 0
+    if not arcs:
+        return ""
+    first, second = (arcs[0] // 40, arcs[0] % 40) if arcs[0] < 80 else (2, arcs[0] - 80)
+    return "." + ".".join(map(str, (first, second, *arcs[1:])))
+
+
+def encode_message(message: Message) -> bytes:
+    varbinds = b"".join(
+        _tlv(Tag.SEQUENCE, _encode_oid(varbind.oid) + _tlv(varbind.tag, varbind.value))
+        for varbind in message.varbinds
+    )
+    pdu = _tlv(
+        message.pdu_type,
+        _encode_integer(message.request_id)
+        + _encode_integer(message.error_status)
+        + _encode_integer(message.error_index)
+        + _tlv(Tag.SEQUENCE, varbinds),
+    )
+    return _tlv(
+        Tag.SEQUENCE,
+        _encode_integer(message.version) + _tlv(Tag.OCTET_STRING, message.community) + pdu,
+    )
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self.offset = 0
+
+    def read(self) -> tuple[int, bytes]:
+        data = self._data
+        tag = data[self.offset]
+        length = data[self.offset + 1]
+        offset = self.offset + 2
+        if length & 0x80:
+            num_bytes = length & 0x7F
+            length = int.from_bytes(data[offset : offset + num_bytes], "big")
+            offset += num_bytes
+        if offset + length > len(data):
+            raise ValueError("Truncated BER data")
+        self.offset = offset + length
+        return tag, data[offset : offset + length]
+
+    def read_integer(self) -> int:
+        tag, payload = self.read()
+        if tag != Tag.INTEGER:
+            raise ValueError(f"Expected INTEGER, got tag {tag:#x}")
+        return int.from_bytes(payload, "big", signed=True)
+
+    def at_end(self) -> bool:
+        return self.offset >= len(self._data)
+
+
+def decode_message(data: bytes) -> Message:
+    """Decode an SNMP message, raise ValueError if it is malformed"""
+    try:
+        tag, payload = _Reader(data).read()
+        if tag != Tag.SEQUENCE:
+            raise ValueError(f"Expected SEQUENCE, got tag {tag:#x}")
+        message = _Reader(payload)
+        version = message.read_integer()
+        tag, community = message.read()
+        pdu_type, pdu_payload = message.read()
+
+        pdu = _Reader(pdu_payload)
+        request_id = pdu.read_integer()
+        error_status = pdu.read_integer()
+        error_index = pdu.read_integer()
+        tag, varbinds_payload = pdu.read()
+
+        varbinds = []
+        varbind_list = _Reader(varbinds_payload)
+        while not varbind_list.at_end():
+            _tag, varbind_payload = varbind_list.read()
+            varbind = _Reader(varbind_payload)
+            _tag, raw_oid = varbind.read()
+            value_tag, value = varbind.read()
+            varbinds.append(VarBind(_decode_oid(raw_oid), value_tag, value))
+    except IndexError as e:
+        raise ValueError("Truncated BER data") from e
+
+    return Message(version, community, pdu_type, request_id, error_status, error_index, varbinds)
+
+
+def render_value(tag: int, value: bytes) -> SNMPRawValue | None:
+    """Render a value like the net-snmp tools do with -On -OQ -Ot
+
+    Returns None for the exceptions noSuchObject, noSuchInstance and endOfMibView.
+    """
+    if tag in _EXCEPTIONS:
+        return None
+    if tag == Tag.INTEGER:
+        return str(int.from_bytes(value, "big", signed=True)).encode()
+    if tag in _UNSIGNED:
+        return str(int.from_bytes(value, "big")).encode()
+    if tag == Tag.OBJECT_IDENTIFIER:
+        return _decode_oid(value).encode()
+    if tag == Tag.IP_ADDRESS:
+        return ".".join(map(str, value)).encode()
+    if tag == Tag.NULL:
+        return b""
+    return value
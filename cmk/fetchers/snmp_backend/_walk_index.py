@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compiled, memory mapped form of a stored SNMP walk
+
+Looking up an OID in the text walk means reading and splitting the whole file.
+The compiled index is created once from the text walk and opened with mmap, a walk
+or get is a binary search over the index then.
+
+File layout (all integers little endian):
+
+    header      magic, mtime (ns) and size of the text walk, number of OIDs
+    index       (offset, key length, OID length, value length) per OID, sorted by key
+    records     key, OID and value of each OID
+
+The key of an OID is the concatenation of its arcs as 32 bit big endian integers.
+Comparing keys as bytes compares the OIDs numerically, and the keys of all OIDs
+below an OID start with the key of that OID.
+"""
+
+import mmap
+import os
+import struct
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Final
+
+from cmk.snmplib import OID, SNMPRowInfo
+
+from cmk.ccc.exceptions import MKGeneralException
+
+from ._utils import strip_snmp_value
+
+__all__ = ["compile_walk_index", "index_path", "WalkIndex"]
+
+_MAGIC: Final = b"CMKSWI01"
+_HEADER: Final = struct.Struct("<8sQQI")
+_ENTRY: Final = struct.Struct("<QHHI")
+
+
+def index_path(path: Path) -> Path:
+    """Path of the compiled index of the text walk at path"""
+    return path.with_name(f".{path.name}.idx")
+
+
+def oid_key(oid: OID) -> bytes:
+    try:
+        return b"".join(int(arc).to_bytes(4, "big") for arc in oid.strip(".").split("."))
+    except (ValueError, OverflowError):
+        raise MKGeneralException(f"Invalid OID {oid}")
+
+
+def compile_walk_index(lines: Iterable[str], source: os.stat_result) -> bytes:
+    """Compile the lines of a text walk as returned by read_walk_from_path()"""
+    rows = []
+    for line in lines:
+        parts = line.split(None, 1)
+        oid = parts[0] if parts[0].startswith(".") else f".{parts[0]}"
+        value = strip_snmp_value(parts[1] if len(parts) > 1 else "")
+        rows.append((oid_key(oid), oid.encode(), value))
+    # Stable: OIDs occurring more than once keep their order
+    rows.sort(key=lambda row: row[0])
+
+    index = []
+    offset = _HEADER.size + len(rows) * _ENTRY.size
+    for key, raw_oid, value in rows:
+        index.append(_ENTRY.pack(offset, len(key), len(raw_oid), len(value)))
+        offset += len(key) + len(raw_oid) + len(value)
+
+    return b"".join(
+        [
+            _HEADER.pack(_MAGIC, source.st_mtime_ns, source.st_size, len(rows)),
+            *index,
+            *(b"".join(row) for row in rows),
+        ]
+    )
+
+
+class WalkIndex:
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        magic, self.source_mtime_ns, self.source_size, self._num_oids = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("Invalid stored walk index")
+        self._data = data
+
+    @classmethod
+    def open(cls, path: Path) -> "WalkIndex | None":
+        try:
+            with path.open("rb") as f:
+                return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def __len__(self) -> int:
+        return self._num_oids
+
+    def is_compiled_from(self, source: os.stat_result) -> bool:
+        return (self.source_mtime_ns, self.source_size) == (source.st_mtime_ns, source.st_size)
+
+    def _entry(self, position: int) -> tuple[int, int, int, int]:
+        return _ENTRY.unpack_from(self._data, _HEADER.size + position * _ENTRY.size)
+
+    def _key(self, position: int) -> bytes:
+        offset, key_length, _oid_length, _value_length = self._entry(position)
+        return self._data[offset : offset + key_length]
+
+    def walk(
+        self, oid: OID, *, children_only: bool = False, limit: int | None = None
+    ) -> SNMPRowInfo:
+        """Return the OID and all OIDs below it, sorted numerically"""
+        prefix = oid_key(oid)
+        low, high = 0, self._num_oids
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < prefix:
+                low = middle + 1
+            else:
+                high = middle
+
+        rows: SNMPRowInfo = []
+        for position in range(low, self._num_oids):
+            if len(rows) == limit:
+                break
+            offset, key_length, oid_length, value_length = self._entry(position)
+            key = self._data[offset : offset + key_length]
+            if not key.startswith(prefix):
+                break
+            if children_only and key == prefix:
+                continue
+            oid_offset = offset + key_length
+            value_offset = oid_offset + oid_length
+            rows.append(
+                (
+                    self._data[oid_offset:value_offset].decode(),
+                    self._data[value_offset : value_offset + value_length],
+                )
+            )
+        return rows
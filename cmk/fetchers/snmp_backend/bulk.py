@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import logging
+import random
+import socket
+import time
+from collections.abc import Sequence
+
+from cmk.utils.log import VERBOSE
+from cmk.utils.sectionname import SectionName
+
+from cmk.snmplib import (
+    OID,
+    SNMPBackend,
+    SNMPContext,
+    SNMPContextTimeout,
+    SNMPHostConfig,
+    SNMPRawValue,
+    SNMPRowInfo,
+    SNMPVersion,
+)
+
+from cmk.ccc.exceptions import MKSNMPError
+
+from ._ber import (
+    decode_message,
+    encode_message,
+    Message,
+    NO_SUCH_NAME,
+    PDUType,
+    render_value,
+    Tag,
+    VarBind,
+)
+
+__all__ = ["BulkSNMPBackend"]
+
+_VERSION_NUMBERS = {SNMPVersion.V1: 0, SNMPVersion.V2C: 1}
+_MAX_DATAGRAM_SIZE = 65535
+
+
+class BulkSNMPBackend(SNMPBackend):
+    """Speak SNMPv1 and SNMPv2c directly, without spawning the net-snmp tools
+
+    Walks use GETBULK requests (GETNEXT for SNMPv1) and fetch all columns of a
+    table with the same requests, see walk_table().
+    """
+
+    def __init__(self, snmp_config: SNMPHostConfig, logger: logging.Logger) -> None:
+        super().__init__(snmp_config, logger)
+        if snmp_config.snmp_version not in _VERSION_NUMBERS:
+            raise MKSNMPError(
+                f"SNMP version {snmp_config.snmp_version.name} is not supported by this backend"
+            )
+        if not isinstance(snmp_config.credentials, str):
+            raise TypeError()
+        self._version = _VERSION_NUMBERS[snmp_config.snmp_version]
+        self._community = snmp_config.credentials.encode()
+        # Same defaults as the net-snmp tools
+        self._timeout = float(snmp_config.timing.get("timeout", 1.0))
+        self._retries = int(snmp_config.timing.get("retries", 5))
+        self._request_id = random.randrange(1, 2**30)
+
+    def get(self, /, oid: OID, *, context: SNMPContext) -> SNMPRawValue | None:
+        if oid.endswith(".*"):
+            oid_prefix = _normalize(oid[:-2])
+            response = self._request(PDUType.GET_NEXT_REQUEST, [oid_prefix])
+            if response is None or response.error_status or not response.varbinds:
+                return None
+            varbind = response.varbinds[0]
+            # In case of .*, check if prefix is the one we are looking for
+            if not varbind.oid.startswith(oid_prefix + "."):
+                return None
+        else:
+            response = self._request(PDUType.GET_REQUEST, [_normalize(oid)])
+            if response is None or response.error_status or not response.varbinds:
+                return None
+            varbind = response.varbinds[0]
+
+        self._logger.debug(f"SNMP answer: ==> [{varbind.value!r}]")
+        return render_value(varbind.tag, varbind.value)
+
+    def walk(
+        self,
+        /,
+        oid: OID,
+        *,
+        context: SNMPContext,
+        section_name: SectionName | None = None,
+        table_base_oid: OID | None = None,
+    ) -> SNMPRowInfo:
+        (rows,) = self.walk_table(
+            [oid], context=context, section_name=section_name, table_base_oid=table_base_oid
+        )
+        if isinstance(rows, SNMPContextTimeout):
+            raise rows
+        return rows
+
+    def walk_table(
+        self,
+        /,
+        oids: Sequence[OID],
+        *,
+        context: SNMPContext,
+        section_name: SectionName | None = None,
+        table_base_oid: OID | None = None,
+        stop_on_timeout: bool = False,
+    ) -> Sequence[SNMPRowInfo | SNMPContextTimeout]:
+        """Walk all columns in lockstep: every request carries one varbind per column
+
+        On a timeout the columns completed so far are kept, unless stop_on_timeout.
+        """
+        prefixes = [_normalize(oid) for oid in oids]
+        rows: list[SNMPRowInfo] = [[] for _ in prefixes]
+        seen: list[set[OID]] = [set() for _ in prefixes]
+        # column index -> OID to continue the walk with
+        pending = dict(enumerate(prefixes))
+        timed_out: dict[int, SNMPContextTimeout] = {}
+
+        while pending:
+            columns = list(pending)
+            response = self._walk_request([pending[c] for c in columns])
+            if response is None:
+                timeout = SNMPContextTimeout(f"SNMP Error on {self.config.ipaddress}: Timeout")
+                if stop_on_timeout:
+                    raise timeout
+                timed_out = dict.fromkeys(columns, timeout)
+                break
+
+            if response.error_status:
+                if response.error_status != NO_SUCH_NAME or not 0 < response.error_index:
+                    raise MKSNMPError(
+                        f"SNMP Error on {self.config.ipaddress}: "
+                        f"error status {response.error_status}"
+                    )
+                # SNMPv1: the column at error-index has reached the end of the MIB
+                del pending[columns[response.error_index - 1]]
+                continue
+
+            done = set()
+            for position, varbind in enumerate(response.varbinds):
+                column = columns[position % len(columns)]
+                if column in done:
+                    continue
+                if (
+                    varbind.tag == Tag.END_OF_MIB_VIEW
+                    or not varbind.oid.startswith(prefixes[column] + ".")
+                    # Broken agents may loop. Never walk the same OID twice.
+                    or varbind.oid in seen[column]
+                ):
+                    done.add(column)
+                    continue
+                seen[column].add(varbind.oid)
+                if (value := render_value(varbind.tag, varbind.value)) is not None:
+                    rows[column].append((varbind.oid, value))
+                pending[column] = varbind.oid
+
+            if not response.varbinds:
+                done.update(columns)
+            for column in done:
+                del pending[column]
+
+        for column, prefix in enumerate(prefixes):
+            if column in timed_out:
+                continue
+            if not rows[column] and (value := self.get(prefix, context=context)) is not None:
+                # Like snmpwalk: a walk of a single variable returns that variable
+                rows[column].append((prefix, value))
+
+        return [timed_out.get(column, rows[column]) for column in range(len(prefixes))]
+
+    def _walk_request(self, oids: Sequence[OID]) -> Message | None:
+        if self.config.use_bulkwalk:
+            # Keep the number of returned varbinds per request constant
+            max_repetitions = max(1, self.config.bulk_walk_size_of // len(oids))
+            return self._request(
+                PDUType.GET_BULK_REQUEST, oids, non_repeaters=0, max_repetitions=max_repetitions
+            )
+        return self._request(PDUType.GET_NEXT_REQUEST, oids)
+
+    def _request(
+        self,
+        pdu_type: PDUType,
+        oids: Sequence[OID],
+        *,
+        non_repeaters: int = 0,
+        max_repetitions: int = 0,
+    ) -> Message | None:
+        """Send the request and wait for the matching response, None on timeout"""
+        self._request_id = self._request_id % (2**31 - 1) + 1
+        request = encode_message(
+            Message(
+                self._version,
+                self._community,
+                pdu_type,
+                self._request_id,
+                non_repeaters,
+                max_repetitions,
+                [VarBind(oid, Tag.NULL, b"") for oid in oids],
+            )
+        )
+        family = socket.AF_INET6 if self.config.is_ipv6_primary else socket.AF_INET
+        address = (self.config.ipaddress or "0.0.0.0", self.config.port)
+
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            for attempt in range(self._retries + 1):
+                if attempt:
+                    self._logger.log(VERBOSE, f"SNMP request to {address[0]} timed out, retrying")
+                try:
+                    sock.sendto(request, address)
+                except OSError as e:
+                    raise MKSNMPError(f"SNMP Error on {address[0]}: {e}") from e
+                if (response := self._receive(sock)) is not None:
+                    return response
+        return None
+
+    def _receive(self, sock: socket.socket) -> Message | None:
+        deadline = time.monotonic() + self._timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            sock.settimeout(remaining)
+            try:
+                data = sock.recv(_MAX_DATAGRAM_SIZE)
+            except TimeoutError:
+                return None
+            except OSError as e:
+                raise MKSNMPError(f"SNMP Error on {self.config.ipaddress}: {e}") from e
+            try:
+                response = decode_message(data)
+            except ValueError:
+                self._logger.debug("Ignoring malformed SNMP response")
+                continue
+            # Drop late answers to requests we already gave up on
+            if response.pdu_type == PDUType.RESPONSE and response.request_id == self._request_id:
+                return response
+        return None
+
+
+def _normalize(oid: OID) -> OID:
+    return oid if oid.startswith(".") else f".{oid}"
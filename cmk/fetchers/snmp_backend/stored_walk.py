@@ -13,9 +13,10 @@ from cmk.utils.sectionname import SectionName
 
 from cmk.snmplib import OID, SNMPBackend, SNMPContext, SNMPHostConfig, SNMPRawValue, SNMPRowInfo
 
+from cmk.ccc import store
 from cmk.ccc.exceptions import MKException, MKGeneralException, MKSNMPError
 
-from ._utils import strip_snmp_value
+from ._walk_index import compile_walk_index, index_path, WalkIndex
 
 __all__ = ["StoredWalkSNMPBackend"]
 
@@ -24,6 +25,7 @@ class StoredWalkSNMPBackend(SNMPBackend):
     def __init__(self, snmp_config: SNMPHostConfig, logger: logging.Logger, path: Path) -> None:
         super().__init__(snmp_config, logger)
         self.path: Final = path
+        self._index: WalkIndex | None = None
         if not self.path.exists():
             raise MKSNMPError(f"No snmpwalk file {self.path}")
 
@@ -57,34 +59,32 @@ class StoredWalkSNMPBackend(SNMPBackend):
             dot_star = False
 
         self._logger.debug(f"  Loading {oid}")
-        lines = self.read_walk_data()
-
-        begin = 0
-        end = len(lines)
-        hit = None
-        while end - begin > 0:
-            current = (begin + end) // 2
-            parts = lines[current].split(None, 1)
-            comp = parts[0]
-            hit = StoredWalkSNMPBackend._compare_oids(oid_prefix, comp)
-            if hit == 0:
-                break
-            if hit == 1:  # we are too low
-                begin = current + 1
-            else:
-                end = current
-
-        if hit != 0:
-            return []  # not found
-
-        rowinfo = StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current, -1)
-        rowinfo.reverse()
-        rowinfo += StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current + 1, 1)
-
         if dot_star:
-            return [rowinfo[0]]
+            return self._walk_index().walk(oid_prefix, children_only=True, limit=1)
+        return self._walk_index().walk(oid_prefix)
+
+    def _walk_index(self) -> WalkIndex:
+        """Open the compiled index of the walk, (re)compile it if it is missing or outdated"""
+        if self._index is not None:
+            return self._index
+
+        try:
+            source = self.path.stat()
+        except OSError:
+            raise MKSNMPError(f"No snmpwalk file {self.path}")
+
+        path = index_path(self.path)
+        if (index := WalkIndex.open(path)) is None or not index.is_compiled_from(source):
+            self._logger.debug(f"  Compiling {self.path}")
+            data = compile_walk_index(self.read_walk_data(), source)
+            try:
+                store.save_bytes_to_file(path, data)
+            except OSError as e:
+                self._logger.debug(f"  Cannot save {path}: {e}")
+            index = WalkIndex(data)
 
-        return rowinfo
+        self._index = index
+        return index
 
     @staticmethod
     def read_walk_from_path(path: Path, logger: logging.Logger) -> Sequence[str]:
@@ -124,33 +124,3 @@ class StoredWalkSNMPBackend(SNMPBackend):
             raise
         except Exception:
             raise MKGeneralException(f"Invalid OID {oid}")
-
-    @staticmethod
-    def _collect_until(
-        oid: OID, oid_prefix: OID, lines: Sequence[str], index: int, direction: int
-    ) -> SNMPRowInfo:
-        rows = []
-        # Handle case, where we run after the end of the lines list
-        if index >= len(lines):
-            if direction > 0:
-                return []
-            index -= 1
-        while True:
-            line = lines[index]
-            parts = line.split(None, 1)
-            o = parts[0]
-            if o.startswith("."):
-                o = o[1:]
-            if o == oid or o.startswith(oid_prefix + "."):
-                if len(parts) > 1:
-                    value = parts[1]
-                else:
-                    value = ""
-                # Fix for missing starting oids
-                rows.append(("." + o, strip_snmp_value(value)))
-                index += direction
-                if index < 0 or index >= len(lines):
-                    break
-            else:
-                break
-        return rows
@@ -16,13 +16,16 @@ from cmk.gui.i18n import _
 
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.compiler import BICompiler, path_compiled_aggregations
-from cmk.bi.computer import BIComputer
+from cmk.bi.computer import BIComputer, BIResultCache
 from cmk.bi.data_fetcher import BIStatusFetcher
 from cmk.bi.lib import SitesCallback
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule
 from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException
 
+# Shared by the requests of this process, see BIResultCache
+_result_cache = BIResultCache()
+
 
 class BIManager:
     def __init__(self) -> None:
@@ -30,7 +33,10 @@ class BIManager:
         self.compiler = BICompiler(self.bi_configuration_file(), sites_callback)
         self.compiler.load_compiled_aggregations()
         self.status_fetcher = BIStatusFetcher(sites_callback)
-        self.computer = BIComputer(self.compiler.compiled_aggregations, self.status_fetcher)
+        _result_cache.set_generation(self.compiler.compilation_generation())
+        self.computer = BIComputer(
+            self.compiler.compiled_aggregations, self.status_fetcher, _result_cache
+        )
 
     @classmethod
     def bi_configuration_file(cls) -> str:
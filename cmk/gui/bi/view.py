@@ -54,7 +54,7 @@ from cmk.gui.visuals import get_livestatus_filter_headers
 from cmk.gui.visuals.filter import Filter
 
 from cmk.bi.aggregation import BIAggregation
-from cmk.bi.computer import BIAggregationFilter
+from cmk.bi.computer import BIAggregationFilter, BIComputer
 from cmk.bi.data_fetcher import get_cache_dir
 from cmk.bi.lib import FrozenMarker
 from cmk.bi.trees import BICompiledRule
@@ -925,7 +925,10 @@ def convert_tree_to_frozen_diff_tree(row: Row) -> tuple[Row, bool]:
     required_aggregations = [(bi_ref_aggregation, [bi_ref_branch])]
     required_elements = bi_manager.computer.get_required_elements(required_aggregations)
     bi_manager.status_fetcher.update_states(required_elements)
-    result = bi_manager.computer.compute_results(required_aggregations)
+    # The reference branch has just been modified, cached results do not fit it anymore
+    result = BIComputer(
+        bi_manager.compiler.compiled_aggregations, bi_manager.status_fetcher
+    ).compute_results(required_aggregations)
     row = bi_ref_aggregation.convert_result_to_legacy_format(result[0][1][0])
     row["aggr_group"] = original_aggr_group
     return row, aggregations_are_equal
@@ -37,10 +37,12 @@ from cmk.gui.visuals.filter import FilterRegistry
 from cmk.gui.visuals.info import VisualInfo, VisualInfoRegistry
 from cmk.gui.watolib.rulespecs import RulespecGroupRegistry, RulespecRegistry
 
+from cmk.ccc import store
 from cmk.ccc.exceptions import MKException
 
 from . import _rulespec
 from ._history import (
+    DELTA_STATS_FILE_NAME,
     FilteredInventoryHistoryPaths,
     FilterInventoryHistoryPathsError,
     get_history,
@@ -277,6 +279,12 @@ class InventoryHousekeeping:
                 for x in (self._inventory_delta_cache_path / hostname).iterdir()
                 if not x.is_dir()
             ]:
+                if filename == DELTA_STATS_FILE_NAME:
+                    self._cleanup_delta_stats(
+                        self._inventory_delta_cache_path / hostname / filename,
+                        available_timestamps,
+                    )
+                    continue
                 delete = False
                 try:
                     first, second = filename.split("_")
@@ -300,9 +308,25 @@ class InventoryHousekeeping:
         for filename in [
             x for x in (self._inventory_archive_path / hostname).iterdir() if not x.is_dir()
         ]:
-            timestamps.add(filename.name)
+            # Archived deltas are named "<timestamp>.delta"
+            timestamps.add(filename.name.split(".")[0])
         return timestamps
 
+    def _cleanup_delta_stats(self, path: Path, available_timestamps: set[str]) -> None:
+        try:
+            stats_by_pair = store.load_object_from_file(path, default={})
+        except (MKException, SyntaxError, ValueError):
+            path.unlink()
+            return
+        store.save_object_to_file(
+            path,
+            {
+                pair: stats
+                for pair, stats in stats_by_pair.items()
+                if all(timestamp in available_timestamps for timestamp in pair.split("_"))
+            },
+        )
+
 
 def execute_inventory_housekeeping_job() -> None:
     cmk.gui.inventory.InventoryHousekeeping().run()
@@ -6,11 +6,17 @@
 from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, Self
 
 import cmk.utils.paths
 from cmk.utils.hostaddress import HostName
-from cmk.utils.structured_data import ImmutableDeltaTree, ImmutableTree, load_tree, SDFilterChoice
+from cmk.utils.structured_data import (
+    ImmutableDeltaTree,
+    ImmutableTree,
+    SDFilterChoice,
+    TreeArchive,
+    TreeOrArchiveStore,
+)
 
 from cmk.gui.i18n import _
 
@@ -46,6 +52,38 @@ class FilterInventoryHistoryPathsError(Exception):
     pass
 
 
+# The numbers of new, changed and removed entries of all compared pairs of trees, including the
+# pairs without changes, for which no delta tree is cached.
+DELTA_STATS_FILE_NAME = "stats"
+
+
+@dataclass
+class _DeltaStats:
+    path: Path
+    stats_by_pair: dict[str, tuple[int, int, int]]
+    changed: bool = False
+
+    @classmethod
+    def load(cls, hostname: HostName) -> Self:
+        path = Path(cmk.utils.paths.inventory_delta_cache_dir, hostname, DELTA_STATS_FILE_NAME)
+        try:
+            stats_by_pair = store.load_object_from_file(path, default={})
+        except (MKGeneralException, SyntaxError, ValueError):
+            stats_by_pair = {}
+        return cls(path, stats_by_pair)
+
+    def get(self, pair: str) -> tuple[int, int, int] | None:
+        return self.stats_by_pair.get(pair)
+
+    def add(self, pair: str, stats: tuple[int, int, int]) -> None:
+        self.stats_by_pair[pair] = stats
+        self.changed = True
+
+    def save(self) -> None:
+        if self.changed:
+            store.save_object_to_file(self.path, self.stats_by_pair)
+
+
 def load_latest_delta_tree(hostname: HostName) -> ImmutableDeltaTree:
     def _get_latest_timestamps(
         tree_paths: Sequence[InventoryHistoryPath],
@@ -133,7 +171,10 @@ def _get_history(
     except FilterInventoryHistoryPathsError:
         return [], []
 
-    cached_tree_loader = _CachedTreeLoader()
+    cached_tree_loader = _CachedTreeLoader(
+        _make_tree_or_archive_store().tree_archive(host_name=hostname)
+    )
+    delta_stats = _DeltaStats.load(hostname)
     corrupted_history_files: set[Path] = set()
     history: list[HistoryEntry] = []
     filters = (
@@ -151,8 +192,12 @@ def _get_history(
             previous.timestamp,
             current.timestamp,
             filters,
+            delta_stats,
         )
 
+        if cached_delta_tree_loader.has_no_changes():
+            continue
+
         if (cached_history_entry := cached_delta_tree_loader.get_cached_entry()) is not None:
             history.append(cached_history_entry)
             continue
@@ -160,7 +205,7 @@ def _get_history(
         try:
             previous_tree = cached_tree_loader.get_tree(previous.path)
             current_tree = cached_tree_loader.get_tree(current.path)
-        except (FileNotFoundError, ValueError):
+        except (FileNotFoundError, ValueError, SyntaxError):
             corrupted_history_files.add(current.short)
             continue
 
@@ -171,24 +216,32 @@ def _get_history(
         ) is not None:
             history.append(history_entry)
 
+    delta_stats.save()
     return history, sorted([str(path) for path in corrupted_history_files])
 
 
+def _make_tree_or_archive_store() -> TreeOrArchiveStore:
+    return TreeOrArchiveStore(
+        cmk.utils.paths.inventory_output_dir,
+        cmk.utils.paths.inventory_archive_dir,
+    )
+
+
 def _get_inventory_history_paths(hostname: HostName) -> Sequence[InventoryHistoryPath]:
     inventory_path = Path(cmk.utils.paths.inventory_output_dir, hostname)
-    inventory_archive_dir = Path(cmk.utils.paths.inventory_archive_dir, hostname)
+    tree_archive = _make_tree_or_archive_store().tree_archive(host_name=hostname)
 
-    try:
-        archived_tree_paths = [
-            InventoryHistoryPath(
-                path=filepath,
-                timestamp=int(filepath.name),
-            )
-            for filepath in sorted(inventory_archive_dir.iterdir())
-        ]
-    except FileNotFoundError:
+    if not (archived_filepaths := tree_archive.filepaths()):
         return []
 
+    archived_tree_paths = [
+        InventoryHistoryPath(
+            path=filepath,
+            timestamp=tree_archive.timestamp(filepath),
+        )
+        for filepath in archived_filepaths
+    ]
+
     try:
         archived_tree_paths.append(
             InventoryHistoryPath(
@@ -217,6 +270,7 @@ def _get_pairs(
 
 @dataclass(frozen=True)
 class _CachedTreeLoader:
+    tree_archive: TreeArchive
     _lookup: dict[Path, ImmutableTree] = field(default_factory=dict)
 
     def get_tree(self, filepath: Path) -> ImmutableTree:
@@ -226,7 +280,8 @@ class _CachedTreeLoader:
         if filepath in self._lookup:
             return self._lookup[filepath]
 
-        if not (tree := load_tree(filepath)):
+        # Archived deltas are applied back from their successors, other files are loaded as they are
+        if not (tree := self.tree_archive.load(filepath)):
             raise ValueError(tree)
 
         return self._lookup.setdefault(filepath, tree)
@@ -239,14 +294,18 @@ class _CachedDeltaTreeLoader:
     current_timestamp: int
     # TODO Cleanup
     filters: Sequence[SDFilterChoice] | None
+    delta_stats: _DeltaStats
+
+    @property
+    def _pair(self) -> str:
+        return f"{self.previous_timestamp}_{self.current_timestamp}"
 
     @property
     def _path(self) -> Path:
-        return Path(
-            cmk.utils.paths.inventory_delta_cache_dir,
-            self.hostname,
-            f"{self.previous_timestamp}_{self.current_timestamp}",
-        )
+        return Path(cmk.utils.paths.inventory_delta_cache_dir, self.hostname, self._pair)
+
+    def has_no_changes(self) -> bool:
+        return self.delta_stats.get(self._pair) == (0, 0, 0)
 
     def get_cached_entry(self) -> HistoryEntry | None:
         try:
@@ -275,6 +334,7 @@ class _CachedDeltaTreeLoader:
         new = delta_stats["new"]
         changed = delta_stats["changed"]
         removed = delta_stats["removed"]
+        self.delta_stats.add(self._pair, (new, changed, removed))
         if new or changed or removed:
             store.save_text_to_file(
                 self._path,
@@ -228,6 +228,8 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleHistoryLifetime)
     config_var_registry.register(ConfigVariableEventConsoleSocketQueueLength)
     config_var_registry.register(ConfigVariableEventConsoleEventSocketQueueLength)
+    config_var_registry.register(ConfigVariableEventConsoleIngestionQueueLength)
+    config_var_registry.register(ConfigVariableEventConsoleIngestionWorkers)
     config_var_registry.register(ConfigVariableEventConsoleTranslateSNMPTraps)
     config_var_registry.register(ConfigVariableEventConsoleSNMPCredentials)
     config_var_registry.register(ConfigVariableEventConsoleDebugRules)
@@ -241,6 +243,8 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleServiceLevels)
     config_var_registry.register(ConfigVariableEventConsoleSqliteHousekeepingInterval)
     config_var_registry.register(ConfigVariableEventConsoleSqliteFreelistSize)
+    config_var_registry.register(ConfigVariableEventConsoleSqliteBatchSize)
+    config_var_registry.register(ConfigVariableEventConsoleSqliteBatchInterval)
 
     rulespec_group_registry.register(RulespecGroupEventConsole)
     rulespec_registry.register(ECEventLimitRulespec)
@@ -4097,6 +4101,54 @@ class ConfigVariableEventConsoleSqliteFreelistSize(ConfigVariable):
         )
 
 
+class ConfigVariableEventConsoleSqliteBatchSize(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainEventConsole
+
+    def ident(self) -> str:
+        return "sqlite_batch_size"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Max. number of Event Console history entries written at once"),
+            help=_(
+                "The Event Console writes its history in the background. Entries are "
+                "collected and written together, until this number of entries or the "
+                "batch interval is reached."
+            ),
+            minvalue=1,
+            maxvalue=100000,
+            unit=_("entries"),
+        )
+
+
+class ConfigVariableEventConsoleSqliteBatchInterval(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainEventConsole
+
+    def ident(self) -> str:
+        return "sqlite_batch_interval"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Max. delay of Event Console history writes"),
+            help=_(
+                "The Event Console writes its history in the background. Entries are "
+                "collected for at most this time before they are written together. "
+                "Longer intervals reduce the load of the history at high event rates."
+            ),
+            minvalue=0,
+            maxvalue=10000,
+            unit=_("ms"),
+        )
+
+
 class ConfigVariableEventConsoleStatisticsInterval(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupEventConsoleGeneric
@@ -4567,6 +4619,56 @@ class ConfigVariableEventConsoleEventSocketQueueLength(ConfigVariable):
         )
 
 
+class ConfigVariableEventConsoleIngestionQueueLength(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainEventConsole
+
+    def ident(self) -> str:
+        return "ingestion_queue_len"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Max. number of messages waiting for the rule matching"),
+            help=_(
+                "The Event Console receives messages independently of the rule matching. "
+                "Received messages are queued until they are matched against the rules. "
+                "When the queue is full, messages received via UDP (syslog and SNMP traps) "
+                "are dropped, while the other sources are not read until there is space again. "
+                "The number of dropped messages is shown in the status of the Event Console."
+            ),
+            minvalue=1,
+            label="max.",
+            unit=_("messages"),
+        )
+
+
+class ConfigVariableEventConsoleIngestionWorkers(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainEventConsole
+
+    def ident(self) -> str:
+        return "ingestion_workers"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Number of threads matching messages against the rules"),
+            help=_(
+                "The received messages are matched against the rules by this number of "
+                "threads. Regardless of this setting, the events are created, counted and "
+                "cancelled in the order the messages have been received."
+            ),
+            minvalue=1,
+            maxvalue=32,
+            unit=_("threads"),
+        )
+
+
 class ConfigVariableEventConsoleTranslateSNMPTraps(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupEventConsoleSNMP
@@ -240,6 +240,9 @@ class CREConfig:
 
     debug_livestatus_queries: bool = False
 
+    # Seconds to reuse the responses to livestatus queries, 0 disables the cache
+    livestatus_query_cache_ttl: int = 0
+
     # Show livestatus errors in multi site setup if some sites are
     # not reachable.
     show_livestatus_errors: bool = True
@@ -17,6 +17,8 @@ from livestatus import (
     MultiSiteConnection,
     NetworkSocketDetails,
     NetworkSocketInfo,
+    QueryCache,
+    QueryCacheStats,
     SiteConfiguration,
     SiteConfigurations,
     SiteId,
@@ -104,6 +106,13 @@ def cleanup_connections() -> Iterator[None]:
             raise
 
 
+def query_cache_stats() -> QueryCacheStats:
+    """Reuse of livestatus responses during the current request"""
+    if "live" not in g:
+        return QueryCacheStats()
+    return g.live.query_cache_stats
+
+
 # TODO: This is not really shutting down or closing connections. It only removes references to
 # sockets and connection classes. This should really be cleaned up (context managers, ...)
 def disconnect() -> None:
@@ -277,11 +286,22 @@ def _inhibit_incompatible_site_connection(
 
 ConnectionClass = MultiSiteConnection
 
+# The responses shared by the requests of this process, see livestatus_query_cache_ttl
+_query_cache = QueryCache(ttl=0)
+
+
+def _get_query_cache() -> QueryCache | None:
+    if not (ttl := active_config.livestatus_query_cache_ttl):
+        return None
+    _query_cache.ttl = ttl
+    return _query_cache
+
 
 def _connect_multiple_sites(user: LoggedInUser) -> None:
     enabled_sites, disabled_sites = _get_enabled_and_disabled_sites(user)
     _set_initial_site_states(enabled_sites, disabled_sites)
     g.live = ConnectionClass(enabled_sites, disabled_sites)
+    query_cache = _get_query_cache()
 
     # Fetch status of sites by querying the version of Nagios and livestatus
     # This may be cached by a proxy for up to the next configuration reload.
@@ -290,7 +310,7 @@ def _connect_multiple_sites(user: LoggedInUser) -> None:
         "GET status\n"
         "Cache: reload\n"
         "Columns: livestatus_version program_version program_start num_hosts num_services max_long_output_size "
-        "core_pid edition"
+        "core_pid edition external_commands"
     ):
         try:
             (
@@ -303,6 +323,7 @@ def _connect_multiple_sites(user: LoggedInUser) -> None:
                 max_long_output_size,
                 pid,
                 remote_edition,
+                external_commands,
             ) = response
         except ValueError:
             e = MKLivestatusQueryError("Invalid response to status query: %s" % response)
@@ -350,7 +371,12 @@ def _connect_multiple_sites(user: LoggedInUser) -> None:
                     "core_pid": pid,
                 }
             )
+            if query_cache is not None:
+                # A restart of the core or a processed command, counted by external_commands,
+                # make the cached responses outdated
+                query_cache.set_generation(site_id, (ps, pid, external_commands))
     g.live.set_prepend_site(False)
+    g.live.set_query_cache(query_cache)
 
     # TODO(lm): Find a better way to make the Livestatus object trigger the update
     # once self.deadsites is updated.
@@ -8,6 +8,7 @@
 from __future__ import annotations
 
 import functools
+import heapq
 import json
 from collections.abc import Callable, Iterable, Mapping, Sequence
 from itertools import chain
@@ -21,7 +22,7 @@ from cmk.utils.cpu_tracking import CPUTracker, Snapshot
 from cmk.utils.livestatus_helpers.queries import Query
 from cmk.utils.user import UserId
 
-from cmk.gui import log, visuals
+from cmk.gui import log, sites, visuals
 from cmk.gui.config import active_config
 from cmk.gui.ctx_stack import g
 from cmk.gui.data_source import data_source_registry
@@ -99,6 +100,15 @@ def page_show_view() -> None:
         painter_options.update_from_url(view.name, view.painter_options)
         process_view(GUIViewRenderer(view, show_buttons=True))
 
+    cache_stats = sites.query_cache_stats()
+    view.process_tracking.livestatus_cache_hits = cache_stats.hits
+    view.process_tracking.livestatus_cache_misses = cache_stats.misses
+    log.logger.debug(
+        "[cpu_tracking] Livestatus cache hits: %d of %d queries (%.0f%%)",
+        cache_stats.hits,
+        cache_stats.hits + cache_stats.misses,
+        cache_stats.hit_ratio * 100,
+    )
     _may_create_slow_view_log_entry(page_view_tracker, view)
 
 
@@ -113,7 +123,7 @@ def _may_create_slow_view_log_entry(page_view_tracker: CPUTracker, view: View) -
             "View name: %s, User: %s, Row limit: %s, Limit type: %s, URL variables: %s"
             ", View context: %s, Unfiltered rows: %s, Filtered rows: %s, Rows after limit: %s"
             ", Duration fetching rows: %s, Duration filtering rows: %s, Duration rendering view: %s"
-            ", Rendering page exceeds %ss: %s"
+            ", Livestatus cache hits: %s of %s queries, Rendering page exceeds %ss: %s"
         ),
         view.name,
         user.id,
@@ -128,6 +138,8 @@ def _may_create_slow_view_log_entry(page_view_tracker: CPUTracker, view: View) -
         _format_snapshot_duration(view.process_tracking.duration_fetch_rows),
         _format_snapshot_duration(view.process_tracking.duration_filter_rows),
         _format_snapshot_duration(view.process_tracking.duration_view_render),
+        view.process_tracking.livestatus_cache_hits,
+        view.process_tracking.livestatus_cache_hits + view.process_tracking.livestatus_cache_misses,
         duration_threshold,
         _format_snapshot_duration(page_view_tracker.duration),
     )
@@ -181,6 +193,7 @@ def _process_regular_view(view_renderer: ABCViewRenderer) -> None:
             view_renderer.view,
             all_active_filters,
             only_count=False,
+            row_limit=_rendered_row_limit(view_renderer.view),
         )
         intercepted_queries = queries
 
@@ -314,9 +327,27 @@ def get_row_count(view: View) -> int:
     return len(rows)
 
 
+def _rendered_row_limit(view: View) -> int | None:
+    """The number of rows the view renderer shows at most, None if it uses all rows"""
+    if (
+        html.output_format != "html"
+        or not display_options.enabled(display_options.W)
+        or view.datasource.ignore_limit
+    ):
+        return None
+    return view.row_limit
+
+
 def _get_view_rows(
-    view: View, all_active_filters: list[Filter], only_count: bool = False
+    view: View,
+    all_active_filters: list[Filter],
+    only_count: bool = False,
+    row_limit: int | None = None,
 ) -> tuple[int, Rows]:
+    """Fetch, filter and sort the rows of the view
+
+    With a row limit, only the rows shown by the view renderer are sorted, see _sort_data().
+    """
     with CPUTracker(log.logger.debug) as fetch_rows_tracker:
         # Fetch data. Some views show data only after pressing [Search]
         if (
@@ -331,9 +362,6 @@ def _get_view_rows(
 
         post_process_rows(view, all_active_filters, rows)
 
-    # Sorting - use view sorters and URL supplied sorters
-    _sort_data(rows, view.sorters)
-
     with CPUTracker(log.logger.debug) as filter_rows_tracker:
         # Apply non-Livestatus filters
         for filter_ in all_active_filters:
@@ -342,6 +370,11 @@ def _get_view_rows(
             except MKMissingDataError as e:
                 view.add_warning_message(str(e))
 
+    # Sorting - use view sorters and URL supplied sorters. Sort only the rows which
+    # survived the filters, counting does not need any order.
+    if not only_count:
+        _sort_data(rows, view.sorters, row_limit)
+
     view.process_tracking.amount_unfiltered_rows = unfiltered_amount_of_rows
     view.process_tracking.amount_filtered_rows = len(rows)
     view.process_tracking.duration_fetch_rows = fetch_rows_tracker.duration
@@ -621,46 +654,78 @@ def _link_to_folder_by_path(path: str) -> str:
     )
 
 
-def _sort_data(data: Rows, sorters: list[SorterEntry]) -> None:
-    """Sort data according to list of sorters."""
+def _sort_data(data: Rows, sorters: list[SorterEntry], limit: int | None = None) -> None:
+    """Sort data according to list of sorters.
+
+    The sort key of each row is computed once. With a limit, only the first rows up to the
+    limit are sorted, they are selected with a heap. The remaining rows follow them in no
+    particular order: The view renderer cuts them off, but still counts them.
+    """
     if not sorters:
         return
 
-    # Handle case where join columns are not present for all rows
-    def safe_compare(
-        compfunc: Callable[[Row, Row, Mapping[str, Any] | None], int],
-        row1: Row,
-        row2: Row,
-        parameters: Mapping[str, Any] | None,
-    ) -> int:
-        if row1 is None and row2 is None:
-            return 0
-        if row1 is None:
-            return -1
-        if row2 is None:
-            return 1
-        return compfunc(
-            row1,
-            row2,
-            parameters,
-        )
+    key = _multisort_key(sorters)
+    if limit is None or limit >= len(data):
+        data.sort(key=key)
+        return
+
+    keys = [key(row) for row in data]
+    # Selects the same rows in the same order as a stable sort would
+    top = heapq.nsmallest(limit, range(len(data)), key=keys.__getitem__)
+    selected = set(top)
+    data[:] = [data[index] for index in top] + [
+        row for index, row in enumerate(data) if index not in selected
+    ]
+
+
+def _multisort_key(sorters: Sequence[SorterEntry]) -> Callable[[Row], tuple[Any, ...]]:
+    entry_keys = [_sorter_entry_key(entry) for entry in sorters]
+    return lambda row: tuple(entry_key(row) for entry_key in entry_keys)
+
+
+def _sorter_entry_key(entry: SorterEntry) -> Callable[[Row], Any]:
+    key = entry.sorter.sort_key(entry.parameters) or _cmp_key(entry.sorter.cmp, entry.parameters)
+    if entry.join_key:  # Sorter for join column, use JOIN info
+        key = _join_key(key, entry.join_key)
+    if entry.negate:
+        key = _reversed_key(key)
+    return key
+
+
+def _cmp_key(
+    compfunc: Callable[[Row, Row, Mapping[str, Any] | None], int],
+    parameters: Mapping[str, Any] | None,
+) -> Callable[[Row], Any]:
+    # Sorters without a sort key are compared row by row
+    return functools.cmp_to_key(lambda row1, row2: compfunc(row1, row2, parameters))
+
+
+def _join_key(key: Callable[[Row], Any], join_key: str) -> Callable[[Row], Any]:
+    # Handle case where join columns are not present for all rows, these come first
+    def joined_row_key(row: Row) -> tuple[Any, ...]:
+        joined_row = row["JOIN"].get(join_key)
+        return (0,) if joined_row is None else (1, key(joined_row))
+
+    return joined_row_key
+
+
+def _reversed_key(key: Callable[[Row], Any]) -> Callable[[Row], Any]:
+    return lambda row: _Reversed(key(row))
+
+
+class _Reversed:
+    """Sort key inverting the order of the wrapped key"""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Reversed) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
 
-    def multisort(e1: Row, e2: Row) -> int:
-        for entry in sorters:
-            neg = -1 if entry.negate else 1
-
-            if entry.join_key:  # Sorter for join column, use JOIN info
-                c = neg * safe_compare(
-                    entry.sorter.cmp,
-                    e1["JOIN"].get(entry.join_key),
-                    e2["JOIN"].get(entry.join_key),
-                    entry.parameters,
-                )
-            else:
-                c = neg * entry.sorter.cmp(e1, e2, entry.parameters)
-
-            if c != 0:
-                return c
-        return 0  # equal
-
-    data.sort(key=functools.cmp_to_key(multisort))
+    def __lt__(self, other: _Reversed) -> bool:
+        return other.key < self.key
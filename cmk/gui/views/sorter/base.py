@@ -6,7 +6,7 @@
 from __future__ import annotations
 
 import abc
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from typing import Any, NamedTuple
 
 from cmk.gui.config import Config
@@ -84,6 +84,14 @@ class Sorter(abc.ABC):
         """
         raise NotImplementedError()
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any] | None:
+        """Optional function computing a key of a row, the keys order the rows like cmp()
+
+        The key is computed once per row, which is much faster than calling cmp() for
+        each comparison. Without a key function, the rows are sorted using cmp().
+        """
+        return None
+
     # TODO: Cleanup this hack
     @property
     def load_inv(self) -> bool:
@@ -14,12 +14,13 @@ from cmk.gui.logged_in import user
 from cmk.gui.painter.v0.base import painter_registry
 from cmk.gui.painter.v0.helpers import RenderLink
 from cmk.gui.painter_options import PainterOptions
-from cmk.gui.type_defs import ColumnName, PainterName, SorterFunction
+from cmk.gui.type_defs import ColumnName, PainterName, SorterFunction, SortKeyFunction
 from cmk.gui.utils.theme import theme
 
 from cmk.ccc.plugin_registry import Registry
 
 from .base import Sorter
+from .helpers import sort_key_of
 
 
 class SorterRegistry(Registry[type[Sorter]]):
@@ -50,20 +51,37 @@ def register_sorter(ident: str, spec: dict[str, Any]) -> None:
             "columns": property(lambda s: s._spec["columns"]),
             "load_inv": property(lambda s: s._spec.get("load_inv", False)),
             "cmp": lambda self, r1, r2, p: spec["cmp"](r1, r2),
+            "sort_key": lambda self, p: spec.get("key"),
         },
     )
     sorter_registry.register(cls)
 
 
-def declare_simple_sorter(name: str, title: str, column: ColumnName, func: SorterFunction) -> None:
+def declare_simple_sorter(
+    name: str,
+    title: str,
+    column: ColumnName,
+    func: SorterFunction,
+    key: SortKeyFunction | None = None,
+) -> None:
+    key = key or sort_key_of(func)
     register_sorter(
         name,
-        {"title": title, "columns": [column], "cmp": lambda r1, r2: func(column, r1, r2)},
+        {
+            "title": title,
+            "columns": [column],
+            "cmp": lambda r1, r2: func(column, r1, r2),
+            "key": None if key is None else lambda row: key(column, row),
+        },
     )
 
 
 def declare_1to1_sorter(
-    painter_name: PainterName, func: SorterFunction, col_num: int = 0, reverse: bool = False
+    painter_name: PainterName,
+    func: SorterFunction,
+    col_num: int = 0,
+    reverse: bool = False,
+    key: SortKeyFunction | None = None,
 ) -> PainterName:
     painter = painter_registry[painter_name](
         user=user,
@@ -74,6 +92,9 @@ def declare_1to1_sorter(
         url_renderer=RenderLink(request, response, display_options),
     )
 
+    # The reversed order can not be expressed by a key, these are sorted using cmp
+    key = None if reverse else key or sort_key_of(func)
+    key_column = painter.columns[col_num]
     register_sorter(
         painter_name,
         {
@@ -84,6 +105,7 @@ def declare_1to1_sorter(
                 if reverse
                 else lambda r1, r2: func(painter.columns[col_num], r1, r2)
             ),
+            "key": None if key is None else lambda row: key(key_column, row),
         },
     )
     return painter_name
@@ -5,11 +5,12 @@
 
 import abc
 import time
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from typing import Any
 
 from cmk.gui import utils
 from cmk.gui.i18n import _
+from cmk.gui.num_split import key_num_split
 from cmk.gui.painter.v0.helpers import get_tag_groups
 from cmk.gui.painter.v1.helpers import get_perfdata_nth_value
 from cmk.gui.site_config import get_site_config
@@ -54,7 +55,9 @@ def register_sorters(registry: SorterRegistry) -> None:
     registry.register(SorterHostIpv4Address)
     registry.register(SorterNumProblems)
 
-    declare_simple_sorter("svcdescr", _("Service name"), "service_description", cmp_service_name)
+    declare_simple_sorter(
+        "svcdescr", _("Service name"), "service_description", cmp_service_name, key_service_name
+    )
     declare_simple_sorter(
         "svcdispname",
         _("Service alternative display name"),
@@ -201,7 +204,7 @@ def register_sorters(registry: SorterRegistry) -> None:
     declare_1to1_sorter("log_time", cmp_simple_number)
     declare_1to1_sorter("log_lineno", cmp_simple_number)
 
-    declare_1to1_sorter("log_what", cmp_log_what)
+    declare_1to1_sorter("log_what", cmp_log_what, key=key_log_what)
 
     declare_1to1_sorter("log_date", cmp_date)
 
@@ -266,6 +269,9 @@ class SorterSvcstate(Sorter):
             cmp_state_equiv(r1) < cmp_state_equiv(r2)
         )
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any]:
+        return cmp_state_equiv
+
 
 class SorterHoststate(Sorter):
     @property
@@ -285,6 +291,9 @@ class SorterHoststate(Sorter):
             cmp_host_state_equiv(r1) < cmp_host_state_equiv(r2)
         )
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any]:
+        return cmp_host_state_equiv
+
 
 class SorterSiteHost(Sorter):
     @property
@@ -304,6 +313,9 @@ class SorterSiteHost(Sorter):
             "host_name", r1, r2
         )
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any]:
+        return lambda row: (row["site"], key_num_split(row["host_name"].lower()))
+
 
 class SorterHostName(Sorter):
     @property
@@ -321,6 +333,9 @@ class SorterHostName(Sorter):
     def cmp(self, r1: Row, r2: Row, parameters: Mapping[str, Any] | None) -> int:
         return cmp_num_split("host_name", r1, r2)
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any]:
+        return lambda row: key_num_split(row["host_name"].lower())
+
 
 class SorterSitealias(Sorter):
     @property
@@ -356,6 +371,9 @@ class ABCTagSorter(Sorter, abc.ABC):
         tag_groups_2 = sorted(get_tag_groups(r2, self.object_type).items())
         return (tag_groups_1 > tag_groups_2) - (tag_groups_1 < tag_groups_2)
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any]:
+        return lambda row: sorted(get_tag_groups(row, self.object_type).items())
+
 
 class SorterHost(ABCTagSorter):
     @property
@@ -404,6 +422,9 @@ class ABCLabelSorter(Sorter, abc.ABC):
         labels_2 = sorted(get_labels(r2, self.object_type).items())
         return (labels_1 > labels_2) - (labels_1 < labels_2)
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any]:
+        return lambda row: sorted(get_labels(row, self.object_type).items())
+
 
 class SorterHostLabels(ABCLabelSorter):
     @property
@@ -447,6 +468,10 @@ def cmp_service_name(column, r1, r2):
     ) or cmp_num_split(column, r1, r2)
 
 
+def key_service_name(column: ColumnName, row: Row) -> tuple[int, tuple[int | str, ...]]:
+    return utils.cmp_service_name_equiv(row[column]), key_num_split(row[column].lower())
+
+
 class PerfValSorter(Sorter):
     _num = 0
 
@@ -467,6 +492,9 @@ class PerfValSorter(Sorter):
         v2 = utils.savefloat(get_perfdata_nth_value(r2, self._num - 1, True))
         return (v1 > v2) - (v1 < v2)
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any]:
+        return lambda row: utils.savefloat(get_perfdata_nth_value(row, self._num - 1, True))
+
 
 class SorterSvcPerfVal01(PerfValSorter):
     _num = 1
@@ -599,11 +627,22 @@ class SorterNumProblems(Sorter):
             < r2["host_num_services"] - r2["host_num_services_ok"] - r2["host_num_services_pending"]
         )
 
+    def sort_key(self, parameters: Mapping[str, Any] | None) -> Callable[[Row], Any]:
+        return lambda row: (
+            row["host_num_services"]
+            - row["host_num_services_ok"]
+            - row["host_num_services_pending"]
+        )
+
 
 def cmp_log_what(col, a, b):
     return (log_what(a[col]) > log_what(b[col])) - (log_what(a[col]) < log_what(b[col]))
 
 
+def key_log_what(col, row):
+    return log_what(row[col])
+
+
 def log_what(t):
     if "HOST" in t:
         return 1
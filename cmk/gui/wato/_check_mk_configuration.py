@@ -138,6 +138,7 @@ def register(
     config_variable_registry.register(ConfigVariableDebug)
     config_variable_registry.register(ConfigVariableGUIProfile)
     config_variable_registry.register(ConfigVariableDebugLivestatusQueries)
+    config_variable_registry.register(ConfigVariableLivestatusQueryCacheTTL)
     config_variable_registry.register(ConfigVariableCMCRulesetMatchingStats)
     config_variable_registry.register(ConfigVariableSelectionLivetime)
     config_variable_registry.register(ConfigVariableShowLivestatusErrors)
@@ -638,6 +639,34 @@ class ConfigVariableDebugLivestatusQueries(ConfigVariable):
         )
 
 
+class ConfigVariableLivestatusQueryCacheTTL(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupUserInterface
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainGUI
+
+    def ident(self) -> str:
+        return "livestatus_query_cache_ttl"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Reuse livestatus responses"),
+            default_value=0,
+            minvalue=0,
+            unit=_("Seconds"),
+            size=3,
+            help=_(
+                "The GUI often sends the same livestatus query several times while rendering "
+                "a page, e.g. for the sidebar snapins and the dashlets. With this option, the "
+                "responses are kept by each GUI process for the given number of seconds and "
+                "are reused for the same query of the same user. The responses of a site are "
+                "dropped when its core has been restarted or has processed a command. New "
+                "check results may show up with this delay. Set to 0 to disable the cache."
+            ),
+        )
+
+
 class ConfigVariableSelectionLivetime(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupUserInterface
@@ -3167,20 +3196,25 @@ class ConfigVariableUseDNSCache(ConfigVariable):
 
 
 def transform_snmp_backend_default_to_valuespec(
-    backend: Literal["classic", "inline"]
+    backend: Literal["classic", "inline", "bulk"]
 ) -> SNMPBackendEnum:
     return {
         "classic": SNMPBackendEnum.CLASSIC,
         "inline": SNMPBackendEnum.INLINE,
+        "bulk": SNMPBackendEnum.BULK,
     }[backend]
 
 
-def transform_snmp_backend_from_valuespec(backend: SNMPBackendEnum) -> Literal["classic", "inline"]:
+def transform_snmp_backend_from_valuespec(
+    backend: SNMPBackendEnum,
+) -> Literal["classic", "inline", "bulk"]:
     match backend:
         case SNMPBackendEnum.CLASSIC:
             return "classic"
         case SNMPBackendEnum.INLINE:
             return "inline"
+        case SNMPBackendEnum.BULK:
+            return "bulk"
         case _:
             raise MKConfigError("SNMPBackendEnum %r not implemented" % backend)
 
@@ -3204,6 +3238,7 @@ class ConfigVariableChooseSNMPBackend(ConfigVariable):
                 choices=[
                     (SNMPBackendEnum.CLASSIC, _("Use Classic SNMP Backend")),
                     (SNMPBackendEnum.INLINE, _("Use Inline SNMP Backend")),
+                    (SNMPBackendEnum.BULK, _("Use Bulk SNMP Backend (SNMP v1 and v2c)")),
                 ],
                 help=_(
                     "By default Checkmk uses command line calls of Net-SNMP tools like snmpget or "
@@ -5642,6 +5677,8 @@ def transform_snmp_backend_hosts_to_valuespec(backend):
         # We dropped pysnmp during the 2.1 beta because it is currently slow
         # and unreliable.
         return SNMPBackendEnum.CLASSIC
+    if backend == "bulk":
+        return SNMPBackendEnum.BULK
     raise MKConfigError("SNMPBackendEnum %r not implemented" % backend)
 
 
@@ -5652,6 +5689,7 @@ def _valuespec_snmp_backend():
             choices=[
                 (SNMPBackendEnum.INLINE, _("Use Inline SNMP backend")),
                 (SNMPBackendEnum.CLASSIC, _("Use Classic backend")),
+                (SNMPBackendEnum.BULK, _("Use Bulk SNMP backend (SNMP v1 and v2c)")),
             ],
         ),
         to_valuespec=transform_snmp_backend_hosts_to_valuespec,
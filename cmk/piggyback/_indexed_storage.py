@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Piggyback data in one indexed SQLite database
+
+This is the storage used with the site setting PIGGYBACK_STORAGE=indexed. Instead of
+one file per source and piggybacked host, whose mtime is the time of the last update,
+all payloads are rows keyed by (piggybacked host, source):
+
+ * All payloads of a source are written in one transaction.
+ * The payloads of a piggybacked host are found via the primary key, no directories
+   are listed.
+ * The cleanup deletes outdated rows via the indexes on the timestamps and gives the
+   freed pages back incrementally.
+
+The database runs in WAL mode: writers append to the log, readers are not blocked.
+"""
+
+import contextlib
+import sqlite3
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Final
+
+__all__ = ["IndexedStore"]
+
+# Seconds to wait for the lock of concurrent writers
+_TIMEOUT: Final = 30.0
+
+_SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS payloads (
+    piggybacked TEXT NOT NULL,
+    source TEXT NOT NULL,
+    last_update INTEGER NOT NULL,
+    raw_data BLOB NOT NULL,
+    PRIMARY KEY (piggybacked, source)
+);
+CREATE INDEX IF NOT EXISTS payloads_by_source ON payloads (source);
+CREATE INDEX IF NOT EXISTS payloads_by_last_update ON payloads (last_update);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    last_contact INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sources_by_last_contact ON sources (last_contact);
+"""
+
+
+class IndexedStore:
+    def __init__(self, path: Path) -> None:
+        self.path: Final = path
+        self._has_schema = False
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # The schema, the vacuum and the journal mode are kept in the database file,
+        # they only have to be set up once (or when the file has been removed).
+        if not (has_schema := self._has_schema and self.path.exists()):
+            self.path.parent.mkdir(mode=0o770, parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=_TIMEOUT)
+        try:
+            if not has_schema:
+                # Must be set before the first table is created
+                connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.executescript(_SCHEMA)
+                self._has_schema = True
+            connection.execute("PRAGMA synchronous = NORMAL")
+            yield connection
+        finally:
+            connection.close()
+
+    def payloads(self, piggybacked: str) -> Sequence[tuple[str, int, int | None, bytes]]:
+        """Return source, last update, last contact and raw data per source of the host"""
+        if not self.path.exists():
+            return []
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT p.source, p.last_update, s.last_contact, p.raw_data"
+                " FROM payloads p LEFT JOIN sources s ON s.source = p.source"
+                " WHERE p.piggybacked = ? ORDER BY p.source",
+                (piggybacked,),
+            ).fetchall()
+
+    def meta_data(self) -> Sequence[tuple[str, str, int, int | None]]:
+        """Return piggybacked host, source, last update and last contact of all payloads"""
+        if not self.path.exists():
+            return []
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT p.piggybacked, p.source, p.last_update, s.last_contact"
+                " FROM payloads p LEFT JOIN sources s ON s.source = p.source"
+                " ORDER BY p.piggybacked, p.source"
+            ).fetchall()
+
+    def store(self, source: str, payloads: Mapping[str, bytes], timestamp: int) -> None:
+        """Replace the payloads of the source for the given hosts, atomically"""
+        with self._connect() as connection, connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO payloads (piggybacked, source, last_update, raw_data)"
+                " VALUES (?, ?, ?, ?)",
+                ((piggybacked, source, timestamp, raw) for piggybacked, raw in payloads.items()),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sources (source, last_contact) VALUES (?, ?)",
+                (source, timestamp),
+            )
+
+    def remove_source(self, source: str) -> bool:
+        """Forget the last contact of the source, return False if there was none"""
+        if not self.path.exists():
+            return False
+        with self._connect() as connection, connection:
+            return (
+                connection.execute("DELETE FROM sources WHERE source = ?", (source,)).rowcount > 0
+            )
+
+    def cleanup(self, cut_off_timestamp: float) -> tuple[int, int]:
+        """Delete sources and payloads not updated since the cut off
+
+        Return the number of deleted sources and payloads.
+        """
+        if not self.path.exists():
+            return 0, 0
+        with self._connect() as connection:
+            with connection:
+                sources = connection.execute(
+                    "DELETE FROM sources WHERE last_contact < ?", (cut_off_timestamp,)
+                ).rowcount
+                payloads = connection.execute(
+                    "DELETE FROM payloads WHERE last_update < ?", (cut_off_timestamp,)
+                ).rowcount
+            if sources or payloads:
+                connection.execute("PRAGMA incremental_vacuum")
+        return sources, payloads
+
+    def rename_host(self, old: str, new: str) -> tuple[str, ...]:
+        """Move the data of old to new, as piggybacked host and as source"""
+        if not self.path.exists():
+            return ()
+        actions = []
+        with self._connect() as connection, connection:
+            if connection.execute(
+                "SELECT 1 FROM payloads WHERE piggybacked = ? LIMIT 1", (old,)
+            ).fetchone():
+                connection.execute("DELETE FROM payloads WHERE piggybacked = ?", (new,))
+                connection.execute(
+                    "UPDATE payloads SET piggybacked = ? WHERE piggybacked = ?", (new, old)
+                )
+                actions.append("piggyback-load")
+            if connection.execute(
+                "SELECT 1 FROM payloads WHERE source = ? LIMIT 1", (old,)
+            ).fetchone():
+                connection.execute("DELETE FROM payloads WHERE source = ?", (new,))
+                connection.execute("UPDATE payloads SET source = ? WHERE source = ?", (new, old))
+                connection.execute("DELETE FROM sources WHERE source = ?", (new,))
+                connection.execute("UPDATE sources SET source = ? WHERE source = ?", (new, old))
+                actions.append("piggyback-pig")
+        return tuple(actions)
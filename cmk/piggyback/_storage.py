@@ -12,12 +12,16 @@ import shutil
 import tempfile
 from collections.abc import Iterable, Mapping, Sequence
 from dataclasses import asdict, dataclass
+from functools import cache
 from pathlib import Path
 from typing import Self
 
 from cmk.utils.hostaddress import HostAddress, HostName
 
-from ._paths import payload_dir, source_status_dir
+from cmk.ccc.site import get_omd_config
+
+from ._indexed_storage import IndexedStore
+from ._paths import indexed_store_path, payload_dir, source_status_dir
 
 logger = logging.getLogger(__name__)
 
@@ -65,12 +69,45 @@ class PiggybackMessage:
 # "source_hostname":
 # - Path(tmp/check_mk/piggyback/HOST/SOURCE).name
 # - Path(tmp/check_mk/piggyback_sources/SOURCE).name
+#
+# With PIGGYBACK_STORAGE=indexed all of this is kept in one database instead,
+# see _indexed_storage.py.
+
+
+@cache
+def _indexed_store(omd_root: Path) -> IndexedStore | None:
+    """Return the indexed store if the site is configured to use it
+
+    The storage can only be changed while the site is stopped, so it is looked up
+    once per process.
+    """
+    try:
+        storage = get_omd_config(omd_root).get("CONFIG_PIGGYBACK_STORAGE")
+    except FileNotFoundError:
+        return None
+    return IndexedStore(indexed_store_path(omd_root)) if storage == "indexed" else None
 
 
 def get_piggyback_raw_data(
     piggybacked_hostname: HostAddress, omd_root: Path
 ) -> Sequence[PiggybackMessage]:
     """Returns piggyback messages for the given host"""
+    if (indexed_store := _indexed_store(omd_root)) is not None:
+        return [
+            PiggybackMessage(
+                PiggybackMetaData(
+                    source=HostName(source),
+                    piggybacked=piggybacked_hostname,
+                    last_update=last_update,
+                    last_contact=last_contact,
+                ),
+                raw_data,
+            )
+            for source, last_update, last_contact, raw_data in indexed_store.payloads(
+                piggybacked_hostname
+            )
+        ]
+
     piggyback_meta_data = _get_payload_meta_data(piggybacked_hostname, omd_root)
     logger.debug("%s piggyback files for '%s'.", len(piggyback_meta_data), piggybacked_hostname)
 
@@ -97,6 +134,19 @@ def get_piggybacked_host_with_sources(
     omd_root: Path,
 ) -> Mapping[HostAddress, Sequence[PiggybackMetaData]]:
     """Generates all piggyback pig/piggybacked host pairs"""
+    if (indexed_store := _indexed_store(omd_root)) is not None:
+        piggybacked: dict[HostAddress, list[PiggybackMetaData]] = {}
+        for piggybacked_host, source, last_update, last_contact in indexed_store.meta_data():
+            piggybacked.setdefault(HostAddress(piggybacked_host), []).append(
+                PiggybackMetaData(
+                    source=HostName(source),
+                    piggybacked=HostName(piggybacked_host),
+                    last_update=last_update,
+                    last_contact=last_contact,
+                )
+            )
+        return piggybacked
+
     return {
         piggybacked_host: _get_payload_meta_data(piggybacked_host, omd_root)
         for piggybacked_host_folder in _get_piggybacked_host_folders(omd_root)
@@ -115,6 +165,8 @@ def _remove_piggyback_file(piggyback_file_path: Path) -> bool:
 def remove_source_status_file(source_hostname: HostName, omd_root: Path) -> bool:
     """Remove the source_status_file of this piggyback host which will
     mark the piggyback data from this source as outdated."""
+    if (indexed_store := _indexed_store(omd_root)) is not None:
+        return indexed_store.remove_source(source_hostname)
     source_status_path = _get_source_status_file_path(source_hostname, omd_root)
     return _remove_piggyback_file(source_status_path)
 
@@ -131,6 +183,18 @@ def store_piggyback_raw_data(
         remove_source_status_file(source_hostname, omd_root)
         return
 
+    if (indexed_store := _indexed_store(omd_root)) is not None:
+        logger.debug("Storing piggyback data for %d hosts", len(piggybacked_raw_data))
+        indexed_store.store(
+            source_hostname,
+            {
+                piggybacked_hostname: b"%s\n" % b"\n".join(lines)
+                for piggybacked_hostname, lines in piggybacked_raw_data.items()
+            },
+            int(timestamp),
+        )
+        return
+
     piggyback_file_paths = []
     for piggybacked_hostname, lines in piggybacked_raw_data.items():
         piggyback_file_path = _get_piggybacked_file_path(
@@ -267,6 +331,11 @@ def cleanup_piggyback_files(cut_off_timestamp: float, omd_root: Path) -> None:
         cut_off_timestamp,
     )
 
+    if (indexed_store := _indexed_store(omd_root)) is not None:
+        sources, payloads = indexed_store.cleanup(cut_off_timestamp)
+        logger.debug("Removed %d source status and %d piggyback entries.", sources, payloads)
+        return
+
     piggybacked_hosts_settings = [
         (piggybacked_host_folder, _files_in(piggybacked_host_folder))
         for piggybacked_host_folder in _get_piggybacked_host_folders(omd_root)
@@ -345,6 +414,9 @@ def move_for_host_rename(omd_root: Path, old_host: str, new_host: str) -> tuple[
 
     Return a tuple of strings representing the actions taken.
     """
+    if (indexed_store := _indexed_store(omd_root)) is not None:
+        return indexed_store.rename_host(old_host, new_host)
+
     piggyback_dir = payload_dir(omd_root)
 
     def _rename_piggybacked_dir(old_name: str, new_name: str) -> Iterable[str]:
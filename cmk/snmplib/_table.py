@@ -59,6 +59,22 @@ def get_snmp_table(
     max_len = 0
     max_len_col = -1
 
+    # Fetch all columns at once, so that backends can walk them in parallel
+    rowinfos = iter(
+        get_snmpwalks(
+            section_name,
+            tree.base,
+            [
+                (f"{tree.base}.{oid.column}", oid.save_to_cache)
+                for oid in tree.oids
+                if not isinstance(oid.column, SpecialColumn)
+            ],
+            walk_cache=walk_cache,
+            backend=backend,
+            log=log,
+        )
+    )
+
     for oid in tree.oids:
         fetchoid: OID = f"{tree.base}.{oid.column}"
         # column may be integer or string like "1.5.4.2.3"
@@ -79,15 +95,7 @@ def get_snmp_table(
             index_column = len(columns)
             index_format = oid.column
         else:
-            rowinfo = get_snmpwalk(
-                section_name,
-                tree.base,
-                fetchoid,
-                walk_cache=walk_cache,
-                save_walk_cache=oid.save_to_cache,
-                backend=backend,
-                log=log,
-            )
+            rowinfo = next(rowinfos)
             if len(rowinfo) > max_len:
                 max_len_col = len(columns)
 
@@ -187,61 +195,101 @@ def get_snmpwalk(
     backend: SNMPBackend,
     log: Callable[[str], None],
 ) -> SNMPRowInfo:
+    return get_snmpwalks(
+        section_name,
+        base_oid,
+        [(fetchoid, save_walk_cache)],
+        walk_cache=walk_cache,
+        backend=backend,
+        log=log,
+    )[0]
+
+
+def get_snmpwalks(
+    section_name: SectionName | None,
+    base_oid: str,
+    fetchoids: Sequence[tuple[OID, bool]],
+    *,
+    walk_cache: MutableMapping[tuple[str, str, bool], SNMPRowInfo],
+    backend: SNMPBackend,
+    log: Callable[[str], None],
+) -> Sequence[SNMPRowInfo]:
+    """Walk the given columns of a table, the bool is the save_walk_cache flag"""
     contexts = backend.config.snmpv3_contexts_of(section_name).contexts
     context_string = "-".join(["no_context" if not c else c for c in contexts])
 
     # contexts are hashed in order not to exceed max pathname length
     context_hash = hashlib.shake_256(context_string.encode("utf-8")).hexdigest(15)
 
-    with contextlib.suppress(KeyError):
-        cache_info = walk_cache[(fetchoid, context_hash, save_walk_cache)]
-        log(f"Already fetched OID: {fetchoid}")
-        return cache_info
+    results: dict[tuple[OID, bool], SNMPRowInfo] = {}
+    for fetchoid, save_walk_cache in fetchoids:
+        with contextlib.suppress(KeyError):
+            results[(fetchoid, save_walk_cache)] = walk_cache[
+                (fetchoid, context_hash, save_walk_cache)
+            ]
+            log(f"Already fetched OID: {fetchoid}")
 
-    added_oids: set[OID] = set()
-    rowinfo: SNMPRowInfo = []
+    if missing := list(dict.fromkeys(k for k in fetchoids if k not in results)):
+        for key, rowinfo in zip(
+            missing,
+            _walk_contexts(section_name, base_oid, [o for o, _s in missing], backend, log),
+        ):
+            walk_cache[(key[0], context_hash, key[1])] = results[key] = rowinfo
 
-    skip: set[SNMPContext] = set()
+    return [results[key] for key in fetchoids]
+
+
+def _walk_contexts(
+    section_name: SectionName | None,
+    base_oid: str,
+    fetchoids: Sequence[OID],
+    backend: SNMPBackend,
+    log: Callable[[str], None],
+) -> Sequence[SNMPRowInfo]:
+    rowinfos: list[SNMPRowInfo] = [[] for _ in fetchoids]
+    added_oids: list[set[OID]] = [set() for _ in fetchoids]
+
+    # The contexts are skipped per column, like the columns were walked one by one.
+    skip: list[set[SNMPContext]] = [set() for _ in fetchoids]
     context_config = backend.config.snmpv3_contexts_of(section_name)
     for context in context_config.contexts:
-        if context in skip:
+        if not (indexes := [i for i, skipped in enumerate(skip) if context not in skipped]):
             continue
 
-        try:
-            rows = backend.walk(
-                fetchoid,
-                section_name=section_name,
-                table_base_oid=base_oid,
-                context=context,
-            )
-        except SNMPContextTimeout:
-            if context_config.timeout_policy == "stop":
-                raise
-
-            log(f"Timeout for SNMP context {context}.  Skipping for now.")
-            skip.add(context)
-            continue
+        columns = backend.walk_table(
+            [fetchoids[i] for i in indexes],
+            section_name=section_name,
+            table_base_oid=base_oid,
+            context=context,
+            stop_on_timeout=context_config.timeout_policy == "stop",
+        )
 
-        # I've seen a broken device (Mikrotik Router), that broke after an
-        # update to RouterOS v6.22. It would return 9 time the same OID when
-        # .1.3.6.1.2.1.1.1.0 was being walked. We try to detect these situations
-        # by removing any duplicate OID information
-        if len(rows) > 1 and rows[0][0] == rows[1][0]:
-            log("Detected broken SNMP agent. Ignoring duplicate OID {rows[0][0]}.")
-            rows = rows[:1]
-
-        for row_oid, val in rows:
-            if row_oid in added_oids:
-                log(f"Duplicate OID found: {row_oid} ({val!r})")
-            else:
-                rowinfo.append((row_oid, val))
-                added_oids.add(row_oid)
-
-    if skip and not rowinfo:
+        for index, rows in zip(indexes, columns):
+            if isinstance(rows, SNMPContextTimeout):
+                log(f"Timeout for SNMP context {context}.  Skipping for now.")
+                skip[index].add(context)
+                continue
+
+            rowinfo, added = rowinfos[index], added_oids[index]
+            # I've seen a broken device (Mikrotik Router), that broke after an
+            # update to RouterOS v6.22. It would return 9 time the same OID when
+            # .1.3.6.1.2.1.1.1.0 was being walked. We try to detect these situations
+            # by removing any duplicate OID information
+            if len(rows) > 1 and rows[0][0] == rows[1][0]:
+                log("Detected broken SNMP agent. Ignoring duplicate OID {rows[0][0]}.")
+                rows = rows[:1]
+
+            for row_oid, val in rows:
+                if row_oid in added:
+                    log(f"Duplicate OID found: {row_oid} ({val!r})")
+                else:
+                    rowinfo.append((row_oid, val))
+                    added.add(row_oid)
+
+    if any(skipped and not rowinfo for skipped, rowinfo in zip(skip, rowinfos)):
         raise MKSNMPError("SNMP Error on %s: SNMP query timed out" % backend.config.hostname)
 
-    walk_cache[(fetchoid, context_hash, save_walk_cache)] = rowinfo
-    return rowinfo
+    return rowinfos
 
 
 def _decode_column(
@@ -57,6 +57,7 @@ class SNMPBackendEnum(enum.Enum):
     INLINE = "Inline"
     CLASSIC = "Classic"
     STORED_WALK = "StoredWalk"
+    BULK = "Bulk"
 
     def serialize(self) -> str:
         return self.name
@@ -221,6 +222,41 @@ class SNMPBackend(abc.ABC):
     ) -> SNMPRowInfo:
         return []
 
+    def walk_table(
+        self,
+        /,
+        oids: Sequence[OID],
+        *,
+        context: SNMPContext,
+        section_name: SectionName | None = None,
+        table_base_oid: OID | None = None,
+        stop_on_timeout: bool = False,
+    ) -> Sequence[SNMPRowInfo | SNMPContextTimeout]:
+        """Walk several columns of the same table
+
+        A column timing out in the context does not affect the other columns,
+        its timeout is returned in its place. With stop_on_timeout the first
+        timeout is raised instead, without walking the remaining columns.
+
+        Backends able to fetch the columns with the same requests override this.
+        """
+        columns: list[SNMPRowInfo | SNMPContextTimeout] = []
+        for oid in oids:
+            try:
+                columns.append(
+                    self.walk(
+                        oid,
+                        context=context,
+                        section_name=section_name,
+                        table_base_oid=table_base_oid,
+                    )
+                )
+            except SNMPContextTimeout as e:
+                if stop_on_timeout:
+                    raise
+                columns.append(e)
+        return columns
+
 
 class SpecialColumn(enum.IntEnum):
     # Until we remove all but the first, its worth having an enum
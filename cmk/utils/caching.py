@@ -9,12 +9,14 @@ from __future__ import annotations
 import collections
 from collections.abc import Callable
 from functools import lru_cache, wraps
-from typing import ParamSpec, TypeVar
+from typing import Generic, ParamSpec, TypeVar
 
 import cmk.utils.misc
 
 P = ParamSpec("P")
 R = TypeVar("R")
+K = TypeVar("K")
+V = TypeVar("V")
 
 
 # Used as decorator wrapper for functools.lru_cache in order to bind the cache to an instance method
@@ -84,6 +86,67 @@ class DictCache(dict):
         self.set_not_populated()
 
 
+class LRUCache(Generic[K, V]):
+    """Mapping like cache which evicts the least recently used entries
+
+    Keeps track of hits, misses and evictions, so that the size can be chosen
+    from real numbers. A maxsize of None disables the eviction.
+    """
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        if maxsize is not None and maxsize < 1:
+            raise ValueError(f"Invalid cache size: {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: dict[K, V] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __getitem__(self, key: K) -> V:
+        try:
+            if self.maxsize is None:
+                value = self._data[key]
+            else:
+                # Re-insert to mark the entry as the most recently used one
+                value = self._data[key] = self._data.pop(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        if self.maxsize is not None:
+            self._data.pop(key, None)
+        self._data[key] = value
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            # dicts keep the insertion order: the first key is the least recently used one
+            del self._data[next(iter(self._data))]
+            self.evictions += 1
+
+    def setdefault(self, key: K, default: V) -> V:
+        """Store the default unless the key is present
+
+        This does not count as a hit or miss: it follows a failed lookup, which is counted.
+        """
+        if key not in self._data:
+            self[key] = default
+            return default
+        if self.maxsize is None:
+            return self._data[key]
+        value = self._data[key] = self._data.pop(key)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
 # This cache manager holds all caches that rely on the configuration
 # and have to be flushed once the configuration is reloaded in the
 # keepalive mode
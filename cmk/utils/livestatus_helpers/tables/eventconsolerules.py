@@ -17,6 +17,13 @@ class Eventconsolerules(Table):
     )
     """The times rule matched an incoming message"""
 
+    rule_skips = Column(
+        'rule_skips',
+        col_type='int',
+        description='The times the rule prefilter ruled out a match of an incoming message',
+    )
+    """The times the rule prefilter ruled out a match of an incoming message"""
+
     rule_id = Column(
         'rule_id',
         col_type='string',
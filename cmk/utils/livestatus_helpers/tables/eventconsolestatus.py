@@ -31,6 +31,20 @@ class Eventconsolestatus(Table):
     )
     """The average event rate"""
 
+    status_average_history_write_rate = Column(
+        'status_average_history_write_rate',
+        col_type='float',
+        description='The average rate of entries written to the history',
+    )
+    """The average rate of entries written to the history"""
+
+    status_average_history_write_time = Column(
+        'status_average_history_write_time',
+        col_type='float',
+        description='The average time entries wait for being written to the history',
+    )
+    """The average time entries wait for being written to the history"""
+
     status_average_message_rate = Column(
         'status_average_message_rate',
         col_type='float',
@@ -52,6 +66,13 @@ class Eventconsolestatus(Table):
     )
     """The average incoming message processing time"""
 
+    status_average_queue_drop_rate = Column(
+        'status_average_queue_drop_rate',
+        col_type='float',
+        description='The average rate of messages dropped because of a full queue',
+    )
+    """The average rate of messages dropped because of a full queue"""
+
     status_average_request_time = Column(
         'status_average_request_time',
         col_type='float',
@@ -171,6 +192,20 @@ class Eventconsolestatus(Table):
     )
     """The number of events received since startup of the Event Console"""
 
+    status_history_write_rate = Column(
+        'status_history_write_rate',
+        col_type='float',
+        description='The rate of entries written to the history',
+    )
+    """The rate of entries written to the history"""
+
+    status_history_writes = Column(
+        'status_history_writes',
+        col_type='int',
+        description='The number of entries written to the history',
+    )
+    """The number of entries written to the history"""
+
     status_message_rate = Column(
         'status_message_rate',
         col_type='float',
@@ -206,6 +241,27 @@ class Eventconsolestatus(Table):
     )
     """The number of message overflows, i.e. messages simply dropped due to an overflow of the Event Console"""
 
+    status_queue_depth = Column(
+        'status_queue_depth',
+        col_type='int',
+        description='The number of messages waiting for the rule matching',
+    )
+    """The number of messages waiting for the rule matching"""
+
+    status_queue_drop_rate = Column(
+        'status_queue_drop_rate',
+        col_type='float',
+        description='The rate of messages dropped because of a full queue',
+    )
+    """The rate of messages dropped because of a full queue"""
+
+    status_queue_drops = Column(
+        'status_queue_drops',
+        col_type='int',
+        description='The number of messages dropped because of a full queue',
+    )
+    """The number of messages dropped because of a full queue"""
+
     status_replication_last_sync = Column(
         'status_replication_last_sync',
         col_type='time',
@@ -109,6 +109,11 @@ class FakeSocket:
     def recv(self, length: int) -> bytes:
         return self.mock_live.socket_recv(length)
 
+    def recv_into(self, buffer: memoryview, nbytes: int = 0) -> int:
+        data = self.mock_live.socket_recv(nbytes or len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
     def send(self, data: bytes) -> None:
         return self.mock_live.socket_send(data)
 
@@ -159,7 +164,7 @@ def _make_livestatus_response(response: Response, output_format: str) -> str:
         raise ValueError(f"Unknown output format: {output_format}")
 
     code = 200
-    length = len(data)
+    length = len(data.encode("utf-8"))
     return f"{code:<3} {length:>11}\n{data}"
 
 
@@ -204,11 +209,12 @@ class MockLiveStatusConnection:
             ...     response = live.result_of_next_query(
             ...         'GET status\\n'
             ...         'Columns: livestatus_version program_version program_start '
-            ...         'num_hosts num_services max_long_output_size core_pid edition'
+            ...         'num_hosts num_services max_long_output_size core_pid edition '
+            ...         'external_commands'
             ...     )[0]
-            ...     # Response looks like [['2020-07-03', 'Check_MK 2020-07-03', 1593762478, 1, 2, 2000, 36, 'raw']]
+            ...     # Response looks like [['2020-07-03', 'Check_MK 2020-07-03', 1593762478, 1, 2, 2000, 36, 'raw', 0]]
             ...     assert len(response) == 1
-            ...     assert len(response[0]) == 8
+            ...     assert len(response[0]) == 9
 
         Some Stats calls are supported as well:
 
@@ -232,7 +238,7 @@ class MockLiveStatusConnection:
             ...
             cmk.livestatus_client.LivestatusTestingError: Expected queries were not queried on site 'NO_SITE':
              * 'GET status\\nColumns: livestatus_version program_version \
-program_start num_hosts num_services max_long_output_size core_pid edition'
+program_start num_hosts num_services max_long_output_size core_pid edition external_commands'
             <BLANKLINE>
             No queries were sent to site NO_SITE.
 
@@ -361,7 +367,7 @@ program_start num_hosts num_services max_long_output_size core_pid edition'
             # We expect this query and give the expected result.
             query = [
                 "GET status",
-                "Columns: livestatus_version program_version program_start num_hosts num_services max_long_output_size core_pid edition",
+                "Columns: livestatus_version program_version program_start num_hosts num_services max_long_output_size core_pid edition external_commands",
             ]
             self.expect_query(query, force_pos=0)  # first query to be expected
 
@@ -629,7 +635,7 @@ class MockSingleSiteConnection:
         self._sent_queries: list[bytes] = []
         self._site_name = site_name
         self._multisite = multisite_connection
-        self._last_response: io.StringIO | None = None
+        self._last_response: io.BytesIO | None = None
         self._expected_queries: list[tuple[str, MatchType]] = []
 
         self.socket = FakeSocket(self)
@@ -714,14 +720,16 @@ class MockSingleSiteConnection:
     def socket_recv(self, length: int) -> bytes:
         if self._last_response is None:
             raise LivestatusTestingError("Nothing sent yet. Can't receive!")
-        return self._last_response.read(length).encode("utf-8")
+        return self._last_response.read(length)
 
     def socket_send(self, data: bytes) -> None:
         self._sent_queries.append(data)
         if data[-2:] == b"\n\n":
             data = data[:-2]
         response, output_format = self.result_of_next_query(data.decode("utf-8"))
-        self._last_response = io.StringIO(_make_livestatus_response(response, output_format))
+        self._last_response = io.BytesIO(
+            _make_livestatus_response(response, output_format).encode("utf-8")
+        )
 
     def __enter__(self) -> None:
         pass
@@ -763,6 +771,7 @@ def _default_tables() -> dict[TableName, ResultList]:
                 "average_latency_generic": 0.0846039,
                 "core_pid": 12345,
                 "edition": "raw",
+                "external_commands": 0,
             }
         ],
         "downtimes": [
@@ -82,6 +82,7 @@ crash_dir = Path(var_dir, "crashes")
 diagnostics_dir = Path(var_dir, "diagnostics")
 site_config_dir = Path(var_dir, "site_configs")
 visuals_cache_dir = Path(tmp_dir, "visuals_cache")
+ruleset_matching_store_dir = Path(tmp_dir, "ruleset_matching")
 predictions_dir = Path(var_dir, "prediction")
 ec_main_config_file = Path(default_config_dir, "mkeventd.mk")
 ec_config_dir = Path(default_config_dir, "mkeventd.d")
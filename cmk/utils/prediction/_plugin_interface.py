@@ -5,7 +5,7 @@
 """Code for predictive monitoring / anomaly detection"""
 
 import logging
-from collections.abc import Callable, Mapping
+from collections.abc import Callable, Mapping, Sequence
 from typing import assert_never, Literal
 
 from cmk.utils.log import VERBOSE
@@ -13,7 +13,7 @@ from cmk.utils.log import VERBOSE
 from cmk.agent_based.prediction_backend import PredictionInfo
 
 from ._prediction import (
-    compute_prediction,
+    compute_predictions,
     LevelsSpec,
     MetricRecord,
     PredictionData,
@@ -27,15 +27,21 @@ logger = logging.getLogger("cmk.prediction")
 
 def make_updated_predictions(
     store: PredictionStore,
-    get_recorded_data: Callable[[str, int, int], MetricRecord | None],
+    get_recorded_data: Callable[[Sequence[tuple[str, int, int]]], Sequence[MetricRecord | None]],
     now: float,
 ) -> Mapping[int, tuple[float | None, tuple[float, float] | None]]:
+    """Compute the missing predictions and make the current references and levels
+
+    get_recorded_data gets all the (metric, start, end) requests needed for the
+    missing predictions at once, so they can be fetched in one query.
+    """
     store.remove_outdated_predictions(now)
+    predictions = dict(store.iter_all_valid_predictions(now))
+    if outdated := [meta for meta, prediction in predictions.items() if prediction is None]:
+        predictions.update(zip(outdated, _update_predictions(store, outdated, get_recorded_data)))
     return {
-        hash(meta): _make_reference_and_prediction(
-            meta, valid_prediction or _update_prediction(store, meta, get_recorded_data), now
-        )
-        for meta, valid_prediction in store.iter_all_valid_predictions(now)
+        hash(meta): _make_reference_and_prediction(meta, prediction, now)
+        for meta, prediction in predictions.items()
     }
 
 
@@ -56,22 +62,24 @@ def _make_reference_and_prediction(
     )
 
 
-def _update_prediction(
+def _update_predictions(
     store: PredictionStore,
-    meta: PredictionInfo,
-    get_recorded_data: Callable[[str, int, int], MetricRecord | None],
-) -> PredictionData | None:
-    logger.log(
-        VERBOSE,
-        "Predicting %s / %s / %s",
-        meta.metric,
-        meta.params.period,
-        meta.valid_interval[0],
-    )
-    if (prediction := compute_prediction(meta, get_recorded_data)) is None:
-        return None
-    store.save_prediction(meta, prediction)
-    return prediction
+    metas: Sequence[PredictionInfo],
+    get_recorded_data: Callable[[Sequence[tuple[str, int, int]]], Sequence[MetricRecord | None]],
+) -> list[PredictionData | None]:
+    for meta in metas:
+        logger.log(
+            VERBOSE,
+            "Predicting %s / %s / %s",
+            meta.metric,
+            meta.params.period,
+            meta.valid_interval[0],
+        )
+    predictions = compute_predictions(metas, get_recorded_data)
+    for meta, prediction in zip(metas, predictions):
+        if prediction is not None:
+            store.save_prediction(meta, prediction)
+    return predictions
 
 
 def estimate_levels(
@@ -9,11 +9,13 @@ from collections.abc import Callable, Iterable, Iterator, Sequence
 from pathlib import Path
 from typing import Final, Literal, NamedTuple, Protocol, Self
 
+import numpy as np
+import numpy.typing as npt
 from pydantic import BaseModel
 
 from cmk.agent_based.prediction_backend import PredictionInfo
 
-from ._grouping import time_slices
+from ._grouping import PeriodName, time_slices
 
 logger = logging.getLogger("cmk.prediction")
 
@@ -135,33 +137,66 @@ class PredictionStore:
 
             data_path = info_path.with_suffix(self.DATA_FILE_SUFFIX)
             try:
-                if info_path.stat().st_mtime >= data_path.stat().st_mtime:
+                # The prediction is outdated if the parameters have changed since.
+                if data_path.stat().st_mtime >= info_path.stat().st_mtime:
                     yield meta, PredictionData.model_validate_json(data_path.read_text())
+                    continue
             except FileNotFoundError:
                 pass
 
             yield meta, None
 
 
-def compute_prediction(
-    info: PredictionInfo,
-    get_recorded_data: Callable[[str, int, int], MetricRecord | None],
-) -> PredictionData | None:
-    time_windows = time_slices(
-        info.valid_interval[0], info.params.horizon * 86400, info.params.period
+def compute_predictions(
+    infos: Sequence[PredictionInfo],
+    get_recorded_data: Callable[[Sequence[tuple[str, int, int]]], Sequence[MetricRecord | None]],
+) -> list[PredictionData | None]:
+    """Compute the predictions from one fetch of all the recorded data they need
+
+    Predictions only differing in their direction or levels are based on the same
+    reference data, which is computed only once.
+    """
+    time_windows = {
+        key: time_slices(key.start, key.horizon * _DAY, key.period)
+        for key in {_ReferenceKey.from_info(info) for info in infos}
+    }
+    requests = list(
+        dict.fromkeys(
+            (f"{key.metric}.max", start, end)
+            for key, windows in time_windows.items()
+            for start, end in windows
+        )
     )
+    records = dict(zip(requests, get_recorded_data(requests))) if requests else {}
+    predictions = {
+        key: _prediction_from_records(
+            [(start, records[(f"{key.metric}.max", start, end)]) for start, end in windows]
+        )
+        for key, windows in time_windows.items()
+    }
+    return [predictions[_ReferenceKey.from_info(info)] for info in infos]
 
-    from_time = time_windows[0][0]
+
+class _ReferenceKey(NamedTuple):
+    """Everything the reference data of a prediction depends on"""
+
+    metric: str
+    period: PeriodName
+    horizon: int
+    start: int
+
+    @classmethod
+    def from_info(cls, info: PredictionInfo) -> Self:
+        return cls(info.metric, info.params.period, info.params.horizon, info.valid_interval[0])
+
+
+def _prediction_from_records(
+    records: Sequence[tuple[int, MetricRecord | None]],
+) -> PredictionData | None:
+    from_time = records[0][0]
     raw_slices = [
-        (
-            response.window,
-            response.values,
-            from_time - start,
-        )
-        for start, end in time_windows
-        if (response := get_recorded_data(f"{info.metric}.max", start, end))
+        (record.window, record.values, from_time - start) for start, record in records if record
     ]
-
     return _calculate_data_for_prediction(raw_slices[0][0], raw_slices) if raw_slices else None
 
 
@@ -189,26 +224,62 @@ def _calculate_data_for_prediction(
 
 def _forward_fill_resample(
     current_range: range, values: Sequence[float | None], new_range: range
-) -> Sequence[float | None]:
+) -> npt.NDArray[np.float64]:
+    """Resample the values to the new range, missing values become NaN"""
+    array = np.array(values, dtype=np.float64)
     if current_range == new_range:
-        return values
+        return array
+    if not len(array):
+        return np.full(len(new_range), np.nan)
+
+    indices = (
+        np.arange(new_range.start, new_range.stop, new_range.step, dtype=np.int64)
+        - current_range.start
+    ) // current_range.step
+    return array[np.clip(indices, 0, len(array) - 1)]
+
+
+def _data_stats(
+    slices: Sequence[Sequence[float | None] | npt.NDArray[np.float64]],
+) -> list[DataStat | None]:
+    """Statistically summarize all the upsampled RRD data
+
+    The slices are the rows of a 2-D array, the statistics are computed per column.
+    Missing values (None or NaN) are ignored. Like zip(), surplus columns of longer
+    slices are dropped.
+    """
+    if not slices:
+        return []
+    length = min(len(values) for values in slices)
+    data = np.array([np.asarray(values, dtype=np.float64)[:length] for values in slices])
+
+    valid = ~np.isnan(data)
+    samples = valid.sum(axis=0)
+    # Summing up row by row adds the values in the same order as sum() per column,
+    # so the results are exactly the same.
+    present = np.where(valid, data, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        averages = present.sum(axis=0) / samples
+        # See _std_dev
+        stdevs = np.sqrt(np.abs((present**2).sum(axis=0) - averages**2 * samples) / (samples - 1))
+    minima = np.where(valid, data, np.inf).min(axis=0)
+    maxima = np.where(valid, data, -np.inf).max(axis=0)
 
-    idx_max = len(values) - 1
     return [
-        values[max(0, min(int((t - current_range.start) / current_range.step), idx_max))]
-        for t in new_range
-    ]
-
-
-def _data_stats(slices: Iterable[Iterable[float | None]]) -> list[DataStat | None]:
-    "Statistically summarize all the upsampled RRD data"
-    return [  # can't inline this b/c it is unit tested :-/
         (
-            DataStat.from_values(point_line)
-            if (point_line := [x for x in time_column if x is not None])
+            DataStat(
+                average=average,
+                min_=min_,
+                max_=max_,
+                # In the case of a single data-point an unbiased standard deviation is undefined.
+                stdev=None if count == 1 else stdev,
+            )
+            if count
             else None
         )
-        for time_column in zip(*slices)
+        for count, average, min_, max_, stdev in zip(
+            samples.tolist(), averages.tolist(), minima.tolist(), maxima.tolist(), stdevs.tolist()
+        )
     ]
 
 
@@ -6,7 +6,9 @@
 
 import contextlib
 import dataclasses
+import itertools
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
 from re import Pattern
 from typing import (
     Any,
@@ -20,6 +22,8 @@ from typing import (
     TypeVar,
 )
 
+import cmk.utils.paths
+from cmk.utils.caching import LRUCache
 from cmk.utils.global_ident_type import GlobalIdent
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.labels import (
@@ -34,10 +38,17 @@ from cmk.utils.labels import (
 from cmk.utils.parameters import merge_parameters
 from cmk.utils.regex import combine_patterns, regex
 from cmk.utils.rulesets.ruleset_matching_stats import (
+    CacheStats,
     HostRulesetMatchingStats,
     persist_matching_stats,
     ServiceRulesetMatchingStats,
 )
+from cmk.utils.rulesets.ruleset_matching_store import (
+    compute_config_hash,
+    condition_key,
+    RulesetMatchStore,
+    save_ruleset_match_store,
+)
 from cmk.utils.servicename import Item, ServiceName
 from cmk.utils.tags import TagConfig, TagGroupID, TagID
 
@@ -105,6 +116,8 @@ PreprocessedServiceRuleset: TypeAlias = list[
         PreprocessedPattern,
     ]
 ]
+# A set of hosts, encoded as integer with one bit per host ordinal of a HostBitmapIndex
+HostBitmap: TypeAlias = int
 
 # FIXME: A lot of signatures regarding rules and rule sets are simply lying:
 # They claim to expect a RuleConditionsSpec or Ruleset, but
@@ -169,6 +182,64 @@ def merge_cluster_labels(all_node_labels: Iterable[Iterable[HostLabel]]) -> Sequ
     return list({l.name: l for node_labels in all_node_labels for l in node_labels}.values())
 
 
+class ServiceDescriptionPrefilter:
+    """Finds the rules whose service description patterns may match a service
+
+    Service description patterns are matched at the beginning of the description.
+    Most of them start with a literal text, e.g. "Interface " or "Filesystem /var".
+    All literal prefixes of all rules are indexed by their length, so that the
+    candidate rules of a service are found with one dictionary lookup per distinct
+    prefix length instead of one regex match per rule. A rule which is not a
+    candidate can not match: None of its patterns matches the description.
+    """
+
+    def __init__(self, pattern_parts_of_rules: Sequence[Sequence[str]]) -> None:
+        self._rules_by_prefix: dict[int, dict[str, set[int]]] = {}
+        for rule_index, pattern_parts in enumerate(pattern_parts_of_rules):
+            for pattern in pattern_parts:
+                prefix = literal_prefix(pattern)
+                self._rules_by_prefix.setdefault(len(prefix), {}).setdefault(prefix, set()).add(
+                    rule_index
+                )
+        self._prefix_lengths = sorted(self._rules_by_prefix)
+
+    def candidates(self, description: str) -> set[int]:
+        candidates: set[int] = set()
+        for length in self._prefix_lengths:
+            if length > len(description):
+                break
+            if rule_indexes := self._rules_by_prefix[length].get(description[:length]):
+                candidates.update(rule_indexes)
+        return candidates
+
+
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+def literal_prefix(pattern: str) -> str:
+    """Returns a text every string matched by the pattern (re.match) starts with
+
+    >>> literal_prefix("Interface 1")
+    'Interface 1'
+    >>> literal_prefix("Filesystem /v.*")
+    'Filesystem /v'
+    >>> literal_prefix("CPU loads?")
+    'CPU load'
+    >>> literal_prefix("^Mem")
+    'Mem'
+    >>> literal_prefix("Mem|CPU")
+    ''
+    """
+    if "|" in pattern:
+        return ""  # Alternatives may start anywhere, do not try to be clever
+    pattern = pattern.removeprefix("^")  # Implied by re.match
+    for index, char in enumerate(pattern):
+        if char in _REGEX_SPECIAL_CHARS:
+            # A quantifier makes the preceding character optional
+            return pattern[: index - 1] if char in "*?{" and index else pattern[:index]
+    return pattern
+
+
 class RulesetMatcher:
     """Performing matching on host / service rulesets
 
@@ -186,6 +257,8 @@ class RulesetMatcher:
         clusters_of: Mapping[HostName, Sequence[HostName]],
         nodes_of: Mapping[HostName, Sequence[HostName]],
         debug_matching_stats: bool = False,
+        host_index: bool = False,
+        cache_size: int | None = None,
     ) -> None:
         super().__init__()
 
@@ -198,6 +271,8 @@ class RulesetMatcher:
             clusters_of,
             nodes_of,
             debug_matching_stats,
+            host_index,
+            cache_size,
         )
         self.labels_of_host = self.ruleset_optimizer.labels_of_host
         self.labels_of_service = self.ruleset_optimizer.labels_of_service
@@ -205,16 +280,18 @@ class RulesetMatcher:
         self.label_sources_of_service = self.ruleset_optimizer.label_sources_of_service
         self.clear_caches = self.ruleset_optimizer.clear_caches
 
-        self._service_match_cache: dict[
+        # These caches grow with the number of services. A cache_size limits each of
+        # them to the most recently used entries, see cache_stats().
+        self._service_match_cache: LRUCache[
             tuple[
                 tuple[ServiceName | None, int], PreprocessedPattern, tuple[tuple[str, object], ...]
             ],
             object,
-        ] = {}
+        ] = LRUCache(cache_size)
         # Expensive and mostly useless caching.
-        self.__service_match_obj: dict[
+        self.__service_match_obj: LRUCache[
             tuple[HostName, ServiceName, Item | None], RulesetMatchObject
-        ] = {}
+        ] = LRUCache(cache_size)
 
         self._debug_matching_stats = debug_matching_stats
 
@@ -225,9 +302,30 @@ class RulesetMatcher:
         separate_files: bool = False,
     ) -> None:
         persist_matching_stats(
-            self.ruleset_optimizer.matching_stats, base_dir, ruleset_id_name_mapping, separate_files
+            self.ruleset_optimizer.matching_stats,
+            base_dir,
+            ruleset_id_name_mapping,
+            separate_files,
+            cache_stats=self.cache_stats(),
         )
 
+    def cache_stats(self) -> Mapping[str, CacheStats]:
+        return {
+            "service_match": CacheStats.from_cache(self._service_match_cache),
+            "service_match_object": CacheStats.from_cache(self.__service_match_obj),
+            "labels_of_host": self.ruleset_optimizer.labels_of_host_cache_stats(),
+        }
+
+    def load_match_store(self, directory: Path) -> bool:
+        """Reuse the host matching results persisted for the current configuration"""
+        return self.ruleset_optimizer.load_match_store(directory)
+
+    def save_match_store(self, directory: Path) -> None:
+        self.ruleset_optimizer.save_match_store(directory)
+
+    def close_match_store(self) -> None:
+        self.ruleset_optimizer.close_match_store()
+
     def get_host_bool_value(self, hostname: HostName, ruleset: Sequence[RuleSpec[bool]]) -> bool:
         """Compute outcome of a ruleset set that just says yes/no
 
@@ -263,7 +361,7 @@ class RulesetMatcher:
 
         # When the requested host is part of the local sites configuration,
         # then use only the sites hosts for processing the rules
-        with_foreign_hosts = hostname not in self.ruleset_optimizer.all_processed_hosts()
+        with_foreign_hosts = not self.ruleset_optimizer.is_processed_host(hostname)
 
         optimized_ruleset: Mapping[HostName | HostAddress, Sequence[TRuleValue]] = (
             self.ruleset_optimizer.get_host_ruleset(ruleset, with_foreign_hosts)
@@ -383,9 +481,7 @@ class RulesetMatcher:
         ruleset: Sequence[RuleSpec[TRuleValue]],
     ) -> Iterator[TRuleValue]:
         """Returns a generator of the values of the matched rules"""
-        with_foreign_hosts = (
-            match_object.host_name not in self.ruleset_optimizer.all_processed_hosts()
-        )
+        with_foreign_hosts = not self.ruleset_optimizer.is_processed_host(match_object.host_name)
         optimized_ruleset = self.ruleset_optimizer.get_service_ruleset(ruleset, with_foreign_hosts)
 
         ruleset_id = id(ruleset)
@@ -422,9 +518,9 @@ class RulesetMatcher:
                 service_label_groups_cache_id,
             )
 
-            if service_cache_id in self._service_match_cache:
+            try:
                 match = self._service_match_cache[service_cache_id]
-            else:
+            except KeyError:
                 match = matches_service_conditions(
                     service_description_condition, service_label_groups, match_object
                 )
@@ -441,6 +537,71 @@ class RulesetMatcher:
         if self._debug_matching_stats and never_matched:
             self._track_service_ruleset_miss(match_object, never_matched, ruleset_id)
 
+    def get_service_ruleset_values_of_services(
+        self,
+        hostname: HostName,
+        descriptions: Iterable[ServiceName],
+        ruleset: Sequence[RuleSpec[TRuleValue]],
+    ) -> Mapping[ServiceName, Sequence[TRuleValue]]:
+        """Returns the values of the matched rules for all given services of a host
+
+        Equivalent to calling get_service_ruleset_values() for every service, but the
+        host conditions are only evaluated once and a prefilter narrows down the rules
+        that need a regex match per service.
+        """
+        if self._debug_matching_stats:
+            return {
+                description: list(
+                    self.get_service_ruleset_values(
+                        self._service_match_object(hostname, description), ruleset
+                    )
+                )
+                for description in descriptions
+            }
+
+        with_foreign_hosts = not self.ruleset_optimizer.is_processed_host(hostname)
+        optimized_ruleset = self.ruleset_optimizer.get_service_ruleset(ruleset, with_foreign_hosts)
+        prefilter = self.ruleset_optimizer.get_service_ruleset_prefilter(ruleset)
+
+        host_rules = [
+            (rule_index, rule)
+            for rule_index, rule in enumerate(optimized_ruleset)
+            if hostname in rule[2]
+        ]
+        if not host_rules:
+            return {description: [] for description in descriptions}
+
+        values_by_service: dict[ServiceName, Sequence[TRuleValue]] = {}
+        for description in descriptions:
+            candidates = prefilter.candidates(description)
+            match_object: RulesetMatchObject | None = None
+            values = []
+            for rule_index, (
+                _rule_id,
+                value,
+                _hosts,
+                label_groups,
+                _cache_id,
+                pattern,
+            ) in host_rules:
+                negate, compiled = pattern
+                if rule_index in candidates:
+                    if (compiled.match(description) is not None) is negate:
+                        continue
+                elif not negate:
+                    continue  # None of the patterns of the rule can match
+
+                if label_groups:
+                    if match_object is None:
+                        match_object = self._service_match_object(hostname, description)
+                    if not matches_labels(match_object.service_labels, label_groups):
+                        continue
+
+                values.append(value)
+            values_by_service[description] = values
+
+        return values_by_service
+
     def _track_service_ruleset_match(
         self,
         match_object: RulesetMatchObject,
@@ -505,9 +666,11 @@ class RulesetOptimizer:
         clusters_of: Mapping[HostName, Sequence[HostName]],
         nodes_of: Mapping[HostName, Sequence[HostName]],
         debug_matching_stats: bool = False,
+        host_index: bool = False,
+        cache_size: int | None = None,
     ) -> None:
         super().__init__()
-        self.__labels_of_host: dict[HostName, Labels] = {}
+        self.__labels_of_host: LRUCache[HostName, Labels] = LRUCache(cache_size)
         self._ruleset_matcher = ruleset_matcher
         self._label_manager = label_manager
         self._host_tags = {hn: set(tags_of_host.items()) for hn, tags_of_host in host_tags.items()}
@@ -521,6 +684,7 @@ class RulesetOptimizer:
         # Every active host or a subset of the active hosts when multiprocessing
         # is enabled.
         self._all_processed_hosts = self._all_configured_hosts
+        self._all_processed_hosts_lookup = frozenset(self._all_processed_hosts)
 
         # A factor which indicates how much hosts share the same host tag configuration (excluding folders).
         # len(all_processed_hosts) / len(different tag combinations)
@@ -528,6 +692,7 @@ class RulesetOptimizer:
         self._all_processed_hosts_similarity = 1.0
 
         self.__service_ruleset_cache: dict[tuple[int, bool], PreprocessedServiceRuleset] = {}
+        self.__service_ruleset_prefilter_cache: dict[int, ServiceDescriptionPrefilter] = {}
         self.__host_ruleset_cache: dict[tuple[int, bool], Mapping[HostAddress, Sequence[Any]]] = {}
         self._all_matching_hosts_match_cache: dict[tuple[ConditionCacheID, bool], set[HostName]] = (
             {}
@@ -544,21 +709,123 @@ class RulesetOptimizer:
         # TODO: Clean this one up?
         self._initialize_host_lookup()
 
+        # Optional bitmap based evaluation of the host conditions. It replaces the
+        # per host loops in _all_matching_hosts for large setups.
+        self._host_index = (
+            HostBitmapIndex(
+                self._all_configured_hosts, self._host_tags, host_paths, self.labels_of_host
+            )
+            if host_index
+            else None
+        )
+        self._all_processed_hosts_bitmap = (
+            0 if self._host_index is None else self._host_index.all_hosts
+        )
+        self._all_matching_hosts_bitmap_cache: dict[tuple[ConditionCacheID, bool], HostBitmap] = {}
+
+        # Host matching results shared with other processes, see load_match_store()
+        self._match_store: RulesetMatchStore | None = None
+        self._match_store_config_hash: str | None = None
+        self._match_store_conditions: dict[ConditionCacheID, RuleConditionsSpec] | None = None
+
         self._debug_matching_stats = debug_matching_stats
         self.matching_stats: dict[int, HostRulesetMatchingStats | ServiceRulesetMatchingStats] = {}
 
+    def labels_of_host_cache_stats(self) -> CacheStats:
+        return CacheStats.from_cache(self.__labels_of_host)
+
     def clear_ruleset_caches(self) -> None:
         self.__host_ruleset_cache.clear()
         self.__service_ruleset_cache.clear()
+        self.__service_ruleset_prefilter_cache.clear()
 
     def clear_caches(self) -> None:
         self.__host_ruleset_cache.clear()
         self._all_matching_hosts_match_cache.clear()
+        self._all_matching_hosts_bitmap_cache.clear()
+
+    def _compute_match_store_config_hash(self) -> str:
+        return compute_config_hash(
+            (
+                sorted(self._all_configured_hosts),
+                sorted((hn, sorted(tags)) for hn, tags in self._host_tags.items()),
+                sorted(self._host_paths.items()),
+                sorted(
+                    (hn, sorted(labels.items()))
+                    for hn, labels in self._label_manager.explicit_host_labels.items()
+                ),
+                self._label_manager.host_label_rules,
+                sorted((hn, list(nodes)) for hn, nodes in self._nodes_of.items()),
+                RulesetOptimizer._builtin_labels_of_host(),
+            ),
+            cmk.utils.paths.discovered_host_labels_dir,
+        )
+
+    def load_match_store(self, directory: Path) -> bool:
+        """Attach the persisted host matching results of the current configuration
+
+        From now on the conditions evaluated by this process are recorded, so that
+        save_match_store() can persist them. Returns whether a store was found.
+        """
+        self.close_match_store()
+        self._match_store_config_hash = self._compute_match_store_config_hash()
+        self._match_store = RulesetMatchStore.open(directory, self._match_store_config_hash)
+        if self._match_store_conditions is None:
+            self._match_store_conditions = {}
+        return self._match_store is not None
+
+    def close_match_store(self) -> None:
+        if self._match_store is not None:
+            self._match_store.close()
+            self._match_store = None
+
+    def save_match_store(self, directory: Path) -> None:
+        """Persist the host matching results of all conditions seen so far
+
+        The results stored by other processes for the same configuration are kept.
+        """
+        if self._match_store_conditions is None or self._match_store_config_hash is None:
+            return
+
+        save_ruleset_match_store(
+            directory,
+            self._match_store_config_hash,
+            self._all_configured_hosts,
+            {
+                condition_key(condition_id): self._all_matching_hosts(
+                    condition, with_foreign_hosts=True
+                )
+                for condition_id, condition in list(self._match_store_conditions.items())
+            },
+        )
+
+    def _persisted_matching_hosts(
+        self, cache_id: tuple[ConditionCacheID, bool], condition: RuleConditionsSpec
+    ) -> Sequence[HostName] | None:
+        """Look up the result of a condition in the persisted store
+
+        The store contains the results with foreign hosts. Limiting them to the
+        processed hosts gives the result without foreign hosts.
+        """
+        condition_id, with_foreign_hosts = cache_id
+        if self._match_store_conditions is not None:
+            self._match_store_conditions.setdefault(condition_id, condition)
+        if self._match_store is None:
+            return None
+
+        if (hosts := self._match_store.get(condition_key(condition_id))) is None:
+            return None
+        if with_foreign_hosts:
+            return hosts
+        return [hn for hn in hosts if hn in self._all_processed_hosts_lookup]
 
     def all_processed_hosts(self) -> Sequence[HostName]:
         """Returns a set of all processed hosts"""
         return self._all_processed_hosts
 
+    def is_processed_host(self, hostname: HostName | HostAddress) -> bool:
+        return hostname in self._all_processed_hosts_lookup
+
     def set_all_processed_hosts(self, all_processed_hosts: Iterable[HostName]) -> None:
         involved_clusters: set[HostName] = set()
         involved_nodes: set[HostName] = set()
@@ -575,12 +842,16 @@ class RulesetOptimizer:
         # Only add references to configured hosts
         nodes_and_clusters.intersection_update(self._all_configured_hosts)
         self._all_processed_hosts = list(nodes_and_clusters)
+        self._all_processed_hosts_lookup = frozenset(nodes_and_clusters)
 
         # The folder host lookup includes a list of all -processed- hosts within a given
         # folder. Any update with set_all_processed hosts invalidates this cache, because
         # the scope of relevant hosts has changed. This is -good-, since the values in this
         # lookup are iterated one by one later on in all_matching_hosts
         self._folder_host_lookup = {}
+        if self._host_index is not None:
+            self._all_processed_hosts_bitmap = self._host_index.bitmap(self._all_processed_hosts)
+            self._all_matching_hosts_bitmap_cache.clear()
 
         used_groups = {
             self._host_grouped_ref.get(hostname, ()) for hostname in self._all_processed_hosts
@@ -645,7 +916,17 @@ class RulesetOptimizer:
         ) -> Mapping[HostAddress, Sequence[TRuleValue]]:
             host_values: dict[HostAddress, list[TRuleValue]] = {}
             for rule in ruleset:
-                all_matching_hosts = self._get_matching_hosts(ruleset_id, rule, with_foreign_hosts)
+                all_matching_hosts: Iterable[HostName]
+                if self._host_index is not None and not self._debug_matching_stats:
+                    if is_disabled(rule):
+                        continue
+                    all_matching_hosts = self._host_index.hosts(
+                        self._all_matching_hosts_bitmap(rule["condition"], with_foreign_hosts)
+                    )
+                else:
+                    all_matching_hosts = self._get_matching_hosts(
+                        ruleset_id, rule, with_foreign_hosts
+                    )
 
                 for hostname in all_matching_hosts:
                     host_values.setdefault(hostname, []).append(rule["value"])
@@ -711,6 +992,34 @@ class RulesetOptimizer:
 
         return self.__service_ruleset_cache.setdefault(cache_id, _impl(ruleset, with_foreign_hosts))
 
+    def get_service_ruleset_prefilter(
+        self, ruleset: Sequence[RuleSpec[TRuleValue]]
+    ) -> ServiceDescriptionPrefilter:
+        """Prefilter for the rules of get_service_ruleset(), indexed like the rules there"""
+        ruleset_id = id(ruleset)
+        with contextlib.suppress(KeyError):
+            return self.__service_ruleset_prefilter_cache[ruleset_id]
+
+        return self.__service_ruleset_prefilter_cache.setdefault(
+            ruleset_id,
+            ServiceDescriptionPrefilter(
+                [
+                    RulesetOptimizer._pattern_parts(rule["condition"].get("service_description"))
+                    for rule in ruleset
+                    if not is_disabled(rule)
+                ]
+            ),
+        )
+
+    @staticmethod
+    def _pattern_parts(patterns: HostOrServiceConditions | None) -> Sequence[str]:
+        if not patterns:
+            return [""]
+        return [
+            p["$regex"] if isinstance(p, dict) else p
+            for p in parse_negated_condition_list(patterns)[1]
+        ]
+
     @staticmethod
     def _convert_pattern_list(patterns: HostOrServiceConditions | None) -> PreprocessedPattern:
         """Compiles a list of service match patterns to a to a single regex
@@ -761,6 +1070,20 @@ class RulesetOptimizer:
         except KeyError:
             pass
 
+        if (persisted := self._persisted_matching_hosts(cache_id, condition)) is not None:
+            return self._all_matching_hosts_match_cache.setdefault(cache_id, set(persisted))
+
+        if self._host_index is not None:
+            # Only turn the bitmap into host names at the edge
+            return self._all_matching_hosts_match_cache.setdefault(
+                cache_id,
+                set(
+                    self._host_index.hosts(
+                        self._all_matching_hosts_bitmap(condition, with_foreign_hosts)
+                    )
+                ),
+            )
+
         # Thin out the valid hosts further. If the rule is located in a folder
         # we only need the intersection of the folders hosts and the previously determined valid_hosts
         valid_hosts = self._get_hosts_within_folder(rule_path, with_foreign_hosts)
@@ -820,6 +1143,39 @@ class RulesetOptimizer:
         self._all_matching_hosts_match_cache[cache_id] = matching
         return matching
 
+    def _all_matching_hosts_bitmap(
+        self, condition: RuleConditionsSpec, with_foreign_hosts: bool
+    ) -> HostBitmap:
+        """Bitmap version of _all_matching_hosts(), only available with the host index"""
+        assert self._host_index is not None
+        cache_id = self._get_cache_id(condition, with_foreign_hosts)
+        with contextlib.suppress(KeyError):
+            return self._all_matching_hosts_bitmap_cache[cache_id]
+
+        if (persisted := self._persisted_matching_hosts(cache_id, condition)) is not None:
+            return self._all_matching_hosts_bitmap_cache.setdefault(
+                cache_id, self._host_index.bitmap(persisted)
+            )
+
+        hostlist = condition.get("host_name")
+        tag_conditions: Mapping[TagGroupID, TagCondition] = condition.get("host_tags", {})
+        label_groups: LabelGroups = condition.get("host_label_groups", [])
+
+        matching = self._host_index.folder(condition.get("host_folder", "/")) & (
+            self._host_index.all_hosts if with_foreign_hosts else self._all_processed_hosts_bitmap
+        )
+        if hostlist == []:
+            matching = 0  # Empty host list -> Nothing matches
+        if matching and tag_conditions:
+            matching &= self._host_index.match_tags(tag_conditions)
+        if matching and hostlist:
+            matching &= self._host_index.match_host_name(hostlist)
+        # Labels last: They are the most expensive ones and only computed for the remaining hosts
+        if matching and label_groups:
+            matching = self._host_index.match_labels(label_groups, matching)
+
+        return self._all_matching_hosts_bitmap_cache.setdefault(cache_id, matching)
+
     @staticmethod
     def _condition_cache_id(
         hostlist: HostOrServiceConditions | None,
@@ -1048,6 +1404,173 @@ class RulesetOptimizer:
         )
 
 
+class HostBitmapIndex:
+    """Bitmap index over the configured hosts
+
+    Every host gets a fixed ordinal. Tags, folders, labels and host name conditions
+    are translated to bitmaps over these ordinals, so that a rule condition can be
+    evaluated with a handful of bitwise operations instead of a loop over all hosts.
+    Python integers are used as bitmaps: They are compact and the bitwise operations
+    are implemented in C.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[HostName],
+        host_tags: Mapping[HostName, Iterable[tuple[TagGroupID, TagID]]],
+        host_paths: Mapping[HostName, str],
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> None:
+        self._hosts: Sequence[HostName] = list(dict.fromkeys(hosts))
+        self._ordinals: dict[str, int] = {
+            hostname: ordinal for ordinal, hostname in enumerate(self._hosts)
+        }
+        self.all_hosts: HostBitmap = (1 << len(self._hosts)) - 1
+        self._labels_of_host = labels_of_host
+
+        tag_ordinals: dict[tuple[TagGroupID, TagID | None], list[int]] = {}
+        path_ordinals: dict[str, list[int]] = {}
+        for ordinal, hostname in enumerate(self._hosts):
+            for tag in host_tags.get(hostname, ()):
+                tag_ordinals.setdefault(tag, []).append(ordinal)
+            path_ordinals.setdefault(host_paths.get(hostname, "/"), []).append(ordinal)
+
+        self._tags = {tag: self._from_ordinals(o) for tag, o in tag_ordinals.items()}
+        self._paths = {path: self._from_ordinals(o) for path, o in path_ordinals.items()}
+        self._folders: dict[str, HostBitmap] = {}
+        self._host_name_regexes: dict[str, HostBitmap] = {}
+
+        # Host labels are expensive to compute. Only index the hosts that were asked for.
+        self._labels: dict[tuple[str, str], HostBitmap] = {}
+        self._labels_indexed: HostBitmap = 0
+
+    def _from_ordinals(self, ordinals: Iterable[int]) -> HostBitmap:
+        data = bytearray((len(self._hosts) + 7) // 8)
+        for ordinal in ordinals:
+            data[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(data, "little")
+
+    def bitmap(self, hosts: Iterable[str]) -> HostBitmap:
+        return self._from_ordinals(
+            ordinal for hostname in hosts if (ordinal := self._ordinals.get(hostname)) is not None
+        )
+
+    def hosts(self, bitmap: HostBitmap) -> Iterator[HostName]:
+        # bin() renders the most significant bit first, hence the reversal.
+        return itertools.compress(self._hosts, map("1".__eq__, bin(bitmap)[:1:-1]))
+
+    def folder(self, folder_path: str) -> HostBitmap:
+        with contextlib.suppress(KeyError):
+            return self._folders[folder_path]
+
+        bitmap = 0
+        for host_path, hosts_in_path in self._paths.items():
+            if host_path.startswith(folder_path):
+                bitmap |= hosts_in_path
+        return self._folders.setdefault(folder_path, bitmap)
+
+    def match_tags(self, tag_conditions: Mapping[TagGroupID, TagCondition]) -> HostBitmap:
+        matching = self.all_hosts
+        for taggroup_id, tag_condition in tag_conditions.items():
+            if is_tag_condition_ne(tag_condition):
+                matching &= ~self._tags.get((taggroup_id, tag_condition["$ne"]), 0)
+            elif is_tag_condition_or(tag_condition):
+                matching &= self._any_tag(taggroup_id, tag_condition["$or"])
+            elif is_tag_condition_nor(tag_condition):
+                matching &= ~self._any_tag(taggroup_id, tag_condition["$nor"])
+            elif isinstance(tag_condition, dict):
+                raise NotImplementedError()
+            else:
+                matching &= self._tags.get((taggroup_id, tag_condition), 0)
+        return matching
+
+    def _any_tag(self, taggroup_id: TagGroupID, tag_ids: Iterable[TagID | None]) -> HostBitmap:
+        bitmap = 0
+        for tag_id in tag_ids:
+            bitmap |= self._tags.get((taggroup_id, tag_id), 0)
+        return bitmap
+
+    def match_labels(self, label_groups: LabelGroups, candidates: HostBitmap) -> HostBitmap:
+        """Bitmap version of matches_labels() for the given candidate hosts"""
+        self._index_labels(candidates)
+
+        overall_match = candidates
+        for group_operator, label_group in label_groups:
+            group_match = candidates
+            for label_operator, label in label_group:
+                if not label:
+                    continue
+                try:
+                    key, value = label.split(":")
+                except Exception:
+                    raise NotImplementedError(f"Invalid label condition: {label}")
+                group_match = _and_or_not_bitmap_match(
+                    group_match, self._labels.get((key, value), 0), label_operator
+                )
+            overall_match = _and_or_not_bitmap_match(overall_match, group_match, group_operator)
+
+        return overall_match & candidates
+
+    def _index_labels(self, candidates: HostBitmap) -> None:
+        if not (missing := candidates & ~self._labels_indexed):
+            return
+
+        label_ordinals: dict[tuple[str, str], list[int]] = {}
+        for hostname in self.hosts(missing):
+            ordinal = self._ordinals[hostname]
+            for label in self._labels_of_host(hostname).items():
+                label_ordinals.setdefault(label, []).append(ordinal)
+
+        for label, ordinals in label_ordinals.items():
+            self._labels[label] = self._labels.get(label, 0) | self._from_ordinals(ordinals)
+        self._labels_indexed |= missing
+
+    def match_host_name(self, host_entries: HostOrServiceConditions) -> HostBitmap:
+        """Bitmap version of matches_host_name() for a non-empty condition"""
+        negate, host_entries = parse_negated_condition_list(host_entries)
+
+        matching = 0
+        explicit_hosts = []
+        for entry in host_entries:
+            if isinstance(entry, dict):
+                matching |= self._match_host_name_regex(entry["$regex"])
+            else:
+                explicit_hosts.append(entry)
+        matching |= self.bitmap(explicit_hosts)
+
+        # The generic agent host ("") never matches a positive condition.
+        if (ordinal := self._ordinals.get("")) is not None:
+            matching &= ~(1 << ordinal)
+
+        return self.all_hosts & ~matching if negate else matching
+
+    def _match_host_name_regex(self, pattern: str) -> HostBitmap:
+        with contextlib.suppress(KeyError):
+            return self._host_name_regexes[pattern]
+
+        compiled = regex(pattern)
+        return self._host_name_regexes.setdefault(
+            pattern,
+            self._from_ordinals(
+                ordinal
+                for ordinal, hostname in enumerate(self._hosts)
+                if compiled.match(hostname) is not None
+            ),
+        )
+
+
+def _and_or_not_bitmap_match(
+    given_group_match: HostBitmap, new_single_match: HostBitmap, operator: AndOrNotLiteral
+) -> HostBitmap:
+    match operator:
+        case "and":
+            return given_group_match & new_single_match
+        case "or":
+            return given_group_match | new_single_match
+        case "not":
+            return given_group_match & ~new_single_match
+
+
 def _tags_cache_id(tag_or_label_spec: object) -> object:
     if isinstance(tag_or_label_spec, dict):
         if "$ne" in tag_or_label_spec:
@@ -12,6 +12,7 @@ import time
 from collections.abc import Mapping
 from typing import Any, Sequence
 
+from cmk.utils.caching import LRUCache
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.paths import omd_root
 from cmk.utils.servicename import Item, ServiceName
@@ -130,11 +131,39 @@ class ServiceRulesetMatchingStats(MatchingStats):
         return base_serialized
 
 
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class CacheStats:
+    size: int
+    maxsize: int | None
+    hits: int
+    misses: int
+    evictions: int
+
+    @classmethod
+    def from_cache(cls, cache: LRUCache) -> "CacheStats":
+        return cls(
+            size=len(cache),
+            maxsize=cache.maxsize,
+            hits=cache.hits,
+            misses=cache.misses,
+            evictions=cache.evictions,
+        )
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def serialize(self) -> dict[str, Any]:
+        return {**dataclasses.asdict(self), "hit_ratio": self.hit_ratio}
+
+
 def persist_matching_stats(
     matching_stats: dict[int, HostRulesetMatchingStats | ServiceRulesetMatchingStats],
     base_dir: str,
     ruleset_id_name_mapping: Mapping[int, str],
     separate_files: bool = False,
+    cache_stats: Mapping[str, CacheStats] | None = None,
 ) -> None:
     if os.getcwd().removeprefix("/opt") != str(omd_root):
         return
@@ -144,9 +173,13 @@ def persist_matching_stats(
     filepath = f"{base_dir.rstrip('/')}/{time.time() if separate_files else single_file_name}.json"
 
     serialized = {key: value.serialize() for key, value in matching_stats.items()}
-    serialized_with_names = {
+    serialized_with_names: dict[int | str, dict[str, Any]] = {
         ruleset_id_name_mapping.get(key, key): values for key, values in serialized.items()
     }
+    if cache_stats is not None:
+        serialized_with_names["cache_stats"] = {
+            name: stats.serialize() for name, stats in cache_stats.items()
+        }
 
     with open(filepath, "w") as stats_file:
         json.dump(serialized_with_names, stats_file, indent=4)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Persist the host matching results of the ruleset matching across processes
+
+The file is written once after the configuration has been activated. All later
+processes working with the same configuration open it via mmap and look up the
+hosts matching a rule condition instead of computing them again.
+
+File layout (all integers little endian):
+
+    header      magic, config hash, number of hosts, number of conditions
+    hosts       "\\n" separated host names, preceded by their length in bytes
+    index       (condition key, offset, length, kind) sorted by condition key
+    payload     per condition either a bitmap over the host ordinals or an
+                array of host ordinals, whichever is smaller
+"""
+
+import array
+import contextlib
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Final
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.ccc import store
+
+_MAGIC: Final = b"CMKRMS01"
+_HEADER: Final = struct.Struct("<8s32sII")
+_LENGTH: Final = struct.Struct("<I")
+_INDEX_ENTRY: Final = struct.Struct("<16sQIB")
+_KIND_BITMAP: Final = 0
+_KIND_ORDINALS: Final = 1
+
+ConditionKey = bytes
+
+
+def condition_key(condition_cache_id: object) -> ConditionKey:
+    """Stable key of a rule condition, independent of the process"""
+    return hashlib.blake2b(repr(condition_cache_id).encode("utf-8"), digest_size=16).digest()
+
+
+def compute_config_hash(parts: Iterable[object], discovered_labels_dir: Path) -> str:
+    """Hash all inputs of the host matching
+
+    The discovered host labels are not part of the configuration, they change with
+    every discovery. Their files are hashed by name, size and mtime instead of loading
+    them all.
+    """
+    config_hash = hashlib.sha256()
+    for part in parts:
+        config_hash.update(repr(part).encode("utf-8"))
+    with contextlib.suppress(FileNotFoundError):
+        with os.scandir(discovered_labels_dir) as entries:
+            for name, size, mtime in sorted(
+                (entry.name, (stat := entry.stat()).st_size, stat.st_mtime_ns) for entry in entries
+            ):
+                config_hash.update(f"{name}\0{size}\0{mtime}\n".encode("utf-8"))
+    return config_hash.hexdigest()
+
+
+def _store_path(directory: Path, config_hash: str) -> Path:
+    return directory / f"{config_hash}.bin"
+
+
+class RulesetMatchStore:
+    """Read access to a persisted host matching store"""
+
+    def __init__(self, path: Path, config_hash: str) -> None:
+        with path.open("rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, raw_hash, num_hosts, self._num_conditions = _HEADER.unpack_from(self._data, 0)
+            if magic != _MAGIC or raw_hash != bytes.fromhex(config_hash):
+                raise ValueError(f"Invalid ruleset matching store: {path}")
+        except (ValueError, struct.error):
+            self._data.close()
+            raise
+
+        offset = _HEADER.size
+        (hosts_length,) = _LENGTH.unpack_from(self._data, offset)
+        offset += _LENGTH.size
+        raw_hosts = self._data[offset : offset + hosts_length].decode("utf-8")
+        self.hosts: Sequence[HostName] = (
+            [HostName(h) for h in raw_hosts.split("\n")] if num_hosts else []
+        )
+        self._index_offset = offset + hosts_length
+
+    @classmethod
+    def open(cls, directory: Path, config_hash: str) -> "RulesetMatchStore | None":
+        try:
+            return cls(_store_path(directory, config_hash), config_hash)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def __len__(self) -> int:
+        return self._num_conditions
+
+    def close(self) -> None:
+        self._data.close()
+
+    def keys(self) -> Iterator[ConditionKey]:
+        return (self._index_entry(position)[0] for position in range(self._num_conditions))
+
+    def _index_entry(self, position: int) -> tuple[bytes, int, int, int]:
+        return _INDEX_ENTRY.unpack_from(
+            self._data, self._index_offset + position * _INDEX_ENTRY.size
+        )
+
+    def ordinals(self, key: ConditionKey) -> Sequence[int] | None:
+        """Return the ordinals of the hosts matching the condition, None if unknown"""
+        low, high = 0, self._num_conditions
+        while low < high:
+            middle = (low + high) // 2
+            if self._index_entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == self._num_conditions:
+            return None
+        found_key, offset, length, kind = self._index_entry(low)
+        if found_key != key:
+            return None
+
+        payload = self._data[offset : offset + length]
+        if kind == _KIND_ORDINALS:
+            ordinals = array.array("I")
+            ordinals.frombytes(payload)
+            return ordinals
+        return list(_bitmap_ordinals(int.from_bytes(payload, "little")))
+
+    def get(self, key: ConditionKey) -> Sequence[HostName] | None:
+        if (ordinals := self.ordinals(key)) is None:
+            return None
+        return [self.hosts[o] for o in ordinals]
+
+
+def _bitmap_ordinals(bitmap: int) -> Iterator[int]:
+    return (o for o, bit in enumerate(bin(bitmap)[:1:-1]) if bit == "1")
+
+
+def _stored_matching_hosts(
+    directory: Path, config_hash: str
+) -> Mapping[ConditionKey, Sequence[HostName]]:
+    if (existing := RulesetMatchStore.open(directory, config_hash)) is None:
+        return {}
+    with contextlib.closing(existing):
+        return {key: hosts for key in existing.keys() if (hosts := existing.get(key)) is not None}
+
+
+def save_ruleset_match_store(
+    directory: Path,
+    config_hash: str,
+    hosts: Sequence[HostName],
+    matching_hosts: Mapping[ConditionKey, Iterable[HostName]],
+) -> None:
+    """Write the store for the given configuration and drop the outdated ones
+
+    The conditions already stored for the same configuration are kept, unless they
+    are given again: A process may only have evaluated some of the conditions.
+    """
+    matching_hosts = {**_stored_matching_hosts(directory, config_hash), **matching_hosts}
+    ordinal_of = {hostname: ordinal for ordinal, hostname in enumerate(hosts)}
+    bitmap_length = (len(hosts) + 7) // 8
+
+    raw_hosts = "\n".join(hosts).encode("utf-8")
+    index_offset = _HEADER.size + _LENGTH.size + len(raw_hosts)
+    offset = index_offset + len(matching_hosts) * _INDEX_ENTRY.size
+
+    index = []
+    payloads = []
+    for key, matching in sorted(matching_hosts.items()):
+        ordinals = array.array("I", sorted(ordinal_of[h] for h in matching if h in ordinal_of))
+        if len(ordinals) * ordinals.itemsize < bitmap_length:
+            kind, payload = _KIND_ORDINALS, ordinals.tobytes()
+        else:
+            bitmap = bytearray(bitmap_length)
+            for ordinal in ordinals:
+                bitmap[ordinal >> 3] |= 1 << (ordinal & 7)
+            kind, payload = _KIND_BITMAP, bytes(bitmap)
+        index.append(_INDEX_ENTRY.pack(key, offset, len(payload), kind))
+        payloads.append(payload)
+        offset += len(payload)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = _store_path(directory, config_hash)
+    store.save_bytes_to_file(
+        path,
+        b"".join(
+            [
+                _HEADER.pack(_MAGIC, bytes.fromhex(config_hash), len(hosts), len(index)),
+                _LENGTH.pack(len(raw_hosts)),
+                raw_hosts,
+                *index,
+                *payloads,
+            ]
+        ),
+    )
+
+    for outdated in directory.glob("*.bin"):
+        if outdated != path:
+            outdated.unlink(missing_ok=True)
@@ -9,14 +9,18 @@ structured monitoring data of Check_MK.
 
 from __future__ import annotations
 
+import functools
 import gzip
 import io
+import marshal
+import os
 import pprint
+import struct
 from collections import Counter
-from collections.abc import Callable, Iterable, Mapping, Sequence
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Generic, Literal, NamedTuple, NewType, Self, TypedDict, TypeVar
+from typing import Any, Generic, Literal, NamedTuple, NewType, Self, TypedDict, TypeVar
 
 from cmk.utils.hostaddress import HostName
 
@@ -1629,7 +1633,119 @@ class ImmutableDeltaTree:
 #   '----------------------------------------------------------------------'
 
 
+# Binary tree files: After the magic, the records of the nodes and tables follow, each of them
+# marshalled on its own. The nodes are written depth first, children before their parents, so
+# a node record can hold the offsets of its table and child nodes and the file is written in
+# one pass. The last bytes hold the offset and size of the record of the root node:
+#
+#   node record: (raw attributes, (key columns, table offset, table size) | None,
+#                 {node name: (node offset, node size)})
+#   table record: raw table
+#
+# A loaded tree only unmarshals the records of the nodes and tables which are accessed.
+_BINARY_TREE_MAGIC = b"CMKSDT01"
+_SPAN = struct.Struct("!QQ")
+
+
+def _write_record(f: io.BytesIO, record: Any) -> tuple[int, int]:
+    data = marshal.dumps(record)
+    return f.tell(), f.write(data)
+
+
+def _write_binary_node(f: io.BytesIO, tree: MutableTree | ImmutableTree) -> tuple[int, int]:
+    nodes = {name: _write_binary_node(f, node) for name, node in tree.nodes_by_name.items() if node}
+    table = (
+        (list(tree.table.key_columns), *_write_record(f, raw_table))
+        if (raw_table := tree.table.serialize())
+        else None
+    )
+    return _write_record(f, (tree.attributes.serialize(), table, nodes))
+
+
+def _serialize_binary_tree(tree: MutableTree | ImmutableTree) -> bytes:
+    f = io.BytesIO()
+    f.write(_BINARY_TREE_MAGIC)
+    f.write(_SPAN.pack(*_write_binary_node(f, tree)))
+    return f.getvalue()
+
+
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+
+class _LoadedOnAccess(Mapping[_K, _V]):
+    """A mapping which is loaded when it is accessed for the first time"""
+
+    def __init__(self, load: Callable[[], Mapping[_K, _V]]) -> None:
+        self._load = load
+
+    @functools.cached_property
+    def _mapping(self) -> Mapping[_K, _V]:
+        return self._load()
+
+    def __getitem__(self, key: _K) -> _V:
+        return self._mapping[key]
+
+    def __iter__(self) -> Iterator[_K]:
+        return iter(self._mapping)
+
+    def __len__(self) -> int:
+        return len(self._mapping)
+
+
+class _BinaryTree:
+    def __init__(self, data: bytes) -> None:
+        if (
+            not data.startswith(_BINARY_TREE_MAGIC)
+            or len(data) < len(_BINARY_TREE_MAGIC) + _SPAN.size
+        ):
+            raise ValueError("not a binary tree file")
+        self._data = data
+
+    def _record(self, offset: int, size: int) -> Any:
+        return marshal.loads(self._data[offset : offset + size])
+
+    def root(self) -> ImmutableTree:
+        return self._node((), *_SPAN.unpack_from(self._data, len(self._data) - _SPAN.size))
+
+    def _node(self, path: SDPath, offset: int, size: int) -> ImmutableTree:
+        raw_attributes, table, nodes = self._record(offset, size)
+        return ImmutableTree(
+            path=path,
+            attributes=ImmutableAttributes.deserialize(raw_attributes),
+            table=ImmutableTable() if table is None else self._table(*table),
+            nodes_by_name=_LoadedOnAccess(
+                lambda: {name: self._node(path + (name,), *span) for name, span in nodes.items()}
+            ),
+        )
+
+    def _table(self, key_columns: Sequence[SDKey], offset: int, size: int) -> ImmutableTable:
+        load = functools.cache(lambda: ImmutableTable.deserialize(self._record(offset, size)))
+        return ImmutableTable(
+            key_columns=key_columns,
+            rows_by_ident=_LoadedOnAccess(lambda: load().rows_by_ident),
+            retentions=_LoadedOnAccess(lambda: load().retentions),
+        )
+
+
+def _binary_tree_file(filepath: Path) -> Path:
+    return filepath.with_name(f"{filepath.name}.bin")
+
+
+def _load_binary_tree(filepath: Path) -> ImmutableTree | None:
+    binary_filepath = _binary_tree_file(filepath)
+    try:
+        # The binary file is outdated if the tree file has been written by someone else since.
+        if binary_filepath.stat().st_mtime < filepath.stat().st_mtime:
+            return None
+        return _BinaryTree(binary_filepath.read_bytes()).root()
+    except (FileNotFoundError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+
 def load_tree(filepath: Path) -> ImmutableTree:
+    if (tree := _load_binary_tree(filepath)) is not None:
+        return tree
     if raw_tree := store.load_object_from_file(filepath, default=None):
         return ImmutableTree.deserialize(raw_tree)
     return ImmutableTree()
@@ -1646,15 +1762,21 @@ class TreeStore:
     def save(self, *, host_name: HostName, tree: MutableTree, pretty: bool = False) -> None:
         self._tree_dir.mkdir(parents=True, exist_ok=True)
 
-        tree_file = self._tree_file(host_name)
-
         output = tree.serialize()
-        store.save_object_to_file(tree_file, output, pretty=pretty)
+        content = f"{output!r}\n".encode("utf-8")
+        store.save_bytes_to_file(
+            self._tree_file(host_name),
+            f"{pprint.pformat(output)}\n".encode("utf-8") if pretty else content,
+        )
+        store.save_bytes_to_file(self._gz_file(host_name), gzip.compress(content))
 
-        buf = io.BytesIO()
-        with gzip.GzipFile(fileobj=buf, mode="wb") as f:
-            f.write((repr(output) + "\n").encode("utf-8"))
-        store.save_bytes_to_file(self._gz_file(host_name), buf.getvalue())
+        try:
+            binary_content = _serialize_binary_tree(tree)
+        except ValueError:
+            # marshal only knows the builtin types, inventory plugins may add subclasses.
+            self._binary_file(host_name).unlink(missing_ok=True)
+        else:
+            store.save_bytes_to_file(self._binary_file(host_name), binary_content)
 
         # Inform Livestatus about the latest inventory update
         self._last_filepath.touch()
@@ -1662,6 +1784,7 @@ class TreeStore:
     def remove(self, *, host_name: HostName) -> None:
         self._tree_file(host_name).unlink(missing_ok=True)
         self._gz_file(host_name).unlink(missing_ok=True)
+        self._binary_file(host_name).unlink(missing_ok=True)
 
     def _tree_file(self, host_name: HostName) -> Path:
         return self._tree_dir / str(host_name)
@@ -1669,6 +1792,183 @@ class TreeStore:
     def _gz_file(self, host_name: HostName) -> Path:
         return self._tree_dir / f"{host_name}.gz"
 
+    def _binary_file(self, host_name: HostName) -> Path:
+        return _binary_tree_file(self._tree_file(host_name))
+
+
+# Archived trees are stored as chains of deltas: The newest archived tree and every
+# _ARCHIVE_SNAPSHOT_INTERVAL-th one before it is a full tree file "<timestamp>", the trees in
+# between are stored as the differences from their successor in "<timestamp>.delta". A tree only
+# depends on newer files, so the cleanup of the oldest files never breaks a chain. A delta is
+# computed on the archive form of the trees, which are nested dicts, rows by their identifiers,
+# and is exact, including retentions:
+#
+#   {"Set": {key: value, ...}, "Removed": [key, ...], "Changed": {key: delta, ...}}
+_ARCHIVE_SNAPSHOT_INTERVAL = 10
+_DELTA_SUFFIX = ".delta"
+
+
+def _archive_form(tree: ImmutableTree) -> dict:
+    return {
+        "Attributes": tree.attributes.serialize(),
+        "KeyColumns": list(tree.table.key_columns),
+        "Rows": {ident: dict(row) for ident, row in tree.table.rows_by_ident.items()},
+        "Retentions": {
+            ident: {key: interval.serialize() for key, interval in intervals.items()}
+            for ident, intervals in tree.table.retentions.items()
+        },
+        "Nodes": {name: _archive_form(node) for name, node in tree.nodes_by_name.items() if node},
+    }
+
+
+def _from_archive_form(path: SDPath, raw_tree: Mapping) -> ImmutableTree:
+    return ImmutableTree(
+        path=path,
+        attributes=ImmutableAttributes.deserialize(raw_tree["Attributes"]),
+        table=ImmutableTable(
+            key_columns=raw_tree["KeyColumns"],
+            rows_by_ident=raw_tree["Rows"],
+            retentions={
+                ident: {key: RetentionInterval.deserialize(raw) for key, raw in intervals.items()}
+                for ident, intervals in raw_tree["Retentions"].items()
+            },
+        ),
+        nodes_by_name={
+            name: _from_archive_form(path + (name,), raw_node)
+            for name, raw_node in raw_tree["Nodes"].items()
+        },
+    )
+
+
+def _make_dict_delta(old: Mapping, new: Mapping) -> dict:
+    set_: dict = {}
+    changed: dict = {}
+    for key, value in new.items():
+        if key not in old:
+            set_[key] = value
+        elif (old_value := old[key]) == value:
+            continue
+        elif isinstance(old_value, Mapping) and isinstance(value, Mapping):
+            changed[key] = _make_dict_delta(old_value, value)
+        else:
+            set_[key] = value
+    delta: dict = {}
+    if set_:
+        delta["Set"] = set_
+    if removed := [key for key in old if key not in new]:
+        delta["Removed"] = removed
+    if changed:
+        delta["Changed"] = changed
+    return delta
+
+
+def _apply_dict_delta(old: Mapping, delta: Mapping) -> dict:
+    removed = set(delta.get("Removed", ()))
+    new = {key: value for key, value in old.items() if key not in removed}
+    for key, sub_delta in delta.get("Changed", {}).items():
+        new[key] = _apply_dict_delta(old[key], sub_delta)
+    new.update(delta.get("Set", {}))
+    return new
+
+
+class TreeArchive:
+    """The archived trees of a host
+
+    Loading an archived delta applies the deltas back from the following full tree. The
+    trees of the last loaded chain are kept, so loading the trees one after another applies
+    each delta once.
+    """
+
+    def __init__(self, host_dir: Path) -> None:
+        self._host_dir = host_dir
+        self._loaded_chain: dict[Path, dict] = {}
+
+    @staticmethod
+    def timestamp(filepath: Path) -> int:
+        return int(filepath.name.removesuffix(_DELTA_SUFFIX))
+
+    @staticmethod
+    def is_delta(filepath: Path) -> bool:
+        return filepath.name.endswith(_DELTA_SUFFIX)
+
+    def filepaths(self) -> Sequence[Path]:
+        """The archive files, oldest first"""
+        try:
+            filepaths = list(self._host_dir.iterdir())
+        except FileNotFoundError:
+            return []
+        return sorted(
+            (fp for fp in filepaths if fp.name.removesuffix(_DELTA_SUFFIX).isdigit()),
+            key=self.timestamp,
+        )
+
+    def load(self, filepath: Path) -> ImmutableTree:
+        if not self.is_delta(filepath):
+            return load_tree(filepath)
+        return _from_archive_form((), self._load_archive_form(filepath, self.filepaths()))
+
+    def _load_archive_form(self, filepath: Path, filepaths: Sequence[Path]) -> dict:
+        if (raw_tree := self._loaded_chain.get(filepath)) is not None:
+            return raw_tree
+
+        chain: list[Path] = []
+        for following in filepaths[filepaths.index(filepath) :]:
+            if not self.is_delta(following):
+                if not (tree := load_tree(following)):
+                    raise ValueError(following)
+                raw_tree = _archive_form(tree)
+                break
+            chain.append(following)
+        else:
+            raise ValueError(f"no full tree archived after {filepath}")
+
+        self._loaded_chain = {}
+        for delta_filepath in reversed(chain):
+            if (delta := store.load_object_from_file(delta_filepath, default=None)) is None:
+                raise ValueError(delta_filepath)
+            raw_tree = self._loaded_chain[delta_filepath] = _apply_dict_delta(raw_tree, delta)
+        return raw_tree
+
+    def add(self, tree_file: Path) -> None:
+        """Move the tree file into the archive
+
+        The previously newest tree is replaced by its difference from the new tree, unless it
+        completes a chain.
+        """
+        self._host_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = int(tree_file.stat().st_mtime)
+        filepaths = self.filepaths()
+        deltas = 0
+        for previous in reversed(filepaths[:-1]):
+            if not self.is_delta(previous):
+                break
+            deltas += 1
+
+        replaced: Path | None = None
+        if (
+            filepaths
+            and not self.is_delta(last := filepaths[-1])
+            and self.timestamp(last) < timestamp
+            and deltas < _ARCHIVE_SNAPSHOT_INTERVAL - 1
+        ):
+            try:
+                last_raw_tree = _archive_form(load_tree(last))
+            except (FileNotFoundError, ValueError, SyntaxError):
+                pass
+            else:
+                delta_file = self._host_dir / f"{self.timestamp(last)}{_DELTA_SUFFIX}"
+                store.save_object_to_file(
+                    delta_file, _make_dict_delta(_archive_form(load_tree(tree_file)), last_raw_tree)
+                )
+                # The cleanup removes the oldest files first, so keep the age of the archived tree
+                os.utime(delta_file, ns=((stat := last.stat()).st_atime_ns, stat.st_mtime_ns))
+                replaced = last
+
+        (self._host_dir / f"{timestamp}{_DELTA_SUFFIX}").unlink(missing_ok=True)
+        tree_file.rename(self._host_dir / str(timestamp))
+        if replaced is not None:
+            replaced.unlink()
+
 
 class TreeOrArchiveStore(TreeStore):
     def __init__(self, tree_dir: Path | str, archive: Path | str) -> None:
@@ -1679,22 +1979,21 @@ class TreeOrArchiveStore(TreeStore):
         if (tree_file := self._tree_file(host_name=host_name)).exists():
             return load_tree(tree_file)
 
-        try:
-            latest_archive_tree_file = max(
-                self._archive_host_dir(host_name).iterdir(), key=lambda tp: int(tp.name)
-            )
-        except (FileNotFoundError, ValueError):
+        tree_archive = self.tree_archive(host_name=host_name)
+        if not (filepaths := tree_archive.filepaths()):
             return ImmutableTree()
 
-        return load_tree(latest_archive_tree_file)
+        try:
+            return tree_archive.load(filepaths[-1])
+        except (FileNotFoundError, ValueError, SyntaxError):
+            return ImmutableTree()
 
-    def _archive_host_dir(self, host_name: HostName) -> Path:
-        return self._archive_dir / str(host_name)
+    def tree_archive(self, *, host_name: HostName) -> TreeArchive:
+        return TreeArchive(self._archive_dir / str(host_name))
 
     def archive(self, *, host_name: HostName) -> None:
         if not (tree_file := self._tree_file(host_name)).exists():
             return
-        target_dir = self._archive_host_dir(host_name)
-        target_dir.mkdir(parents=True, exist_ok=True)
-        tree_file.rename(target_dir / str(int(tree_file.stat().st_mtime)))
+        self.tree_archive(host_name=host_name).add(tree_file)
         self._gz_file(host_name).unlink(missing_ok=True)
+        self._binary_file(host_name).unlink(missing_ok=True)
@@ -13,20 +13,21 @@ from __future__ import annotations
 
 import ast
 import contextlib
+import functools
 import json
 import os
 import re
 import select
+import selectors
 import socket
 import ssl
 import threading
 import time
-from collections.abc import Iterator, Sequence
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import cache
-from io import BytesIO
-from typing import Any, Literal, NamedTuple, NewType, TypedDict
+from typing import Any, Literal, NamedTuple, NewType, TypedDict, TypeVar
 
 from opentelemetry import trace
 from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
@@ -157,6 +158,15 @@ tracer = trace.get_tracer("cmk.livestatus_client")
 # Keep a global array of persistent connections
 persistent_connections: dict[str, socket.socket] = {}
 
+# Bytes read from a socket at once
+_RECEIVE_SIZE = 65536
+
+_T = TypeVar("_T")
+
+# Seconds to receive the content of a response once its header arrived. The data is
+# already available at the site, 30 seconds are enough for the maximum size of 100MB.
+_CONTENT_TIMEOUT = 30
+
 # Regular expression for removing Cache: headers if caching is not allowed
 remove_cache_regex = re.compile("\nCache:[^\n]*")
 
@@ -455,6 +465,89 @@ QueryTypes = str | Query
 OnlySites = list[SiteId] | None
 DeadSite = dict[str, str | int | Exception | SiteConfiguration]
 
+# Site, AuthUser header and the query with its headers
+_QueryCacheKey = tuple[SiteId | None, str, str]
+
+
+@dataclass
+class QueryCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        queries = self.hits + self.misses
+        return self.hits / queries if queries else 0.0
+
+
+class QueryCache:
+    """Responses to livestatus queries, shared by the connections of a process
+
+    A response is reused for at most ttl seconds. All responses of a site are dropped
+    as soon as the generation of the site changes, e.g. its program start, and when a
+    command is sent to the site.
+
+    The cache holds at most max_rows rows, the oldest responses are dropped first.
+    Responses with more than max_response_rows rows are not cached at all, copying
+    them would cost more than asking the site again.
+    """
+
+    def __init__(self, ttl: float, max_rows: int = 50000, max_response_rows: int = 5000) -> None:
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_response_rows = max_response_rows
+        self._lock = threading.Lock()
+        self._generations: dict[SiteId | None, object] = {}
+        self._responses: dict[_QueryCacheKey, tuple[float, LivestatusResponse]] = {}
+        self._rows = 0
+
+    def set_generation(self, site: SiteId | None, generation: object) -> None:
+        with self._lock:
+            if site in self._generations and self._generations[site] == generation:
+                return
+            self._generations[site] = generation
+            self._drop_site(site)
+
+    def invalidate(self, site: SiteId | None) -> None:
+        with self._lock:
+            self._drop_site(site)
+
+    def get(self, key: _QueryCacheKey) -> LivestatusResponse | None:
+        with self._lock:
+            if (entry := self._responses.get(key)) is None:
+                return None
+            stored, response = entry
+            if time.monotonic() - stored > self.ttl:
+                self._drop(key)
+                return None
+        return _copy_response(response)
+
+    def put(self, key: _QueryCacheKey, response: LivestatusResponse) -> None:
+        if len(response) > min(self.max_response_rows, self.max_rows):
+            return
+        response = _copy_response(response)
+        with self._lock:
+            self._drop(key)
+            self._responses[key] = (time.monotonic(), response)
+            self._rows += len(response)
+            while self._rows > self.max_rows:
+                # The oldest entry goes first
+                self._drop(next(iter(self._responses)))
+
+    def _drop(self, key: _QueryCacheKey) -> None:
+        if (entry := self._responses.pop(key, None)) is not None:
+            self._rows -= len(entry[1])
+
+    def _drop_site(self, site: SiteId | None) -> None:
+        for key in [key for key in self._responses if key[0] == site]:
+            self._drop(key)
+
+
+def _copy_response(response: LivestatusResponse) -> LivestatusResponse:
+    # The callers modify the rows, e.g. by prepending the site
+    return LivestatusResponse([LivestatusRow(list(row)) for row in response])
+
+
 # .
 #   .--SingleSiteConn------------------------------------------------------.
 #   |  ____  _             _      ____  _ _        ____                    |
@@ -542,6 +635,8 @@ class SingleSiteConnection(Helpers):
         self.timeout: int | None = None
         self.successful_persistence = False
         self._output_format = LivestatusOutputFormat.PYTHON
+        self.query_cache: QueryCache | None = None
+        self.query_cache_stats = QueryCacheStats()
 
         # Whether to establish an encrypted connection
         self.tls = tls
@@ -663,29 +758,30 @@ class SingleSiteConnection(Helpers):
             except KeyError:
                 pass
 
-    def receive_data(self, size: int, timeout: float | None = None) -> bytes:
+    def receive_data(self, size: int, timeout: float | None = None) -> bytearray:
         if self.socket is None:
             raise MKLivestatusSocketError("Socket to '%s' is not connected" % self.socketurl)
 
-        data = BytesIO()
+        # The data is received right into its final place
+        data = bytearray(size)
+        view = memoryview(data)
+        received = 0
         self.socket.settimeout(timeout)
         receive_start = time.time()
-        while size > 0:
-            if is_socket_readable(self.socket, 0.1):
-                packet = self.socket.recv(size)
-                if not packet:
-                    raise MKLivestatusSocketClosed(
-                        "Read zero data from socket, remote peer closed connection."
-                    )
-                size -= len(packet)
-                data.write(packet)
+        while received < size:
+            packet_size = self.socket.recv_into(view[received:])
+            if not packet_size:
+                raise MKLivestatusSocketClosed(
+                    "Read zero data from socket, remote peer closed connection."
+                )
+            received += packet_size
             if timeout is not None and (time.time() - receive_start) > timeout:
                 raise MKLivestatusSocketError(
                     f"{timeout}s while reading data from socket. "
-                    "Received data: {data.getbuffer().nbytes}/{size} bytes"
+                    f"Received data: {received}/{size} bytes"
                 )
 
-        return data.getvalue()
+        return data
 
     def do_query(self, query: Query, add_headers: str = "") -> LivestatusResponse:
         with tracer.start_as_current_span(
@@ -757,40 +853,40 @@ class SingleSiteConnection(Helpers):
         query: str,
         suppress_exceptions: tuple[type[Exception], ...],
         timeout_at: float | None = None,
-    ) -> bytes:
-        try:
-            # Headers are always ASCII encoded
-            resp = self.receive_data(16)
-            code = resp[0:3].decode("ascii")
-            try:
-                length = int(resp[4:15].lstrip())
-            except Exception:
-                self.disconnect()
-                raise MKLivestatusSocketError(
-                    f"Malformed response header {resp!r}. Livestatus TCP socket might be "
-                    "unreachable or wrong encryption settings are used."
-                )
-
-            # Apply a lower timeout for the content because the data is already available
-            # in the socket. The liveproxyd (same system) has the complete data available
-            # while the data from a standard connection can still take some time.
-            # 30 seconds should be more than enough for the maximum telegram size of 100MB
-            data = self.receive_data(length, 30)
-
-            if code == "200":
-                return data
-
-            error_info = data.decode("utf-8")
-            if code == "404":
-                raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
+    ) -> bytes | bytearray:
+        # Apply a lower timeout for the content because the data is already available
+        # in the socket. The liveproxyd (same system) has the complete data available
+        # while the data from a standard connection can still take some time.
+        # 30 seconds should be more than enough for the maximum telegram size of 100MB
+        return self._receive_response(
+            query,
+            suppress_exceptions,
+            lambda code, length: self.response_data(
+                code, self.receive_data(length, _CONTENT_TIMEOUT)
+            ),
+            timeout_at,
+        )
 
-            if code == "413":
-                raise MKLivestatusPayloadTooLargeError(error_info)
+    def _receive_response(
+        self,
+        query: str,
+        suppress_exceptions: tuple[type[Exception], ...],
+        receive_content: Callable[[str, int], _T],
+        timeout_at: float | None = None,
+    ) -> _T:
+        """Receive the header of the response and then its content via receive_content
 
-            if code == "502":
-                raise MKLivestatusBadGatewayError(error_info)
+        The header may take as long as the site needs to compute the response, only the
+        content has a timeout.
+        """
+        try:
+            code, length = self.parse_response_header(self.receive_data(16))
+            return receive_content(code, length)
 
-            raise MKLivestatusQueryError(f"{code}: {error_info}")
+        except TimeoutError as e:
+            # The site got the query, sending it again would only add to its load
+            self.disconnect()
+            raise MKLivestatusSocketError(f"Timeout while reading data from socket: {e}")
 
         except (MKLivestatusSocketClosed, OSError) as e:
             # In case of an IO error or the other side having
@@ -817,7 +913,9 @@ class SingleSiteConnection(Helpers):
                 self.connect()
                 self.send_query(query)
                 # do not send query again -> danger of infinite loop
-                return self.receive_raw_response(query, suppress_exceptions, timeout_at)
+                return self._receive_response(
+                    query, suppress_exceptions, receive_content, timeout_at
+                )
             raise MKLivestatusSocketError(str(e))
 
         except suppress_exceptions:
@@ -830,11 +928,45 @@ class SingleSiteConnection(Helpers):
             # FIXME: ? self.disconnect()
             raise MKLivestatusSocketError("Unhandled exception: %s" % e)
 
-    def parse_raw_response(self, raw_response: bytes, query: Query) -> LivestatusResponse:
-        data = raw_response.decode("utf-8")
+    def parse_response_header(self, header: bytes | bytearray) -> tuple[str, int]:
+        """The response code and the length of the data following the fixed16 header"""
+        # Headers are always ASCII encoded
+        code = header[0:3].decode("ascii")
+        try:
+            return code, int(header[4:15].lstrip())
+        except Exception:
+            self.disconnect()
+            raise MKLivestatusSocketError(
+                f"Malformed response header {header!r}. Livestatus TCP socket might be "
+                "unreachable or wrong encryption settings are used."
+            )
+
+    def response_data(self, code: str, data: bytes | bytearray) -> bytes | bytearray:
+        """The data of a successful response, raises the error of any other response"""
+        if code == "200":
+            return data
+
+        error_info = data.decode("utf-8")
+        if code == "404":
+            raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
+
+        if code == "413":
+            raise MKLivestatusPayloadTooLargeError(error_info)
+
+        if code == "502":
+            raise MKLivestatusBadGatewayError(error_info)
+
+        raise MKLivestatusQueryError(f"{code}: {error_info}")
+
+    def parse_raw_response(
+        self, raw_response: bytes | bytearray, query: Query
+    ) -> LivestatusResponse:
         try:
             response: LivestatusResponse = (
-                json.loads(data) if query.supports_json_format() else ast.literal_eval(data)
+                # JSON is parsed without decoding the whole response first
+                json.loads(raw_response)
+                if query.supports_json_format()
+                else ast.literal_eval(raw_response.decode("utf-8"))
             )
             return response
         except (ValueError, SyntaxError):
@@ -866,12 +998,118 @@ class SingleSiteConnection(Helpers):
                 normalized_query.suppress_exceptions,
             )
 
-        response = self.do_query(normalized_query, normalized_add_headers)
+        response = self.cached_response(normalized_query, normalized_add_headers)
+        if response is None:
+            response = self.do_query(normalized_query, normalized_add_headers)
+            self.cache_response(normalized_query, normalized_add_headers, response)
         if self.prepend_site:
             for row in response:
                 row.insert(0, b"")
         return response
 
+    def cached_response(self, query: Query, add_headers: str) -> LivestatusResponse | None:
+        """A copy of the response to an equal query, if it is in the query cache"""
+        if self.query_cache is None:
+            return None
+        response = self.query_cache.get(self._query_cache_key(query, add_headers))
+        if response is None:
+            self.query_cache_stats.misses += 1
+        else:
+            self.query_cache_stats.hits += 1
+        return response
+
+    def cache_response(self, query: Query, add_headers: str, response: LivestatusResponse) -> None:
+        if self.query_cache is not None:
+            self.query_cache.put(self._query_cache_key(query, add_headers), response)
+
+    def _query_cache_key(self, query: Query, add_headers: str) -> _QueryCacheKey:
+        output_format = (
+            LivestatusOutputFormat.JSON if query.supports_json_format() else self._output_format
+        )
+        return (
+            self.site_name,
+            self.auth_header,
+            f"{remove_cache_regex.sub('', str(query))}\n{output_format.value}\n{add_headers}",
+        )
+
+    def iter_query(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Yield the rows of the response while it is being received
+
+        Only a chunk of the response is held in memory at a time. The connection must
+        not be used for other queries until all rows have been consumed. Until the first
+        row, errors are handled like by query(), including the reconnect of a closed
+        socket.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        if self.limit is not None:
+            normalized_query = Query(
+                "%sLimit: %d\n" % (normalized_query, self.limit),
+                normalized_query.suppress_exceptions,
+            )
+
+        with _livestatus_output_format_switcher(normalized_query, self):
+            str_query = self.build_query(normalized_query, add_headers)
+            self.send_query(str_query)
+            length = self._receive_response(
+                str_query, normalized_query.suppress_exceptions, self._successful_response_length
+            )
+            complete = False
+            try:
+                for rows in self._iter_response_rows(normalized_query, length):
+                    for row in rows:
+                        if self.prepend_site:
+                            row.insert(0, b"")
+                        yield row
+                complete = True
+            except MKLivestatusQueryError:
+                self.disconnect()
+                raise
+            except OSError as e:
+                raise MKLivestatusSocketError(str(e))
+            finally:
+                if not complete:
+                    # The rest of the response would confuse the next query
+                    self.disconnect()
+
+    def _successful_response_length(self, code: str, length: int) -> int:
+        """The length of a successful response, raises the error of any other response"""
+        if code != "200":
+            self.response_data(code, self.receive_data(length, _CONTENT_TIMEOUT))
+        return length
+
+    def _iter_response_rows(self, query: Query, length: int) -> Iterator[LivestatusResponse]:
+        # Livestatus separates the rows by ",\n" and encloses them in "[" and "]\n". Each
+        # chunk of complete lines is parsed as a list of its own.
+        pending = b""
+        received = 0
+        first = True
+        while received < length:
+            data = self.receive_data(min(length - received, _RECEIVE_SIZE), _CONTENT_TIMEOUT)
+            received += len(data)
+            if received < length:
+                if (end := data.rfind(b"\n")) == -1:
+                    pending += data
+                    continue
+                chunk = (pending + data[:end]).rstrip(b",")
+                pending = bytes(data[end + 1 :])
+                if chunk in (b"", b"["):
+                    continue
+                text = chunk + b"]"
+            else:
+                text = pending + data
+
+            if not first:
+                text = b"[" + text
+            first = False
+            try:
+                yield (
+                    json.loads(text)
+                    if query.supports_json_format()
+                    else ast.literal_eval(text.decode("utf-8"))
+                )
+            except (ValueError, SyntaxError):
+                raise MKLivestatusQueryError("Malformed raw response output")
+
     def command(
         self, command: str, site: SiteId | None = None  # pylint: disable=unused-argument
     ) -> None:
@@ -888,6 +1126,9 @@ class SingleSiteConnection(Helpers):
             },
         ):
             self.send_command(f"COMMAND {command_str}")
+        if self.query_cache is not None:
+            # The responses do not reflect the command yet
+            self.query_cache.invalidate(self.site_name)
 
     def send_command(self, command: str) -> None:
         if self.socket is None:
@@ -951,6 +1192,113 @@ class ConnectedSite(NamedTuple):
 
 ConnectedSites = list[ConnectedSite]
 
+# The rows of each site
+_SiteResponses = list[tuple[SiteId, LivestatusResponse]]
+
+
+class _SiteResponse:
+    """The response of a site, read piece by piece whenever its socket is readable"""
+
+    def __init__(self, str_query: str, request_span: trace.Span, connected_site: ConnectedSite):
+        self.str_query = str_query
+        self.connected_site = connected_site
+        self.started = time.monotonic()
+        self.span = tracer.start_span(
+            f"receive_from_site[{connected_site.id}]",
+            kind=trace.SpanKind.CONSUMER,
+            links=[trace.Link(request_span.get_span_context())],
+            attributes={
+                "cmk.livestatus.query": str_query,
+                "cmk.livestatus.target_site_id": str(connected_site.id),
+            },
+        )
+        self.code = ""
+        self._length: int | None = None
+        self._chunks: list[bytes] = []
+        # Including the 16 bytes of the header
+        self.received = 0
+        self._header_received = 0.0
+        # The timeout of the socket, restored when it is no longer read from the selector
+        self._socket_timeout: float | None = None
+
+    @property
+    def data(self) -> bytes:
+        return b"".join(self._chunks[1:])
+
+    @property
+    def deadline(self) -> float | None:
+        """When the site is given up: the content has to follow the header within
+        _CONTENT_TIMEOUT, the header itself may take as long as the site needs"""
+        if self._length is None:
+            return None
+        return self._header_received + _CONTENT_TIMEOUT
+
+    def timeout_error(self) -> MKLivestatusSocketError:
+        return MKLivestatusSocketError(
+            f"{_CONTENT_TIMEOUT}s while reading data from socket. "
+            f"Received data: {self.received - 16}/{self._length} bytes"
+        )
+
+    def register(self, selector: selectors.BaseSelector, sock: socket.socket) -> None:
+        """Read from the socket whenever it is readable
+
+        The socket does not block, so a partial TLS record does not hold up the other sites.
+        """
+        selector.register(sock, selectors.EVENT_READ, self)
+        self._socket_timeout = sock.gettimeout()
+        sock.setblocking(False)
+
+    def unregister(self, selector: selectors.BaseSelector, sock: socket.socket) -> None:
+        selector.unregister(sock)
+        with contextlib.suppress(OSError):
+            sock.settimeout(self._socket_timeout)
+
+    def read(self) -> bool:
+        """Read the available data, True once the response is complete"""
+        connection = self.connected_site.connection
+        if (sock := connection.socket) is None:
+            raise MKLivestatusSocketError("Socket to '%s' is not connected" % connection.socketurl)
+
+        while True:
+            try:
+                if self._length is None:
+                    packet = sock.recv(16 - self.received)
+                else:
+                    packet = sock.recv(min(16 + self._length - self.received, _RECEIVE_SIZE))
+            except (BlockingIOError, ssl.SSLWantReadError):
+                return False  # e.g. only a part of a TLS record arrived
+            if not packet:
+                raise MKLivestatusSocketClosed(
+                    "Read zero data from socket, remote peer closed connection."
+                )
+            self.received += len(packet)
+
+            if self._length is not None:
+                self._chunks.append(packet)
+            else:
+                # The first chunk is the header
+                self._chunks = [b"".join(self._chunks) + packet]
+                if self.received == 16:
+                    self.code, self._length = connection.parse_response_header(self._chunks[0])
+                    self._header_received = time.monotonic()
+
+            if self._length is not None and self.received >= 16 + self._length:
+                return True
+            # SSL sockets may have buffered data the selector does not know about
+            if not (isinstance(sock, ssl.SSLSocket) and sock.pending()):
+                return False
+
+    def receive_blocking(
+        self, suppress_exceptions: tuple[type[Exception], ...]
+    ) -> bytes | bytearray:
+        """Receive the response like a single site connection, including its reconnect"""
+        connection = self.connected_site.connection
+        if self.received:
+            # The rest of the response is lost, ask again
+            connection.disconnect()
+            connection.send_query(self.str_query)
+        return connection.receive_raw_response(self.str_query, suppress_exceptions)
+
 
 class MultiSiteConnection(Helpers):
     def __init__(  # pylint: disable=too-many-branches
@@ -966,6 +1314,12 @@ class MultiSiteConnection(Helpers):
         self.only_sites: OnlySites = None
         self.limit: int | None = None
         self.parallelize = True
+        # Seconds to wait for the responses, None waits for all sites
+        self.response_deadline: float | None = None
+        # Sites left out of the last result, because they missed the deadline
+        self.late_sites: set[SiteId] = set()
+        # Shared by the connections of all sites
+        self.query_cache_stats = QueryCacheStats()
 
         # Status host: A status host helps to prevent trying to connect
         # to a remote site which is unreachable. This is done by looking
@@ -1140,6 +1494,14 @@ class MultiSiteConnection(Helpers):
         """Impose Limit on number of returned datasets (distributed among sites)"""
         self.limit = limit
 
+    def set_response_deadline(self, deadline: float | None = None) -> None:
+        """Return the rows of the sites responding within the deadline (in seconds)
+
+        The sites responding later are listed in late_sites. They are not considered to
+        be dead, they will be asked again with the next query.
+        """
+        self.response_deadline = deadline
+
     def dead_sites(self) -> dict[SiteId, DeadSite]:
         return self.deadsites
 
@@ -1170,6 +1532,12 @@ class MultiSiteConnection(Helpers):
         for connected_site in self.connections:
             connected_site.connection.set_auth_domain(domain)
 
+    def set_query_cache(self, query_cache: QueryCache | None) -> None:
+        """Reuse the responses of the cache, its hits are counted in query_cache_stats"""
+        for connected_site in self.connections:
+            connected_site.connection.query_cache = query_cache
+            connected_site.connection.query_cache_stats = self.query_cache_stats
+
     def query(self, query: QueryTypes, add_headers: str = "") -> LivestatusResponse:
         # Normalize argument types
         normalized_add_headers = add_headers
@@ -1219,6 +1587,15 @@ class MultiSiteConnection(Helpers):
         Limit: is simply applied to all sites - resulting in possibly more results then Limit
         requests.
         """
+        result: list[LivestatusRow] = []
+        for site_id, rows in self._query_parallel_by_site(query, add_headers):
+            if self.prepend_site:
+                for row in rows:
+                    row.insert(0, site_id)
+            result.extend(rows)
+        return LivestatusResponse(result)
+
+    def _query_parallel_by_site(self, query: Query, add_headers: str) -> _SiteResponses:
         stillalive = []
         if self.only_sites is not None:
             connect_to_sites = [c for c in self.connections if c[0] in self.only_sites]
@@ -1227,25 +1604,43 @@ class MultiSiteConnection(Helpers):
         else:
             connect_to_sites = self.connections
 
+        limit_header = "Limit: %d\n" % self.limit if self.limit is not None else ""
         with tracer.start_as_current_span(
             "query_parallel", attributes={"cmk.livestatus.query": str(query)}
-        ):
+        ) as span:
+            # Sites which recently answered the same query are not asked again
+            result: _SiteResponses = []
+            uncached_sites = []
+            for connected_site in connect_to_sites:
+                rows = connected_site.connection.cached_response(query, add_headers + limit_header)
+                if rows is None:
+                    uncached_sites.append(connected_site)
+                    continue
+                stillalive.append(connected_site)
+                result.append((connected_site.id, rows))
+            if len(uncached_sites) < len(connect_to_sites):
+                span.set_attribute(
+                    "cmk.livestatus.cached_sites", len(connect_to_sites) - len(uncached_sites)
+                )
+
             # First send all queries
             retrieve_responses = self._send_queries(
-                query,
-                add_headers,
-                connect_to_sites,
-                limit_header="Limit: %d\n" % self.limit if self.limit is not None else "",
+                query, add_headers, uncached_sites, limit_header=limit_header
             )
 
-            # Then retrieve all raw responses. We will be as slow as the slowest of all connections.
-            site_responses = self._retrieve_responses(query, retrieve_responses, stillalive)
-
-            # Convert responses to python format
-            result = self._parse_responses(query, site_responses, stillalive)
+            # Then read all responses at the same time, each one is parsed once complete
+            result += self._receive_responses(
+                query, add_headers + limit_header, retrieve_responses, stillalive
+            )
+            if self.late_sites:
+                span.set_attribute("cmk.livestatus.late_sites", sorted(self.late_sites))
 
+        # The responses are received in any order, keep the order of the connections
+        position = {connected_site.id: nr for nr, connected_site in enumerate(self.connections)}
+        result.sort(key=lambda site_rows: position[site_rows[0]])
+        stillalive.sort(key=lambda connected_site: position[connected_site.id])
         self.connections = stillalive
-        return LivestatusResponse(result)
+        return result
 
     def _send_queries(
         self, query: Query, add_headers: str, connect_to_sites: ConnectedSites, limit_header: str
@@ -1275,73 +1670,145 @@ class MultiSiteConnection(Helpers):
                     }
         return retrieve_responses
 
-    def _retrieve_responses(
+    def _receive_responses(
         self,
         query: Query,
+        headers: str,
         retrieve_responses: list[tuple[str, trace.Span, ConnectedSite]],
         stillalive: ConnectedSites,
-    ) -> list[tuple[ConnectedSite, bytes]]:
-        site_responses: list[tuple[ConnectedSite, bytes]] = []
-        for str_query, request_span, connected_site in retrieve_responses:
-            with tracer.start_as_current_span(
-                f"receive_from_site[{connected_site.id}]",
-                kind=trace.SpanKind.CONSUMER,
-                links=[trace.Link(request_span.get_span_context())],
-                attributes={
-                    "cmk.livestatus.query": str_query,
-                    "cmk.livestatus.target_site_id": str(connected_site.id),
-                },
-            ):
+    ) -> _SiteResponses:
+        result: _SiteResponses = []
+        self.late_sites = set()
+        deadline = (
+            None if self.response_deadline is None else time.monotonic() + self.response_deadline
+        )
+        # Sites sharing a socket can not be read at the same time
+        one_by_one: list[_SiteResponse] = []
+        with selectors.DefaultSelector() as selector:
+            for str_query, request_span, connected_site in retrieve_responses:
+                site_response = _SiteResponse(str_query, request_span, connected_site)
+                if (sock := connected_site.connection.socket) is None:
+                    one_by_one.append(site_response)
+                    continue
                 try:
-                    site_responses.append(
-                        (
-                            connected_site,
-                            connected_site.connection.receive_raw_response(
-                                str_query, query.suppress_exceptions
-                            ),
+                    site_response.register(selector, sock)
+                except (KeyError, ValueError):
+                    one_by_one.append(site_response)
+
+            while selector.get_map():
+                now = time.monotonic()
+                if deadline is not None and deadline <= now:
+                    break
+                deadlines = [
+                    site_deadline
+                    for key in selector.get_map().values()
+                    if (site_deadline := key.data.deadline) is not None
+                ]
+                if deadline is not None:
+                    deadlines.append(deadline)
+                timeout = max(0.0, min(deadlines) - now) if deadlines else None
+                for key, _events in selector.select(timeout):
+                    site_response = key.data
+                    try:
+                        if not site_response.read():
+                            continue
+                        site_response.unregister(selector, key.fileobj)
+                        receive = functools.partial(
+                            site_response.connected_site.connection.response_data,
+                            site_response.code,
+                            site_response.data,
                         )
+                    except LivestatusTestingError:
+                        raise
+                    except (MKLivestatusSocketClosed, OSError):
+                        site_response.unregister(selector, key.fileobj)
+                        receive = functools.partial(
+                            site_response.receive_blocking, query.suppress_exceptions
+                        )
+                    except MKLivestatusSocketError as e:
+                        # A malformed header, asking again would not help
+                        site_response.unregister(selector, key.fileobj)
+                        receive = functools.partial(_raise, e)
+                    self._finish_response(
+                        query, headers, site_response, receive, stillalive, result
                     )
-                except query.suppress_exceptions:
-                    # Mostly handles exception types MKLivestatusTableNotFoundError
-                    stillalive.append(connected_site)
-                    continue
-                except LivestatusTestingError:
-                    raise
-                except Exception as e:
-                    connected_site.connection.disconnect()
-                    self.deadsites[connected_site.id] = {
-                        "exception": e,
-                        "site": connected_site.config,
-                    }
-        return site_responses
+                self._give_up_timed_out_sites(selector)
+
+            for key in list(selector.get_map().values()):
+                site_response = key.data
+                site_response.unregister(selector, key.fileobj)
+                # The rest of the response would confuse the next query
+                site_response.connected_site.connection.disconnect()
+                site_response.span.set_attribute("cmk.livestatus.late", True)
+                site_response.span.end()
+                self.late_sites.add(site_response.connected_site.id)
+                stillalive.append(site_response.connected_site)
+
+        for site_response in one_by_one:
+            self._finish_response(
+                query,
+                headers,
+                site_response,
+                functools.partial(site_response.receive_blocking, query.suppress_exceptions),
+                stillalive,
+                result,
+            )
+        return result
 
-    def _parse_responses(
+    def _give_up_timed_out_sites(self, selector: selectors.BaseSelector) -> None:
+        now = time.monotonic()
+        for key in list(selector.get_map().values()):
+            site_response = key.data
+            if (site_deadline := site_response.deadline) is None or site_deadline > now:
+                continue
+            site_response.unregister(selector, key.fileobj)
+            connected_site = site_response.connected_site
+            connected_site.connection.disconnect()
+            self.deadsites[connected_site.id] = {
+                "exception": site_response.timeout_error(),
+                "site": connected_site.config,
+            }
+            site_response.span.end()
+
+    def _finish_response(
         self,
         query: Query,
-        site_responses: list[tuple[ConnectedSite, bytes]],
+        headers: str,
+        site_response: _SiteResponse,
+        receive: Callable[[], bytes | bytearray],
         stillalive: ConnectedSites,
-    ) -> list[LivestatusRow]:
-        result: list[LivestatusRow] = []
-        for connected_site, raw_response in site_responses:
-            try:
-                rows = connected_site.connection.parse_raw_response(raw_response, query)
-                stillalive.append(connected_site)
-                if self.prepend_site:
-                    for row in rows:
-                        row.insert(0, connected_site.id)
-                result.extend(rows)
-            except query.suppress_exceptions:
-                stillalive.append(connected_site)
-                continue
-            except LivestatusTestingError:
-                raise
-            except Exception as e:
-                connected_site.connection.disconnect()
-                self.deadsites[connected_site.id] = {
-                    "exception": e,
-                    "site": connected_site.config,
-                }
-        return result
+        result: _SiteResponses,
+    ) -> None:
+        connected_site = site_response.connected_site
+        span = site_response.span
+        try:
+            raw_response = receive()
+            span.set_attribute(
+                "cmk.livestatus.response_time", time.monotonic() - site_response.started
+            )
+            span.set_attribute("cmk.livestatus.response_size", len(raw_response))
+            parse_start = time.monotonic()
+            rows = connected_site.connection.parse_raw_response(raw_response, query)
+            span.set_attribute("cmk.livestatus.parse_time", time.monotonic() - parse_start)
+        except query.suppress_exceptions:
+            # Mostly handles exception types MKLivestatusTableNotFoundError
+            stillalive.append(connected_site)
+            return
+        except LivestatusTestingError:
+            raise
+        except Exception as e:
+            connected_site.connection.disconnect()
+            self.deadsites[connected_site.id] = {
+                "exception": e,
+                "site": connected_site.config,
+            }
+            return
+        finally:
+            span.end()
+
+        stillalive.append(connected_site)
+        connected_site.connection.cache_response(query, headers, rows)
+        result.append((connected_site.id, rows))
 
     def command(self, command: str, sitename: SiteId | None = SiteId("local")) -> None:
         if sitename in self.deadsites:
@@ -1370,6 +1837,10 @@ class MultiSiteConnection(Helpers):
         raise KeyError("Connection does not exist")
 
 
+def _raise(exception: Exception) -> bytes:
+    raise exception
+
+
 @contextlib.contextmanager
 def _livestatus_output_format_switcher(
     query: Query, connection: MultiSiteConnection | SingleSiteConnection
@@ -1543,9 +2014,7 @@ def get_rrd_data(
 
     """
 
-    step = 1
-    point_range = ":".join(lqencode(str(x)) for x in (fromtime, untiltime, step, max_entries))
-    column = f"rrddata:m1:{rpn}:{point_range}"
+    column = _rrd_column(rpn, fromtime, untiltime, max_entries)
 
     lql = livestatus_lql([host_name], [column], service_description) + "OutputFormat: python\n"
 
@@ -1557,6 +2026,45 @@ def get_rrd_data(
     if response is None:  # It is not obvious to me if this can be the case or not.
         return None
 
+    return _rrd_response(response)
+
+
+def get_rrd_data_batch(
+    connection: SingleSiteConnection,
+    host_name: str,
+    service_description: str,
+    requests: Sequence[tuple[str, int, int]],
+    max_entries: int = 400,
+) -> list[RRDResponse | None]:
+    """Fetch RRD historic metrics data of a specific service for many time ranges at once
+
+    Each request is a tuple of the rpn, fromtime and untiltime as passed to get_rrd_data(),
+    the responses are returned in the same order. All of them are fetched with one query.
+    """
+    if not requests:
+        return []
+
+    columns = [
+        _rrd_column(rpn, fromtime, untiltime, max_entries, nr)
+        for nr, (rpn, fromtime, untiltime) in enumerate(requests, start=1)
+    ]
+    lql = livestatus_lql([host_name], columns, service_description) + "OutputFormat: python\n"
+
+    try:
+        row = connection.query_row(lql)
+    except MKLivestatusNotFoundError:
+        return [None] * len(requests)
+
+    return [None if response is None else _rrd_response(response) for response in row]
+
+
+def _rrd_column(rpn: str, fromtime: int, untiltime: int, max_entries: int, nr: int = 1) -> str:
+    step = 1
+    point_range = ":".join(lqencode(str(x)) for x in (fromtime, untiltime, step, max_entries))
+    return f"rrddata:m{nr}:{rpn}:{point_range}"
+
+
+def _rrd_response(response: Sequence[Any]) -> RRDResponse | None:
     raw_start, raw_end, raw_step, *values = response
 
     return (
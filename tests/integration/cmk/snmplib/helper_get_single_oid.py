@@ -42,8 +42,8 @@ backend_type = SNMPBackendEnum.deserialize(params[1])
 config = SNMPHostConfig.deserialize(params[2])
 cmk.utils.paths.snmpwalks_dir = params[3]
 
-snmp_cache.initialize_single_oid_cache(
-    HostName("abc"), None, cache_dir=Path(cmk.utils.paths.snmp_scan_cache_dir)
+oid_cache = snmp_cache.single_oid_cache(
+    HostName("abc"), None, cache_dir=Path(cmk.utils.paths.snmp_scan_cache_dir), ttl=0
 )
 
 backend: Callable[[SNMPHostConfig, logging.Logger], SNMPBackend]
@@ -64,11 +64,11 @@ print(
         (
             get_single_oid(
                 oid,
-                single_oid_cache=snmp_cache.single_oid_cache(),
+                single_oid_cache=oid_cache,
                 backend=backend(config, logger),
                 log=logger.debug,
             ),
-            snmp_cache.single_oid_cache(),
+            dict(oid_cache),
         )
     )
 )
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the list based computation of predictions with the vectorized one
+
+The list based implementation is the one predictions used to be computed with.
+
+Example:
+
+    ./benchmark_prediction.py --services 1000 --slices 30 --points 1440
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from collections.abc import Iterable, Sequence
+
+# Make the cmk modules available
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+# pylint: disable=protected-access
+from cmk.utils.prediction import _prediction
+from cmk.utils.prediction._prediction import DataStat, PredictionData
+
+_RawSlices = Sequence[tuple[range, Sequence[float | None], int]]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--slices", type=int, default=30, help="time slices per prediction")
+    parser.add_argument("--points", type=int, default=1440, help="values per time slice")
+    parser.add_argument("--missing", type=float, default=0.05, help="share of missing values")
+    parser.add_argument("--seed", type=int, default=4711)
+    return parser.parse_args()
+
+
+def _make_raw_slices(args: argparse.Namespace, rnd: random.Random) -> _RawSlices:
+    day = 86400
+    start = 1700000000 - 1700000000 % day
+    step = day // args.points
+    raw_slices = []
+    for nr in range(args.slices):
+        # Older slices have a coarser resolution, like the RRDs
+        slice_step = step * (1 if nr < args.slices // 3 else 5)
+        slice_start = start - nr * day
+        values = [
+            None if rnd.random() < args.missing else rnd.gauss(50.0, 10.0)
+            for _t in range(slice_start, slice_start + day, slice_step)
+        ]
+        raw_slices.append((range(slice_start, slice_start + day, slice_step), values, nr * day))
+    return raw_slices
+
+
+def _list_forward_fill_resample(
+    current_range: range, values: Sequence[float | None], new_range: range
+) -> Sequence[float | None]:
+    if current_range == new_range:
+        return values
+
+    idx_max = len(values) - 1
+    return [
+        values[max(0, min(int((t - current_range.start) / current_range.step), idx_max))]
+        for t in new_range
+    ]
+
+
+def _list_data_stats(slices: Iterable[Iterable[float | None]]) -> list[DataStat | None]:
+    return [
+        (
+            DataStat.from_values(point_line)
+            if (point_line := [x for x in time_column if x is not None])
+            else None
+        )
+        for time_column in zip(*slices)
+    ]
+
+
+def _list_calculate(youngest_range: range, raw_slices: _RawSlices) -> PredictionData:
+    slices = [
+        _list_forward_fill_resample(
+            current_range,
+            values,
+            range(youngest_range.start - shift, youngest_range.stop - shift, youngest_range.step),
+        )
+        for current_range, values, shift in raw_slices
+    ]
+    return PredictionData(
+        points=_list_data_stats(slices),
+        start=youngest_range.start,
+        step=youngest_range.step,
+    )
+
+
+def _max_deviation(expected: PredictionData, actual: PredictionData) -> float:
+    deviation = 0.0
+    for expected_point, actual_point in zip(expected.points, actual.points, strict=True):
+        if expected_point is None or actual_point is None:
+            if expected_point is not actual_point:
+                return math.inf
+            continue
+        for expected_value, actual_value in zip(expected_point, actual_point):
+            if (expected_value is None) != (actual_value is None):
+                return math.inf
+            if expected_value is not None and actual_value is not None:
+                deviation = max(deviation, abs(expected_value - actual_value))
+    return deviation
+
+
+def main() -> None:
+    args = _parse_args()
+    rnd = random.Random(args.seed)
+    services = [_make_raw_slices(args, rnd) for _nr in range(args.services)]
+
+    results = {}
+    for name, calculate in (
+        ("lists", _list_calculate),
+        ("vectorized", _prediction._calculate_data_for_prediction),
+    ):
+        before = time.perf_counter()
+        results[name] = [calculate(raw_slices[0][0], raw_slices) for raw_slices in services]
+        print(
+            f"{name:>10}: {time.perf_counter() - before:.3f}s for {args.services} predictions "
+            f"of {args.slices} slices with {args.points} values"
+        )
+
+    deviation = max(
+        _max_deviation(expected, actual)
+        for expected, actual in zip(results["lists"], results["vectorized"])
+    )
+    print(f"maximum deviation: {deviation}")
+    if deviation > 1e-9:
+        sys.exit("ERROR: The results differ")
+
+
+if __name__ == "__main__":
+    main()
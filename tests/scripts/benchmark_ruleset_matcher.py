@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the set based host matching of the RulesetOptimizer with the bitmap host index
+
+Example:
+
+    ./benchmark_ruleset_matcher.py --hosts 60000 --rules 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections.abc import Sequence
+
+# Make the cmk modules available
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from cmk.utils.hostaddress import HostName
+from cmk.utils.rulesets.ruleset_matcher import LabelManager, RulesetMatcher, RuleSpec
+from cmk.utils.tags import TagGroupID, TagID
+
+_TAG_GROUPS = {
+    TagGroupID("criticality"): [TagID("prod"), TagID("critical"), TagID("test"), TagID("offline")],
+    TagGroupID("networking"): [TagID("lan"), TagID("wan"), TagID("dmz")],
+    TagGroupID("agent"): [TagID("cmk-agent"), TagID("no-agent"), TagID("special-agents")],
+}
+_FOLDERS = [f"/dc{dc}/rack{rack}/" for dc in range(10) for rack in range(20)]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=20000)
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=4711)
+    return parser.parse_args()
+
+
+def _make_matcher(
+    hosts: Sequence[HostName], rnd: random.Random, host_index: bool
+) -> RulesetMatcher:
+    return RulesetMatcher(
+        host_tags={
+            hostname: {group: rnd.choice(tags) for group, tags in _TAG_GROUPS.items()}
+            for hostname in hosts
+        },
+        host_paths={hostname: f"{rnd.choice(_FOLDERS)}hosts.mk" for hostname in hosts},
+        label_manager=LabelManager(
+            explicit_host_labels={
+                hostname: {"os": rnd.choice(["linux", "windows", "aix"]), "site": f"s{i % 7}"}
+                for i, hostname in enumerate(hosts)
+            },
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=hosts,
+        clusters_of={},
+        nodes_of={},
+        host_index=host_index,
+    )
+
+
+def _make_rule(num: int, hosts: Sequence[HostName], rnd: random.Random) -> RuleSpec[int]:
+    group = rnd.choice(list(_TAG_GROUPS))
+    conditions: list[dict] = [
+        {"host_tags": {group: rnd.choice(_TAG_GROUPS[group])}},
+        {"host_tags": {group: {"$ne": rnd.choice(_TAG_GROUPS[group])}}},
+        {"host_tags": {group: {"$or": rnd.sample(_TAG_GROUPS[group], 2)}}},
+        {"host_label_groups": [("and", [("and", "os:linux"), ("not", f"site:s{num % 7}")])]},
+        {"host_name": rnd.sample(list(hosts), 5)},
+        {"host_name": [{"$regex": f"host{num % 10}"}]},
+        {"host_folder": rnd.choice(_FOLDERS)},
+    ]
+    condition = rnd.choice(conditions)
+    if rnd.random() < 0.3:
+        condition["host_folder"] = rnd.choice(_FOLDERS)
+    return {"id": str(num), "value": num, "condition": condition}  # type: ignore[typeddict-item]
+
+
+def main() -> None:
+    args = _parse_args()
+    hosts = [HostName(f"host{i}") for i in range(args.hosts)]
+    rnd = random.Random(args.seed)
+    ruleset = [_make_rule(num, hosts, rnd) for num in range(args.rules)]
+
+    results = {}
+    for host_index in (False, True):
+        matcher = _make_matcher(hosts, random.Random(args.seed), host_index)
+        before = time.perf_counter()
+        results[host_index] = matcher.ruleset_optimizer.get_host_ruleset(ruleset, False)
+        print(
+            f"{'bitmap index' if host_index else 'sets':>12}: "
+            f"{time.perf_counter() - before:.3f}s for {args.hosts} hosts and {args.rules} rules"
+        )
+
+    if results[False] != results[True]:
+        sys.exit("ERROR: The results differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compare the compare function based sorting of view rows with the key based one
+
+Before, all fetched rows were sorted using the cmp() of the sorters and filtered
+afterwards. Now the filtered rows are sorted by keys, and with a row limit only the
+shown rows are sorted.
+
+Example:
+
+    ./benchmark_view_sorting.py --rows 300000 --filtered 0.5 --limit 1000
+"""
+
+import argparse
+import functools
+import os
+import random
+import sys
+import time
+
+# Make the cmk modules available
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+# pylint: disable=protected-access
+from cmk.gui.config import active_config
+from cmk.gui.display_options import display_options
+from cmk.gui.http import request, response
+from cmk.gui.i18n import _
+from cmk.gui.logged_in import user
+from cmk.gui.painter.v0.helpers import RenderLink
+from cmk.gui.painter_options import PainterOptions
+from cmk.gui.type_defs import Row, Rows
+from cmk.gui.utils.theme import theme
+from cmk.gui.views import page_show_view
+from cmk.gui.views.sorter import declare_simple_sorter, Sorter, SorterEntry, sorter_registry
+from cmk.gui.views.sorter.sorters import (
+    cmp_service_name,
+    key_service_name,
+    SorterSiteHost,
+    SorterSvcstate,
+)
+
+_SERVICES = ["Check_MK", "CPU load", "Memory", "Uptime"] + [
+    f"Filesystem /data{nr}" for nr in range(20)
+]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument(
+        "--filtered", type=float, default=0.5, help="share of rows removed by the filters"
+    )
+    parser.add_argument("--limit", type=int, default=1000, help="row limit of the view")
+    parser.add_argument("--seed", type=int, default=4711)
+    return parser.parse_args()
+
+
+def _make_rows(count: int, rnd: random.Random) -> Rows:
+    return [
+        {
+            "site": f"site{rnd.randrange(5)}",
+            "host_name": f"host{rnd.randrange(max(1, count // len(_SERVICES)))}",
+            "service_description": rnd.choice(_SERVICES),
+            "service_state": rnd.choice([0, 0, 0, 0, 1, 2, 3]),
+            "service_has_been_checked": 1,
+        }
+        for _nr in range(count)
+    ]
+
+
+def _sorter(sorter_cls: type[Sorter], negate: bool) -> SorterEntry:
+    return SorterEntry(
+        sorter=sorter_cls(
+            user=user,
+            config=active_config,
+            request=request,
+            painter_options=PainterOptions.get_instance(),
+            theme=theme,
+            url_renderer=RenderLink(request, response, display_options),
+        ),
+        negate=negate,
+        join_key=None,
+        parameters=None,
+    )
+
+
+def _cmp_sort_data(data: Rows, sorters: list[SorterEntry]) -> None:
+    def multisort(e1: Row, e2: Row) -> int:
+        for entry in sorters:
+            neg = -1 if entry.negate else 1
+            c = neg * entry.sorter.cmp(e1, e2, entry.parameters)
+            if c != 0:
+                return c
+        return 0  # equal
+
+    data.sort(key=functools.cmp_to_key(multisort))
+
+
+def main() -> None:
+    args = _parse_args()
+    rnd = random.Random(args.seed)
+    rows = _make_rows(args.rows, rnd)
+    removed = {id(row) for row in rows if rnd.random() < args.filtered}
+
+    declare_simple_sorter(
+        "svcdescr", _("Service name"), "service_description", cmp_service_name, key_service_name
+    )
+    # The sorting of the "Service problems" view
+    sorters = [
+        _sorter(SorterSvcstate, True),
+        _sorter(SorterSiteHost, False),
+        _sorter(sorter_registry["svcdescr"], False),
+    ]
+
+    before = time.perf_counter()
+    expected = list(rows)
+    _cmp_sort_data(expected, sorters)
+    expected = [row for row in expected if id(row) not in removed]
+    print(f"{'cmp':>10}: {time.perf_counter() - before:.3f}s for {args.rows} rows")
+
+    results = {}
+    for name, limit in (("keys", None), ("top-n", args.limit)):
+        before = time.perf_counter()
+        results[name] = [row for row in rows if id(row) not in removed]
+        page_show_view._sort_data(results[name], sorters, limit)
+        print(
+            f"{name:>10}: {time.perf_counter() - before:.3f}s for {args.rows} rows, "
+            f"{len(results[name])} after filtering"
+        )
+
+    if results["keys"] != expected or results["top-n"][: args.limit] != expected[: args.limit]:
+        sys.exit("ERROR: The results differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Send syslog messages at a given rate to a local Event Console and report its counters
+
+The Event Console has to listen for syslog messages (UDP or TCP). Run this as site
+user, the counters are read from the status socket of the site.
+
+Example:
+
+    ./ec_load_generator.py --rate 20000 --duration 10 --protocol udp
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import time
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+_COUNTERS = [
+    "status_messages",
+    "status_message_rate",
+    "status_queue_depth",
+    "status_queue_drops",
+    "status_average_processing_time",
+]
+
+_TEXTS = [
+    "Disk /dev/sd{x} failed",
+    "user u{n} logged in",
+    "connection to 10.0.{n}.1 refused",
+    "link eth{n} down",
+    "CPU load high: {n}%",
+]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=int, default=5000, help="messages per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--protocol", choices=["udp", "tcp"], default="udp")
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=514)
+    parser.add_argument("--hosts", type=int, default=500)
+    parser.add_argument(
+        "--status-socket",
+        type=Path,
+        default=Path(os.environ.get("OMD_ROOT", ""), "tmp/run/mkeventd/status"),
+    )
+    parser.add_argument("--seed", type=int, default=4711)
+    return parser.parse_args()
+
+
+def _messages(hosts: int, rnd: random.Random) -> Iterator[bytes]:
+    while True:
+        text = rnd.choice(_TEXTS).format(x=rnd.choice("abc"), n=rnd.randrange(100))
+        yield (
+            f"<{rnd.randrange(192)}>{time.strftime('%b %d %H:%M:%S')} "
+            f"host{rnd.randrange(hosts)} app{rnd.randrange(10)}: {text}"
+        ).encode()
+
+
+def _status(path: Path) -> Mapping[str, object]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path))
+        sock.sendall(f"GET status\nColumns: {' '.join(_COUNTERS)}\nOutputFormat: json\n".encode())
+        sock.shutdown(socket.SHUT_WR)
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    # The first row holds the column headers
+    return dict(zip(_COUNTERS, json.loads(response)[1]))
+
+
+def _send(args: argparse.Namespace) -> int:
+    messages = _messages(args.hosts, random.Random(args.seed))
+    if args.protocol == "udp":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.connect((args.address, args.port))
+        terminator = b""
+    else:
+        sock = socket.create_connection((args.address, args.port))
+        terminator = b"\n"
+
+    sent = 0
+    start = time.monotonic()
+    with sock:
+        while (elapsed := time.monotonic() - start) < args.duration:
+            # Send in small bursts, like a busy syslog relay
+            for _nr in range(int(elapsed * args.rate) - sent):
+                sock.sendall(next(messages) + terminator)
+                sent += 1
+            time.sleep(0.001)
+    return sent
+
+
+def main() -> None:
+    args = _parse_args()
+    before = _status(args.status_socket)
+    sent = _send(args)
+    # Give the Event Console the chance to work off its queue
+    time.sleep(2)
+    after = _status(args.status_socket)
+
+    print(f"sent: {sent} messages via {args.protocol} in {args.duration:.1f}s")
+    for column in _COUNTERS:
+        value = after[column]
+        if column.endswith(("messages", "drops")) and isinstance(value, int):
+            print(f"{column}: {value} (+{value - int(str(before[column]))})")
+        else:
+            print(f"{column}: {value}")
+
+
+if __name__ == "__main__":
+    main()
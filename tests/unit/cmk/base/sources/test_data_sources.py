@@ -51,6 +51,7 @@ def _make_sources(
                 on_error=OnError.RAISE,
                 missing_sys_description=False,
                 oid_cache_dir=tmp_path,
+                oid_cache_ttl=0,
             ),
             selected_sections=NO_SELECTION,
             backend_override=None,
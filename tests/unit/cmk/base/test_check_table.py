@@ -662,3 +662,32 @@ def test_check_table__get_static_check_entries(
             TimespecificParameterSet({}, ()),
         )
     )
+
+
+def test_check_table_skips_ignored_services(monkeypatch: MonkeyPatch) -> None:
+    hostname = HostName("node")
+    plugin_name = CheckPluginName("smart_temp")
+
+    ts = Scenario()
+    ts.add_host(hostname)
+    ts.set_ruleset(
+        "ignored_services",
+        [
+            {
+                "id": "01",
+                "condition": {"service_description": [{"$regex": "Temperature SMART ignored"}]},
+                "value": True,
+            },
+        ],
+    )
+    ts.set_autochecks(
+        hostname,
+        [
+            AutocheckEntry(plugin_name, "ignored", {}, {}),
+            AutocheckEntry(plugin_name, "kept", {}, {}),
+        ],
+    )
+    config_cache = ts.apply(monkeypatch)
+
+    assert list(config_cache.check_table(hostname)) == [ServiceID(plugin_name, "kept")]
+    assert len(config_cache.check_table(hostname, skip_ignored=False, use_cache=False)) == 2
@@ -9,6 +9,7 @@ from livestatus import LivestatusResponse, SiteId
 
 from cmk.bi.actions import BICallARuleAction
 from cmk.bi.aggregation import BIAggregation
+from cmk.bi.computer import BIResultCache
 from cmk.bi.data_fetcher import BIStatusFetcher, BIStructureFetcher
 from cmk.bi.packs import BIAggregationPacks
 from cmk.bi.searcher import BISearcher
@@ -83,3 +84,56 @@ def test_compute_aggregation(
     assert actual_result.acknowledged == expected_acknowledgment
     assert actual_result.in_downtime == expected_in_downtime
     assert actual_result.in_service_period == expected_service_period
+
+
+def test_compute_aggregation_incrementally(
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_structure_fetcher: BIStructureFetcher,
+    bi_searcher: BISearcher,
+    bi_status_fetcher: BIStatusFetcher,
+) -> None:
+    bi_structure_fetcher.add_site_data(SiteId("heute"), sample_config.bi_structure_states)
+    bi_searcher.set_hosts(bi_structure_fetcher.hosts)
+    bi_aggregation = bi_packs_sample_config.get_aggregation("default_aggregation")
+    assert bi_aggregation is not None
+    compiled_aggregation = bi_aggregation.compile(bi_searcher)
+    result_cache = BIResultCache()
+
+    bi_status_fetcher.states = bi_status_fetcher.create_bi_status_data(sample_config.bi_status_rows)
+    first_results = result_cache.compute_branches(
+        compiled_aggregation, compiled_aggregation.branches, bi_status_fetcher
+    )
+    assert first_results == compiled_aggregation.compute_branches(
+        compiled_aggregation.branches, bi_status_fetcher
+    )
+
+    # Unchanged states: The results are taken from the cache
+    bi_status_fetcher.states = bi_status_fetcher.create_bi_status_data(sample_config.bi_status_rows)
+    assert all(
+        result is first_result
+        for result, first_result in zip(
+            result_cache.compute_branches(
+                compiled_aggregation, compiled_aggregation.branches, bi_status_fetcher
+            ),
+            first_results,
+            strict=True,
+        )
+    )
+
+    # The cached results are bound to the nodes of a new compilation
+    recompiled_aggregation = bi_aggregation.compile(bi_searcher)
+    assert result_cache.compute_branches(
+        recompiled_aggregation, recompiled_aggregation.branches, bi_status_fetcher
+    ) == recompiled_aggregation.compute_branches(recompiled_aggregation.branches, bi_status_fetcher)
+
+    # Changed states: The affected nodes are computed again
+    bi_status_fetcher.states = bi_status_fetcher.create_bi_status_data(
+        sample_config.bi_acknowledgment_status_rows
+    )
+    changed_results = result_cache.compute_branches(
+        recompiled_aggregation, recompiled_aggregation.branches, bi_status_fetcher
+    )
+    assert changed_results == recompiled_aggregation.compute_branches(
+        recompiled_aggregation.branches, bi_status_fetcher
+    )
+    assert changed_results[0].actual_result.acknowledged
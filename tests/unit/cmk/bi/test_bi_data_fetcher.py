@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# pylint: disable=protected-access
+
+import pytest
+
+from livestatus import LivestatusOutputFormat, LivestatusResponse, LivestatusRow, SiteId
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.bi import data_fetcher
+from cmk.bi.data_fetcher import BIStatusFetcher
+from cmk.bi.lib import BIHostSpec, SitesCallback
+
+_SITE_HOSTS = {
+    SiteId("big"): [HostName(f"big{nr}") for nr in range(5)],
+    SiteId("small"): [HostName(f"small{nr}") for nr in range(3)],
+}
+
+
+@pytest.fixture(name="queries")
+def fixture_queries() -> list[tuple[list[str], list[SiteId]]]:
+    return []
+
+
+@pytest.fixture(name="bi_status_fetcher")
+def fixture_bi_status_fetcher(
+    queries: list[tuple[list[str], list[SiteId]]],
+) -> BIStatusFetcher:
+    def query(
+        query: str,
+        only_sites: list[SiteId] | None = None,
+        output_format: LivestatusOutputFormat = LivestatusOutputFormat.PYTHON,
+        fetch_full_data: bool = False,
+    ) -> LivestatusResponse:
+        assert only_sites
+        host_names = [
+            line.removeprefix("Filter: name = ")
+            for line in query.splitlines()
+            if line.startswith("Filter: name = ")
+        ]
+        queries.append((host_names, only_sites))
+        return LivestatusResponse(
+            [
+                LivestatusRow([site_id, host_name])
+                for site_id in only_sites
+                for host_name in _SITE_HOSTS[site_id]
+                if not host_names or host_name in host_names
+            ]
+        )
+
+    return BIStatusFetcher(SitesCallback(lambda: [], query, lambda s: s))
+
+
+def test_query_hosts_chunked(
+    monkeypatch: pytest.MonkeyPatch,
+    bi_status_fetcher: BIStatusFetcher,
+    queries: list[tuple[list[str], list[SiteId]]],
+) -> None:
+    monkeypatch.setattr(data_fetcher, "_MAX_HOST_FILTERS", 2)
+    hosts = {
+        BIHostSpec(SiteId("big"), HostName("big1")),
+        BIHostSpec(SiteId("big"), HostName("big2")),
+        BIHostSpec(SiteId("small"), HostName("small0")),
+    }
+
+    rows = bi_status_fetcher._query_hosts("GET hosts\nColumns: name\n", hosts)
+
+    assert {BIHostSpec(*row) for row in rows} == hosts
+    assert queries == [
+        (["big1", "big2"], ["big"]),
+        (["small0"], ["small"]),
+    ]
+
+
+def test_query_hosts_of_big_site_unfiltered(
+    monkeypatch: pytest.MonkeyPatch,
+    bi_status_fetcher: BIStatusFetcher,
+    queries: list[tuple[list[str], list[SiteId]]],
+) -> None:
+    monkeypatch.setattr(data_fetcher, "_MAX_FILTERED_HOSTS", 3)
+    hosts = {BIHostSpec(SiteId("big"), host_name) for host_name in _SITE_HOSTS[SiteId("big")][:4]}
+    hosts.add(BIHostSpec(SiteId("small"), HostName("small2")))
+
+    rows = bi_status_fetcher._query_hosts("GET hosts\nColumns: name\n", hosts)
+
+    assert {BIHostSpec(*row) for row in rows} == hosts
+    assert queries == [
+        ([], ["big"]),
+        (["small2"], ["small"]),
+    ]
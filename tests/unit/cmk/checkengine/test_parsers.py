@@ -159,6 +159,37 @@ class TestAgentParser:
         assert ahs.piggybacked_raw_data == {}
         assert not store.load()
 
+    def test_parse_lines(self, parser: AgentParser) -> None:
+        raw_data = AgentRawData(
+            b"\r\n".join(
+                (
+                    b"<<<a_section>>>",
+                    b"first line",
+                    b"second line",
+                    b"<<<<piggyback_host>>>>",
+                    b"<<<another_section:cached(1000,900)>>>",
+                    b"first line",
+                    b"<<<<>>>>",
+                    b"<<<a_section>>>",
+                    b"third line",
+                    b"",
+                )
+            )
+        )
+
+        ahs = parser.parse(raw_data, selection=NO_SELECTION)
+
+        assert ahs.sections == {
+            SectionName("a_section"): [["first", "line"], ["second", "line"], ["third", "line"]],
+        }
+        assert ahs.cache_info == {}
+        assert ahs.piggybacked_raw_data == {
+            HostName("piggyback_host"): [
+                b"<<<another_section:cached(1000,900)>>>",
+                b"first line",
+            ]
+        }
+
     def test_partial_header_is_not_a_header(
         self, parser: AgentParser, store: SectionStore[Sequence[AgentRawDataSectionElem]]
     ) -> None:
@@ -3,15 +3,25 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+# pylint: disable=protected-access
+
 import logging
+import time
 
 from tests.unit.cmk.ec.helpers import new_event
 
 from cmk.utils.hostaddress import HostName
 
 import cmk.ec.export as ec
-from cmk.ec.config import Config, MatchGroups, ServiceLevel
-from cmk.ec.main import create_history, EventServer, StatusTableEvents, StatusTableHistory
+from cmk.ec.config import Config, Expect, MatchGroups, ServiceLevel
+from cmk.ec.helpers import ECLock
+from cmk.ec.main import (
+    create_history,
+    EventServer,
+    EventStatus,
+    StatusTableEvents,
+    StatusTableHistory,
+)
 
 RULE = ec.Rule(
     actions=[],
@@ -61,3 +71,52 @@ def test_event_rewrite(
 
     assert event["text"] == "SUPERWARN"
     assert event["state"] == 2
+
+
+def test_merged_absent_event_is_reindexed(
+    event_server: EventServer, event_status: EventStatus
+) -> None:
+    rule = RULE.copy()
+    rule["id"] = "expecting"
+    rule["expect"] = Expect(interval=60, count=1, merge="open")
+    rule["set_host"] = "rewritten"
+    event = new_event(
+        ec.Event(rule_id="expecting", host=HostName("original"), core_host=HostName("original"))
+    )
+    event_status.new_event(event)
+
+    event_server._handle_absent_event(rule, 0, 1, time.time())
+
+    assert event["count"] == 2
+    assert event["host"] == "rewritten"
+    assert event_status._events.oldest_of_host("rewritten") is event
+    assert event_status._events.oldest_of_host("original") is None
+
+
+class _CountingLock(ECLock):
+    def __init__(self) -> None:
+        super().__init__(logging.getLogger("cmk.mkeventd.configuration"))
+        self.acquired = 0
+
+    def __enter__(self) -> None:
+        self.acquired += 1
+        super().__enter__()
+
+
+def test_match_event_takes_the_configuration_lock_once(
+    event_server: EventServer, config: Config
+) -> None:
+    rules = [RULE | {"id": f"rule{nr}", "match": f"text{nr}"} for nr in range(3)]
+    event_server.reload_configuration(
+        config | {"rule_optimizer": False, "rule_packs": [ec.default_rule_pack(rules)]},
+        history=event_server._history,
+    )
+    lock = _CountingLock()
+    event_server._lock_configuration = lock
+
+    matches = event_server.match_event(
+        new_event(ec.Event(host=HostName("heute"), text="text2", core_host=HostName("heute")))
+    )
+
+    assert [rule["id"] for rule, _result in matches.hits] == ["rule2"]
+    assert lock.acquired == 1
@@ -23,6 +23,7 @@ from cmk.ec.history_file import (
     FileHistory,
     parse_history_file,
 )
+from cmk.ec.history_index import index_positions
 from cmk.ec.main import StatusTableHistory
 from cmk.ec.query import QueryFilter, QueryGET, StatusTable
 
@@ -109,3 +110,80 @@ def test_history_parse(tmp_path: Path) -> None:
 
     assert len(new_entries) == 4
     assert new_entries[0][1] == 1666942292.3000507
+
+
+def _query(history: FileHistory, *headers: str) -> list[dict[str, object]]:
+    table = StatusTableHistory(logging.getLogger("cmk.mkeventd"), history)
+    query = QueryGET(
+        lambda name: table, ["GET history", *headers], logging.getLogger("cmk.mkeventd")
+    )
+    return [dict(zip(table.column_names, row)) for row in history.get(query)]
+
+
+def _add_events(history: FileHistory) -> None:
+    for nr in range(30):
+        history.add(
+            ec.Event(id=nr, host=HostName(f"Host{nr % 3}"), rule_id=f"rule{nr % 5}", text=f"{nr}"),
+            what="NEW",
+        )
+
+
+def test_file_get_indexed(history: FileHistory) -> None:
+    _add_events(history)
+
+    rows = _query(
+        history, "Filter: event_host =~ host1", "Filter: event_rule_id = rule2", "Limit: 1"
+    )
+    assert [(row["event_id"], row["history_line"]) for row in rows] == [(22, 23)]
+
+    rows = _query(history, "Filter: event_host in Host0 Host2", "Filter: event_id >= 25")
+    assert [row["event_id"] for row in rows] == [29, 27, 26]
+
+    assert len(_query(history, "Limit: 4")) == 4
+    assert not _query(history, "Filter: event_host = host1")
+
+
+def test_file_get_rebuilds_index(history: FileHistory, settings: ec.Settings) -> None:
+    _add_events(history)
+    (index_file,) = settings.paths.history_dir.value.glob("*.idx")
+    index_file.unlink()
+
+    rows = _query(history, "Filter: event_id = 7")
+    assert [(row["event_id"], row["event_host"]) for row in rows] == [(7, "Host1")]
+    assert index_file.exists()
+
+    history.add(ec.Event(id=30, host=HostName("Host0")), what="NEW")
+    assert [row["event_id"] for row in _query(history, "Filter: event_host = Host0")][:2] == [
+        30,
+        27,
+    ]
+
+
+def test_file_get_time_range(history: FileHistory) -> None:
+    with time_machine.travel(datetime.datetime(2024, 1, 1, tzinfo=ZoneInfo("UTC")), tick=False):
+        history.add(ec.Event(id=1), what="NEW")
+    with time_machine.travel(datetime.datetime(2024, 1, 1, 12, tzinfo=ZoneInfo("UTC")), tick=False):
+        history.add(ec.Event(id=2), what="NEW")
+
+    rows = _query(history, "Filter: history_time >= 1704096000")
+    assert [row["event_id"] for row in rows] == [2]
+
+
+def test_index_positions() -> None:
+    column_names = [column_name for column_name, _default in StatusTableHistory.columns[1:]]
+    assert [column_names[position] for position in index_positions(StatusTableHistory.columns)] == [
+        "history_time",
+        "event_id",
+        "event_host",
+        "event_rule_id",
+    ]
+
+
+def test_file_keeps_recently_used_indexes(history: FileHistory, tmp_path: Path) -> None:
+    paths = [tmp_path / f"{nr}.log" for nr in range(6)]
+    for path in paths:
+        path.write_bytes(b"1704096000.0\tNEW\t\t\t1\n")
+        history._load_index(path)
+    history._load_index(paths[0])
+
+    assert list(history._indexes) == [*paths[3:], paths[0]]
@@ -4,17 +4,22 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 """EC History sqlite backend"""
 
+# pylint: disable=protected-access
+
 import logging
 import sqlite3
-from collections.abc import Iterator
+import threading
+import time
+from collections.abc import Iterator, Sequence
 
 import pytest
 
 from cmk.utils.hostaddress import HostName
 
 import cmk.ec.export as ec
-from cmk.ec.history_sqlite import filters_to_sqlite_query, SQLiteHistory
+from cmk.ec.history_sqlite import _Entry, filters_to_sqlite_query, SQLiteHistory
 from cmk.ec.main import StatusTableHistory
+from cmk.ec.perfcounters import Perfcounters
 from cmk.ec.query import QueryFilter, QueryGET, StatusTable
 
 
@@ -23,16 +28,14 @@ def fixture_history_sqlite_raw() -> Iterator[sqlite3.Connection]:
     """history_sqlite_raw as an in :memory: database"""
 
     con = sqlite3.connect(":memory:")
-    con.execute(
-        """CREATE TABLE IF NOT EXISTS history
+    con.execute("""CREATE TABLE IF NOT EXISTS history
                              (time TEXT, what TEXT, who TEXT, addinfo TEXT, id INTEGER, count INTEGER, text TEXT, first FLOAT, last FLOAT,
                              comment TEXT, sl INTEGER, host TEXT, contact TEXT, application TEXT,
                              pid INTEGER, priority INTEGER, facility INTEGER, rule_id TEXT,
                              state INTEGER, phase TEXT, owner TEXT, match_groups TEXT,
                              contact_groups TEXT, ipaddress TEXT, orig_host TEXT,
                              contact_groups_precedence TEXT, core_host TEXT, host_in_downtime BOOL,
-                             match_groups_syslog_application TEXT)"""
-    )
+                             match_groups_syslog_application TEXT)""")
 
     yield con
 
@@ -208,6 +211,7 @@ def test_housekeeping(history_sqlite: SQLiteHistory) -> None:
     event2 = ec.Event(host=HostName("ABC2"), text="Event2 text", core_host=HostName("ABC"))
     history_sqlite.add(event=event1, what="NEW")
     history_sqlite.add(event=event2, what="NEW")
+    history_sqlite.sync()
 
     with history_sqlite.conn as connection:
         cur = connection.cursor()
@@ -216,5 +220,79 @@ def test_housekeeping(history_sqlite: SQLiteHistory) -> None:
 
         cur.execute("UPDATE history set time = 123456 where host = 'ABC1'")
         history_sqlite.housekeeping()
+        history_sqlite.sync()
         cur.execute("SELECT count(*) FROM history;")
         assert cur.fetchone()["count(*)"] == 1
+
+
+def test_add_batched(history_sqlite: SQLiteHistory, perfcounters: Perfcounters) -> None:
+    """Entries are written in batches and counted."""
+    history_sqlite._perfcounters = perfcounters
+    history_sqlite._config = history_sqlite._config | {
+        "sqlite_batch_size": 10,
+        "sqlite_batch_interval": 1000,
+    }
+
+    for nr in range(25):
+        history_sqlite.add(event=ec.Event(host=HostName(f"ABC{nr}"), id=nr), what="NEW")
+    history_sqlite.sync()
+
+    with history_sqlite.conn as connection:
+        cur = connection.cursor()
+        cur.execute("SELECT id FROM history ORDER BY line;")
+        assert [row["id"] for row in cur.fetchall()] == list(range(25))
+    assert perfcounters._counters["history_writes"] == 25
+    assert perfcounters._times["history_write"] > 0
+
+
+def test_sync_does_not_wait_for_later_entries(
+    history_sqlite: SQLiteHistory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Entries added after sync() was called are not waited for."""
+    history_sqlite._config = history_sqlite._config | {"sqlite_batch_size": 1}
+    writing = threading.Event()
+    released = {1: threading.Event(), 2: threading.Event()}
+    write_entries = history_sqlite._write_entries
+
+    def blocking_write_entries(entries: Sequence[_Entry]) -> None:
+        writing.set()
+        for entry in entries:
+            released[entry.row[5]].wait(5)  # type: ignore[index]
+        write_entries(entries)
+
+    monkeypatch.setattr(history_sqlite, "_write_entries", blocking_write_entries)
+
+    history_sqlite.add(event=ec.Event(id=1), what="NEW")
+    assert writing.wait(5)
+    syncing = threading.Thread(target=history_sqlite.sync)
+    syncing.start()
+    deadline = time.monotonic() + 5
+    while history_sqlite._queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    history_sqlite.add(event=ec.Event(id=2), what="NEW")
+
+    released[1].set()
+    syncing.join(2)
+    try:
+        assert not syncing.is_alive()
+    finally:
+        released[2].set()
+    history_sqlite.sync()
+
+
+def test_housekeeping_in_chunks(history_sqlite: SQLiteHistory) -> None:
+    """Expired entries are deleted in several transactions."""
+    history_sqlite.add_entries(
+        [
+            (None, 123456.0 if nr < 12000 else time.time(), "NEW") + (None,) * 27
+            for nr in range(12010)
+        ]
+    )
+
+    history_sqlite.housekeeping()
+    history_sqlite.sync()
+
+    with history_sqlite.conn as connection:
+        cur = connection.cursor()
+        cur.execute("SELECT count(*) FROM history;")
+        assert cur.fetchone()["count(*)"] == 10
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from tests.unit.cmk.ec.helpers import new_event
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.ec.event import Event
+from cmk.ec.event_store import EventStore
+
+
+def _event(eid: int, rule_id: str, host: str, application: str = "") -> Event:
+    return new_event(Event(id=eid, rule_id=rule_id, host=HostName(host), application=application))
+
+
+def _ids(events: object) -> list[int]:
+    assert isinstance(events, list)
+    return [event["id"] for event in events]
+
+
+def test_order_and_lookup() -> None:
+    events = [_event(1, "a", "h1"), _event(2, "b", "h1"), _event(3, "a", "h2", "app")]
+    store = EventStore(events)
+
+    assert len(store) == 3
+    assert list(store) == events
+    assert store.get(2) is events[1]
+    assert store.get(4) is None
+    assert events[0] in store
+    assert _event(1, "a", "h1") not in store
+
+    assert _ids(store.of_rule("a")) == [1, 3]
+    assert _ids(store.of_key(("a", HostName("h2"), "app"))) == [3]
+    assert not store.of_rule("c")
+    assert not store.of_key(("a", HostName("h2"), ""))
+
+
+def test_oldest() -> None:
+    store = EventStore([_event(1, "a", "h1"), _event(2, "b", "h2"), _event(3, "b", "h1")])
+
+    assert (oldest := store.oldest()) is not None and oldest["id"] == 1
+    assert (oldest := store.oldest_of_rule("b")) is not None and oldest["id"] == 2
+    assert (oldest := store.oldest_of_host("h1")) is not None and oldest["id"] == 1
+    assert store.oldest_of_rule("c") is None
+    assert EventStore().oldest() is None
+
+
+def test_remove() -> None:
+    events = [_event(1, "a", "h1"), _event(2, "a", "h1")]
+    store = EventStore(events)
+
+    assert store.remove(events[0])
+    assert not store.remove(events[0])
+    assert list(store) == [events[1]]
+    assert _ids(store.of_rule("a")) == [2]
+
+    assert store.remove(events[1])
+    assert not store
+    assert store.oldest_of_host("h1") is None
+
+
+def test_reindex() -> None:
+    events = [_event(1, "a", "h1"), _event(2, "a", "h2")]
+    store = EventStore(events)
+
+    events[0]["host"] = HostName("h2")
+    store.reindex(events[0])
+
+    assert list(store) == events
+    assert store.oldest_of_host("h1") is None
+    assert (oldest := store.oldest_of_host("h2")) is not None and oldest["id"] == 2
+    assert _ids(store.of_key(("a", HostName("h2"), ""))) == [2, 1]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# pylint: disable=protected-access
+
+import logging
+import random
+import socket
+import time
+
+from cmk.ec.event import Event
+from cmk.ec.perfcounters import Perfcounters
+from cmk.ec.pipeline import Pipeline, receive_datagrams
+
+logger = logging.getLogger("cmk.mkeventd")
+
+
+def _slow_match(event: Event) -> str:
+    time.sleep(random.uniform(0, 0.002))
+    if event["text"] == "broken":
+        raise ValueError(event["text"])
+    return event["text"].upper()
+
+
+def test_commits_in_order() -> None:
+    committed: list[tuple[str, str]] = []
+    pipeline = Pipeline(
+        match=_slow_match,
+        commit=lambda event, result: committed.append((event["text"], result)),
+        num_workers=4,
+        queue_len=1000,
+        perfcounters=Perfcounters(logger),
+        logger=logger,
+    )
+    texts = [f"message {nr}" for nr in range(200)]
+    texts[17] = "broken"
+
+    pipeline.start()
+    pipeline.put((Event(text=text) for text in texts), block=True)
+    pipeline.stop()
+
+    assert committed == [(text, text.upper()) for text in texts if text != "broken"]
+
+
+def test_drops_when_full() -> None:
+    perfcounters = Perfcounters(logger)
+    pipeline = Pipeline(
+        match=_slow_match,
+        commit=lambda event, result: None,
+        num_workers=1,
+        queue_len=3,
+        perfcounters=perfcounters,
+        logger=logger,
+    )
+
+    pipeline.put((Event(text=f"message {nr}") for nr in range(5)), block=False)
+
+    assert perfcounters._counters["queue_drops"] == 2
+    assert perfcounters._gauges["queue_depth"] == 3
+
+
+def test_receive_datagrams() -> None:
+    receiver, sender = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    with receiver, sender:
+        for nr in range(3):
+            sender.send(f"message {nr}".encode())
+
+        assert [message for message, _address in receive_datagrams(receiver, 4096)] == [
+            b"message 0",
+            b"message 1",
+            b"message 2",
+        ]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import logging
+import re
+
+import pytest
+
+from tests.unit.cmk.ec.helpers import new_event
+
+from livestatus import SiteId
+
+from cmk.utils.hostaddress import HostName
+
+import cmk.ec.export as ec
+from cmk.ec.config import Config
+from cmk.ec.main import (
+    create_history,
+    EventServer,
+    EventStatus,
+    StatusTableEvents,
+    StatusTableHistory,
+)
+from cmk.ec.rule_matcher import compile_rule, MatchSuccess, RuleMatcher
+from cmk.ec.rule_prefilter import regex_anchors, RulePrefilter
+
+
+@pytest.mark.parametrize(
+    "pattern, anchors",
+    [
+        ("ODBC error", ["odbc error"]),
+        ("^Disk (sda|sdb) failed: .*", [" failed: "]),
+        (r"user \w+ logged in", [" logged in"]),
+        ("(?:timeout|refused|unreachable)", ["timeout", "refused", "unreachable"]),
+        ("(timeout|no)", []),
+        ("a.b.c", []),
+        ("colou?r", ["colo"]),
+        ("ab?c", []),
+        ("(?-i:Fail)ed", []),
+        ("äöü", []),
+        ("(?x) long \\ text", ["long text"]),
+    ],
+)
+def test_regex_anchors(pattern: str, anchors: list[str]) -> None:
+    assert regex_anchors(re.compile(pattern, re.IGNORECASE)) == anchors
+
+
+def _rule(rule_id: str, **attrs: object) -> ec.Rule:
+    rule: ec.Rule = ec.Rule(id=rule_id, pack="pack", **attrs)  # type: ignore[typeddict-item]
+    compile_rule(rule)
+    return rule
+
+
+RULES = [
+    _rule("plain", match="Disk full"),
+    _rule("regex", match="^Disk (sda|sdb) failed"),
+    _rule("alternatives", match="timeout|refused"),
+    _rule("cancelling", match="link down", match_ok="link up"),
+    _rule("host", match_host="Srv1"),
+    _rule("host_regex", match_host="^srv[0-9]+$"),
+    _rule("application", match_application="sshd"),
+    _rule("cancel_application", match_application="kernel", cancel_application="udev"),
+    _rule("inverted", match="Disk full", invert_matching=True),
+    _rule("unspecific", match="x.y"),
+    _rule("no_conditions"),
+]
+
+EVENTS = [
+    ec.Event(host=HostName(host), application=application, text=text)
+    for host in ("srv1", "SRV1", "srv12", "other")
+    for application in ("", "sshd", "udev", "kernel")
+    for text in (
+        "DISK FULL on /var",
+        "disk sdb failed",
+        "connection Refused",
+        "Link up",
+        "LINK DOWN",
+        "ſ ı",
+        "x-y",
+        "",
+    )
+]
+
+
+def test_never_rules_out_a_match() -> None:
+    prefilter = RulePrefilter(RULES)
+    matcher = RuleMatcher(None, SiteId("site"), lambda _name: True)
+    skipped = 0
+    for event in EVENTS:
+        may_match = prefilter.may_match(new_event(event))
+        for rule in RULES:
+            if isinstance(matcher.event_rule_matches(rule, new_event(event)), MatchSuccess):
+                assert may_match(rule), (rule["id"], event)
+            elif not may_match(rule):
+                skipped += 1
+    assert skipped
+
+
+def test_filtered_rules() -> None:
+    prefilter = RulePrefilter(RULES)
+    may_match = prefilter.may_match(
+        new_event(ec.Event(host=HostName("srv1"), application="udev", text="link up"))
+    )
+    assert {rule["id"] for rule in RULES if may_match(rule)} == {
+        "cancelling",
+        "host",
+        "host_regex",
+        "cancel_application",
+        "inverted",
+        "unspecific",
+        "no_conditions",
+    }
+    assert prefilter.num_filtered_rules == 8
+
+
+def test_skips_are_counted(
+    event_server: EventServer, event_status: EventStatus, settings: ec.Settings, config: Config
+) -> None:
+    rules = [
+        ec.Rule(id="disk", match="Disk full", drop=True),
+        ec.Rule(id="any", drop=True),
+    ]
+    config = config | {"rule_packs": [ec.default_rule_pack(rules)], "rule_optimizer": True}
+    history = create_history(
+        settings,
+        config,
+        logging.getLogger("cmk.mkeventd"),
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+    event_server.reload_configuration(config, history=history)
+
+    event_server.process_potential_event(new_event(ec.Event(text="CPU load high")))
+    event_server.process_potential_event(new_event(ec.Event(text="Disk full")))
+
+    assert list(event_status.get_rule_stats()) == [("any", 1, 0), ("disk", 1, 1)]
@@ -11,6 +11,7 @@ import pytest
 
 from cmk.fetchers._agentprtcl import (
     AgentCtlMessage,
+    AgentCtlMessageDecoder,
     CompressionType,
     decrypt_by_agent_protocol,
     HeaderV1,
@@ -101,6 +102,41 @@ class TestAgentCtlMessage:
         )
 
 
+class TestAgentCtlMessageDecoder:
+    @staticmethod
+    def _decode(message: bytes, chunk_size: int) -> bytes:
+        decoder = AgentCtlMessageDecoder()
+        return b"".join(
+            [
+                *(
+                    decoder.feed(message[i : i + chunk_size])
+                    for i in range(0, len(message), chunk_size)
+                ),
+                decoder.flush(),
+            ]
+        )
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 4096])
+    @pytest.mark.parametrize("compression_type", list(CompressionType))
+    def test_decode(self, compression_type: CompressionType, chunk_size: int) -> None:
+        payload = b"<<<check_mk>>>\nVersion: 2.3.0\n" * 100
+        message = b"%b%b%b" % (
+            bytes(Version.V1),
+            bytes(compression_type),
+            compress(payload) if compression_type is CompressionType.ZLIB else payload,
+        )
+        assert self._decode(message, chunk_size) == payload
+
+    def test_decode_truncated(self) -> None:
+        message = b"%b%b%b" % (
+            bytes(Version.V1),
+            bytes(CompressionType.ZLIB),
+            compress(b"<<<check_mk>>>\n" * 100),
+        )
+        with pytest.raises(ValueError, match="Decompression with zlib failed"):
+            self._decode(message[:-4], 3)
+
+
 class TestHeaderV1:
     def test_from_bytes(self) -> None:
         assert HeaderV1.from_bytes(bytes(CompressionType.ZLIB)) == HeaderV1(CompressionType.ZLIB)
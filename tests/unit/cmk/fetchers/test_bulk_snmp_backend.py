@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import bisect
+import dataclasses
+import logging
+import socket
+import threading
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.snmplib import (
+    BackendOIDSpec,
+    BackendSNMPTree,
+    get_snmp_table,
+    SNMPBackendEnum,
+    SNMPContextTimeout,
+    SNMPHostConfig,
+    SNMPRawValue,
+    SNMPVersion,
+    SpecialColumn,
+)
+
+from cmk.fetchers.snmp_backend import BulkSNMPBackend, StoredWalkSNMPBackend
+from cmk.fetchers.snmp_backend._ber import (
+    decode_message,
+    encode_message,
+    Message,
+    NO_SUCH_NAME,
+    PDUType,
+    render_value,
+    Tag,
+    VarBind,
+)
+from cmk.fetchers.snmp_backend._utils import strip_snmp_value
+
+WALK = """\
+.1.3.6.1.2.1.1.1.0 "Linux switch 4.19"
+.1.3.6.1.2.1.1.2.0 .1.3.6.1.4.1.8072.3.2.10
+.1.3.6.1.2.1.1.5.0 "switch"
+.1.3.6.1.2.1.2.2.1.1.1 1
+.1.3.6.1.2.1.2.2.1.1.2 2
+.1.3.6.1.2.1.2.2.1.1.10 10
+.1.3.6.1.2.1.2.2.1.2.1 "lo"
+.1.3.6.1.2.1.2.2.1.2.2 "eth0"
+.1.3.6.1.2.1.2.2.1.2.10 "eth1"
+.1.3.6.1.2.1.2.2.1.6.1 ""
+.1.3.6.1.2.1.2.2.1.6.2 "B2 E0 7D 2C 4D 15 "
+.1.3.6.1.2.1.2.2.1.6.10 "B2 E0 7D 2C 4D 16 "
+.1.3.6.1.2.1.31.1.1.1.1.2 "eth0"
+"""
+
+
+def _key(oid: str) -> tuple[int, ...]:
+    return tuple(int(arc) for arc in oid.strip(".").split("."))
+
+
+class SimulatedAgent:
+    """An SNMP agent answering GET, GETNEXT and GETBULK requests from a stored walk"""
+
+    def __init__(self, rows: Sequence[tuple[str, SNMPRawValue]]) -> None:
+        self.rows = sorted(rows, key=lambda row: _key(row[0]))
+        self.keys = [_key(oid) for oid, _value in self.rows]
+        self.requests: list[Message] = []
+        # Stop answering after this many requests
+        self.max_answers: int | None = None
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def __enter__(self) -> "SimulatedAgent":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.sock.close()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                data, address = self.sock.recvfrom(65535)
+            except OSError:
+                return
+            request = decode_message(data)
+            self.requests.append(request)
+            if self.max_answers is not None and len(self.requests) > self.max_answers:
+                continue
+            self.sock.sendto(encode_message(self._answer(request)), address)
+
+    def _get(self, oid: str) -> VarBind:
+        index = bisect.bisect_left(self.keys, _key(oid))
+        if index < len(self.keys) and self.keys[index] == _key(oid):
+            return VarBind(oid, Tag.OCTET_STRING, self.rows[index][1])
+        return VarBind(oid, Tag.NO_SUCH_OBJECT, b"")
+
+    def _next(self, oid: str) -> VarBind:
+        index = bisect.bisect_right(self.keys, _key(oid))
+        if index < len(self.keys):
+            return VarBind(self.rows[index][0], Tag.OCTET_STRING, self.rows[index][1])
+        return VarBind(oid, Tag.END_OF_MIB_VIEW, b"")
+
+    def _answer(self, request: Message) -> Message:
+        oids = [varbind.oid for varbind in request.varbinds]
+        varbinds: list[VarBind] = []
+        match request.pdu_type:
+            case PDUType.GET_REQUEST:
+                varbinds = [self._get(oid) for oid in oids]
+            case PDUType.GET_NEXT_REQUEST:
+                varbinds = [self._next(oid) for oid in oids]
+            case PDUType.GET_BULK_REQUEST:
+                for _repetition in range(request.error_index):
+                    row = [self._next(oid) for oid in oids]
+                    varbinds.extend(row)
+                    oids = [varbind.oid for varbind in row]
+
+        error_status = error_index = 0
+        if request.version == 0:
+            for position, varbind in enumerate(varbinds, start=1):
+                if varbind.tag in (Tag.NO_SUCH_OBJECT, Tag.END_OF_MIB_VIEW):
+                    error_status, error_index = NO_SUCH_NAME, position
+                    varbinds = list(request.varbinds)
+                    break
+        return Message(
+            request.version,
+            request.community,
+            PDUType.RESPONSE,
+            request.request_id,
+            error_status,
+            error_index,
+            varbinds,
+        )
+
+
+def _make_config(port: int, snmp_version: SNMPVersion, bulk_walk_size_of: int) -> SNMPHostConfig:
+    return SNMPHostConfig(
+        is_ipv6_primary=False,
+        hostname=HostName("switch"),
+        ipaddress=HostAddress("127.0.0.1"),
+        credentials="public",
+        port=port,
+        bulkwalk_enabled=True,
+        snmp_version=snmp_version,
+        bulk_walk_size_of=bulk_walk_size_of,
+        timing={"timeout": 1, "retries": 0},
+        oid_range_limits={},
+        snmpv3_contexts=[],
+        character_encoding="ascii",
+        snmp_backend=SNMPBackendEnum.BULK,
+    )
+
+
+@pytest.fixture(name="stored_walk")
+def fixture_stored_walk(tmp_path: Path) -> StoredWalkSNMPBackend:
+    path = tmp_path / "switch"
+    path.write_text(WALK)
+    return StoredWalkSNMPBackend(
+        _make_config(161, SNMPVersion.V2C, 10), logging.getLogger("test"), path
+    )
+
+
+@pytest.fixture(name="agent")
+def fixture_agent(stored_walk: StoredWalkSNMPBackend) -> Iterator[SimulatedAgent]:
+    rows = [
+        (oid, strip_snmp_value(value))
+        for oid, _sep, value in (
+            line.strip().partition(" ") for line in stored_walk.read_walk_data()
+        )
+    ]
+    with SimulatedAgent(rows) as agent:
+        yield agent
+
+
+@pytest.mark.parametrize(
+    "oid, tag, value, expected",
+    [
+        (".1.3.6.1.2.1.1.3.0", Tag.TIMETICKS, (4294967295).to_bytes(5, "big"), b"4294967295"),
+        (".1.3.6.1.2.1.2.2.1.8.1", Tag.INTEGER, (-2).to_bytes(1, "big", signed=True), b"-2"),
+        (".1.3.6.1.2.1.4.20.1.1.10.0.0.1", Tag.IP_ADDRESS, bytes((10, 0, 0, 1)), b"10.0.0.1"),
+        (
+            ".1.3.6.1.2.1.1.2.0",
+            Tag.OBJECT_IDENTIFIER,
+            b"\x2b\x06\x01\x04\x01\xbf\x08",
+            b".1.3.6.1.4.1.8072",
+        ),
+        (".1.3.6.1.4.1.2620.1.1", Tag.OCTET_STRING, b"\xb2\xe0", b"\xb2\xe0"),
+        (".1.3.6.1.2.1.1.9.0", Tag.NO_SUCH_INSTANCE, b"", None),
+    ],
+)
+def test_ber_round_trip(oid: str, tag: Tag, value: bytes, expected: bytes | None) -> None:
+    message = Message(1, b"public", PDUType.RESPONSE, 2**31 - 1, 0, 0, [VarBind(oid, tag, value)])
+
+    decoded = decode_message(encode_message(message))
+
+    assert decoded == message
+    assert render_value(decoded.varbinds[0].tag, decoded.varbinds[0].value) == expected
+
+
+def test_ber_truncated() -> None:
+    message = Message(
+        1, b"public", PDUType.GET_REQUEST, 1, 0, 0, [VarBind(".1.3.6", Tag.NULL, b"")]
+    )
+    with pytest.raises(ValueError):
+        decode_message(encode_message(message)[:-3])
+
+
+@pytest.mark.parametrize(
+    "snmp_version, bulk_walk_size_of",
+    [(SNMPVersion.V1, 10), (SNMPVersion.V2C, 1), (SNMPVersion.V2C, 10)],
+)
+@pytest.mark.parametrize(
+    "oid",
+    [
+        ".1.3.6.1.2.1.1",
+        ".1.3.6.1.2.1.2.2.1.2",
+        ".1.3.6.1.2.1.2.2.1.6",
+        ".1.3.6.1.2.1.31",
+        ".1.3.6.1.2.1.1.1.0",
+        ".1.3.6.1.2.1.99",
+    ],
+)
+def test_walk_equals_stored_walk(
+    agent: SimulatedAgent,
+    stored_walk: StoredWalkSNMPBackend,
+    snmp_version: SNMPVersion,
+    bulk_walk_size_of: int,
+    oid: str,
+) -> None:
+    backend = BulkSNMPBackend(
+        _make_config(agent.port, snmp_version, bulk_walk_size_of), logging.getLogger("test")
+    )
+    assert backend.walk(oid, context="") == stored_walk.walk(oid, context="")
+
+
+@pytest.mark.parametrize(
+    "oid, expected",
+    [
+        (".1.3.6.1.2.1.1.5.0", b"switch"),
+        (".1.3.6.1.2.1.1.6.0", None),
+        (".1.3.6.1.2.1.1.*", b"Linux switch 4.19"),
+        (".1.3.6.1.2.1.3.*", None),
+    ],
+)
+def test_get(agent: SimulatedAgent, oid: str, expected: bytes | None) -> None:
+    backend = BulkSNMPBackend(
+        _make_config(agent.port, SNMPVersion.V2C, 10), logging.getLogger("test")
+    )
+    assert backend.get(oid, context="") == expected
+
+
+def test_table_columns_share_requests(
+    agent: SimulatedAgent, stored_walk: StoredWalkSNMPBackend
+) -> None:
+    tree = BackendSNMPTree(
+        base=".1.3.6.1.2.1.2.2.1",
+        oids=[
+            BackendOIDSpec(SpecialColumn.END, "string", False),
+            BackendOIDSpec("2", "string", False),
+            BackendOIDSpec("6", "binary", False),
+        ],
+    )
+    backend = BulkSNMPBackend(
+        _make_config(agent.port, SNMPVersion.V2C, 10), logging.getLogger("test")
+    )
+
+    def table(backend: BulkSNMPBackend | StoredWalkSNMPBackend) -> object:
+        return get_snmp_table(
+            section_name=None, tree=tree, walk_cache={}, backend=backend, log=lambda msg: None
+        )
+
+    assert (
+        table(backend)
+        == table(stored_walk)
+        == [
+            ["1", "lo", []],
+            ["2", "eth0", [178, 224, 125, 44, 77, 21]],
+            ["10", "eth1", [178, 224, 125, 44, 77, 22]],
+        ]
+    )
+    # Both columns are fetched by a single GETBULK request
+    assert [(r.pdu_type, len(r.varbinds)) for r in agent.requests] == [
+        (PDUType.GET_BULK_REQUEST, 2)
+    ]
+
+
+def test_timeout() -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        backend = BulkSNMPBackend(
+            dataclasses.replace(
+                _make_config(sock.getsockname()[1], SNMPVersion.V2C, 10),
+                timing={"timeout": 0.1, "retries": 1},
+            ),
+            logging.getLogger("test"),
+        )
+        assert backend.get(".1.3.6.1.2.1.1.1.0", context="") is None
+        with pytest.raises(SNMPContextTimeout):
+            backend.walk(".1.3.6.1.2.1.1", context="")
+
+
+def test_timeout_keeps_completed_columns(agent: SimulatedAgent) -> None:
+    backend = BulkSNMPBackend(
+        dataclasses.replace(
+            _make_config(agent.port, SNMPVersion.V1, 10),
+            timing={"timeout": 0.1, "retries": 0},
+        ),
+        logging.getLogger("test"),
+    )
+    # The first column is done after the second GETNEXT, the third one times out.
+    agent.max_answers = 2
+
+    completed, timed_out = backend.walk_table(
+        [".1.3.6.1.2.1.1.5", ".1.3.6.1.2.1.2.2.1.2"], context=""
+    )
+
+    assert completed == [(".1.3.6.1.2.1.1.5.0", b"switch")]
+    assert isinstance(timed_out, SNMPContextTimeout)
+
+
+def test_timeout_stops_the_walk(agent: SimulatedAgent) -> None:
+    backend = BulkSNMPBackend(
+        dataclasses.replace(
+            _make_config(agent.port, SNMPVersion.V1, 10),
+            timing={"timeout": 0.1, "retries": 0},
+        ),
+        logging.getLogger("test"),
+    )
+    agent.max_answers = 2
+
+    with pytest.raises(SNMPContextTimeout):
+        backend.walk_table(
+            [".1.3.6.1.2.1.1.5", ".1.3.6.1.2.1.2.2.1.2"], context="", stop_on_timeout=True
+        )
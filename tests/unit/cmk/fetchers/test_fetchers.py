@@ -6,8 +6,12 @@
 # pylint: disable=protected-access
 from __future__ import annotations
 
+import asyncio
 import os
 import socket
+import ssl
+import time
+import uuid
 from collections.abc import Sequence, Sized
 from pathlib import Path
 from typing import Generic, NamedTuple, NoReturn, TypeAlias, TypeVar
@@ -17,7 +21,10 @@ from pyghmi.exceptions import IpmiException  # type: ignore[import-untyped]
 from pytest import MonkeyPatch
 
 import cmk.utils.resulttype as result
+from cmk.utils.agent_registration import UUIDLinkManager
 from cmk.utils.agentdatatype import AgentRawData
+from cmk.utils.certs import RootCA
+from cmk.utils.crypto.certificate import CertificateWithPrivateKey
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.sectionname import SectionMap, SectionName
 
@@ -33,8 +40,10 @@ from cmk.snmplib import (
 )
 
 import cmk.fetchers._snmp as snmp
+import cmk.fetchers._tcp as _tcp
 from cmk.fetchers import (
     Fetcher,
+    fetch_all_tcp_async,
     get_raw_data,
     IPMIFetcher,
     Mode,
@@ -364,6 +373,7 @@ class TestSNMPFetcherDeserialization:
                 on_error=OnError.RAISE,
                 missing_sys_description=False,
                 oid_cache_dir=tmp_path,
+                oid_cache_ttl=0,
             ),
             do_status_data_inventory=False,
             section_store_path="/tmp/db",
@@ -451,6 +461,7 @@ class TestSNMPFetcherFetch:
                 on_error=OnError.RAISE,
                 missing_sys_description=False,
                 oid_cache_dir=path,
+                oid_cache_ttl=0,
             ),
             do_status_data_inventory=do_status_data_inventory,
             section_store_path="/tmp/db",
@@ -705,6 +716,7 @@ class TestSNMPFetcherFetchCache:
                 on_error=OnError.RAISE,
                 missing_sys_description=False,
                 oid_cache_dir=tmp_path,
+                oid_cache_ttl=0,
             ),
             do_status_data_inventory=False,
             section_store_path="/tmp/db",
@@ -839,6 +851,167 @@ class TestTCPFetcher:
         assert isinstance(raw_data.error, MKFetcherError)
 
 
+class TestFetchAllTCP:
+    @staticmethod
+    def _fetcher(port: int, tmp_path: Path, timeout: float = 1.0) -> TCPFetcher:
+        return TCPFetcher(
+            family=socket.AF_INET,
+            address=(HostAddress("127.0.0.1"), port),
+            host_name=HostName(f"host-{port}"),
+            timeout=timeout,
+            encryption_handling=TCPEncryptionHandling.ANY_AND_PLAIN,
+            pre_shared_secret=None,
+            tls_config=TLSConfig(
+                cas_dir=tmp_path,
+                ca_store=tmp_path,
+                site_crt=tmp_path,
+            ),
+        )
+
+    @staticmethod
+    async def _serve(output: bytes | None) -> asyncio.Server:
+        async def handle(_reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            if output is None:
+                await asyncio.sleep(10)  # never answer
+            else:
+                writer.write(output)
+                await writer.drain()
+            writer.close()
+
+        return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+    def test_fetch_all(self, tmp_path: Path) -> None:
+        async def scenario() -> Sequence[result.Result[AgentRawData, Exception]]:
+            servers = [
+                await self._serve(b"<<<check_mk>>>\nVersion: 2.3.0\n"),
+                await self._serve(b"<<<uptime>>>\n1234\n"),
+                await self._serve(b""),
+                await self._serve(None),
+            ]
+            ports = [server.sockets[0].getsockname()[1] for server in servers]
+            try:
+                return await fetch_all_tcp_async(
+                    [self._fetcher(port, tmp_path) for port in ports], timeout=0.5
+                )
+            finally:
+                for server in servers:
+                    server.close()
+
+        results = asyncio.run(scenario())
+
+        assert results[0] == result.OK(b"<<<check_mk>>>\nVersion: 2.3.0\n")
+        assert results[1] == result.OK(b"<<<uptime>>>\n1234\n")
+        assert isinstance(results[2].error, MKFetcherError)
+        assert "Empty output" in str(results[2].error)
+        assert isinstance(results[3].error, MKFetcherError)
+        assert "Timeout" in str(results[3].error)
+
+    def test_fetch_all_stalled_agent(self, tmp_path: Path) -> None:
+        async def handle_stalled(
+            _reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            writer.write(b"<<")
+            await writer.drain()
+            await asyncio.sleep(10)  # stall after the protocol bytes
+            writer.close()
+
+        async def scenario() -> Sequence[result.Result[AgentRawData, Exception]]:
+            servers = [
+                await self._serve(None),
+                await asyncio.start_server(handle_stalled, "127.0.0.1", 0),
+                await self._serve(b"<<<uptime>>>\n1234\n"),
+            ]
+            ports = [server.sockets[0].getsockname()[1] for server in servers]
+            try:
+                # No overall timeout: only the fetchers' own timeouts apply
+                return await fetch_all_tcp_async(
+                    [self._fetcher(port, tmp_path, timeout=0.3) for port in ports]
+                )
+            finally:
+                for server in servers:
+                    server.close()
+
+        start = time.monotonic()
+        results = asyncio.run(scenario())
+
+        assert time.monotonic() - start < 5
+        for stalled in results[:2]:
+            assert isinstance(stalled.error, MKFetcherError)
+            assert "timed out" in str(stalled.error)
+        assert results[2] == result.OK(b"<<<uptime>>>\n1234\n")
+
+    def test_fetch_all_connection_refused(self, tmp_path: Path) -> None:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        (fetched,) = asyncio.run(fetch_all_tcp_async([self._fetcher(port, tmp_path)]))
+
+        assert isinstance(fetched.error, MKFetcherError)
+        assert "Communication failed" in str(fetched.error)
+
+    def test_fetch_all_tls(self, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+        controller_uuid = uuid.uuid4()
+        ca = CertificateWithPrivateKey.generate_self_signed(
+            common_name="Site CA", organization="Checkmk Testing", key_size=2048, is_ca=True
+        )
+        root_ca = RootCA(certificate=ca.certificate, private_key=ca.private_key)
+        (cas_dir := tmp_path / "cas").mkdir()
+        (cas_dir / "ca.pem").write_bytes(root_ca.certificate.dump_pem().bytes)
+        root_ca.issue_and_store_certificate(tmp_path / "site.pem", "site", key_size=2048)
+        root_ca.issue_and_store_certificate(
+            tmp_path / "agent.pem", str(controller_uuid), key_size=2048
+        )
+        agent_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        agent_context.load_cert_chain(tmp_path / "agent.pem")
+
+        async def handle(_reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            writer.write(b"16")
+            await writer.drain()
+            await writer.start_tls(agent_context)
+            # version, no compression, plain agent output
+            writer.write(b"\x00\x00\x00<<<check_mk>>>\nVersion: 2.3.0\n")
+            await writer.drain()
+            writer.close()
+
+        async def scenario() -> Sequence[result.Result[AgentRawData, Exception]]:
+            servers = [await asyncio.start_server(handle, "127.0.0.1", 0) for _nr in range(2)]
+            fetchers = [
+                TCPFetcher(
+                    family=socket.AF_INET,
+                    address=(HostAddress("127.0.0.1"), server.sockets[0].getsockname()[1]),
+                    host_name=HostName(f"host-{nr}"),
+                    timeout=1.0,
+                    encryption_handling=TCPEncryptionHandling.ANY_AND_PLAIN,
+                    pre_shared_secret=None,
+                    tls_config=TLSConfig(
+                        cas_dir=cas_dir,
+                        ca_store=tmp_path / "ca_store.pem",
+                        site_crt=tmp_path / "site.pem",
+                    ),
+                )
+                for nr, server in enumerate(servers)
+            ]
+            try:
+                return await fetch_all_tcp_async(fetchers, timeout=5.0)
+            finally:
+                for server in servers:
+                    server.close()
+
+        link_manager = UUIDLinkManager(
+            received_outputs_dir=tmp_path / "received", data_source_dir=tmp_path / "push"
+        )
+        # Only the first host is registered
+        link_manager.create_link(HostName("host-0"), controller_uuid, push_configured=False)
+        monkeypatch.setattr(_tcp, "get_uuid_link_manager", lambda: link_manager)
+
+        registered, unregistered = asyncio.run(scenario())
+
+        assert registered == result.OK(b"<<<check_mk>>>\nVersion: 2.3.0\n")
+        assert isinstance(unregistered.error, MKFetcherError)
+        assert "Agent controller not registered" in str(unregistered.error)
+
+
 class TestFetcherCaching:
     @pytest.fixture
     def fetcher(self) -> Fetcher[AgentRawData]:
@@ -10,8 +10,13 @@ from pathlib import Path
 
 import pytest
 
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.snmplib import SNMPBackendEnum, SNMPHostConfig, SNMPVersion
+
 import cmk.fetchers.snmp_backend._utils as utils
 from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
+from cmk.fetchers.snmp_backend._walk_index import index_path
 
 
 @pytest.mark.parametrize(
@@ -66,3 +71,89 @@ def create_files(tmpdir):
     p1.write(".1.2.3 foo\n.1.2.4 bar\nfoobar\n")
     p2 = (tmpdir / "walkdata").join("2.txt")
     p2.write(".1.2.3 foo\n\n\n.1.2.5 test\n")
+
+
+def _stored_walk_backend(path: Path) -> StoredWalkSNMPBackend:
+    return StoredWalkSNMPBackend(
+        SNMPHostConfig(
+            is_ipv6_primary=False,
+            hostname=HostName("bob"),
+            ipaddress=HostAddress("1.2.3.4"),
+            credentials="public",
+            port=42,
+            bulkwalk_enabled=True,
+            snmp_version=SNMPVersion.V2C,
+            bulk_walk_size_of=10,
+            timing={},
+            oid_range_limits={},
+            snmpv3_contexts=[],
+            character_encoding=None,
+            snmp_backend=SNMPBackendEnum.STORED_WALK,
+        ),
+        logging.getLogger("test"),
+        path,
+    )
+
+
+class TestStoredWalkIndex:
+    @pytest.fixture
+    def walk_path(self, tmp_path: Path) -> Path:
+        path = tmp_path / "bob"
+        path.write_text(
+            ".1.2.3.10 ten\n"
+            ".1.2.3.9 nine\n"
+            ".1.2.3 three\n"
+            '.1.2.30 "B2 E0 7D "\n'
+            ".1.2.4 multi\nline\n"
+            ".1.2.5\n"
+        )
+        return path
+
+    @pytest.mark.parametrize(
+        "oid, expected",
+        [
+            (
+                ".1.2.3",
+                [(".1.2.3", b"three"), (".1.2.3.9", b"nine"), (".1.2.3.10", b"ten")],
+            ),
+            ("1.2.3.9", [(".1.2.3.9", b"nine")]),
+            (".1.2.3.*", [(".1.2.3.9", b"nine")]),
+            (".1.2.30", [(".1.2.30", b"\xb2\xe0}")]),
+            (".1.2.4", [(".1.2.4", b"multi\nline")]),
+            (".1.2.5", [(".1.2.5", b"")]),
+            (".1.2.6", []),
+            (".1.1", []),
+        ],
+    )
+    def test_walk(self, walk_path: Path, oid: str, expected: list[tuple[str, bytes]]) -> None:
+        assert _stored_walk_backend(walk_path).walk(oid, context="") == expected
+
+    def test_get(self, walk_path: Path) -> None:
+        backend = _stored_walk_backend(walk_path)
+        assert backend.get(".1.2.3.10", context="") == b"ten"
+        assert backend.get(".1.2.3.*", context="") == b"nine"
+        assert backend.get(".1.2.3", context="") is None
+        assert backend.get(".1.2.6", context="") is None
+
+    def test_index_is_compiled_once(self, walk_path: Path) -> None:
+        _stored_walk_backend(walk_path).walk(".1.2.4", context="")
+        compiled = index_path(walk_path).stat()
+
+        assert _stored_walk_backend(walk_path).walk(".1.2.4", context="") == [
+            (".1.2.4", b"multi\nline")
+        ]
+        assert index_path(walk_path).stat().st_mtime_ns == compiled.st_mtime_ns
+
+    def test_outdated_index_is_recompiled(self, walk_path: Path) -> None:
+        _stored_walk_backend(walk_path).walk(".1.2.4", context="")
+        walk_path.write_text(".1.2.4 changed\n")
+
+        assert _stored_walk_backend(walk_path).walk(".1.2.4", context="") == [
+            (".1.2.4", b"changed")
+        ]
+
+    def test_unwritable_index(self, walk_path: Path) -> None:
+        index_path(walk_path).mkdir()
+        assert _stored_walk_backend(walk_path).walk(".1.2.4", context="") == [
+            (".1.2.4", b"multi\nline")
+        ]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import time
+from pathlib import Path
+
+import pytest
+
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.fetchers._snmpcache import SingleOIDCache, single_oid_cache
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    cache = SingleOIDCache(tmp_path / "cache", ttl=60)
+    cache[".1.3.6.1.2.1.1.1.0"] = "Linux switch äöü"
+    cache[".1.3.6.1.2.1.1.2.0"] = ""
+    cache[".1.3.6.1.4.1.9.*"] = None
+    cache.save()
+
+    assert dict(SingleOIDCache.load(tmp_path / "cache", ttl=60)) == {
+        ".1.3.6.1.2.1.1.1.0": "Linux switch äöü",
+        ".1.3.6.1.2.1.1.2.0": "",
+        ".1.3.6.1.4.1.9.*": None,
+    }
+
+
+def test_expired_entries_are_dropped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = SingleOIDCache(tmp_path / "cache", ttl=60)
+    cache[".1.3.6.1.2.1.1.1.0"] = "old"
+    cache.save()
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    cache[".1.3.6.1.2.1.1.2.0"] = "new"
+
+    assert ".1.3.6.1.2.1.1.1.0" not in cache
+    assert dict(SingleOIDCache.load(tmp_path / "cache", ttl=60)) == {}
+    assert dict(cache) == {".1.3.6.1.2.1.1.2.0": "new"}
+
+
+@pytest.mark.parametrize("content", [b"", b"garbage", b"CMKSOC01\x00\x01"])
+def test_broken_file(tmp_path: Path, content: bytes) -> None:
+    (tmp_path / "cache").write_bytes(content)
+    assert not SingleOIDCache.load(tmp_path / "cache", ttl=60)
+
+
+def test_single_oid_cache_is_shared(tmp_path: Path) -> None:
+    cache = single_oid_cache(HostName("heute"), HostAddress("1.2.3.4"), cache_dir=tmp_path, ttl=60)
+    cache[".1.3.6.1.2.1.1.1.0"] = "sys description"
+
+    assert (
+        single_oid_cache(HostName("heute"), HostAddress("1.2.3.4"), cache_dir=tmp_path, ttl=60)
+        is cache
+    )
+    assert not single_oid_cache(
+        HostName("heute"), HostAddress("1.2.3.5"), cache_dir=tmp_path, ttl=60
+    )
+
+
+def test_single_oid_cache_disabled(tmp_path: Path) -> None:
+    cache = single_oid_cache(HostName("heute"), None, cache_dir=tmp_path, ttl=0)
+    cache[".1.3.6.1.2.1.1.1.0"] = "sys description"
+    cache.save()
+
+    assert not list(tmp_path.iterdir())
+    assert not single_oid_cache(HostName("heute"), None, cache_dir=tmp_path, ttl=0)
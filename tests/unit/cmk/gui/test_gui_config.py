@@ -53,6 +53,7 @@ def test_default_config_from_plugins() -> None:
         "acknowledge_problems",
         "custom_links",
         "debug_livestatus_queries",
+        "livestatus_query_cache_ttl",
         "show_livestatus_errors",
         "liveproxyd_enabled",
         "visible_views",
@@ -3,8 +3,22 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import functools
+import random
+
+import pytest
+
+from cmk.gui.config import active_config
+from cmk.gui.display_options import display_options
+from cmk.gui.http import request, response
+from cmk.gui.logged_in import user
+from cmk.gui.painter.v0.helpers import RenderLink
+from cmk.gui.painter_options import PainterOptions
+from cmk.gui.type_defs import Row, Rows
+from cmk.gui.utils.theme import theme
 from cmk.gui.view import View
-from cmk.gui.views.page_show_view import _get_needed_regular_columns
+from cmk.gui.views.page_show_view import _get_needed_regular_columns, _sort_data
+from cmk.gui.views.sorter import SorterEntry, sorter_registry
 from cmk.gui.visuals.filter import Filter
 
 
@@ -67,3 +81,65 @@ def test_get_needed_regular_columns(view: View) -> None:
             "some_column",
         ]
     )
+
+
+def _service_rows(count: int) -> Rows:
+    rnd = random.Random(4711)
+    return [
+        {
+            "site": f"site{rnd.randrange(3)}",
+            "host_name": f"Host{rnd.randrange(20)}",
+            "service_description": rnd.choice(["Check_MK", "CPU load", "Disk C:", "Disk D:"])
+            + f" {rnd.randrange(12)}",
+            "service_state": rnd.randrange(4),
+            "service_has_been_checked": rnd.randrange(2),
+            "service_last_state_change": rnd.randrange(5),
+        }
+        for _nr in range(count)
+    ]
+
+
+def _sorter_entry(name: str, negate: bool) -> SorterEntry:
+    return SorterEntry(
+        sorter=sorter_registry[name](
+            user=user,
+            config=active_config,
+            request=request,
+            painter_options=PainterOptions.get_instance(),
+            theme=theme,
+            url_renderer=RenderLink(request, response, display_options),
+        ),
+        negate=negate,
+        join_key=None,
+        parameters=None,
+    )
+
+
+def _cmp_sorted(rows: Rows, sorters: list[SorterEntry]) -> Rows:
+    def multisort(r1: Row, r2: Row) -> int:
+        for entry in sorters:
+            if c := entry.sorter.cmp(r1, r2, entry.parameters):
+                return -c if entry.negate else c
+        return 0
+
+    return sorted(rows, key=functools.cmp_to_key(multisort))
+
+
+@pytest.mark.parametrize(
+    "sorter_names",
+    [
+        [("svcstate", True), ("site_host", False), ("svcdescr", False)],
+        [("stateage", False), ("host_name", True)],
+        [("svcdescr", True)],
+    ],
+)
+@pytest.mark.parametrize("limit", [None, 0, 10, 1000])
+def test_sort_data_like_cmp(sorter_names: list[tuple[str, bool]], limit: int | None) -> None:
+    sorters = [_sorter_entry(name, negate) for name, negate in sorter_names]
+    rows = _service_rows(200)
+    expected = _cmp_sorted(rows, sorters)
+
+    _sort_data(rows, sorters, limit)
+
+    assert len(rows) == len(expected)
+    assert rows[:limit] == expected[:limit]
@@ -114,13 +114,18 @@ def test_registered_configvars() -> None:
         "history_rotation",
         "hostname_translation",
         "housekeeping_interval",
+        "ingestion_queue_len",
+        "ingestion_workers",
         "sqlite_housekeeping_interval",
         "sqlite_freelist_size",
+        "sqlite_batch_size",
+        "sqlite_batch_interval",
         "user_security_notification_duration",
         "http_proxies",
         "inventory_check_autotrigger",
         "inventory_check_interval",
         "inventory_check_severity",
+        "livestatus_query_cache_ttl",
         "log_logon_failures",
         "lock_on_logon_failures",
         "log_level",
@@ -184,53 +184,57 @@ def backend() -> Iterator[SNMPBackend]:
 
 
 @pytest.fixture
-def cache_oids(backend, tmp_path):
+def oid_cache(backend: SNMPBackend, tmp_path: Path) -> snmp_cache.SingleOIDCache:
     # Cache OIDs to avoid actual SNMP I/O.
-    snmp_cache.initialize_single_oid_cache(
-        backend.config.hostname, backend.config.ipaddress, cache_dir=tmp_path
+    cache = snmp_cache.single_oid_cache(
+        backend.config.hostname, backend.config.ipaddress, cache_dir=tmp_path, ttl=3600
     )
-    snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_DESCR] = "sys description"
-    snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_OBJ] = "sys object"
-    yield
-    snmp_cache._clear_other_hosts_oid_cache(backend.hostname)
+    cache[snmp_scan.OID_SYS_DESCR] = "sys description"
+    cache[snmp_scan.OID_SYS_OBJ] = "sys object"
+    return cache
 
 
-@pytest.mark.usefixtures("cache_oids")
 @pytest.mark.parametrize("oid", [snmp_scan.OID_SYS_DESCR, snmp_scan.OID_SYS_OBJ])
-def test_snmp_scan_prefetch_description_object__oid_missing(oid: OID, backend: SNMPBackend) -> None:
-    snmp_cache.single_oid_cache()[oid] = None
+def test_snmp_scan_prefetch_description_object__oid_missing(
+    oid: OID, oid_cache: snmp_cache.SingleOIDCache, backend: SNMPBackend
+) -> None:
+    oid_cache[oid] = None
 
     with pytest.raises(MKSNMPError, match=r"Cannot fetch [\w ]+ OID %s" % oid):
-        snmp_scan._prefetch_description_object(backend=backend)
+        snmp_scan._prefetch_description_object(oid_cache, backend=backend)
 
 
-@pytest.mark.usefixtures("cache_oids")
-def test_snmp_scan_prefetch_description_object__success(backend: SNMPBackend) -> None:
-    sys_desc = snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_DESCR]
-    sys_obj = snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_OBJ]
+def test_snmp_scan_prefetch_description_object__success(
+    oid_cache: snmp_cache.SingleOIDCache, backend: SNMPBackend
+) -> None:
+    sys_desc = oid_cache[snmp_scan.OID_SYS_DESCR]
+    sys_obj = oid_cache[snmp_scan.OID_SYS_OBJ]
     assert sys_desc
     assert sys_obj
 
-    snmp_scan._prefetch_description_object(backend=backend)
+    snmp_scan._prefetch_description_object(oid_cache, backend=backend)
 
     # Success is no-op
-    assert snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_DESCR] == sys_desc
-    assert snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_OBJ] == sys_obj
+    assert oid_cache[snmp_scan.OID_SYS_DESCR] == sys_desc
+    assert oid_cache[snmp_scan.OID_SYS_OBJ] == sys_obj
 
 
-@pytest.mark.usefixtures("cache_oids")
-def test_snmp_scan_fake_description_object__success(backend: SNMPBackend) -> None:
-    snmp_scan._fake_description_object(logging.getLogger("test"))
+def test_snmp_scan_fake_description_object__success(
+    oid_cache: snmp_cache.SingleOIDCache, backend: SNMPBackend
+) -> None:
+    snmp_scan._fake_description_object(oid_cache, logging.getLogger("test"))
 
-    assert snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_DESCR] == ""
-    assert snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_OBJ] == ""
+    assert oid_cache[snmp_scan.OID_SYS_DESCR] == ""
+    assert oid_cache[snmp_scan.OID_SYS_OBJ] == ""
 
 
-@pytest.mark.usefixtures("cache_oids")
-def test_snmp_scan_find_plugins__success(backend: SNMPBackend) -> None:
+def test_snmp_scan_find_plugins__success(
+    oid_cache: snmp_cache.SingleOIDCache, backend: SNMPBackend
+) -> None:
     sections = [(s.name, s.detect_spec) for s in agent_based_register.iter_all_snmp_sections()]
     found = snmp_scan._find_sections(
         sections,
+        oid_cache,
         on_error=OnError.RAISE,
         backend=backend,
     )
@@ -240,10 +244,11 @@ def test_snmp_scan_find_plugins__success(backend: SNMPBackend) -> None:
     assert len(sections) > len(found)
 
 
-@pytest.mark.usefixtures("cache_oids")
-def test_gather_available_raw_section_names_defaults(backend: SNMPBackend, tmp_path: Path) -> None:
-    assert snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_DESCR]
-    assert snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_OBJ]
+def test_gather_available_raw_section_names_defaults(
+    oid_cache: snmp_cache.SingleOIDCache, backend: SNMPBackend, tmp_path: Path
+) -> None:
+    assert oid_cache[snmp_scan.OID_SYS_DESCR]
+    assert oid_cache[snmp_scan.OID_SYS_OBJ]
 
     assert snmp_scan.gather_available_raw_section_names(
         [(s.name, s.detect_spec) for s in agent_based_register.iter_all_snmp_sections()],
@@ -251,6 +256,7 @@ def test_gather_available_raw_section_names_defaults(backend: SNMPBackend, tmp_p
             on_error=OnError.RAISE,
             missing_sys_description=False,
             oid_cache_dir=tmp_path,
+            oid_cache_ttl=3600,
         ),
         backend=backend,
     ) == {
@@ -258,3 +264,26 @@ def test_gather_available_raw_section_names_defaults(backend: SNMPBackend, tmp_p
         SectionName("snmp_info"),
         SectionName("snmp_uptime"),
     }
+
+
+def test_gather_available_raw_section_names_persists_oids(
+    backend: SNMPBackend, tmp_path: Path
+) -> None:
+    snmp_scan.gather_available_raw_section_names(
+        [(s.name, s.detect_spec) for s in agent_based_register.iter_all_snmp_sections()],
+        scan_config=snmp_scan.SNMPScanConfig(
+            on_error=OnError.RAISE,
+            missing_sys_description=True,
+            oid_cache_dir=tmp_path,
+            oid_cache_ttl=3600,
+        ),
+        backend=backend,
+    )
+
+    persisted = snmp_cache.SingleOIDCache.load(
+        tmp_path / f"{backend.config.hostname}.{backend.config.ipaddress}", ttl=3600
+    )
+    # The scan functions fetched their OIDs, but the faked sys description is not kept
+    assert persisted
+    assert snmp_scan.OID_SYS_DESCR not in persisted
+    assert snmp_scan.OID_SYS_OBJ not in persisted
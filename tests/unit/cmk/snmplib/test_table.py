@@ -262,3 +262,85 @@ def test_walk_raises_on_timeout_without_snmpv3_context_stop_on_timeout() -> None
         )
 
     assert type(excinfo.value) is SNMPContextTimeout  # pylint: disable=unidiomatic-typecheck
+
+
+def test_walks_stop_at_the_first_timed_out_column() -> None:
+    walked = []
+
+    class Backend(SNMPBackend):
+        def get(self, /, *args: object, **kw: object) -> NoReturn:
+            assert False
+
+        def walk(self, /, oid: str, *, context: str, **kw: object) -> list[tuple[str, bytes]]:
+            walked.append((oid, context))
+            if oid == ".1.2.3.2":
+                raise SNMPContextTimeout
+            return [(f"{oid}.{context}", context.encode())]
+
+    section_name = SectionName("section")
+    with pytest.raises(SNMPContextTimeout):
+        _snmp_table.get_snmpwalks(
+            section_name,
+            ".1.2.3",
+            [(".1.2.3.1", False), (".1.2.3.2", False), (".1.2.3.3", False)],
+            walk_cache={},
+            backend=Backend(
+                dataclasses.replace(
+                    SNMPConfig,
+                    snmp_version=SNMPVersion.V3,
+                    snmpv3_contexts=[
+                        SNMPContextConfig(
+                            section=section_name,
+                            contexts=["a", "b"],
+                            timeout_policy="stop",
+                        )
+                    ],
+                ),
+                logging.getLogger("test"),
+            ),
+            log=logger.debug,
+        )
+
+    assert walked == [(".1.2.3.1", "a"), (".1.2.3.2", "a")]
+
+
+def test_walks_skip_timed_out_contexts_per_column() -> None:
+    class Backend(SNMPBackend):
+        def get(self, /, *args: object, **kw: object) -> NoReturn:
+            assert False
+
+        def walk(self, /, oid: str, *, context: str, **kw: object) -> list[tuple[str, bytes]]:
+            if (oid, context) == (".1.2.3.2", "a"):
+                raise SNMPContextTimeout
+            if oid == ".1.2.3.3":
+                return []
+            return [(f"{oid}.{context}", context.encode())]
+
+    section_name = SectionName("section")
+    assert _snmp_table.get_snmpwalks(
+        section_name,
+        ".1.2.3",
+        [(".1.2.3.1", False), (".1.2.3.2", False), (".1.2.3.3", False)],
+        walk_cache={},
+        backend=Backend(
+            dataclasses.replace(
+                SNMPConfig,
+                snmp_version=SNMPVersion.V3,
+                snmpv3_contexts=[
+                    SNMPContextConfig(
+                        section=section_name,
+                        contexts=["a", "b"],
+                        timeout_policy="continue",
+                    )
+                ],
+            ),
+            logging.getLogger("test"),
+        ),
+        log=logger.debug,
+    ) == [
+        # The first column keeps the data of the context the second one timed out in,
+        # the empty third column did not time out.
+        [(".1.2.3.1.a", b"a"), (".1.2.3.1.b", b"b")],
+        [(".1.2.3.2.b", b"b")],
+        [],
+    ]
@@ -6,12 +6,16 @@
 # pylint: disable=protected-access
 
 import pprint
+from collections.abc import Iterator
+
+import pytest
 
 import cmk.utils.log
 import cmk.utils.paths
 from cmk.utils.hostaddress import HostAddress
 
 from cmk import piggyback
+from cmk.piggyback import _storage
 
 _TEST_HOST_NAME = HostAddress("test-host")
 
@@ -23,6 +27,18 @@ _PAYLOAD = (
 _REF_TIME = 1640000000.0
 
 
+@pytest.fixture(autouse=True, params=["files", "indexed"])
+def storage(request: pytest.FixtureRequest) -> Iterator[str]:
+    if request.param != "files":
+        site_conf = cmk.utils.paths.omd_root / "etc/omd/site.conf"
+        site_conf.parent.mkdir(parents=True, exist_ok=True)
+        site_conf.write_text(f"CONFIG_PIGGYBACK_STORAGE='{request.param}'\n")
+    # The storage is looked up once per omd_root
+    _storage._indexed_store.cache_clear()
+    yield request.param
+    _storage._indexed_store.cache_clear()
+
+
 def _get_only_raw_data_element(host_name: HostAddress) -> piggyback.PiggybackMessage:
     first, *other = piggyback.get_piggyback_raw_data(host_name, cmk.utils.paths.omd_root)
     assert not other
@@ -180,3 +196,42 @@ def test_get_source_and_piggyback_hosts() -> None:
             ),
         ],
     }
+
+
+def test_cleanup_piggyback_files() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source1"), {_TEST_HOST_NAME: _PAYLOAD}, _REF_TIME, cmk.utils.paths.omd_root
+    )
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source2"),
+        {_TEST_HOST_NAME: _PAYLOAD},
+        _REF_TIME + 10,
+        cmk.utils.paths.omd_root,
+    )
+
+    piggyback.cleanup_piggyback_files(_REF_TIME + 5, cmk.utils.paths.omd_root)
+
+    assert [
+        m.meta for m in piggyback.get_piggyback_raw_data(_TEST_HOST_NAME, cmk.utils.paths.omd_root)
+    ] == [
+        piggyback.PiggybackMetaData(
+            source=HostAddress("source2"),
+            piggybacked=_TEST_HOST_NAME,
+            last_update=int(_REF_TIME + 10),
+            last_contact=int(_REF_TIME + 10),
+        )
+    ]
+    assert not piggyback.remove_source_status_file(HostAddress("source1"), cmk.utils.paths.omd_root)
+
+
+def test_move_for_host_rename() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source1"), {_TEST_HOST_NAME: _PAYLOAD}, _REF_TIME, cmk.utils.paths.omd_root
+    )
+
+    piggyback.move_for_host_rename(cmk.utils.paths.omd_root, _TEST_HOST_NAME, "new-host")
+
+    assert not piggyback.get_piggyback_raw_data(_TEST_HOST_NAME, cmk.utils.paths.omd_root)
+    assert _get_only_raw_data_element(HostAddress("new-host")).raw_data == b"%s\n" % b"\n".join(
+        _PAYLOAD
+    )
@@ -3,8 +3,13 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
 
-from cmk.utils.prediction import estimate_levels
+from cmk.utils.prediction import estimate_levels, make_updated_predictions, PredictionStore
+
+from cmk.agent_based.prediction_backend import PredictionInfo, PredictionParameters
 
 
 def test_estimate_levels_absolute() -> None:
@@ -45,3 +50,37 @@ def test_estimate_levels_lower_ubound() -> None:
     )
 
     assert estimate_levels(42.0, 1.0, "lower", ("stdev", (2.3, 3.2)), (38.5, 50.0)) == (38.5, 38.8)
+
+
+@dataclass(frozen=True)
+class _Record:
+    window: range
+    values: Sequence[float | None]
+
+
+def test_make_updated_predictions_fetches_once(tmp_path: Path) -> None:
+    now = 1700000000
+    store = PredictionStore(tmp_path)
+    params = PredictionParameters(period="hour", horizon=3, levels=("absolute", (1, 2)))
+    for direction in ("upper", "lower"):
+        meta = PredictionInfo.make("util", direction, params, now)
+        info_path = Path(store.meta_file_path_template.format(meta=meta))
+        info_path.parent.mkdir(parents=True, exist_ok=True)
+        info_path.write_text(meta.model_dump_json())
+
+    fetched: list[Sequence[tuple[str, int, int]]] = []
+
+    def get_recorded_data(requests: Sequence[tuple[str, int, int]]) -> Sequence[_Record]:
+        fetched.append(requests)
+        return [
+            _Record(range(start, end, 600), [42.0] * len(range(start, end, 600)))
+            for _metric, start, end in requests
+        ]
+
+    predictions = make_updated_predictions(store, get_recorded_data, now)
+    assert [len(requests) for requests in fetched] == [3]
+    assert {metric for requests in fetched for metric, _start, _end in requests} == {"util.max"}
+    assert sorted(predictions.values()) == [(42.0, (41.0, 40.0)), (42.0, (43.0, 44.0))]
+
+    assert make_updated_predictions(store, get_recorded_data, now) == predictions
+    assert len(fetched) == 1
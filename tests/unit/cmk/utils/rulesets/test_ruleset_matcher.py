@@ -15,6 +15,7 @@ from tests.testlib.base import Scenario
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.rulesets.ruleset_matcher import (
+    HostBitmapIndex,
     LabelManager,
     matches_tag_condition,
     RuleConditionsSpec,
@@ -859,3 +860,261 @@ def test_matches_tag_condition(
         )
         is expected_result
     )
+
+
+host_index_ruleset: Sequence[RuleSpec[str]] = [
+    {"id": "01", "value": "all", "condition": {}},
+    {"id": "03", "value": "explicit", "condition": {"host_name": ["host1", "unknown"]}},
+    {"id": "04", "value": "regex", "condition": {"host_name": [{"$regex": "host[12]"}]}},
+    {"id": "05", "value": "negated", "condition": {"host_name": {"$nor": ["host1", "host3"]}}},
+    {"id": "06", "value": "folder", "condition": {"host_folder": "/lvl1/"}},
+    {"id": "07", "value": "tag", "condition": {"host_tags": {TagGroupID("net"): TagID("lan")}}},
+    {
+        "id": "08",
+        "value": "tag_ne",
+        "condition": {"host_tags": {TagGroupID("net"): {"$ne": TagID("lan")}}},
+    },
+    {
+        "id": "09",
+        "value": "tag_or",
+        "condition": {"host_tags": {TagGroupID("net"): {"$or": [TagID("lan"), TagID("dmz")]}}},
+    },
+    {
+        "id": "10",
+        "value": "tag_nor",
+        "condition": {"host_tags": {TagGroupID("net"): {"$nor": [TagID("lan"), TagID("dmz")]}}},
+    },
+    {
+        "id": "11",
+        "value": "label",
+        "condition": {"host_label_groups": [("and", [("and", "os:linux"), ("not", "hu:ha")])]},
+    },
+    {
+        "id": "12",
+        "value": "label_or",
+        "condition": {
+            "host_label_groups": [("and", [("and", "os:windows")]), ("or", [("and", "hu:ha")])]
+        },
+    },
+    {
+        "id": "13",
+        "value": "combined",
+        "condition": {
+            "host_name": [{"$regex": "host"}],
+            "host_tags": {TagGroupID("net"): TagID("wan")},
+            "host_label_groups": [("and", [("and", "os:linux")])],
+            "host_folder": "/lvl1/",
+        },
+    },
+    {"id": "14", "value": "disabled", "condition": {}, "options": {"disabled": True}},
+]
+
+
+def _make_host_index_matcher(host_index: bool) -> RulesetMatcher:
+    return RulesetMatcher(
+        host_tags={
+            HostName("host1"): {TagGroupID("net"): TagID("lan")},
+            HostName("host2"): {TagGroupID("net"): TagID("wan")},
+            HostName("host3"): {TagGroupID("net"): TagID("dmz")},
+            HostName("other"): {TagGroupID("net"): TagID("wan")},
+        },
+        host_paths={
+            HostName("host2"): "/lvl1/hosts.mk",
+            HostName("other"): "/lvl1/lvl2/hosts.mk",
+        },
+        label_manager=LabelManager(
+            explicit_host_labels={
+                HostName("host1"): {"os": "linux", "hu": "ha"},
+                HostName("host2"): {"os": "linux"},
+                HostName("other"): {"os": "windows"},
+            },
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=[
+            HostName("host1"),
+            HostName("host2"),
+            HostName("host3"),
+            HostName("other"),
+        ],
+        clusters_of={},
+        nodes_of={},
+        host_index=host_index,
+    )
+
+
+@pytest.mark.parametrize(
+    "hostname, expected_result",
+    [
+        (HostName("host1"), ["all", "explicit", "regex", "tag", "tag_or", "label_or"]),
+        (
+            HostName("host2"),
+            ["all", "regex", "negated", "folder", "tag_ne", "tag_nor", "label", "combined"],
+        ),
+        (HostName("host3"), ["all", "tag_ne", "tag_or"]),
+        (HostName("other"), ["all", "negated", "folder", "tag_ne", "tag_nor", "label_or"]),
+    ],
+)
+@pytest.mark.parametrize("host_index", [False, True])
+def test_ruleset_matcher_get_host_values_host_index(
+    hostname: HostName, expected_result: Sequence[str], host_index: bool
+) -> None:
+    matcher = _make_host_index_matcher(host_index)
+    assert list(matcher.get_host_values(hostname, ruleset=host_index_ruleset)) == expected_result
+
+
+def test_ruleset_matcher_host_index_processed_hosts() -> None:
+    matcher = _make_host_index_matcher(host_index=True)
+    matcher.ruleset_optimizer.set_all_processed_hosts([HostName("host1")])
+
+    assert list(matcher.get_host_values(HostName("host1"), ruleset=host_index_ruleset)) == [
+        "all",
+        "explicit",
+        "regex",
+        "tag",
+        "tag_or",
+        "label_or",
+    ]
+    assert matcher.ruleset_optimizer._all_matching_hosts({}, with_foreign_hosts=False) == {
+        HostName("host1")
+    }
+    assert len(matcher.ruleset_optimizer._all_matching_hosts({}, with_foreign_hosts=True)) == 4
+
+
+def test_host_bitmap_index_round_trip() -> None:
+    hosts = [HostName(f"host{i}") for i in range(20)]
+    index = HostBitmapIndex(hosts, {}, {}, lambda hostname: {})
+    selection = {hosts[0], hosts[7], hosts[8], hosts[19]}
+
+    assert index.bitmap(selection) == 0b1000_0000_0001_1000_0001
+    assert set(index.hosts(index.bitmap(selection))) == selection
+    assert not list(index.hosts(0))
+    assert list(index.hosts(index.all_hosts)) == hosts
+
+
+service_batch_ruleset: Sequence[RuleSpec[str]] = [
+    {"id": "01", "value": "all", "condition": {}},
+    {
+        "id": "02",
+        "value": "interfaces",
+        "condition": {"service_description": [{"$regex": "Interface "}]},
+    },
+    {
+        "id": "03",
+        "value": "interface_1x",
+        "condition": {"service_description": [{"$regex": "Interface 1[0-9]$"}]},
+    },
+    {
+        "id": "04",
+        "value": "not_interfaces",
+        "condition": {"service_description": {"$nor": [{"$regex": "Interface"}]}},
+    },
+    {
+        "id": "05",
+        "value": "cpu_or_memory",
+        "condition": {"service_description": [{"$regex": "CPU|Memory"}]},
+    },
+    {
+        "id": "06",
+        "value": "case_insensitive",
+        "condition": {"service_description": [{"$regex": "(?i)cpu"}]},
+    },
+    {
+        "id": "07",
+        "value": "labeled_interfaces",
+        "condition": {
+            "service_description": [{"$regex": "Interface"}],
+            "service_label_groups": [("and", [("and", "speed:fast")])],
+        },
+    },
+    {
+        "id": "08",
+        "value": "other_host",
+        "condition": {"host_name": ["host2"]},
+    },
+    {"id": "09", "value": "disabled", "condition": {}, "options": {"disabled": True}},
+]
+
+
+def test_get_service_ruleset_values_of_services() -> None:
+    matcher = RulesetMatcher(
+        host_tags={HostName("host1"): {}, HostName("host2"): {}},
+        host_paths={},
+        label_manager=LabelManager(
+            explicit_host_labels={},
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda host_name, description: (
+                {"speed": "fast"} if description == "Interface 11" else {}
+            ),
+        ),
+        all_configured_hosts=[HostName("host1"), HostName("host2")],
+        clusters_of={},
+        nodes_of={},
+    )
+    descriptions = [
+        ServiceName(d)
+        for d in ("Interface 1", "Interface 11", "Interface 111", "CPU load", "Memory", "Uptime")
+    ]
+
+    values = matcher.get_service_ruleset_values_of_services(
+        HostName("host1"), descriptions, service_batch_ruleset
+    )
+
+    assert values == {
+        description: matcher.service_extra_conf(
+            HostName("host1"), description, service_batch_ruleset
+        )
+        for description in descriptions
+    }
+    assert values[ServiceName("Interface 11")] == [
+        "all",
+        "interfaces",
+        "interface_1x",
+        "labeled_interfaces",
+    ]
+    assert values[ServiceName("CPU load")] == [
+        "all",
+        "not_interfaces",
+        "cpu_or_memory",
+        "case_insensitive",
+    ]
+
+
+def _make_service_matcher(cache_size: int | None) -> RulesetMatcher:
+    hosts = [HostName("host1"), HostName("host2")]
+    return RulesetMatcher(
+        host_tags={hostname: {} for hostname in hosts},
+        host_paths={},
+        label_manager=LabelManager(
+            explicit_host_labels={},
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=hosts,
+        clusters_of={},
+        nodes_of={},
+        cache_size=cache_size,
+    )
+
+
+def test_ruleset_matcher_cache_size() -> None:
+    bounded = _make_service_matcher(cache_size=2)
+    unbounded = _make_service_matcher(cache_size=None)
+    descriptions = [ServiceName(f"Interface {i}") for i in range(5)]
+
+    for _round in range(2):
+        for description in descriptions:
+            assert bounded.service_extra_conf(
+                HostName("host1"), description, service_batch_ruleset
+            ) == unbounded.service_extra_conf(HostName("host1"), description, service_batch_ruleset)
+
+    bounded_stats = bounded.cache_stats()
+    assert all(s.size <= 2 for s in bounded_stats.values())
+    assert bounded_stats["service_match"].evictions > 0
+
+    unbounded_stats = unbounded.cache_stats()
+    assert unbounded_stats["service_match"].evictions == 0
+    assert unbounded_stats["service_match"].hit_ratio == 0.5
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# pylint: disable=protected-access
+
+from collections.abc import Sequence
+from pathlib import Path
+
+import pytest
+
+from cmk.utils.hostaddress import HostName
+from cmk.utils.rulesets import ruleset_matcher
+from cmk.utils.rulesets.ruleset_matcher import LabelManager, RulesetMatcher, RuleSpec
+from cmk.utils.rulesets.ruleset_matching_store import (
+    compute_config_hash,
+    condition_key,
+    RulesetMatchStore,
+    save_ruleset_match_store,
+)
+from cmk.utils.tags import TagGroupID, TagID
+
+_HOSTS = [HostName(f"host{i}") for i in range(100)]
+
+
+def test_save_and_open_store(tmp_path: Path) -> None:
+    config_hash = compute_config_hash(["config"], tmp_path / "labels")
+    save_ruleset_match_store(
+        tmp_path,
+        config_hash,
+        _HOSTS,
+        {
+            condition_key("sparse"): [_HOSTS[3], _HOSTS[99]],
+            condition_key("dense"): _HOSTS[::2],
+            condition_key("empty"): [],
+        },
+    )
+
+    store = RulesetMatchStore.open(tmp_path, config_hash)
+    assert store is not None
+    assert len(store) == 3
+    assert store.get(condition_key("sparse")) == [_HOSTS[3], _HOSTS[99]]
+    assert store.get(condition_key("dense")) == _HOSTS[::2]
+    assert store.get(condition_key("empty")) == []
+    assert store.get(condition_key("unknown")) is None
+
+
+def test_save_keeps_stored_conditions(tmp_path: Path) -> None:
+    config_hash = compute_config_hash(["config"], tmp_path / "labels")
+    save_ruleset_match_store(
+        tmp_path,
+        config_hash,
+        _HOSTS,
+        {condition_key("first"): [_HOSTS[1]], condition_key("both"): [_HOSTS[2]]},
+    )
+    save_ruleset_match_store(
+        tmp_path,
+        config_hash,
+        list(reversed(_HOSTS)),
+        {condition_key("second"): [_HOSTS[3]], condition_key("both"): [_HOSTS[4]]},
+    )
+
+    store = RulesetMatchStore.open(tmp_path, config_hash)
+    assert store is not None
+    assert store.get(condition_key("first")) == [_HOSTS[1]]
+    assert store.get(condition_key("second")) == [_HOSTS[3]]
+    assert store.get(condition_key("both")) == [_HOSTS[4]]
+    store.close()
+
+
+def test_save_drops_outdated_stores(tmp_path: Path) -> None:
+    old_hash = compute_config_hash(["old"], tmp_path / "labels")
+    new_hash = compute_config_hash(["new"], tmp_path / "labels")
+    save_ruleset_match_store(tmp_path, old_hash, _HOSTS, {})
+    save_ruleset_match_store(tmp_path, new_hash, _HOSTS, {})
+
+    assert RulesetMatchStore.open(tmp_path, old_hash) is None
+    assert RulesetMatchStore.open(tmp_path, new_hash) is not None
+
+
+def test_config_hash_tracks_discovered_labels(tmp_path: Path) -> None:
+    labels_dir = tmp_path / "labels"
+    labels_dir.mkdir()
+    before = compute_config_hash(["config"], labels_dir)
+    (labels_dir / "host1.mk").write_text("{'os': {'value': 'linux', 'plugin_name': None}}")
+
+    assert compute_config_hash(["config"], labels_dir) != before
+
+
+_RULESET: Sequence[RuleSpec[str]] = [
+    {"id": "1", "value": "lan", "condition": {"host_tags": {TagGroupID("net"): TagID("lan")}}},
+    {"id": "2", "value": "host1", "condition": {"host_name": ["host1"]}},
+]
+
+
+def _make_matcher() -> RulesetMatcher:
+    return RulesetMatcher(
+        host_tags={
+            HostName("host1"): {TagGroupID("net"): TagID("lan")},
+            HostName("host2"): {TagGroupID("net"): TagID("wan")},
+        },
+        host_paths={},
+        label_manager=LabelManager(
+            explicit_host_labels={},
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=[HostName("host1"), HostName("host2")],
+        clusters_of={},
+        nodes_of={},
+    )
+
+
+def test_ruleset_matcher_reuses_match_store(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    writer = _make_matcher()
+    assert not writer.load_match_store(tmp_path)
+    assert writer.get_host_values(HostName("host1"), _RULESET) == ["lan", "host1"]
+    writer.save_match_store(tmp_path)
+
+    def _no_matching(*args: object, **kwargs: object) -> bool:
+        raise AssertionError("host matching should have been skipped")
+
+    monkeypatch.setattr(ruleset_matcher, "matches_host_tags", _no_matching)
+    monkeypatch.setattr(ruleset_matcher, "matches_host_name", _no_matching)
+
+    reader = _make_matcher()
+    assert reader.load_match_store(tmp_path)
+    reader.ruleset_optimizer.set_all_processed_hosts([HostName("host2")])
+    assert reader.get_host_values(HostName("host1"), _RULESET) == ["lan", "host1"]
+    assert reader.get_host_values(HostName("host2"), _RULESET) == []
+
+
+def test_ruleset_matcher_ignores_store_of_other_config(tmp_path: Path) -> None:
+    writer = _make_matcher()
+    writer.load_match_store(tmp_path)
+    writer.get_host_values(HostName("host1"), _RULESET)
+    writer.save_match_store(tmp_path)
+
+    reader = RulesetMatcher(
+        host_tags={HostName("host1"): {TagGroupID("net"): TagID("wan")}},
+        host_paths={},
+        label_manager=LabelManager(
+            explicit_host_labels={},
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=[HostName("host1")],
+        clusters_of={},
+        nodes_of={},
+    )
+    assert not reader.load_match_store(tmp_path)
+    assert reader.get_host_values(HostName("host1"), _RULESET) == ["host1"]
@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import gzip
+import os
 import shutil
 from collections.abc import Iterable, Mapping, Sequence
 from pathlib import Path
@@ -29,6 +30,8 @@ from cmk.utils.structured_data import (
     SDNodeName,
     SDPath,
     SDRetentionFilterChoices,
+    TreeArchive,
+    TreeOrArchiveStore,
     TreeStore,
     UpdateResult,
 )
@@ -914,6 +917,127 @@ def test_save_tree(tmp_path: Path) -> None:
         f.read()
 
 
+def test_save_and_load_binary_tree(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(
+        path=(SDNodeName("path-to"), SDNodeName("node")), pairs=[{SDKey("foo"): 1, SDKey("bär"): 2}]
+    )
+    tree.add(
+        path=(SDNodeName("path-to"), SDNodeName("table")),
+        key_columns=[SDKey("name")],
+        rows=[{SDKey("name"): "a", SDKey("size"): 1.5}, {SDKey("name"): "b", SDKey("size"): None}],
+    )
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=host_name, tree=tree)
+
+    assert (tmp_path / "inventory" / "heute.bin").exists()
+    loaded_tree = tree_store.load(host_name=host_name)
+    assert loaded_tree.get_rows((SDNodeName("path-to"), SDNodeName("table"))) == [
+        {"name": "a", "size": 1.5},
+        {"name": "b", "size": None},
+    ]
+    assert loaded_tree.get_tree((SDNodeName("path-to"), SDNodeName("node"))).path == (
+        SDNodeName("path-to"),
+        SDNodeName("node"),
+    )
+    assert loaded_tree == tree
+
+
+def test_load_ignores_outdated_binary_tree(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(path=(SDNodeName("node"),), pairs=[{SDKey("foo"): 1}])
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=host_name, tree=tree)
+
+    tree_file = tmp_path / "inventory" / "heute"
+    tree_file.write_text(repr({"Attributes": {}, "Table": {}, "Nodes": {}}))
+    binary_file = tmp_path / "inventory" / "heute.bin"
+    mtime = binary_file.stat().st_mtime
+    os.utime(tree_file, (mtime + 1, mtime + 1))
+
+    assert not tree_store.load(host_name=host_name)
+
+
+def _make_archived_tree(nr: int) -> MutableTree:
+    tree = MutableTree()
+    tree.add(path=(SDNodeName("hardware"),), pairs=[{SDKey("nr"): nr, SDKey("fixed"): "x"}])
+    tree.add(
+        path=(SDNodeName("software"), SDNodeName("packages")),
+        key_columns=[SDKey("name")],
+        rows=[{SDKey("name"): f"p{n}", SDKey("version"): nr // 3} for n in range(nr % 4, 10)],
+    )
+    if nr % 5:
+        tree.add(path=(SDNodeName("networking"),), pairs=[{SDKey("count"): nr % 5}])
+    tree.attributes.retentions = {SDKey("nr"): RetentionInterval(nr, 1, 2, "current")}
+    return tree
+
+
+def test_archive_delta_chain(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    trees = [_make_archived_tree(nr) for nr in range(23)]
+    for nr, tree in enumerate(trees):
+        tree_or_archive_store.save(host_name=host_name, tree=tree)
+        os.utime(tmp_path / "inventory" / "heute", (1000 + nr, 1000 + nr))
+        tree_or_archive_store.archive(host_name=host_name)
+
+    tree_archive = tree_or_archive_store.tree_archive(host_name=host_name)
+    filepaths = tree_archive.filepaths()
+    assert [fp.name for fp in filepaths if not tree_archive.is_delta(fp)] == [
+        "1009",
+        "1019",
+        "1022",
+    ]
+    assert [tree_archive.timestamp(fp) for fp in filepaths] == list(range(1000, 1023))
+
+    loaded_trees = [tree_archive.load(fp) for fp in filepaths]
+    assert loaded_trees == trees
+    assert [t.attributes.retentions for t in loaded_trees] == [
+        t.attributes.retentions for t in trees
+    ]
+    # Loading a single tree of the chain
+    assert TreeArchive(tmp_path / "archive" / "heute").load(filepaths[15]) == trees[15]
+    assert tree_or_archive_store.load_previous(host_name=host_name) == trees[-1]
+
+
+def test_archive_with_corrupted_delta(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    for nr in range(3):
+        tree_or_archive_store.save(host_name=host_name, tree=_make_archived_tree(nr))
+        os.utime(tmp_path / "inventory" / "heute", (1000 + nr, 1000 + nr))
+        tree_or_archive_store.archive(host_name=host_name)
+    (tmp_path / "archive" / "heute" / "1001.delta").write_text("{")
+
+    tree_archive = tree_or_archive_store.tree_archive(host_name=host_name)
+    assert [fp.name for fp in tree_archive.filepaths()] == ["1000.delta", "1001.delta", "1002"]
+    with pytest.raises(SyntaxError):
+        tree_archive.load(tmp_path / "archive" / "heute" / "1000.delta")
+    assert tree_or_archive_store.load_previous(host_name=host_name) == _make_archived_tree(2)
+
+
+def test_archive_cleanup_of_oldest_files(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    trees = [_make_archived_tree(nr) for nr in range(13)]
+    for nr, tree in enumerate(trees):
+        tree_or_archive_store.save(host_name=host_name, tree=tree)
+        os.utime(tmp_path / "inventory" / "heute", (1000 + nr, 1000 + nr))
+        tree_or_archive_store.archive(host_name=host_name)
+
+    filepaths = tree_or_archive_store.tree_archive(host_name=host_name).filepaths()
+    # The ages of the files are the archive times of their trees
+    assert [int(fp.stat().st_mtime) for fp in filepaths] == list(range(1000, 1013))
+
+    # Delete the oldest files first, like the diskspace cleanup does
+    for nr, filepath in enumerate(filepaths):
+        filepath.unlink()
+        tree_archive = TreeArchive(tmp_path / "archive" / "heute")
+        assert [tree_archive.load(fp) for fp in tree_archive.filepaths()] == trees[nr + 1 :]
+
+
 @pytest.mark.parametrize(
     "tree_name",
     [
@@ -3,6 +3,10 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import contextlib
+
+import pytest
+
 import cmk.utils.caching
 
 
@@ -45,3 +49,43 @@ def test_populated() -> None:
     assert cache.is_populated()
     cache.clear()
     assert not cache.is_populated()
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache = cmk.utils.caching.LRUCache[str, int](maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+
+    cache["c"] = 3
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 0, 1)
+
+
+def test_lru_cache_counts_misses() -> None:
+    cache = cmk.utils.caching.LRUCache[str, int]()
+    with pytest.raises(KeyError):
+        _ = cache["a"]
+    assert cache.setdefault("a", 1) == 1
+    assert cache.setdefault("a", 2) == 1
+    assert (cache.hits, cache.misses, cache.evictions) == (0, 1, 0)
+
+
+def test_lru_cache_stats_of_lookup_then_setdefault() -> None:
+    cache = cmk.utils.caching.LRUCache[int, str]()
+
+    def get(key: int) -> str:
+        with contextlib.suppress(KeyError):
+            return cache[key]
+        return cache.setdefault(key, str(key))
+
+    assert [get(1), get(1), get(2)] == ["1", "1", "2"]
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 2, 0)
+
+
+def test_lru_cache_invalid_size() -> None:
+    with pytest.raises(ValueError):
+        cmk.utils.caching.LRUCache[str, int](maxsize=0)
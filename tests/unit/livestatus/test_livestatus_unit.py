@@ -8,10 +8,13 @@
 # pylint: disable=redefined-outer-name
 
 import errno
+import itertools
 import socket
 import ssl
+import threading
+import time
 from collections.abc import Sequence
-from contextlib import closing
+from contextlib import closing, suppress
 from pathlib import Path
 
 import pytest
@@ -117,6 +120,277 @@ def test_livestatus_local_connection(sock_path: Path) -> None:
     assert isinstance(live, livestatus.SingleSiteConnection)
 
 
+def _serve_response(
+    sock_path: Path,
+    rows: Sequence[Sequence[object]],
+    delay: float,
+    content_delay: float = 0.0,
+) -> list[bytes]:
+    """Answer the query of the first connection, the queries of all connections are recorded"""
+    server = socket.socket(socket.AF_UNIX)
+    server.bind(str(sock_path))
+    server.listen(1)
+    queries: list[bytes] = []
+
+    def handle(conn: socket.socket, answer: bool) -> None:
+        with conn:
+            query = b""
+            while not query.endswith(b"\n\n"):
+                if not (packet := conn.recv(4096)):
+                    return
+                query += packet
+            queries.append(query)
+            if not answer:
+                return
+            time.sleep(delay)
+            # Like livestatus: One row per line
+            data = ("[" + ",\n".join(repr(row) for row in rows) + "]\n").encode("utf-8")
+            with suppress(OSError):
+                conn.sendall(b"200 %11d\n" % len(data))
+                time.sleep(content_delay)
+                conn.sendall(data)
+
+    def serve() -> None:
+        with server:
+            for nr in itertools.count():
+                conn = server.accept()[0]
+                threading.Thread(target=handle, args=(conn, nr == 0), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return queries
+
+
+def _multisite_connection(
+    tmp_path: Path, delays: dict[str, float]
+) -> livestatus.MultiSiteConnection:
+    sites = {}
+    for site_id, delay in delays.items():
+        _serve_response(tmp_path / site_id, [[f"{site_id}-host"]], delay)
+        sites[livestatus.SiteId(site_id)] = livestatus.SiteConfiguration(
+            socket=f"unix:{tmp_path / site_id}"
+        )
+    live = livestatus.MultiSiteConnection(livestatus.SiteConfigurations(sites))
+    live.set_prepend_site(True)
+    return live
+
+
+def test_multisite_connection_receives_all_sites(tmp_path: Path) -> None:
+    live = _multisite_connection(tmp_path, {"slow": 0.2, "fast": 0.0, "other": 0.1})
+
+    # In the order of the sites, not of their responses
+    assert live.query("GET hosts\nColumns: name") == [
+        ["slow", "slow-host"],
+        ["fast", "fast-host"],
+        ["other", "other-host"],
+    ]
+    assert live.alive_sites() == ["slow", "fast", "other"]
+    assert not live.dead_sites()
+    assert not live.late_sites
+
+
+def test_multisite_connection_content_timeout(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("cmk.livestatus_client._CONTENT_TIMEOUT", 0.3)
+    _serve_response(tmp_path / "stalled", [["stalled-host"]], 0.0, content_delay=5.0)
+    _serve_response(tmp_path / "fast", [["fast-host"]], 0.0)
+    live = livestatus.MultiSiteConnection(
+        livestatus.SiteConfigurations(
+            {
+                livestatus.SiteId(site_id): livestatus.SiteConfiguration(
+                    socket=f"unix:{tmp_path / site_id}"
+                )
+                for site_id in ("stalled", "fast")
+            }
+        )
+    )
+
+    assert live.query("GET hosts\nColumns: name") == [["fast-host"]]
+    assert list(live.dead_sites()) == ["stalled"]
+    assert "0.3s while reading data" in str(live.dead_sites()["stalled"]["exception"])
+    assert live.alive_sites() == ["fast"]
+
+
+def test_multisite_connection_site_slower_than_timeout(tmp_path: Path) -> None:
+    queries = _serve_response(tmp_path / "slow", [["slow-host"]], 1.5)
+    live = livestatus.MultiSiteConnection(
+        livestatus.SiteConfigurations(
+            {
+                # The connect timeout does not limit the time to compute the response
+                livestatus.SiteId("slow"): livestatus.SiteConfiguration(
+                    socket=f"unix:{tmp_path / 'slow'}", timeout=1
+                )
+            }
+        )
+    )
+
+    assert live.query("GET hosts\nColumns: name") == [["slow-host"]]
+    assert not live.dead_sites()
+    assert len(queries) == 1
+
+
+def test_multisite_connection_response_deadline(tmp_path: Path) -> None:
+    live = _multisite_connection(tmp_path, {"slow": 5.0, "fast": 0.0})
+    live.set_response_deadline(0.5)
+
+    assert live.query("GET hosts\nColumns: name") == [["fast", "fast-host"]]
+    assert live.late_sites == {"slow"}
+    assert not live.dead_sites()
+    assert sorted(live.alive_sites()) == ["fast", "slow"]
+
+
+def test_multisite_connection_query_cache(tmp_path: Path) -> None:
+    live = _multisite_connection(tmp_path, {"site1": 0.0, "site2": 0.0})
+    live.set_query_cache(livestatus.QueryCache(ttl=60))
+
+    assert sorted(live.query("GET hosts\nColumns: name")) == [
+        ["site1", "site1-host"],
+        ["site2", "site2-host"],
+    ]
+    # The sites answer only one query
+    assert sorted(live.query("GET hosts\nColumns: name")) == [
+        ["site1", "site1-host"],
+        ["site2", "site2-host"],
+    ]
+    assert not live.dead_sites()
+    assert live.query_cache_stats == livestatus.QueryCacheStats(hits=2, misses=2)
+
+
+def test_query_cache_generation() -> None:
+    query_cache = livestatus.QueryCache(ttl=60)
+    site_id = livestatus.SiteId("site")
+    key = (site_id, "AuthUser: hh\n", "GET hosts\nColumns: name\n")
+    query_cache.set_generation(site_id, (1700000000, 4711))
+    query_cache.put(key, livestatus.LivestatusResponse([livestatus.LivestatusRow(["host"])]))
+
+    response = query_cache.get(key)
+    assert response == [["host"]]
+    assert response is not None
+    response[0].insert(0, site_id)
+    assert query_cache.get(key) == [["host"]]
+
+    query_cache.set_generation(site_id, (1700000000, 4711))
+    assert query_cache.get(key) == [["host"]]
+
+    query_cache.set_generation(site_id, (1700000100, 4711))
+    assert query_cache.get(key) is None
+
+
+def test_query_cache_size() -> None:
+    query_cache = livestatus.QueryCache(ttl=60, max_rows=5, max_response_rows=3)
+    site_id = livestatus.SiteId("site")
+
+    def response(rows: int) -> livestatus.LivestatusResponse:
+        return livestatus.LivestatusResponse(
+            [livestatus.LivestatusRow([f"host{nr}"]) for nr in range(rows)]
+        )
+
+    for nr in range(3):
+        query_cache.put((site_id, "", f"query{nr}"), response(2))
+    # Too large to be cached
+    query_cache.put((site_id, "", "query3"), response(4))
+
+    assert query_cache.get((site_id, "", "query0")) is None
+    assert query_cache.get((site_id, "", "query1")) == response(2)
+    assert query_cache.get((site_id, "", "query2")) == response(2)
+    assert query_cache.get((site_id, "", "query3")) is None
+
+
+def test_single_site_connection_iter_query(tmp_path: Path) -> None:
+    rows = [[f"host{nr}", "äöü\n", nr] for nr in range(20000)]
+    _serve_response(tmp_path / "live", rows, 0.0)
+    live = livestatus.SingleSiteConnection(f"unix:{tmp_path / 'live'}")
+
+    assert list(live.iter_query("GET hosts\nColumns: name alias state")) == rows
+
+
+def test_single_site_connection_iter_query_stopped(tmp_path: Path) -> None:
+    _serve_response(tmp_path / "live", [[f"host{nr}"] for nr in range(20000)], 0.0)
+    live = livestatus.SingleSiteConnection(f"unix:{tmp_path / 'live'}")
+
+    with closing(live.iter_query("GET hosts\nColumns: name")) as rows:
+        assert next(rows) == ["host0"]
+    # The rest of the response has been dropped
+    assert live.socket is None
+
+
+def _serve_responses(sock_path: Path, responses: Sequence[bytes | None]) -> None:
+    """Answer one query per connection, None closes the connection instead"""
+    server = socket.socket(socket.AF_UNIX)
+    server.bind(str(sock_path))
+    server.listen(1)
+
+    def serve() -> None:
+        with server:
+            for response in responses:
+                with server.accept()[0] as conn:
+                    query = b""
+                    while not query.endswith(b"\n\n"):
+                        query += conn.recv(4096)
+                    if response is not None:
+                        conn.sendall(
+                            b"%s %11d\n%s" % (response[:3], len(response) - 4, response[4:])
+                        )
+
+    threading.Thread(target=serve, daemon=True).start()
+
+
+@pytest.mark.parametrize(
+    "suppress_exceptions, expected_exception",
+    [
+        ((livestatus.MKLivestatusTableNotFoundError,), livestatus.MKLivestatusTableNotFoundError),
+        ((), livestatus.MKLivestatusSocketError),
+    ],
+)
+def test_single_site_connection_iter_query_error(
+    tmp_path: Path,
+    suppress_exceptions: tuple[type[Exception], ...],
+    expected_exception: type[Exception],
+) -> None:
+    _serve_responses(tmp_path / "live", [b"404 Table 'eventconsoleevents' does not exist"])
+    live = livestatus.SingleSiteConnection(f"unix:{tmp_path / 'live'}")
+
+    with pytest.raises(expected_exception):
+        list(live.iter_query(livestatus.Query("GET eventconsoleevents\n", suppress_exceptions)))
+
+
+def test_single_site_connection_iter_query_reconnects(tmp_path: Path) -> None:
+    # The persisted connection has been closed by the site in the meantime
+    _serve_responses(tmp_path / "live", [None, b'200 [["host1"],\n["host2"]]\n'])
+    live = livestatus.SingleSiteConnection(f"unix:{tmp_path / 'live'}", persist=True)
+
+    try:
+        assert list(live.iter_query("GET hosts\nColumns: name")) == [["host1"], ["host2"]]
+    finally:
+        live.disconnect()
+
+
+@pytest.mark.parametrize("iterate", [False, True])
+def test_single_site_connection_slower_than_timeout(tmp_path: Path, iterate: bool) -> None:
+    queries = _serve_response(tmp_path / "live", [["host1"]], 1.5)
+    live = livestatus.SingleSiteConnection(f"unix:{tmp_path / 'live'}")
+    # The connect timeout does not limit the time to compute the response
+    live.set_timeout(1)
+
+    query = "GET hosts\nColumns: name"
+    assert (list(live.iter_query(query)) if iterate else live.query(query)) == [["host1"]]
+    assert len(queries) == 1
+
+
+@pytest.mark.parametrize("iterate", [False, True])
+def test_single_site_connection_content_timeout(
+    tmp_path: Path, monkeypatch: MonkeyPatch, iterate: bool
+) -> None:
+    monkeypatch.setattr("cmk.livestatus_client._CONTENT_TIMEOUT", 0.3)
+    queries = _serve_response(tmp_path / "live", [["host1"]], 0.0, content_delay=1.0)
+    live = livestatus.SingleSiteConnection(f"unix:{tmp_path / 'live'}")
+
+    query = "GET hosts\nColumns: name"
+    with pytest.raises(livestatus.MKLivestatusSocketError):
+        _rows = list(live.iter_query(query)) if iterate else live.query(query)
+    # Give a query sent again the time to arrive
+    time.sleep(0.2)
+    assert len(queries) == 1
+
+
 def test_livestatus_ipv4_connection() -> None:
     with closing(socket.socket(socket.AF_INET)) as sock:
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)